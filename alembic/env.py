@@ -25,7 +25,10 @@ sys.path.insert(
 from app.db.base_class import Base  # noqa
 from app.db.functions import (
     cms_content_tsvector_update,
+    notify_cms_content_changed_function,
     notify_flow_event_function,
+    notify_reference_data_changed_function,
+    notify_webhook_subscriptions_changed_function,
     public_encode_uri_component,
     refresh_search_view_v1_function,
     refresh_work_collection_frequency_view_function,
@@ -34,10 +37,16 @@ from app.db.functions import (
     update_edition_title_from_work,
 )
 from app.db.triggers import (
+    cms_content_changed_trigger,
     cms_content_tsvector_trigger,
     conversation_sessions_notify_flow_event_trigger,
+    countries_reference_data_changed_trigger,
     editions_update_edition_title_trigger,
+    hues_reference_data_changed_trigger,
+    products_reference_data_changed_trigger,
+    reading_abilities_reference_data_changed_trigger,
     update_collections_trigger,
+    webhook_subscriptions_changed_trigger,
     works_update_edition_title_from_work_trigger,
 )
 from app.db.views import collection_frequency_view, search_view_v1
@@ -53,6 +62,9 @@ register_entities(
         public_encode_uri_component,
         cms_content_tsvector_update,
         notify_flow_event_function,
+        notify_webhook_subscriptions_changed_function,
+        notify_cms_content_changed_function,
+        notify_reference_data_changed_function,
         # Views
         collection_frequency_view,
         search_view_v1,
@@ -62,6 +74,12 @@ register_entities(
         cms_content_tsvector_trigger,
         conversation_sessions_notify_flow_event_trigger,
         update_collections_trigger,
+        webhook_subscriptions_changed_trigger,
+        cms_content_changed_trigger,
+        hues_reference_data_changed_trigger,
+        reading_abilities_reference_data_changed_trigger,
+        countries_reference_data_changed_trigger,
+        products_reference_data_changed_trigger,
     ]
 )
 
@@ -0,0 +1,52 @@
+"""
+Add webhook subscription version sequence and change notification trigger
+
+Revision ID: 4f1d2a8c6e53
+Revises: b7e3c1a94d20
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "4f1d2a8c6e53"
+down_revision = "b7e3c1a94d20"
+branch_labels = None
+depends_on = None
+
+
+notify_webhook_subscriptions_changed = PGFunction(
+    schema="public",
+    signature="notify_webhook_subscriptions_changed()",
+    definition=(
+        "returns trigger LANGUAGE plpgsql\n      AS $function$\n        BEGIN\n        PERFORM pg_notify(\n            'webhook_subscriptions',\n            nextval('webhook_subscriptions_version_seq')::text\n        );\n        RETURN NULL;\n      END;\n      $function$\n    "
+    ),
+)
+
+webhook_subscriptions_changed_trigger = PGTrigger(
+    schema="public",
+    signature="webhook_subscriptions_changed_trigger",
+    on_entity="public.webhook_subscriptions",
+    is_constraint=False,
+    definition=(
+        "AFTER INSERT OR UPDATE OF status, flow_id, event_types, url, secret, "
+        "headers, timeout_seconds, max_retries OR DELETE OR TRUNCATE "
+        "ON public.webhook_subscriptions FOR EACH STATEMENT EXECUTE FUNCTION "
+        "notify_webhook_subscriptions_changed()"
+    ),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE webhook_subscriptions_version_seq")
+    op.create_entity(notify_webhook_subscriptions_changed)
+    op.create_entity(webhook_subscriptions_changed_trigger)
+
+
+def downgrade() -> None:
+    op.drop_entity(webhook_subscriptions_changed_trigger)
+    op.drop_entity(notify_webhook_subscriptions_changed)
+    op.execute("DROP SEQUENCE webhook_subscriptions_version_seq")
@@ -0,0 +1,52 @@
+"""
+Add CMS content version sequence and change notification trigger
+
+Revision ID: 9c2e7b4d1a06
+Revises: 4f1d2a8c6e53
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9c2e7b4d1a06"
+down_revision = "4f1d2a8c6e53"
+branch_labels = None
+depends_on = None
+
+
+notify_cms_content_changed = PGFunction(
+    schema="public",
+    signature="notify_cms_content_changed()",
+    definition=(
+        "returns trigger LANGUAGE plpgsql\n      AS $function$\n        BEGIN\n        PERFORM pg_notify(\n            'cms_content',\n            nextval('cms_content_version_seq')::text\n        );\n        RETURN NULL;\n      END;\n      $function$\n    "
+    ),
+)
+
+cms_content_changed_trigger = PGTrigger(
+    schema="public",
+    signature="cms_content_changed_trigger",
+    on_entity="public.cms_content",
+    is_constraint=False,
+    definition=(
+        "AFTER INSERT OR UPDATE OF type, info, tags, is_active, school_id, "
+        "visibility OR DELETE OR TRUNCATE ON public.cms_content "
+        "FOR EACH STATEMENT EXECUTE FUNCTION "
+        "notify_cms_content_changed()"
+    ),
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE cms_content_version_seq")
+    op.create_entity(notify_cms_content_changed)
+    op.create_entity(cms_content_changed_trigger)
+
+
+def downgrade() -> None:
+    op.drop_entity(cms_content_changed_trigger)
+    op.drop_entity(notify_cms_content_changed)
+    op.execute("DROP SEQUENCE cms_content_version_seq")
@@ -0,0 +1,31 @@
+"""
+Add cover image dimensions, placeholder and variants to editions
+
+Revision ID: b7d3e9a1c524
+Revises: e8b4c2f6a913
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7d3e9a1c524"
+down_revision = "e8b4c2f6a913"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "editions",
+        sa.Column(
+            "cover_image", postgresql.JSONB(astext_type=sa.Text()), nullable=True
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("editions", "cover_image")
@@ -0,0 +1,265 @@
+"""partition conversation_history and flow_execution_steps by time
+
+Revision ID: b7e3c1a94d20
+Revises: 3252097e86db
+Create Date: 2026-10-18 09:12:44.118203
+
+Converts both tables to declarative range partitioning so retention can drop
+whole partitions instead of deleting rows:
+
+- conversation_history: monthly partitions on created_at
+- flow_execution_steps: daily partitions on started_at
+
+The partition key must be part of the primary key, so both primary keys become
+(id, <timestamp>). Existing rows are copied into partitions covering their
+range. A DEFAULT partition catches anything outside the pre-created ranges.
+Ongoing partition creation is handled by app.services.partition_maintenance.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b7e3c1a94d20"
+down_revision = "3252097e86db"
+branch_labels = None
+depends_on = None
+
+
+def _next_start(start: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def _rename_primary_key(table: str, new_name: str):
+    """Move the primary key name out of the way so the new table can reuse it."""
+    conn = op.get_bind()
+    name = conn.execute(
+        sa.text(
+            "SELECT conname FROM pg_constraint "
+            "WHERE conrelid = CAST(:table AS regclass) AND contype = 'p'"
+        ),
+        {"table": table},
+    ).scalar()
+    if name:
+        op.execute(f'ALTER TABLE {table} RENAME CONSTRAINT "{name}" TO {new_name}')
+
+
+def _create_partitions(
+    table: str, column: str, interval: str, premake: int, utc_offset: str = ""
+):
+    """Create range partitions from the oldest legacy row until `premake` ahead."""
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text(f"SELECT MIN({column}) FROM {table}_legacy")).scalar()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if oldest is not None and oldest.tzinfo is not None:
+        oldest = oldest.astimezone(timezone.utc).replace(tzinfo=None)
+    start = (oldest or now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "month":
+        start = start.replace(day=1)
+    end = now
+    for _ in range(premake + 1):
+        end = _next_start(end, interval)
+
+    suffix_format = "%Y%m%d" if interval == "day" else "%Y%m"
+    while start < end:
+        stop = _next_start(start, interval)
+        op.execute(
+            f"CREATE TABLE {table}_p{start.strftime(suffix_format)} "
+            f"PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}{utc_offset}') "
+            f"TO ('{stop.isoformat()}{utc_offset}')"
+        )
+        start = stop
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def upgrade():
+    # conversation_history
+    op.execute("ALTER TABLE conversation_history RENAME TO conversation_history_legacy")
+    _rename_primary_key("conversation_history_legacy", "pk_conversation_history_legacy")
+    op.drop_index(
+        "ix_conversation_history_created_at", table_name="conversation_history_legacy"
+    )
+    op.drop_index(
+        "ix_conversation_history_session_id", table_name="conversation_history_legacy"
+    )
+    op.execute("""
+        CREATE TABLE conversation_history (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            session_id UUID NOT NULL,
+            node_id VARCHAR(255) NOT NULL,
+            interaction_type enum_interaction_type NOT NULL,
+            content JSONB NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            CONSTRAINT pk_conversation_history PRIMARY KEY (id, created_at),
+            CONSTRAINT fk_history_session FOREIGN KEY (session_id)
+                REFERENCES conversation_sessions (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.create_index(
+        "ix_conversation_history_created_at", "conversation_history", ["created_at"]
+    )
+    op.create_index(
+        "ix_conversation_history_session_id", "conversation_history", ["session_id"]
+    )
+    _create_partitions("conversation_history", "created_at", "month", premake=3)
+    op.execute(
+        "INSERT INTO conversation_history SELECT * FROM conversation_history_legacy"
+    )
+    op.drop_table("conversation_history_legacy")
+
+    # flow_execution_steps
+    op.execute("ALTER TABLE flow_execution_steps RENAME TO flow_execution_steps_legacy")
+    _rename_primary_key("flow_execution_steps_legacy", "pk_flow_execution_steps_legacy")
+    for index_name in (
+        "ix_flow_execution_steps_session_id",
+        "ix_flow_execution_steps_node_id",
+        "ix_flowexecutionsteps_session_id_step_number",
+        "ix_flowexecutionsteps_session_id_started_at",
+        "ix_flowexecutionsteps_session_id_node_id",
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute("""
+        CREATE TABLE flow_execution_steps (
+            id UUID NOT NULL DEFAULT gen_random_uuid(),
+            session_id UUID NOT NULL,
+            node_id VARCHAR(255) NOT NULL,
+            node_type VARCHAR(50) NOT NULL,
+            step_number INTEGER NOT NULL,
+            state_before JSONB NOT NULL DEFAULT '{}'::jsonb,
+            state_after JSONB NOT NULL DEFAULT '{}'::jsonb,
+            execution_details JSONB NOT NULL DEFAULT '{}'::jsonb,
+            connection_type VARCHAR(50),
+            next_node_id VARCHAR(255),
+            started_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            completed_at TIMESTAMP WITH TIME ZONE,
+            duration_ms INTEGER,
+            error_message TEXT,
+            error_details JSONB,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            CONSTRAINT pk_flow_execution_steps PRIMARY KEY (id, started_at),
+            CONSTRAINT fk_exec_step_session FOREIGN KEY (session_id)
+                REFERENCES conversation_sessions (id) ON DELETE CASCADE
+        ) PARTITION BY RANGE (started_at)
+    """)
+    op.create_index(
+        "ix_flow_execution_steps_session_id", "flow_execution_steps", ["session_id"]
+    )
+    op.create_index(
+        "ix_flow_execution_steps_node_id", "flow_execution_steps", ["node_id"]
+    )
+    op.create_index(
+        "ix_flowexecutionsteps_session_id_step_number",
+        "flow_execution_steps",
+        ["session_id", "step_number"],
+    )
+    op.create_index(
+        "ix_flowexecutionsteps_session_id_started_at",
+        "flow_execution_steps",
+        ["session_id", "started_at"],
+        postgresql_where=sa.text("completed_at IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_flowexecutionsteps_session_id_node_id",
+        "flow_execution_steps",
+        ["session_id", "node_id"],
+        postgresql_where=sa.text("error_message IS NOT NULL"),
+    )
+    _create_partitions(
+        "flow_execution_steps", "started_at", "day", premake=14, utc_offset="+00:00"
+    )
+    op.execute("""
+        INSERT INTO flow_execution_steps (
+            id, session_id, node_id, node_type, step_number, state_before,
+            state_after, execution_details, connection_type, next_node_id,
+            started_at, completed_at, duration_ms, error_message, error_details,
+            created_at
+        )
+        SELECT
+            id, session_id, node_id, node_type, step_number, state_before,
+            state_after, execution_details, connection_type, next_node_id,
+            started_at, completed_at, duration_ms, error_message, error_details,
+            created_at
+        FROM flow_execution_steps_legacy
+    """)
+    op.drop_table("flow_execution_steps_legacy")
+
+
+def downgrade():
+    # flow_execution_steps
+    op.execute("ALTER TABLE flow_execution_steps RENAME TO flow_execution_steps_part")
+    _rename_primary_key("flow_execution_steps_part", "pk_flow_execution_steps_part")
+    for index_name in (
+        "ix_flow_execution_steps_session_id",
+        "ix_flow_execution_steps_node_id",
+        "ix_flowexecutionsteps_session_id_step_number",
+        "ix_flowexecutionsteps_session_id_started_at",
+        "ix_flowexecutionsteps_session_id_node_id",
+    ):
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute("""
+        CREATE TABLE flow_execution_steps (
+            LIKE flow_execution_steps_part INCLUDING DEFAULTS,
+            CONSTRAINT pk_flow_execution_steps PRIMARY KEY (id),
+            CONSTRAINT fk_exec_step_session FOREIGN KEY (session_id)
+                REFERENCES conversation_sessions (id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "INSERT INTO flow_execution_steps SELECT * FROM flow_execution_steps_part"
+    )
+    op.execute("DROP TABLE flow_execution_steps_part CASCADE")
+    op.create_index(
+        "ix_flow_execution_steps_session_id", "flow_execution_steps", ["session_id"]
+    )
+    op.create_index(
+        "ix_flow_execution_steps_node_id", "flow_execution_steps", ["node_id"]
+    )
+    op.create_index(
+        "ix_flowexecutionsteps_session_id_step_number",
+        "flow_execution_steps",
+        ["session_id", "step_number"],
+    )
+    op.create_index(
+        "ix_flowexecutionsteps_session_id_started_at",
+        "flow_execution_steps",
+        ["session_id", "started_at"],
+        postgresql_where=sa.text("completed_at IS NOT NULL"),
+    )
+    op.create_index(
+        "ix_flowexecutionsteps_session_id_node_id",
+        "flow_execution_steps",
+        ["session_id", "node_id"],
+        postgresql_where=sa.text("error_message IS NOT NULL"),
+    )
+
+    # conversation_history
+    op.execute("ALTER TABLE conversation_history RENAME TO conversation_history_part")
+    _rename_primary_key("conversation_history_part", "pk_conversation_history_part")
+    op.execute("DROP INDEX IF EXISTS ix_conversation_history_created_at")
+    op.execute("DROP INDEX IF EXISTS ix_conversation_history_session_id")
+    op.execute("""
+        CREATE TABLE conversation_history (
+            LIKE conversation_history_part INCLUDING DEFAULTS,
+            CONSTRAINT pk_conversation_history PRIMARY KEY (id),
+            CONSTRAINT fk_history_session FOREIGN KEY (session_id)
+                REFERENCES conversation_sessions (id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "INSERT INTO conversation_history SELECT * FROM conversation_history_part"
+    )
+    op.execute("DROP TABLE conversation_history_part CASCADE")
+    op.create_index(
+        "ix_conversation_history_created_at", "conversation_history", ["created_at"]
+    )
+    op.create_index(
+        "ix_conversation_history_session_id", "conversation_history", ["session_id"]
+    )
@@ -0,0 +1,61 @@
+"""
+Add reference data version sequence and change notification triggers
+
+Revision ID: c3a7e5d2f814
+Revises: b7d3e9a1c524
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic_utils.pg_function import PGFunction
+from alembic_utils.pg_trigger import PGTrigger
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3a7e5d2f814"
+down_revision = "b7d3e9a1c524"
+branch_labels = None
+depends_on = None
+
+
+notify_reference_data_changed = PGFunction(
+    schema="public",
+    signature="notify_reference_data_changed()",
+    definition=(
+        "returns trigger LANGUAGE plpgsql\n      AS $function$\n        BEGIN\n        PERFORM pg_notify(\n            'reference_data',\n            nextval('reference_data_version_seq')::text\n        );\n        RETURN NULL;\n      END;\n      $function$\n    "
+    ),
+)
+
+
+def _reference_data_changed_trigger(table: str) -> PGTrigger:
+    return PGTrigger(
+        schema="public",
+        signature=f"{table}_reference_data_changed_trigger",
+        on_entity=f"public.{table}",
+        is_constraint=False,
+        definition=(
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.{table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION "
+            "notify_reference_data_changed()"
+        ),
+    )
+
+
+reference_data_changed_triggers = [
+    _reference_data_changed_trigger(table)
+    for table in ("hues", "reading_abilities", "countries", "products")
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE reference_data_version_seq")
+    op.create_entity(notify_reference_data_changed)
+    for trigger in reference_data_changed_triggers:
+        op.create_entity(trigger)
+
+
+def downgrade() -> None:
+    for trigger in reference_data_changed_triggers:
+        op.drop_entity(trigger)
+    op.drop_entity(notify_reference_data_changed)
+    op.execute("DROP SEQUENCE reference_data_version_seq")
@@ -0,0 +1,47 @@
+"""
+Notify CMS content changes to the content body and version
+
+Revision ID: d5a8f3e1b927
+Revises: 9c2e7b4d1a06
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic_utils.pg_trigger import PGTrigger
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d5a8f3e1b927"
+down_revision = "9c2e7b4d1a06"
+branch_labels = None
+depends_on = None
+
+
+def _cms_content_changed_trigger(columns: str) -> PGTrigger:
+    return PGTrigger(
+        schema="public",
+        signature="cms_content_changed_trigger",
+        on_entity="public.cms_content",
+        is_constraint=False,
+        definition=(
+            f"AFTER INSERT OR UPDATE OF {columns} OR DELETE OR TRUNCATE "
+            "ON public.cms_content FOR EACH STATEMENT EXECUTE FUNCTION "
+            "notify_cms_content_changed()"
+        ),
+    )
+
+
+def upgrade() -> None:
+    op.replace_entity(
+        _cms_content_changed_trigger(
+            "type, content, info, tags, is_active, version, school_id, visibility"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.replace_entity(
+        _cms_content_changed_trigger(
+            "type, info, tags, is_active, school_id, visibility"
+        )
+    )
@@ -0,0 +1,44 @@
+"""
+Add impression, engagement and conversion counters to content variants
+
+Revision ID: e8b4c2f6a913
+Revises: d5a8f3e1b927
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e8b4c2f6a913"
+down_revision = "d5a8f3e1b927"
+branch_labels = None
+depends_on = None
+
+COUNTERS = ("impressions", "engagements", "conversions")
+
+
+def upgrade() -> None:
+    for name in COUNTERS:
+        op.add_column(
+            "cms_content_variants",
+            sa.Column(
+                name, sa.BigInteger(), server_default=sa.text("0"), nullable=False
+            ),
+        )
+
+    # Carry over counts previously reported into performance_data
+    op.execute(
+        "UPDATE cms_content_variants SET "
+        + ", ".join(
+            f"{name} = CASE WHEN performance_data->>'{name}' ~ '^[0-9]+$' "
+            f"THEN (performance_data->>'{name}')::bigint ELSE 0 END"
+            for name in COUNTERS
+        )
+    )
+
+
+def downgrade() -> None:
+    for name in reversed(COUNTERS):
+        op.drop_column("cms_content_variants", name)
@@ -13,6 +13,7 @@ from structlog import get_logger
 from tenacity import retry, stop_after_delay, wait_fixed
 
 from app import crud
+from app.api.dependencies.async_db_dep import DBSessionDep
 from app.api.dependencies.security import (
     create_user_access_token,
     get_current_active_user_or_service_account,
@@ -34,6 +35,7 @@ from app.schemas.users.student import StudentDetail, StudentIdentity
 from app.schemas.users.user import UserDetail, UserInfo
 from app.schemas.users.user_create import UserCreateIn
 from app.schemas.users.wriveted_admin import WrivetedAdminDetail
+from app.services.login_recorder import get_login_recorder
 from app.services.security import TokenPayload
 from app.services.users import (
     link_parent_with_subscription_via_checkout_session,
@@ -196,9 +198,9 @@ class ClassCodeUserLogIn(BaseModel):
         422: {"description": "Invalid data"},
     },
 )
-def student_user_auth(
+async def student_user_auth(
     data: ClassCodeUserLogIn,
-    session: Session = Depends(get_session),
+    session: DBSessionDep,
 ):
     """Login to Wriveted API as a student by posting a valid username and class code.
 
@@ -212,59 +214,32 @@ def student_user_auth(
     """
     logger.debug("Processing student login request")
 
-    # Get the class by joining code or 401
-    class_group = class_group_repository.get_by_class_code(
-        session, data.class_joining_code
-    )
-    if class_group is None:
-        raise HTTPException(status_code=401, detail="Unauthorized")
-
-    logger.debug(
-        "Get the school associated with the given class group",
-        school=class_group.school,
-    )
-    school = class_group.school
-    if not school:
-        raise HTTPException(status_code=401, detail="Invalid class group")
-
-    logger.debug("Get the user by username")
-    # if the school doesn't match -> 401
-    user = crud.user.get_student_by_username_and_school_id(
-        session, username=data.username, school_id=school.id
+    # Class code -> school -> student by username, in one query. The student
+    # could have been moved to another class, or removed from a class, but we
+    # log them in anyway. No match (unknown class code, or no such student
+    # at the class's school) -> 401
+    login = await crud.user.aget_student_class_code_login(
+        session, username=data.username, class_joining_code=data.class_joining_code
     )
-    # Note the user could have been moved to another class, or removed from a class but we log them in anyway
-    if (
-        user is None
-        or user.school is not school
-        or user.type not in {UserAccountType.STUDENT, UserAccountType.PUBLIC}
-    ):
+    if login is None:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    logger.debug("Check active user and school")
-    # Check the school + user is active else 403 (difference being the server knows who you are)
-    if not user.is_active or school.state != SchoolState.ACTIVE:
-        logger.info("User active?", r=user.is_active)
-        logger.info("School active", school_state=school.state)
+    # Check the school + user is active
+    if not login.is_active or login.school_state != SchoolState.ACTIVE:
         logger.warning(
-            "Login attempt to inactive user or school", user=user, school=school
+            "Login attempt to inactive user or school",
+            user_id=login.id,
+            user_active=login.is_active,
+            school_id=login.school_id,
+            school_state=login.school_state,
         )
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    event_repository.create(
-        session=session,
-        title="User logged in",
-        description="Student logged in",
-        account=user,
-        level=EventLevel.DEBUG,
-        commit=False,
-    )
+    # The login event and last_login_at are written in batches via the outbox
+    get_login_recorder().record(login.id)
 
-    user.last_login_at = datetime.utcnow()
-    session.add(user)
-    session.commit()
     logger.debug("Generating access token")
-
-    wriveted_access_token = create_user_access_token(user)
+    wriveted_access_token = create_user_access_token(login)
 
     return {
         "access_token": wriveted_access_token,
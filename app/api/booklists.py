@@ -9,9 +9,11 @@ from structlog import get_logger
 
 from app import crud
 from app.api.common.pagination import PaginatedQueryParams
+from app.api.dependencies.async_db_dep import DBSessionDep
 from app.api.dependencies.booklist import (
+    aget_booklist_from_wriveted_id,
+    aget_public_huey_booklist_from_slug,
     get_booklist_from_wriveted_id,
-    get_public_huey_booklist_from_slug,
 )
 from app.api.dependencies.security import (
     get_active_principals,
@@ -35,7 +37,10 @@ from app.schemas.booklist import (
     BookListUpdateIn,
 )
 from app.schemas.pagination import Pagination
-from app.services.booklists import populate_booklist_object, validate_booklist_publicity
+from app.services.booklists import (
+    apopulate_booklist_object,
+    validate_booklist_publicity,
+)
 
 logger = get_logger()
 
@@ -221,7 +226,8 @@ def get_booklists(
     "/list/{booklist_identifier}",
     response_model=(BookListDetailEnriched | BookListDetail),
 )
-def get_booklist_detail(
+async def get_booklist_detail(
+    session: DBSessionDep,
     enriched: bool = Query(
         default=False,
         title="Enrich items in response",
@@ -231,11 +237,10 @@ def get_booklist_detail(
             Will grab a suitable edition if none is specified in the booklist item.
         """,
     ),
-    booklist: BookList = Permission("read", get_booklist_from_wriveted_id),
+    booklist: BookList = Permission("read", aget_booklist_from_wriveted_id),
     pagination: PaginatedQueryParams = Depends(),
-    session: Session = Depends(get_session),
 ):
-    return populate_booklist_object(booklist, session, pagination, enriched)
+    return await apopulate_booklist_object(booklist, session, pagination, enriched)
 
 
 @router.patch(
@@ -336,7 +341,8 @@ def get_public_booklists(
     "/public-list/{booklist_slug}",
     response_model=(BookListDetailEnriched | BookListDetail),
 )
-def get_public_booklist_detail(
+async def get_public_booklist_detail(
+    session: DBSessionDep,
     enriched: bool = Query(
         default=False,
         title="Enrich items in response",
@@ -346,11 +352,10 @@ def get_public_booklist_detail(
             Will grab a suitable edition if none is specified in the booklist item.
         """,
     ),
-    booklist: BookList = Depends(get_public_huey_booklist_from_slug),
+    booklist: BookList = Depends(aget_public_huey_booklist_from_slug),
     pagination: PaginatedQueryParams = Depends(),
-    session: Session = Depends(get_session),
 ):
     """
     Retrieve a public booklist.
     """
-    return populate_booklist_object(booklist, session, pagination, enriched)
+    return await apopulate_booklist_object(booklist, session, pagination, enriched)
@@ -12,7 +12,6 @@ from fastapi import (
     Response,
     Security,
 )
-from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from starlette import status
 from structlog import get_logger
@@ -29,7 +28,7 @@ from app.api.dependencies.security import (
 from app.config import get_settings
 from app.crud.cms import CRUDConversationSession
 from app.models import User
-from app.models.cms import ChatTheme, SessionStatus
+from app.models.cms import SessionStatus
 from app.repositories.chat_repository import chat_repo
 from app.schemas.cms import (
     ConversationHistoryResponse,
@@ -42,7 +41,10 @@ from app.schemas.cms import (
 )
 from app.schemas.pagination import Pagination
 from app.security.csrf import generate_csrf_token, set_secure_session_cookie
+from app.services.chat_metadata_cache import chat_metadata_cache
 from app.services.chat_runtime import FlowNotFoundError, chat_runtime
+from app.services.exceptions import SessionLockTimeoutError
+from app.services.flow_graph import flow_graph_cache
 
 logger = get_logger()
 
@@ -97,38 +99,6 @@ async def start_conversation(
             initial_state=session_data.initial_state,
         )
 
-        # Resolve school name from school_wriveted_id if not already set
-        session_state = conversation_session.state or {}
-        ctx = session_state.get("context", {})
-        school_wriveted_id = ctx.get("school_wriveted_id")
-        if school_wriveted_id and not ctx.get("school_name"):
-            try:
-                from app.repositories.school_repository import school_repository
-
-                school_obj = await school_repository.aget_by_wriveted_id_or_404(
-                    db=session, wriveted_id=school_wriveted_id
-                )
-                ctx["school_name"] = school_obj.name
-                session_state["context"] = ctx
-                await chat_repo.update_session_state(
-                    session,
-                    session_id=conversation_session.id,
-                    state_updates=session_state,
-                    expected_revision=conversation_session.revision,
-                )
-                # Refresh session to pick up updated state
-                refreshed = await chat_repo.get_session_by_id(
-                    session, conversation_session.id
-                )
-                if refreshed:
-                    conversation_session = refreshed
-            except Exception as e:
-                logger.warning(
-                    "Could not resolve school name",
-                    school_wriveted_id=school_wriveted_id,
-                    error=str(e),
-                )
-
         # Get initial node
         initial_node = await chat_runtime.get_initial_node(
             session, session_data.flow_id, conversation_session
@@ -137,39 +107,18 @@ async def start_conversation(
         # Load theme if flow has one configured
         theme_id = None
         theme_response = None
-        flow = await crud.flow.aget(session, session_data.flow_id)
-        if flow and flow.flow_data:
-            # Theme ID can be in flow_data.theme_id or info.theme_id
-            theme_id_str = flow.flow_data.get("theme_id") or flow.info.get("theme_id")
-            if theme_id_str:
-                try:
-                    theme_id = (
-                        UUID(theme_id_str)
-                        if isinstance(theme_id_str, str)
-                        else theme_id_str
-                    )
-                    # Load the theme
-                    theme_result = await session.execute(
-                        select(ChatTheme).where(
-                            ChatTheme.id == theme_id, ChatTheme.is_active.is_(True)
-                        )
-                    )
-                    theme = theme_result.scalar_one_or_none()
-                    if theme:
-                        # Return full theme object for frontend
-                        theme_response = {
-                            "id": str(theme.id),
-                            "name": theme.name,
-                            "config": theme.config,
-                            "logo_url": theme.logo_url,
-                            "avatar_url": theme.avatar_url,
-                        }
-                except (ValueError, TypeError):
-                    logger.warning(
-                        "Invalid theme_id in flow",
-                        flow_id=session_data.flow_id,
-                        theme_id=theme_id_str,
-                    )
+        compiled_flow = await flow_graph_cache.get(session, session_data.flow_id)
+        theme_id_str = compiled_flow.theme_id if compiled_flow else None
+        if theme_id_str:
+            try:
+                theme_id = UUID(theme_id_str)
+                theme_response = await chat_metadata_cache.get_theme(session, theme_id)
+            except (ValueError, TypeError):
+                logger.warning(
+                    "Invalid theme_id in flow",
+                    flow_id=session_data.flow_id,
+                    theme_id=theme_id_str,
+                )
 
         # Set secure session cookie and CSRF token
         csrf_token = generate_csrf_token()
@@ -210,7 +159,7 @@ async def start_conversation(
             next_node=initial_node,
             theme_id=theme_id,
             theme=theme_response,
-            flow_name=flow.name if flow else None,
+            flow_name=compiled_flow.name if compiled_flow else None,
         )
 
     except HTTPException:
@@ -304,6 +253,12 @@ async def interact_with_session(
             status_code=status.HTTP_409_CONFLICT,
             detail="Session state has been modified by another process",
         )
+    except SessionLockTimeoutError:
+        logger.warning("Session lock timed out", session_id=conversation_session.id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Another interaction with this session is still being processed",
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -1,9 +1,11 @@
+import asyncio
 from typing import List, Union
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Security
+from fastapi import APIRouter, Depends, HTTPException, Request, Security
 from fastapi.params import Query
 from fastapi_permissions import All, Allow, has_permission
+from pydantic import ValidationError
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from starlette import status
@@ -30,8 +32,12 @@ from app.schemas.class_group import (
     ClassGroupDetail,
     ClassGroupListResponse,
     ClassGroupUpdateIn,
+    StudentRosterEntry,
+    StudentRosterIn,
+    StudentRosterResponse,
 )
 from app.schemas.pagination import Pagination
+from app.services.class_groups import parse_student_roster_csv, provision_students
 
 logger = get_logger()
 
@@ -187,6 +193,77 @@ async def update_class(
     return updated_class
 
 
+@router.post(
+    "/class/{id}/students",
+    response_model=StudentRosterResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["students"],
+                        "properties": {
+                            "students": {
+                                "type": "array",
+                                "items": StudentRosterEntry.model_json_schema(),
+                            }
+                        },
+                    }
+                },
+                "text/csv": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def provision_class_students(
+    request: Request,
+    class_orm: ClassGroup = Permission("update", get_class_from_id),
+    school: School = Permission("update", get_school_from_class_id),
+    account=Depends(get_current_active_user_or_service_account),
+    session: Session = Depends(get_session),
+):
+    """
+    Create student accounts for a whole class roster at once.
+
+    Post either JSON (`{"students": [{"first_name": ..., "last_name_initial": ...}]}`)
+    or a CSV with a header row of `first_name` and `last_name_initial` (or
+    `last_name`). Responds with each student's username, which they sign in
+    with alongside the class joining code.
+
+    🔒 caller needs `update` permission on the class and the school.
+    """
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("text/csv"):
+            roster = StudentRosterIn(
+                students=parse_student_roster_csv(body.decode("utf-8"))
+            )
+        else:
+            roster = StudentRosterIn.model_validate_json(body)
+    except (ValidationError, UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    logger.info(
+        "Provisioning students", target_class=class_orm, count=len(roster.students)
+    )
+    try:
+        # Keep the inserts for a large roster off the event loop
+        students = await asyncio.to_thread(
+            provision_students, session, class_orm, roster.students, account=account
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return StudentRosterResponse(
+        class_group_id=class_orm.id,
+        school_id=school.wriveted_identifier,
+        join_code=class_orm.join_code,
+        students=students,
+    )
+
+
 @router.delete(
     "/class/{id}",
     response_model=ClassGroupBrief,
@@ -73,6 +73,7 @@ from app.schemas.execution_trace import (
 )
 from app.schemas.pagination import Pagination
 from app.services.cel_evaluator import evaluate_cel_expression
+from app.services.chat_metadata_cache import chat_metadata_cache
 from app.services.cms_workflow import CMSWorkflowService
 from app.services.exceptions import (
     CMSWorkflowError,
@@ -80,6 +81,7 @@ from app.services.exceptions import (
     FlowValidationError,
 )
 from app.services.execution_trace import execution_trace_service, trace_audit_service
+from app.services.flow_graph import flow_graph_cache
 from app.services.flow_service import FlowService
 from app.services.trace_cleanup import trace_cleanup_service
 
@@ -1322,6 +1324,7 @@ async def update_theme(
         setattr(theme, field, value)
 
     await session.commit()
+    chat_metadata_cache.invalidate_theme(theme_id)
     await session.refresh(theme)
 
     logger.info("Updated theme", theme_id=theme_id)
@@ -1377,6 +1380,7 @@ async def delete_theme(
 
     theme.is_active = False
     await session.commit()
+    chat_metadata_cache.invalidate_theme(theme_id)
 
     logger.info("Deleted theme (soft delete)", theme_id=theme_id)
 
@@ -1522,6 +1526,7 @@ async def configure_flow_tracing(
     flow.trace_sample_rate = int(config.sample_rate * 100)  # Store as percentage
 
     await session.commit()
+    flow_graph_cache.invalidate(flow_id)
     await session.refresh(flow)
 
     logger.info(
@@ -4,6 +4,7 @@ from fastapi import Depends, HTTPException, Path
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.api.dependencies.async_db_dep import DBSessionDep
 from app.db.session import get_session
 from app.models.booklist import BookList, ListSharingType, ListType
 from app.repositories.booklist_repository import booklist_repository
@@ -18,14 +19,23 @@ def get_booklist_from_wriveted_id(
     return booklist_repository.get_or_404(db=session, id=booklist_identifier)
 
 
-def get_public_huey_booklist_from_slug(
+async def aget_booklist_from_wriveted_id(
+    session: DBSessionDep,
+    booklist_identifier: uuid.UUID = Path(
+        ..., description="UUID representing a unique list of books"
+    ),
+):
+    return await booklist_repository.aget_or_404(db=session, id=booklist_identifier)
+
+
+async def aget_public_huey_booklist_from_slug(
+    session: DBSessionDep,
     booklist_slug: str = Path(
         ..., description="Slug representing a public Huey booklist/pseudoarticle"
     ),
-    session: Session = Depends(get_session),
 ):
-    booklist = session.scalars(
-        select(BookList).filter(BookList.slug == booklist_slug)
+    booklist = (
+        await session.scalars(select(BookList).filter(BookList.slug == booklist_slug))
     ).one_or_none()
     # obscure the 404 if the booklist exists but is not public
     if booklist is None or booklist.sharing != ListSharingType.PUBLIC:
@@ -7,14 +7,14 @@ from starlette import status
 from structlog import get_logger
 
 from app.api.common.pagination import PaginatedQueryParams
+from app.api.dependencies.async_db_dep import DBSessionDep
 from app.api.dependencies.editions import get_edition_from_isbn
 from app.api.dependencies.security import get_current_active_user_or_service_account
 from app.db.session import get_session
-from app.models import Edition
+from app.repositories.catalogue_read_repository import catalogue_read_repository
 from app.repositories.edition_repository import edition_repository
 from app.repositories.event_repository import event_repository
 from app.repositories.illustrator_repository import illustrator_repository
-from app.repositories.work_repository import work_repository
 from app.schemas import is_url
 from app.schemas.edition import (
     EditionBrief,
@@ -24,12 +24,14 @@ from app.schemas.edition import (
     KnownAndTaggedEditionCounts,
 )
 from app.schemas.illustrator import IllustratorCreateIn
+from app.services.cover_derivatives import get_cover_derivative_pipeline
 from app.services.cover_images import handle_edition_cover_image_update
 from app.services.editions import (
     compare_known_editions,
     create_missing_editions,
     get_definitive_isbn,
 )
+from app.services.object_storage import get_object_storage
 
 logger = get_logger()
 router = APIRouter(
@@ -38,24 +40,23 @@ router = APIRouter(
 
 
 @router.get("/editions", response_model=List[EditionBrief])
-def get_editions(
-    work_id: Optional[str] = Query(None, description="Filter editions by work"),
+async def get_editions(
+    session: DBSessionDep,
+    work_id: Optional[int] = Query(None, description="Filter editions by work"),
     query: Optional[str] = Query(None, description="Query string"),
     pagination: PaginatedQueryParams = Depends(),
-    session: Session = Depends(get_session),
 ):
-    if work_id is not None:
-        work = work_repository.get_or_404(session, id=work_id)
-        return work.editions[pagination.skip : pagination.skip + pagination.limit]
-    elif query is not None:
-        statement = edition_repository.get_all_query(session).where(
-            Edition.title.match(query)
-        )
-        return session.scalars(statement).all()
-    else:
-        return edition_repository.get_all(
-            session, skip=pagination.skip, limit=pagination.limit
-        )
+    if work_id is not None and not await catalogue_read_repository.awork_exists(
+        session, work_id
+    ):
+        raise HTTPException(status_code=404, detail=f"Work with id {work_id} not found")
+    return await catalogue_read_repository.aget_edition_briefs(
+        session,
+        work_id=work_id,
+        query=query,
+        skip=pagination.skip,
+        limit=pagination.limit,
+    )
 
 
 @router.post("/editions/compare", response_model=KnownAndTaggedEditionCounts)
@@ -152,14 +153,32 @@ def update_edition(
 
     # handle any provided cover image
     cover_url_data = edition_data.cover_url
-    if cover_url_data:
-        cover_url = (
-            cover_url_data
-            if is_url(cover_url_data)
-            else handle_edition_cover_image_update(edition, cover_url_data, "wriveted")
+    if cover_url_data and is_url(cover_url_data):
+        if cover_url_data != edition.cover_url:
+            # The variants were made from the old cover
+            update_data["cover_image"] = None
+    elif cover_url_data:
+        uploads = get_object_storage().batch()
+        cover_url = handle_edition_cover_image_update(
+            edition, cover_url_data, "wriveted", uploads=uploads, variants=True
         )
+        cover_images = get_cover_derivative_pipeline().collect([cover_url])
+        failed = uploads.drain()
+        if cover_url in failed:
+            raise HTTPException(
+                status_code=status.HTTP_502_BAD_GATEWAY,
+                detail="Failed to store the cover image",
+            )
         if cover_url:
             update_data["cover_url"] = cover_url
+            # Leave out the variants if any of them failed to upload
+            cover_image = None if failed else cover_images.get(cover_url)
+            update_data["cover_image"] = (
+                cover_image.model_dump(mode="json") if cover_image else None
+            )
+        else:
+            # Invalid image data, keep the current cover
+            del update_data["cover_url"]
 
     updated_edition = edition_repository.update(
         db=session, db_obj=edition, obj_in=update_data, merge_dicts=merge_dicts
@@ -4,12 +4,14 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Security
 from fastapi_permissions import has_permission
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette import status
 from structlog import get_logger
 
 from app import crud
 from app.api.common.pagination import PaginatedQueryParams
+from app.api.dependencies.async_db_dep import DBSessionDep
 from app.api.dependencies.security import (
     get_active_principals,
     get_current_active_user_or_service_account,
@@ -17,11 +19,11 @@ from app.api.dependencies.security import (
 from app.api.dependencies.user import get_and_validate_specified_user_from_body
 from app.db.session import get_session
 from app.models.event import EventLevel
+from app.models.school import School
 from app.models.service_account import ServiceAccount
 from app.models.user import User
 from app.repositories.event_repository import event_repository
 from app.repositories.school_repository import school_repository
-from app.repositories.service_account_repository import service_account_repository
 from app.schemas.events.event import EventCreateIn
 from app.schemas.events.event_detail import (
     EventDetail,
@@ -84,6 +86,7 @@ async def create(
 
 @router.get("/events", response_model=EventListsResponse)
 async def get_events(
+    session: DBSessionDep,
     query: list[str] = Query(
         None,
         description="List of query strings to match against event names",
@@ -117,7 +120,6 @@ async def get_events(
         get_current_active_user_or_service_account
     ),
     principals: List = Depends(get_active_principals),
-    session: Session = Depends(get_session),
 ):
     """
     Get a filtered and paginated list of events.
@@ -140,7 +142,7 @@ async def get_events(
 
     # At this point we know that we have either a school id, a user id or the request is from an admin
     if user_id is not None:
-        user = crud.user.get_or_404(db=session, id=user_id)
+        user = await crud.user.aget_or_404(db=session, id=user_id)
         if not has_permission(principals, "read", user):
             logger.warning(
                 "Forbidden event request due to lack of permissions to read user account"
@@ -152,16 +154,25 @@ async def get_events(
     else:
         user = None
 
-    service_account = (
-        service_account_repository.get_or_404(db=session, id=service_account_id)
-        if service_account_id
-        else None
-    )
+    if service_account_id:
+        service_account = await session.get(ServiceAccount, service_account_id)
+        if service_account is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"ServiceAccount with id {service_account_id} not found.",
+            )
+    else:
+        service_account = None
 
     if school_id is not None:
-        school = school_repository.get_by_wriveted_id_or_404(
-            db=session, wriveted_id=school_id
+        school = await session.scalar(
+            select(School).where(School.wriveted_identifier == school_id)
         )
+        if school is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"School with wriveted_id {school_id} not found.",
+            )
         if not has_permission(principals, "read", school):
             logger.warning(
                 "Forbidden event request due to to lack of read permission on school"
@@ -174,7 +185,7 @@ async def get_events(
         school = None
 
     try:
-        events = event_repository.get_all_with_optional_filters(
+        events = await event_repository.aget_details_with_optional_filters(
             session,
             query_string=query,
             match_prefix=match_prefix,
@@ -191,7 +202,9 @@ async def get_events(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
         ) from e
-    filtered_events = [e for e in events if has_permission(principals, "read", e)]
+    filtered_events = [
+        detail for detail, acl in events if has_permission(principals, "read", acl)
+    ]
     if len(filtered_events) != len(events):
         logger.info(
             f"Filtering out {len(events)-len(filtered_events)} events", account=account
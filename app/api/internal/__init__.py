@@ -1,3 +1,4 @@
+from dataclasses import asdict
 from typing import Any, List, Optional
 from uuid import UUID
 
@@ -14,7 +15,8 @@ from app.api.dependencies.async_db_dep import DBSessionDep
 
 # Import tasks router
 from app.api.internal.tasks import router as tasks_router
-from app.db.session import get_session
+from app.config import get_settings
+from app.db.session import get_async_session_maker, get_session
 from app.models.event import EventSlackChannel
 from app.repositories.service_account_repository import service_account_repository
 from app.repositories.work_repository import work_repository
@@ -28,7 +30,7 @@ from app.services.commerce import (
     send_sendgrid_email,
 )
 from app.services.events import handle_event_to_slack_alert, process_events
-from app.services.gpt import label_and_update_work
+from app.services.gpt.labelling_worker import LabellingWorker
 from app.services.hydration import hydrate_bulk
 from app.services.stripe_events import process_stripe_event
 
@@ -155,25 +157,35 @@ async def handle_generate_reading_pathways(data: GenerateReadingPathwaysPayload)
 
 
 class GenerateLabelsPayload(BaseModel):
-    work_id: int
+    work_id: Optional[int] = None
+    work_ids: List[int] = []
 
 
 @router.post("/generate-labels")
-async def handle_generate_labels(
-    data: GenerateLabelsPayload,
-    session: Session = Depends(get_session),
-):
-    logger.info("Internal API generating labels for work", work_id=data.work_id)
-    work = work_repository.get_or_404(db=session, id=data.work_id)
+async def handle_generate_labels(data: GenerateLabelsPayload):
+    work_ids = data.work_ids + ([data.work_id] if data.work_id is not None else [])
+    logger.info("Internal API generating labels for works", work_ids=work_ids)
     try:
-        await label_and_update_work(work, session)
-        logger.info(
-            "Labels generated",
-        )
+        stats = await LabellingWorker(get_async_session_maker()).run(work_ids=work_ids)
+        logger.info("Labels generated", stats=stats)
     except Exception as e:
         logger.error("Error generating labels. Ignoring.", exc_info=e)
         return {"msg": "error"}
-    return {"msg": "ok"}
+    return {"msg": "ok", "stats": asdict(stats)}
+
+
+class LabelUnlabelledWorksPayload(BaseModel):
+    max_works: Optional[int] = None
+
+
+@router.post("/generate-labels/unlabelled")
+async def handle_label_unlabelled_works(data: LabelUnlabelledWorksPayload):
+    """Label works without hues from a labelling origin, in batches."""
+    stats = await LabellingWorker(get_async_session_maker()).run(
+        max_works=data.max_works
+    )
+    logger.info("Labelled unlabelled works", stats=stats)
+    return {"msg": "ok", "stats": asdict(stats)}
 
 
 # Maintenance: Regenerate flow_data snapshots
@@ -198,6 +210,22 @@ async def regenerate_flow_snapshots(
     return {"msg": "ok", "stats": stats}
 
 
+@router.post("/partitions/maintain")
+async def maintain_partitions(session: DBSessionDep):
+    """
+    Pre-create upcoming partitions for the time-partitioned chat tables and drop
+    expired ones. Intended to be run daily by Cloud Scheduler.
+    """
+    from app.services.partition_maintenance import partition_maintenance_service
+
+    stats = await partition_maintenance_service.run_maintenance(
+        session,
+        history_retention_days=get_settings().CONVERSATION_HISTORY_RETENTION_DAYS,
+    )
+    logger.info("Partition maintenance completed", stats=stats)
+    return {"msg": "ok", "stats": stats}
+
+
 @router.post("/send-email")
 def handle_send_email(
     data: SendEmailPayload,
@@ -23,31 +23,27 @@ async def bulk_patch_labelsets(
     patches: list[LabelSetPatch],
     session: Session = Depends(get_session),
 ):
-    patched = 0
-    unknown = 0
-    errors = 0
-
-    for patch in patches:
-        work = work_repository.find_by_isbn(session, patch.isbn)
-        if not work:
-            unknown += 1
-            continue
-
-        try:
-            labelset = labelset_repository.get_or_create(session, work, False)
-            labelset = labelset_repository.patch(
-                session, labelset, patch.patch_data, False
-            )
-
-            # TODO: add to Huey's Picks booklist
-            # if patch.huey_pick:
-            #     work.booklists.append(crud.booklists.get_by_key("wriveted_hueypicks"))
-
-            session.commit()
-            patched += 1
-        except Exception as ex:
-            print(ex)
-            errors += 1
-            continue
-
-    return {"patched": patched, "unknown": unknown, "errors": errors}
+    work_ids = work_repository.get_work_ids_by_isbns(
+        session, [patch.isbn for patch in patches]
+    )
+    known = [patch for patch in patches if patch.isbn in work_ids]
+    labelsets = labelset_repository.get_or_create_many(
+        session, [work_ids[patch.isbn] for patch in known], commit=False
+    )
+
+    # TODO: add to Huey's Picks booklist
+    # if patch.huey_pick:
+    #     work.booklists.append(crud.booklists.get_by_key("wriveted_hueypicks"))
+
+    patched = labelset_repository.patch_many(
+        session,
+        [(labelsets[work_ids[patch.isbn]], patch.patch_data) for patch in known],
+        commit=True,
+        raise_errors=False,
+    )
+
+    return {
+        "patched": patched,
+        "unknown": len(patches) - len(known),
+        "errors": len(known) - patched,
+    }
@@ -162,6 +162,7 @@ async def get_recommendations_with_fallback(
             work_id=work.id,
             isbn=edition.isbn,
             cover_url=edition.cover_url,
+            cover_image=edition.cover_image,
             display_title=edition.get_display_title(),
             authors_string=work.get_authors_string(),
             summary=labelset.huey_summary,
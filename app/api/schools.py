@@ -33,6 +33,11 @@ from app.schemas.school import (
     SchoolSelectorOption,
 )
 from app.services.experiments import get_experiments
+from app.services.reference_data import (
+    ReferenceData,
+    get_reference_data,
+    reference_data_registry,
+)
 from app.utils.dict_utils import deep_merge_dicts
 
 logger = get_logger()
@@ -106,6 +111,26 @@ def _is_terms_only_patch(patch: SchoolPatchOptions, patch_info: Any) -> bool:
     return _is_terms_only_info_patch(patch_info)
 
 
+def _check_country_codes(reference: ReferenceData, schools: List[SchoolCreateIn]):
+    unknown = sorted(
+        {
+            school.country_code
+            for school in schools
+            if reference.country(school.country_code) is None
+        }
+    )
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown country code(s): {', '.join(unknown)}",
+        )
+
+
+def _country_name(reference: ReferenceData, country_code: str) -> str:
+    country = reference.country(country_code)
+    return country.name if country is not None else country_code
+
+
 @router.get(
     "/schools",
     response_model=List[SchoolSelectorOption],
@@ -342,10 +367,14 @@ async def update_school(
         )
 
     if not terms_only:
+        reference = await reference_data_registry.aget(session)
         await event_repository.acreate(
             session=session,
             title="School Updated",
-            description=f"School '{school.name}' in {school.country.name} updated.",
+            description=(
+                f"School '{school.name}' in "
+                f"{_country_name(reference, school.country_code)} updated."
+            ),
             school=school,
             account=account,
             commit=False,
@@ -371,6 +400,7 @@ async def bulk_add_schools(
     session: Session = Depends(get_session),
 ):
     """Bulk API to add schools"""
+    _check_country_codes(get_reference_data(session), schools)
 
     new_schools = [
         school_repository.create(db=session, obj_in=school_data, commit=False)
@@ -410,6 +440,7 @@ def add_school(
     ),
     session: Session = Depends(get_session),
 ):
+    _check_country_codes(get_reference_data(session), [school])
     try:
         school_orm = school_repository.create(db=session, obj_in=school, commit=False)
         school_orm.info["experiments"] = get_experiments(school=school_orm)
@@ -440,7 +471,10 @@ def delete_school(
     event_repository.create(
         session=session,
         title="School Deleted",
-        description=f"School {school.name} in {school.country.name} deleted.",
+        description=(
+            f"School {school.name} in "
+            f"{_country_name(get_reference_data(session), school.country_code)} deleted."
+        ),
         account=account,
         commit=False,
     )
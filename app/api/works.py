@@ -1,25 +1,25 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Path, Security
+from fastapi import APIRouter, Depends, HTTPException, Path, Security
 from fastapi.params import Query
 from fastapi_permissions import All, Allow, Authenticated
-from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 from structlog import get_logger
 
 from app import crud
 from app.api.common.pagination import PaginatedQueryParams
+from app.api.dependencies.async_db_dep import DBSessionDep
 from app.api.dependencies.security import (
     get_current_active_superuser_or_backend_service_account,
     get_current_active_user_or_service_account,
 )
 from app.crud.base import compare_dicts
 from app.db.session import get_session
-from app.models import Author, Work
-from app.models.edition import Edition
+from app.models import Work
 from app.models.work import WorkType
 from app.permissions import Permission
 from app.repositories.author_repository import author_repository
+from app.repositories.catalogue_read_repository import catalogue_read_repository
 from app.repositories.edition_repository import edition_repository
 from app.repositories.labelset_repository import labelset_repository
 from app.repositories.work_repository import work_repository
@@ -65,89 +65,44 @@ def get_work(
     "/works",
     response_model=List[WorkBrief],
 )
-def get_works(
+async def get_works(
+    session: DBSessionDep,
     query: Optional[str] = Query(None, description="Query string"),
     author_id: Optional[int] = Query(None, description="Author's Wriveted Id"),
     isbn: Optional[str] = Query(None, description="Isbn"),
     type: Optional[WorkType] = Query(WorkType.BOOK),
     pagination: PaginatedQueryParams = Depends(),
-    session: Session = Depends(get_session),
 ):
-    works_query = work_repository.get_all_query(session).where(Work.type == type)
-
-    if author_id is not None:
-        works_query = works_query.where(Work.authors.any(Author.id == author_id))
-
-    if query is not None:
-        works_query = works_query.where(func.lower(Work.title).contains(query.lower()))
-
-    if isbn is not None:
-        works_query = works_query.where(Work.editions.any(Edition.isbn == isbn))
-    else:
-        # Ensure there is one or more editions...
-        works_query = works_query.where(Work.editions.any())
-
-    works = (
-        session.execute(
-            work_repository.apply_pagination(
-                works_query, skip=pagination.skip, limit=pagination.limit
-            )
-        )
-        .scalars()
-        .all()
+    return await catalogue_read_repository.aget_work_briefs(
+        session,
+        type=type,
+        author_id=author_id,
+        query=query,
+        isbn=isbn,
+        skip=pagination.skip,
+        limit=pagination.limit,
     )
 
-    output = []
-    for work in works:
-        brief = {}
-        brief["id"] = work.id
-        brief["type"] = work.type
-        brief["leading_article"] = work.leading_article
-        brief["title"] = work.title
-        brief["subtitle"] = work.subtitle
-        brief["authors"] = [
-            {
-                "id": author.id,
-                "first_name": author.first_name,
-                "last_name": author.last_name,
-            }
-            for author in work.authors
-        ]
-        output.append(brief)
-
-    return output
-
 
 @router.get("/work/{work_id}", response_model=WorkDetail | WorkEnriched)
-def get_work_by_id(
-    work: Work = Depends(get_work),
+async def get_work_by_id(
+    session: DBSessionDep,
+    work_id: int = Path(
+        ...,
+        description="Identifier for a unique creative work in the Wriveted database",
+    ),
     full_detail: bool = Query(
         default=True,
         title="Full recursive detail",
         description="If enabled, will include information for each of the work's editions.",
     ),
-    session: Session = Depends(get_session),
 ):
-    if full_detail:
-        if work.info is not None and "genres" not in work.info:
-            work.info["genres"] = []
-            work.info["other"] = {}
-            session.add(work)
-            session.commit()
-        return WorkDetail.model_validate(work)
-
-    else:
-        output = WorkEnriched.model_validate(work)
-        first_edition_with_cover = session.scalar(
-            select(Edition).where(
-                and_(Edition.cover_url.isnot(None), Edition.work_id == work.id)
-            )
-        )
-        output.cover_url = (
-            first_edition_with_cover.cover_url if first_edition_with_cover else None
-        )
-
-        return output
+    work = await catalogue_read_repository.aget_work(
+        session, work_id, full_detail=full_detail
+    )
+    if work is None:
+        raise HTTPException(status_code=404, detail=f"Work with id {work_id} not found")
+    return work
 
 
 @router.post(
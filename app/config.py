@@ -1,6 +1,6 @@
 import enum
 from functools import lru_cache
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 
 from pydantic import AnyHttpUrl, DirectoryPath, HttpUrl, field_validator
 from pydantic_core.core_schema import FieldValidationInfo
@@ -27,6 +27,32 @@ class Settings(BaseSettings):
     GCP_HUEY_MEDIA_BUCKET: str = "wriveted-huey-media"
     GCP_BOOK_DATA_BUCKET: str = "wriveted-book-data"
 
+    class ObjectStorageBackend(str, enum.Enum):
+        GCS = "gcs"
+        LOCAL = "local"
+
+    # Where images and cached book data are stored. The local backend writes
+    # under OBJECT_STORAGE_LOCAL_ROOT/<bucket>/ and serves public urls from
+    # OBJECT_STORAGE_LOCAL_BASE_URL, for development, tests and benchmarks
+    OBJECT_STORAGE_BACKEND: ObjectStorageBackend = ObjectStorageBackend.GCS
+    OBJECT_STORAGE_LOCAL_ROOT: str = "/tmp/wriveted-object-storage"
+    OBJECT_STORAGE_LOCAL_BASE_URL: str = "http://localhost:8000/storage"
+    # Batched uploads (e.g. covers during bulk hydration) run in a per-process
+    # thread pool of this size. When OBJECT_STORAGE_BACKGROUND_UPLOADS is set,
+    # writes nothing in the database points at (cached API responses, deletes
+    # of replaced images) are also left to the pool. That work continues after
+    # the response, where Cloud Run may throttle the CPU, so it is off by
+    # default; image uploads made while handling a request always block
+    OBJECT_STORAGE_MAX_CONCURRENT_UPLOADS: int = 8
+    OBJECT_STORAGE_BACKGROUND_UPLOADS: bool = False
+
+    # Widths (px) of the resized WebP and JPEG variants made for each edition
+    # cover; covers are never upscaled
+    COVER_DERIVATIVE_WIDTHS: List[int] = [160, 320, 640]
+    # Worker processes rendering cover variants, 0 renders in the calling
+    # thread
+    COVER_DERIVATIVE_PROCESSES: int = 2
+
     GOOGLE_API_KEY: str = ""
     GOOGLE_CSE_ID: str = ""
 
@@ -56,6 +82,22 @@ class Settings(BaseSettings):
     # e.g. "gpt-3.5-turbo", "gpt-4", "gpt-4-1106-preview"
     OPENAI_MODEL: str = "gpt-4"
     OPENAI_TIMEOUT: float = 60.0
+    # Alternative OpenAI compatible endpoint, e.g. the stub server in
+    # app/services/gpt/stub_server.py for local runs
+    OPENAI_BASE_URL: Optional[str] = None
+
+    # Labelling worker: works per batch (one commit each), requests in
+    # flight, and the account's request and token rate limits
+    GPT_LABELLING_BATCH_SIZE: int = 50
+    GPT_LABELLING_CONCURRENCY: int = 8
+    GPT_LABELLING_REQUESTS_PER_MINUTE: int = 500
+    GPT_LABELLING_TOKENS_PER_MINUTE: int = 300_000
+    # Reserved against the token limit for each response before its actual
+    # usage is known
+    GPT_LABELLING_EXPECTED_COMPLETION_TOKENS: int = 1200
+    # Validated responses are cached in GCP_BOOK_DATA_BUCKET by prompt hash,
+    # so relabelling unchanged works costs nothing
+    GPT_LABELLING_CACHE: bool = True
 
     LABEL_AFTER_HYDRATION: bool = True
 
@@ -255,6 +297,20 @@ class Settings(BaseSettings):
 
     ENABLE_OTEL_GOOGLE_EXPORTER: bool = False
 
+    # Parent-based ratio sampling for new traces (0.0 - 1.0)
+    OTEL_TRACE_SAMPLE_RATE: float = 1.0
+    # Per-route overrides, glob pattern on the request path -> ratio.
+    # e.g. '{"/v1/chat/sessions/*/interact": 0.01}'
+    OTEL_ROUTE_SAMPLE_RATES: Dict[str, float] = {}
+    # Export spans that end in error even if their trace wasn't sampled.
+    # Unsampled traces are then still recorded in full, which costs most of
+    # what sampling saves; prefer tail sampling in the collector.
+    OTEL_ALWAYS_SAMPLE_ERRORS: bool = False
+    # Batched span export
+    OTEL_SPAN_MAX_QUEUE_SIZE: int = 2048
+    OTEL_SPAN_MAX_EXPORT_BATCH_SIZE: int = 512
+    OTEL_SPAN_SCHEDULE_DELAY_MILLIS: int = 5000
+
     # E2E Test configuration - when set, enables test auth endpoints
     # This should NEVER be set in production
     E2E_TEST_AUTH_SECRET: Optional[str] = None
@@ -263,6 +319,55 @@ class Settings(BaseSettings):
     # Set to True in test environment to skip PostgreSQL LISTEN/NOTIFY
     DISABLE_EVENT_LISTENER: bool = False
 
+    # Per-session debouncing of flow events for coalescing handlers (webhooks):
+    # node changes are held this long after the latest one, and at most
+    # FLOW_EVENT_MAX_DELAY_MS after the first, then delivered as one event
+    FLOW_EVENT_DEBOUNCE_MS: int = 250
+    FLOW_EVENT_MAX_DELAY_MS: int = 1000
+
+    # How often (seconds) each process checks whether webhook subscriptions
+    # changed, on top of the change NOTIFY received by the event listener
+    WEBHOOK_SUBSCRIPTION_REFRESH_SECONDS: float = 30.0
+
+    # How long (seconds) a process reuses a compiled flow graph (nodes and
+    # connections) before reloading it; edits made through this process
+    # invalidate it immediately
+    FLOW_GRAPH_CACHE_TTL_SECONDS: float = 60.0
+
+    # How long (seconds) a process reuses chat themes and school names when
+    # starting chat sessions; theme edits made through this process
+    # invalidate them immediately
+    CHAT_METADATA_CACHE_TTL_SECONDS: float = 300.0
+
+    # How often (seconds) each process checks whether CMS content changed and
+    # its random selection pools need reloading, on top of the change NOTIFY
+    CMS_CONTENT_POOL_REFRESH_SECONDS: float = 10.0
+
+    # How often (seconds) each process checks whether the reference tables
+    # (hues, reading abilities, countries, products) changed, on top of the
+    # change NOTIFY
+    REFERENCE_DATA_REFRESH_SECONDS: float = 300.0
+
+    # How long (seconds) a process reuses a cached CMS content body referenced
+    # by message and question nodes; content edits also drop it immediately
+    CMS_CONTENT_CACHE_TTL_SECONDS: float = 300.0
+
+    # Content variant allocation: how long (seconds) variants are cached per
+    # process, the share of traffic always split by configured weight rather
+    # than observed conversion rate, and how often counters are flushed
+    CMS_VARIANT_REFRESH_SECONDS: float = 30.0
+    CMS_VARIANT_EXPLORATION: float = 0.1
+    CMS_VARIANT_FLUSH_SECONDS: float = 10.0
+
+    # Student logins are buffered per process and written to the event outbox
+    # this often (seconds), at most this many logins per outbox event
+    LOGIN_RECORD_FLUSH_SECONDS: float = 5.0
+    LOGIN_RECORD_MAX_BATCH: int = 1000
+
+    # Days of conversation_history to keep. History is partitioned by month and
+    # whole partitions older than this are dropped; None keeps history forever.
+    CONVERSATION_HISTORY_RETENTION_DAYS: Optional[int] = None
+
     # Disable CSRF cookie validation for cross-origin development
     # When True, only validates the X-CSRF-Token header, not the cookie
     # This should only be enabled in development/debug mode
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 from uuid import UUID
 
 from fastapi import Query
@@ -12,6 +12,7 @@ from structlog import get_logger
 from app.crud import CRUDBase
 from app.crud.base import deep_merge_dicts
 from app.models import (
+    ClassGroup,
     Educator,
     Parent,
     PublicReader,
@@ -333,5 +334,47 @@ class CRUDUser(CRUDBase[User, UserCreateIn, UserUpdateIn]):
         )
         return db.execute(q).scalar_one_or_none()
 
+    async def aget_student_class_code_login(
+        self, db: AsyncSession, username: str, class_joining_code: str
+    ):
+        """
+        Look up a class-code login in one query: the class's school, and the
+        student with that username at the school (who may have since moved
+        class). Returns a row of ``id``, ``is_active``, ``school_id`` and
+        ``school_state``, or None.
+        """
+        q = (
+            select(
+                Student.id,
+                Student.is_active,
+                School.id.label("school_id"),
+                School.state.label("school_state"),
+            )
+            .join(School, Student.school_id == School.id)
+            .join(ClassGroup, ClassGroup.school_id == School.wriveted_identifier)
+            .where(
+                and_(
+                    ClassGroup.join_code == class_joining_code,
+                    func.lower(Student.username) == username.lower(),
+                )
+            )
+        )
+        return (await db.execute(q)).first()
+
+    def get_claimed_student_usernames(
+        self, db: Session, usernames: Iterable[str], school_id: int
+    ) -> set[str]:
+        """Return the lowercased subset of `usernames` already taken at the school."""
+        lowered = {username.lower() for username in usernames}
+        if not lowered:
+            return set()
+        q = select(func.lower(Student.username)).where(
+            and_(
+                func.lower(Student.username).in_(lowered),
+                Student.school_id == school_id,
+            )
+        )
+        return set(db.scalars(q))
+
 
 user = CRUDUser(User)
@@ -144,6 +144,60 @@ notify_flow_event_function = PGFunction(
     """,
 )
 
+# Bumps the webhook subscription version and tells API processes to rebuild
+# their in-memory routing index
+notify_webhook_subscriptions_changed_function = PGFunction(
+    schema="public",
+    signature="notify_webhook_subscriptions_changed()",
+    definition="""returns trigger LANGUAGE plpgsql
+      AS $function$
+        BEGIN
+        PERFORM pg_notify(
+            'webhook_subscriptions',
+            nextval('webhook_subscriptions_version_seq')::text
+        );
+        RETURN NULL;
+      END;
+      $function$
+    """,
+)
+
+# Bumps the CMS content version and tells API processes to drop their
+# in-memory random selection pools
+notify_cms_content_changed_function = PGFunction(
+    schema="public",
+    signature="notify_cms_content_changed()",
+    definition="""returns trigger LANGUAGE plpgsql
+      AS $function$
+        BEGIN
+        PERFORM pg_notify(
+            'cms_content',
+            nextval('cms_content_version_seq')::text
+        );
+        RETURN NULL;
+      END;
+      $function$
+    """,
+)
+
+# Bumps the reference data version and tells API processes to reload their
+# in-memory hues, reading abilities, countries and products
+notify_reference_data_changed_function = PGFunction(
+    schema="public",
+    signature="notify_reference_data_changed()",
+    definition="""returns trigger LANGUAGE plpgsql
+      AS $function$
+        BEGIN
+        PERFORM pg_notify(
+            'reference_data',
+            nextval('reference_data_version_seq')::text
+        );
+        RETURN NULL;
+      END;
+      $function$
+    """,
+)
+
 # Full-text search maintenance for CMS content
 cms_content_tsvector_update = PGFunction(
     schema="public",
@@ -0,0 +1,16 @@
+"""Read version sequences that are advanced by change notification triggers."""
+
+from sqlalchemy import Sequence, text
+from sqlalchemy.sql.elements import TextClause
+
+
+def sequence_version_query(sequence: Sequence) -> TextClause:
+    """Select how many times ``nextval`` has been called on ``sequence``.
+
+    ``last_value`` alone reads 1 both before and after the first ``nextval``,
+    so the first change would go unnoticed; ``is_called`` tells them apart.
+    """
+    return text(
+        "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END "
+        f"FROM {sequence.name}"
+    )
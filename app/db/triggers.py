@@ -1,6 +1,11 @@
 from alembic_utils.pg_trigger import PGTrigger
 
-from app.db.functions import cms_content_tsvector_update
+from app.db.functions import (
+    cms_content_tsvector_update,
+    notify_cms_content_changed_function,
+    notify_reference_data_changed_function,
+    notify_webhook_subscriptions_changed_function,
+)
 
 editions_update_edition_title_trigger = PGTrigger(
     schema="public",
@@ -72,6 +77,21 @@ conversation_sessions_notify_flow_event_trigger = PGTrigger(
                   FOR EACH ROW EXECUTE FUNCTION notify_flow_event()""",
 )
 
+# Only routing columns are listed so delivery health updates don't invalidate
+# the routing index
+webhook_subscriptions_changed_trigger = PGTrigger(
+    schema="public",
+    signature="webhook_subscriptions_changed_trigger",
+    on_entity="public.webhook_subscriptions",
+    is_constraint=False,
+    definition=(
+        "AFTER INSERT OR UPDATE OF status, flow_id, event_types, url, secret, "
+        "headers, timeout_seconds, max_retries OR DELETE OR TRUNCATE "
+        "ON public.webhook_subscriptions FOR EACH STATEMENT EXECUTE FUNCTION "
+        f"{notify_webhook_subscriptions_changed_function.signature}"
+    ),
+)
+
 # Trigger to update collection timestamps when items change
 update_collections_trigger = PGTrigger(
     schema="public",
@@ -92,3 +112,42 @@ cms_content_tsvector_trigger = PGTrigger(
         f"{cms_content_tsvector_update.signature}"
     ),
 )
+
+# Only columns used for random content selection and message rendering are
+# listed, so workflow bookkeeping (status, search document) doesn't invalidate
+# the in-memory content pools and caches
+cms_content_changed_trigger = PGTrigger(
+    schema="public",
+    signature="cms_content_changed_trigger",
+    on_entity="public.cms_content",
+    is_constraint=False,
+    definition=(
+        "AFTER INSERT OR UPDATE OF type, content, info, tags, is_active, version, "
+        "school_id, visibility OR DELETE OR TRUNCATE ON public.cms_content "
+        "FOR EACH STATEMENT EXECUTE FUNCTION "
+        f"{notify_cms_content_changed_function.signature}"
+    ),
+)
+
+
+def _reference_data_changed_trigger(table: str) -> PGTrigger:
+    return PGTrigger(
+        schema="public",
+        signature=f"{table}_reference_data_changed_trigger",
+        on_entity=f"public.{table}",
+        is_constraint=False,
+        definition=(
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.{table} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION "
+            f"{notify_reference_data_changed_function.signature}"
+        ),
+    )
+
+
+# The in-memory reference data is reloaded whenever any of these change
+hues_reference_data_changed_trigger = _reference_data_changed_trigger("hues")
+reading_abilities_reference_data_changed_trigger = _reference_data_changed_trigger(
+    "reading_abilities"
+)
+countries_reference_data_changed_trigger = _reference_data_changed_trigger("countries")
+products_reference_data_changed_trigger = _reference_data_changed_trigger("products")
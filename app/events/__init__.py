@@ -1,39 +1,35 @@
 """
 Event system initialization and management.
 
-This module provides startup and shutdown handlers for the PostgreSQL event listener
-and webhook notification system.
+This module provides startup and shutdown handlers for the PostgreSQL event listener,
+the webhook notification system and the process-wide services they share.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Awaitable, Callable
 
 from fastapi import FastAPI
 
 from app.config import get_settings
+from app.services.cms_content_cache import cms_content_cache
+from app.services.cms_content_pool import CMS_CONTENT_CHANNEL, cms_content_pools
+from app.services.content_variants import get_content_variant_allocator
+from app.services.cover_derivatives import get_cover_derivative_pipeline
 from app.services.event_listener import get_event_listener, register_default_handlers
+from app.services.flow_webhook_service import get_flow_webhook_service
+from app.services.login_recorder import get_login_recorder
+from app.services.object_storage import get_object_storage
+from app.services.reference_data import REFERENCE_DATA_CHANNEL, reference_data_registry
 from app.services.webhook_notifier import get_webhook_notifier, webhook_event_handler
+from app.services.webhook_subscription_index import WEBHOOK_SUBSCRIPTIONS_CHANNEL
 
 logger = logging.getLogger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    """
-    FastAPI lifespan context manager for event system startup and shutdown.
-
-    This handles the PostgreSQL event listener lifecycle during application startup/shutdown.
-    """
-    settings = get_settings()
-
-    # Skip event system if disabled (e.g., in tests)
-    if settings.DISABLE_EVENT_LISTENER:
-        logger.info("Event listener disabled via DISABLE_EVENT_LISTENER setting")
-        yield
-        return
-
-    # Startup
+async def start_event_system() -> None:
+    """Start the PostgreSQL event listener and the handlers fed by it."""
     logger.info("Starting event system...")
 
     try:
@@ -46,36 +42,124 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         # Register default event handlers
         register_default_handlers(event_listener)
 
-        # Register webhook notification handler for all events
-        event_listener.register_handler("*", webhook_event_handler)
+        # Register webhook notification handler for all events, debounced per
+        # session so bursts of node changes become a single notification
+        event_listener.register_handler("*", webhook_event_handler, coalesce=True)
 
         # Start listening for PostgreSQL notifications
         await event_listener.start_listening()
 
-        logger.info("Event system started successfully")
+        # Rebuild the webhook routing index when subscriptions change
+        await event_listener.add_channel_listener(
+            WEBHOOK_SUBSCRIPTIONS_CHANNEL,
+            get_flow_webhook_service().subscription_index.handle_notification,
+        )
+
+        # Drop random content selection pools and cached content bodies when
+        # content changes
+        await event_listener.add_channel_listener(
+            CMS_CONTENT_CHANNEL, cms_content_pools.handle_notification
+        )
+        await event_listener.add_channel_listener(
+            CMS_CONTENT_CHANNEL, cms_content_cache.handle_notification
+        )
+
+        # Reload hues, reading abilities, countries and products when they
+        # change
+        await event_listener.add_channel_listener(
+            REFERENCE_DATA_CHANNEL, reference_data_registry.handle_notification
+        )
 
-        yield
+        logger.info("Event system started successfully")
 
     except Exception as e:
         logger.error(f"Failed to start event system: {e}")
-        yield
 
-    finally:
-        # Shutdown
-        logger.info("Shutting down event system...")
 
-        try:
-            event_listener = get_event_listener()
-            webhook_notifier = get_webhook_notifier()
+async def stop_event_system() -> None:
+    """Stop the PostgreSQL event listener and the webhook notifier."""
+    logger.info("Shutting down event system...")
+    event_listener = get_event_listener()
+    await _shut_down("event listener", event_listener.stop_listening)
+    await _shut_down("event listener connection", event_listener.disconnect)
+    await _shut_down("webhook notifier", get_webhook_notifier().shutdown)
+
+
+async def preload_reference_data() -> None:
+    """Load hues, reading abilities, countries and products before the first request."""
+    try:
+        await reference_data_registry.preload()
+    except Exception as e:
+        # Lookups load it on first use instead
+        logger.warning(f"Failed to preload reference data: {e}")
+
+
+async def shut_down_services() -> None:
+    """
+    Flush and stop the process-wide services.
+
+    Buffered variant counters and logins are written out, and in-flight
+    cover renders and background uploads are left to finish. Each service
+    is shut down even if another one fails.
+    """
+    await _shut_down(
+        "content variant allocator", get_content_variant_allocator().shutdown
+    )
+    await _shut_down("login recorder", get_login_recorder().shutdown)
+    await _shut_down(
+        "cover derivative pipeline",
+        lambda: asyncio.to_thread(get_cover_derivative_pipeline().shutdown),
+    )
+    await _shut_down(
+        "object storage", lambda: asyncio.to_thread(get_object_storage().shutdown)
+    )
+
+
+async def _shut_down(name: str, shutdown: Callable[[], Awaitable[Any]]) -> None:
+    try:
+        await shutdown()
+    except Exception as e:
+        logger.error(f"Error shutting down {name}: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """
+    FastAPI lifespan context manager for the public API.
+
+    Starts the PostgreSQL event listener unless ``DISABLE_EVENT_LISTENER`` is
+    set. Reference data is preloaded and the shared services are shut down
+    either way, so buffered writes aren't lost when the listener is off.
+    """
+    settings = get_settings()
+
+    if settings.DISABLE_EVENT_LISTENER:
+        logger.info("Event listener disabled via DISABLE_EVENT_LISTENER setting")
+    else:
+        await start_event_system()
+    await preload_reference_data()
+
+    try:
+        yield
+    finally:
+        if not settings.DISABLE_EVENT_LISTENER:
+            await stop_event_system()
+        await shut_down_services()
 
-            await event_listener.stop_listening()
-            await event_listener.disconnect()
-            await webhook_notifier.shutdown()
 
-            logger.info("Event system shut down successfully")
+@asynccontextmanager
+async def internal_lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    """
+    FastAPI lifespan context manager for the internal API.
 
-        except Exception as e:
-            logger.error(f"Error during event system shutdown: {e}")
+    The internal API doesn't listen for events, but shares the process-wide
+    services and reference data with the handlers it runs.
+    """
+    await preload_reference_data()
+    try:
+        yield
+    finally:
+        await shut_down_services()
 
 
 def setup_event_handlers(app: FastAPI) -> None:
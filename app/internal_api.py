@@ -10,6 +10,7 @@ from structlog import get_logger
 
 from app.api.internal import router as internal_api_router
 from app.config import get_settings
+from app.events import internal_lifespan
 from app.logging import init_logging, init_tracing
 
 api_docs = textwrap.dedent(
@@ -41,6 +42,7 @@ internal_app = FastAPI(
     description=api_docs,
     docs_url="/v1/docs",
     redoc_url="/v1/redoc",
+    lifespan=internal_lifespan,
 )
 
 init_tracing(internal_app, settings)
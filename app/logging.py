@@ -1,10 +1,12 @@
 import logging
 import logging.config
-from typing import List
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Sequence
 
 import structlog
 import uvicorn
 from opentelemetry import trace
+from opentelemetry.context import Context
 from opentelemetry.exporter.cloud_trace import CloudTraceSpanExporter
 from opentelemetry.instrumentation.asyncpg import AsyncPGInstrumentor
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
@@ -12,25 +14,193 @@ from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from opentelemetry.instrumentation.psycopg2 import Psycopg2Instrumentor
 from opentelemetry.propagate import set_global_textmap
 from opentelemetry.propagators.cloud_trace_propagator import CloudTraceFormatPropagator
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter
+from opentelemetry.sdk.trace.sampling import (
+    Decision,
+    ParentBased,
+    Sampler,
+    SamplingResult,
+    TraceIdRatioBased,
+)
+from opentelemetry.trace import Link, SpanContext, SpanKind, StatusCode, TraceFlags
+from opentelemetry.util.types import Attributes
 
 from app.config import Settings
 
 
-def init_tracing(app, settings: Settings):
-    trace.set_tracer_provider(TracerProvider())
+class RouteRatioSampler(Sampler):
+    """Trace ID ratio sampler with per-route rate overrides for root spans.
+
+    ``route_rates`` maps glob patterns (matched against the request path, e.g.
+    ``/v1/chat/sessions/*/interact``) to a sampling ratio. The first matching
+    pattern wins, otherwise ``default_rate`` applies.
+
+    When ``record_unsampled`` is set, traces that lose the ratio draw are still
+    recorded (but not exported) so that ``ErrorSpanProcessor`` can export
+    spans that end in error.
+    """
+
+    def __init__(
+        self,
+        default_rate: float,
+        route_rates: Optional[Dict[str, float]] = None,
+        record_unsampled: bool = False,
+    ):
+        self._default = TraceIdRatioBased(default_rate)
+        self._routes = [
+            (pattern, TraceIdRatioBased(rate))
+            for pattern, rate in (route_rates or {}).items()
+        ]
+        self._record_unsampled = record_unsampled
+
+    def _sampler_for(self, attributes: Attributes) -> Sampler:
+        path = (attributes or {}).get("http.target") or (attributes or {}).get(
+            "url.path"
+        )
+        if isinstance(path, str):
+            path = path.split("?", 1)[0]
+            for pattern, sampler in self._routes:
+                if fnmatchcase(path, pattern):
+                    return sampler
+        return self._default
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state=None,
+    ) -> SamplingResult:
+        result = self._sampler_for(attributes).should_sample(
+            parent_context, trace_id, name, kind, attributes, links, trace_state
+        )
+        if result.decision == Decision.DROP and self._record_unsampled:
+            return SamplingResult(Decision.RECORD_ONLY, attributes, trace_state)
+        return result
+
+    def get_description(self) -> str:
+        return f"RouteRatioSampler{{default={self._default.rate}, routes={len(self._routes)}}}"
+
+
+class _RecordOnlySampler(Sampler):
+    """Records but never samples; used beneath unsampled parents."""
+
+    def should_sample(
+        self,
+        parent_context: Optional[Context],
+        trace_id: int,
+        name: str,
+        kind: Optional[SpanKind] = None,
+        attributes: Attributes = None,
+        links: Optional[Sequence[Link]] = None,
+        trace_state=None,
+    ) -> SamplingResult:
+        return SamplingResult(Decision.RECORD_ONLY, attributes, trace_state)
+
+    def get_description(self) -> str:
+        return "RecordOnlySampler"
+
+
+class ErrorSpanProcessor(SpanProcessor):
+    """Forwards sampled spans to ``delegate`` and promotes unsampled error spans.
+
+    Spans that were only recorded (not sampled) are dropped unless they ended
+    with an error status, in which case a sampled copy is exported.
+    """
+
+    def __init__(self, delegate: SpanProcessor):
+        self._delegate = delegate
 
+    def on_start(self, span: Span, parent_context: Optional[Context] = None) -> None:
+        self._delegate.on_start(span, parent_context=parent_context)
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled:
+            self._delegate.on_end(span)
+        elif span.status.status_code == StatusCode.ERROR:
+            self._delegate.on_end(self._as_sampled(span))
+
+    @staticmethod
+    def _as_sampled(span: ReadableSpan) -> ReadableSpan:
+        context = span.context
+        return ReadableSpan(
+            name=span.name,
+            context=SpanContext(
+                context.trace_id,
+                context.span_id,
+                context.is_remote,
+                TraceFlags(TraceFlags.SAMPLED),
+                context.trace_state,
+            ),
+            parent=span.parent,
+            resource=span.resource,
+            attributes=span.attributes,
+            events=span.events,
+            links=span.links,
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        )
+
+    def shutdown(self) -> None:
+        self._delegate.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self._delegate.force_flush(timeout_millis)
+
+
+def build_tracer_provider(
+    settings: Settings, exporter: Optional[SpanExporter] = None
+) -> TracerProvider:
+    """Create a tracer provider with sampling and batched export per ``settings``.
+
+    Spans are only exported when an ``exporter`` is given.
+    """
+    root_sampler = RouteRatioSampler(
+        settings.OTEL_TRACE_SAMPLE_RATE,
+        settings.OTEL_ROUTE_SAMPLE_RATES,
+        record_unsampled=settings.OTEL_ALWAYS_SAMPLE_ERRORS,
+    )
+    if settings.OTEL_ALWAYS_SAMPLE_ERRORS:
+        sampler = ParentBased(
+            root_sampler,
+            remote_parent_not_sampled=_RecordOnlySampler(),
+            local_parent_not_sampled=_RecordOnlySampler(),
+        )
+    else:
+        sampler = ParentBased(root_sampler)
+
+    provider = TracerProvider(sampler=sampler)
+    if exporter is not None:
+        processor: SpanProcessor = BatchSpanProcessor(
+            exporter,
+            max_queue_size=settings.OTEL_SPAN_MAX_QUEUE_SIZE,
+            schedule_delay_millis=settings.OTEL_SPAN_SCHEDULE_DELAY_MILLIS,
+            max_export_batch_size=settings.OTEL_SPAN_MAX_EXPORT_BATCH_SIZE,
+        )
+        if settings.OTEL_ALWAYS_SAMPLE_ERRORS:
+            processor = ErrorSpanProcessor(processor)
+        provider.add_span_processor(processor)
+    return provider
+
+
+def init_tracing(app, settings: Settings):
+    exporter = None
     if settings.ENABLE_OTEL_GOOGLE_EXPORTER:
-        cloud_trace_exporter = CloudTraceSpanExporter(
+        exporter = CloudTraceSpanExporter(
             project_id=settings.GCP_PROJECT_ID,
         )
-        trace.get_tracer_provider().add_span_processor(
-            SimpleSpanProcessor(cloud_trace_exporter)
-        )
         # Set the X-Cloud-Trace-Context header
         set_global_textmap(CloudTraceFormatPropagator())
 
+    trace.set_tracer_provider(build_tracer_provider(settings, exporter))
+
     HTTPXClientInstrumentor().instrument()
     FastAPIInstrumentor().instrument_app(app)
 
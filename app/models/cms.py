@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from fastapi_permissions import All, Allow  # type: ignore[import-untyped]
 from sqlalchemy import (
     JSON,
+    BigInteger,
     Boolean,
     Date,
     DateTime,
@@ -13,6 +14,7 @@ from sqlalchemy import (
     ForeignKeyConstraint,
     Index,
     Integer,
+    Sequence,
     String,
     Text,
     UniqueConstraint,
@@ -225,6 +227,11 @@ class CMSContent(Base):
     )
 
 
+# Advanced by a statement trigger whenever selection-relevant content columns
+# change; API processes compare it against their random selection pools.
+cms_content_version_seq = Sequence("cms_content_version_seq", metadata=Base.metadata)
+
+
 class CMSContentVariant(Base):
     __tablename__ = "cms_content_variants"  # type: ignore[assignment]
 
@@ -263,6 +270,17 @@ class CMSContentVariant(Base):
         server_default=text("'{}'::json"),
     )
 
+    # Served/observed counts, incremented in batches by the variant allocator
+    impressions: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("0")
+    )
+    engagements: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("0")
+    )
+    conversions: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("0")
+    )
+
     is_active: Mapped[bool] = mapped_column(
         Boolean, nullable=False, server_default=text("true")
     )
@@ -743,8 +761,14 @@ class ConversationHistory(Base):
         nullable=False,  # type: ignore[arg-type]
     )
 
+    # Part of the primary key because the table is range partitioned by month
+    # on created_at (see app.services.partition_maintenance).
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, nullable=False, server_default=func.current_timestamp(), index=True
+        DateTime,
+        nullable=False,
+        server_default=func.current_timestamp(),
+        primary_key=True,
+        index=True,
     )
 
     # Relationships
@@ -752,6 +776,8 @@ class ConversationHistory(Base):
         "ConversationSession", back_populates="history"
     )
 
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
     def __repr__(self) -> str:
         return f"<ConversationHistory {self.interaction_type} at {self.node_id}>"
 
@@ -984,9 +1010,13 @@ class FlowExecutionStep(Base):
     connection_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     next_node_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
 
-    # Timing
+    # Timing. Part of the primary key because the table is range partitioned
+    # by day on started_at (see app.services.partition_maintenance).
     started_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        primary_key=True,
     )
     completed_at: Mapped[Optional[datetime]] = mapped_column(
         DateTime(timezone=True), nullable=True
@@ -1024,6 +1054,7 @@ class FlowExecutionStep(Base):
             "node_id",
             postgresql_where=text("error_message IS NOT NULL"),
         ),
+        {"postgresql_partition_by": "RANGE (started_at)"},
     )
 
     def __repr__(self) -> str:
@@ -67,6 +67,10 @@ class Edition(Base):
 
     cover_url: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
 
+    # Dimensions, placeholder (blurhash, dominant colour) and resized variants
+    # of the uploaded cover. See app.services.cover_derivatives
+    cover_image: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+
     # Info contains stuff like edition number, language
     # media (paperback/hardback/audiobook), number of pages.
     info: Mapped[Optional[Dict[str, Any]]] = mapped_column(
@@ -96,20 +96,27 @@ class Event(Base):
         return f"<Event {self.title} - {self.description}>"
 
     def __acl__(self) -> List[tuple[Any, str, Any]]:
-        acl = [
-            (Allow, "role:admin", All),
-        ]
+        return event_acl(self.school_id, self.user_id, self.title)
 
-        if self.school_id is not None:
-            acl.append((Allow, f"educator:{self.school_id}", "read"))
-            # acl.append((Allow, f"student:{self.school_id}", "read"))
 
-        if self.user_id is not None:
-            acl.append((Allow, f"user:{self.user_id}", "read"))
+def event_acl(
+    school_id: Optional[int], user_id: Optional[uuid.UUID], title: str
+) -> List[tuple[Any, str, Any]]:
+    """ACL of an event, usable on projected rows as well as Event instances."""
+    acl = [
+        (Allow, "role:admin", All),
+    ]
 
-            acl.append((Allow, f"parent:{self.user_id}", "read"))
+    if school_id is not None:
+        acl.append((Allow, f"educator:{school_id}", "read"))
+        # acl.append((Allow, f"student:{school_id}", "read"))
 
-        if self.title.startswith("Reader timeline event:"):
-            acl.append((Allow, f"supporter:{self.user_id}", "read"))
+    if user_id is not None:
+        acl.append((Allow, f"user:{user_id}", "read"))
 
-        return acl
+        acl.append((Allow, f"parent:{user_id}", "read"))
+
+    if title.startswith("Reader timeline event:"):
+        acl.append((Allow, f"supporter:{user_id}", "read"))
+
+    return acl
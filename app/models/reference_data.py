@@ -0,0 +1,10 @@
+from sqlalchemy import Sequence
+
+from app.db import Base
+
+# Advanced by statement triggers whenever a reference table (hues, reading
+# abilities, countries, products) changes; API processes compare it against
+# their in-memory reference data.
+reference_data_version_seq = Sequence(
+    "reference_data_version_seq", metadata=Base.metadata
+)
@@ -10,7 +10,16 @@ from datetime import datetime
 from typing import List, Optional
 
 from sqlalchemy import UUID as SqlUUID
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    Sequence,
+    String,
+    Text,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -26,6 +35,13 @@ class WebhookSubscriptionStatus(CaseInsensitiveStringEnum):
     DISABLED = "disabled"
 
 
+# Advanced by a statement trigger whenever subscription routing changes; API
+# processes compare it against the version of their in-memory routing index.
+webhook_subscriptions_version_seq = Sequence(
+    "webhook_subscriptions_version_seq", metadata=Base.metadata
+)
+
+
 class WebhookSubscription(Base):
     """
     Webhook Subscription - Stores webhook endpoint configurations.
@@ -5,9 +5,22 @@ Replaces the generic CRUDBookList class with proper repository pattern.
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional
-
-from sqlalchemy import delete, func, select, text, update
+from dataclasses import dataclass
+from dataclasses import field as dataclass_field
+from typing import Any, Optional
+
+from sqlalchemy import (
+    JSON,
+    Integer,
+    column,
+    delete,
+    func,
+    insert,
+    select,
+    text,
+    update,
+    values,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, aliased
 from structlog import get_logger
@@ -27,6 +40,86 @@ from app.utils.dict_utils import deep_merge_dicts
 logger = get_logger()
 
 
+@dataclass
+class BooklistItemPlan:
+    """The writes needed to take a booklist from its current items to the edited ones."""
+
+    removed: list[int] = dataclass_field(default_factory=list)
+    # (work_id, order_id) for existing items whose position changed
+    moved: list[tuple[int, int]] = dataclass_field(default_factory=list)
+    # (work_id, info) for existing items whose info changed
+    info_updates: list[tuple[int, Any]] = dataclass_field(default_factory=list)
+    added: list[dict] = dataclass_field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.removed or self.moved or self.info_updates or self.added)
+
+
+def plan_item_changes(
+    current: list[tuple[int, int, Any]], changes: list[BookListItemUpdateIn]
+) -> BooklistItemPlan:
+    """
+    Apply a batch of item changes to a booklist's ``(work_id, order_id, info)``
+    rows in memory.
+
+    Changes are applied in order with the same semantics as the single item
+    helpers: adding a present work or updating/removing a missing one is
+    skipped, and an ``order_id`` is a position that the other items shift
+    around. The resulting list is numbered from 0 without gaps.
+    """
+    order = [work_id for work_id, _, _ in sorted(current, key=lambda row: row[1])]
+    original_order_ids = {work_id: order_id for work_id, order_id, _ in current}
+    infos = {work_id: info for work_id, _, info in current}
+    changed_info = set()
+
+    for change in changes:
+        match change.action:
+            case ItemUpdateType.ADD:
+                if change.work_id in infos:
+                    logger.debug("Got asked to add an item that is already present")
+                    continue
+                position = len(order) if change.order_id is None else change.order_id
+                order.insert(position, change.work_id)
+                infos[change.work_id] = (
+                    change.info.model_dump() if change.info is not None else None
+                )
+            case ItemUpdateType.UPDATE:
+                if change.work_id not in infos:
+                    logger.warning("Skipping update of missing item in booklist")
+                    continue
+                if change.order_id is not None:
+                    order.remove(change.work_id)
+                    order.insert(change.order_id, change.work_id)
+                if change.info is not None:
+                    info_dict = dict(infos[change.work_id] or {})
+                    deep_merge_dicts(info_dict, dict(change.info))
+                    infos[change.work_id] = info_dict
+                    changed_info.add(change.work_id)
+            case ItemUpdateType.REMOVE:
+                if change.work_id not in infos:
+                    logger.warning(
+                        "Got asked to remove an item that is already removed"
+                    )
+                    continue
+                order.remove(change.work_id)
+                del infos[change.work_id]
+
+    plan = BooklistItemPlan(
+        removed=[work_id for work_id in original_order_ids if work_id not in infos]
+    )
+    for order_id, work_id in enumerate(order):
+        if work_id not in original_order_ids:
+            plan.added.append(
+                {"work_id": work_id, "order_id": order_id, "info": infos[work_id]}
+            )
+            continue
+        if original_order_ids[work_id] != order_id:
+            plan.moved.append((work_id, order_id))
+        if work_id in changed_info:
+            plan.info_updates.append((work_id, infos[work_id]))
+    return plan
+
+
 class BooklistRepository(ABC):
     """Repository interface for Booklist domain operations."""
 
@@ -40,6 +133,11 @@ class BooklistRepository(ABC):
         """Get a booklist by ID or raise 404."""
         pass
 
+    @abstractmethod
+    async def aget_or_404(self, db: AsyncSession, id: int) -> BookList:
+        """Async version of get_or_404."""
+        pass
+
     @abstractmethod
     def create(
         self, db: Session, obj_in: BookListCreateIn, commit: bool = True
@@ -74,6 +172,16 @@ class BooklistRepository(ABC):
         """Update a booklist and its items."""
         pass
 
+    @abstractmethod
+    def apply_item_changes(
+        self,
+        db: Session,
+        booklist_orm_object: BookList,
+        item_changes: list[BookListItemUpdateIn],
+    ) -> BooklistItemPlan:
+        """Apply a batch of item adds, moves and removals without committing."""
+        pass
+
     @abstractmethod
     def apply_pagination(self, query, skip: int = 0, limit: int = 100):
         """Apply pagination to a query."""
@@ -145,6 +253,17 @@ class BooklistRepositoryImpl(BooklistRepository):
             )
         return booklist
 
+    async def aget_or_404(self, db: AsyncSession, id: int) -> BookList:
+        """Async version of get_or_404."""
+        from fastapi import HTTPException
+
+        booklist = await db.get(BookList, id)
+        if not booklist:
+            raise HTTPException(
+                status_code=404, detail=f"Booklist with id {id} not found"
+            )
+        return booklist
+
     def create(
         self, db: Session, obj_in: BookListCreateIn, commit: bool = True
     ) -> BookList:
@@ -298,25 +417,93 @@ class BooklistRepositoryImpl(BooklistRepository):
 
         db.add(db_obj)
 
-        for change in item_changes:
-            match change.action:
-                case ItemUpdateType.ADD:
-                    self._add_item_to_booklist(
-                        db=db, booklist_orm_object=db_obj, item_update=change
-                    )
-                case ItemUpdateType.UPDATE:
-                    self._update_item_in_booklist(
-                        db=db, booklist_id=db_obj.id, item_update=change
-                    )
-                case ItemUpdateType.REMOVE:
-                    self._remove_item_from_booklist(
-                        db=db, booklist_orm_object=db_obj, item_to_remove=change
-                    )
+        if item_changes:
+            self.apply_item_changes(
+                db=db, booklist_orm_object=db_obj, item_changes=item_changes
+            )
 
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def apply_item_changes(
+        self,
+        db: Session,
+        booklist_orm_object: BookList,
+        item_changes: list[BookListItemUpdateIn],
+    ) -> BooklistItemPlan:
+        """
+        Apply a batch of item adds, moves and removals without committing.
+
+        The whole batch is resolved in memory against one read of the list's
+        items, then written with at most one statement each for removals,
+        the new order, info changes and additions.
+        """
+        booklist_id = booklist_orm_object.id
+        current = db.execute(
+            select(BookListItem.work_id, BookListItem.order_id, BookListItem.info)
+            .where(BookListItem.booklist_id == booklist_id)
+            .order_by(BookListItem.order_id)
+        ).all()
+        plan = plan_item_changes([tuple(row) for row in current], item_changes)
+        if not plan:
+            return plan
+
+        # Positions are swapped within the update, so let the unique
+        # (booklist_id, order_id) constraint be checked at commit
+        db.execute(text("SET CONSTRAINTS ALL DEFERRED"))
+        if plan.removed:
+            db.execute(
+                delete(BookListItem)
+                .where(BookListItem.booklist_id == booklist_id)
+                .where(BookListItem.work_id.in_(plan.removed))
+            )
+        if plan.moved:
+            db.execute(self._reorder_statement(booklist_id, plan.moved))
+        if plan.info_updates:
+            db.execute(self._info_update_statement(booklist_id, plan.info_updates))
+        if plan.added:
+            db.execute(
+                insert(BookListItem),
+                [{"booklist_id": booklist_id, **item} for item in plan.added],
+            )
+
+        logger.debug(
+            "Applied booklist item changes",
+            booklist_id=booklist_id,
+            removed=len(plan.removed),
+            moved=len(plan.moved),
+            info_updates=len(plan.info_updates),
+            added=len(plan.added),
+        )
+        return plan
+
+    @staticmethod
+    def _reorder_statement(booklist_id, moved: list[tuple[int, int]]):
+        new_order = values(
+            column("work_id", Integer), column("order_id", Integer), name="new_order"
+        ).data(moved)
+        return (
+            update(BookListItem)
+            .where(BookListItem.booklist_id == booklist_id)
+            .where(BookListItem.work_id == new_order.c.work_id)
+            .values(order_id=new_order.c.order_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _info_update_statement(booklist_id, info_updates: list[tuple[int, Any]]):
+        new_info = values(
+            column("work_id", Integer), column("info", JSON), name="new_info"
+        ).data(info_updates)
+        return (
+            update(BookListItem)
+            .where(BookListItem.booklist_id == booklist_id)
+            .where(BookListItem.work_id == new_info.c.work_id)
+            .values(info=new_info.c.info)
+            .execution_options(synchronize_session=False)
+        )
+
     def apply_pagination(self, query, skip: int = 0, limit: int = 100):
         """Apply pagination to a query."""
         return query.offset(skip).limit(limit)
@@ -0,0 +1,521 @@
+"""
+Catalogue read repository - Core projections for the hot book read paths.
+
+The works, editions and booklist read endpoints only serialise a handful of
+columns, so these queries select exactly those columns on the async engine
+and build the response schemas straight from the rows. Nothing is added to a
+session's identity map, and related rows (authors, labels, illustrators) are
+fetched with one ``IN`` query per relation for the whole page rather than
+lazily per work.
+"""
+
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import desc, func, nulls_last, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.models import (
+    Author,
+    BookList,
+    BookListItem,
+    Edition,
+    Hue,
+    Illustrator,
+    LabelSet,
+    LabelSetHue,
+    LabelSetReadingAbility,
+    ReadingAbility,
+    School,
+    User,
+    Work,
+)
+from app.models.author_work_association import author_work_association_table
+from app.models.illustrator_edition_association import (
+    illustrator_edition_association_table,
+)
+from app.models.work import WorkType
+from app.schemas.author import AuthorBrief
+from app.schemas.edition import EditionBrief, EditionDetail
+from app.schemas.illustrator import IllustratorBrief
+from app.schemas.labelset import LabelSetBasic, LabelSetDetail
+from app.schemas.work import WorkBrief, WorkDetail, WorkEnriched
+
+logger = get_logger()
+
+EDITION_BRIEF_COLUMNS = (
+    Edition.leading_article,
+    Edition.title,
+    Edition.cover_url,
+    Edition.work_id,
+    Edition.isbn,
+)
+
+EDITION_DETAIL_COLUMNS = (
+    Edition.id,
+    *EDITION_BRIEF_COLUMNS,
+    Edition.cover_image,
+    Edition.date_published,
+    Edition.info,
+)
+
+WORK_BRIEF_COLUMNS = (
+    Work.id,
+    Work.type,
+    Work.leading_article,
+    Work.title,
+    Work.subtitle,
+)
+
+LABELSET_BASIC_COLUMNS = (
+    LabelSet.id,
+    LabelSet.work_id,
+    LabelSet.min_age,
+    LabelSet.max_age,
+    LabelSet.huey_summary,
+)
+
+
+class CatalogueReadRepository(ABC):
+    """Read-only projections of works, editions and booklists."""
+
+    @abstractmethod
+    async def aget_work_briefs(
+        self,
+        db: AsyncSession,
+        *,
+        type: WorkType,
+        author_id: Optional[int] = None,
+        query: Optional[str] = None,
+        isbn: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[WorkBrief]:
+        """Get a page of works that have at least one edition."""
+        pass
+
+    @abstractmethod
+    async def aget_work(
+        self, db: AsyncSession, work_id: int, *, full_detail: bool = True
+    ) -> Optional[WorkDetail | WorkEnriched]:
+        """Get one work with its labels, and its editions if ``full_detail``."""
+        pass
+
+    @abstractmethod
+    async def aget_enriched_works(
+        self, db: AsyncSession, work_ids: Iterable[int]
+    ) -> Dict[int, WorkEnriched]:
+        """Get works with their authors and basic labels, keyed by id."""
+        pass
+
+    @abstractmethod
+    async def awork_exists(self, db: AsyncSession, work_id: int) -> bool:
+        """Check whether a work with ``work_id`` exists."""
+        pass
+
+    @abstractmethod
+    async def aget_edition_briefs(
+        self,
+        db: AsyncSession,
+        *,
+        work_id: Optional[int] = None,
+        query: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[EditionBrief]:
+        """Get a page of editions, optionally of one work or matching a query."""
+        pass
+
+    @abstractmethod
+    async def aget_edition_details(
+        self, db: AsyncSession, isbns: Iterable[str]
+    ) -> Dict[str, EditionDetail]:
+        """Get editions with their authors and illustrators, keyed by ISBN."""
+        pass
+
+    @abstractmethod
+    async def aget_feature_edition_details(
+        self, db: AsyncSession, work_ids: Iterable[int]
+    ) -> Dict[int, EditionDetail]:
+        """Get the edition to feature for each work, keyed by work id."""
+        pass
+
+    @abstractmethod
+    async def aget_booklist_brief(
+        self, db: AsyncSession, booklist_id: uuid.UUID
+    ) -> Optional[Dict[str, Any]]:
+        """Get the fields of a BookListBrief, including the item count."""
+        pass
+
+    @abstractmethod
+    async def aget_booklist_items(
+        self, db: AsyncSession, booklist_id: uuid.UUID, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Get a page of a booklist's items in list order."""
+        pass
+
+
+class CatalogueReadRepositoryImpl(CatalogueReadRepository):
+    """Implementation of CatalogueReadRepository."""
+
+    async def aget_work_briefs(
+        self,
+        db: AsyncSession,
+        *,
+        type: WorkType,
+        author_id: Optional[int] = None,
+        query: Optional[str] = None,
+        isbn: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[WorkBrief]:
+        """Get a page of works that have at least one edition."""
+        statement = select(*WORK_BRIEF_COLUMNS).where(Work.type == type)
+
+        if author_id is not None:
+            statement = statement.where(Work.authors.any(Author.id == author_id))
+
+        if query is not None:
+            statement = statement.where(func.lower(Work.title).contains(query.lower()))
+
+        if isbn is not None:
+            statement = statement.where(Work.editions.any(Edition.isbn == isbn))
+        else:
+            # Ensure there is one or more editions...
+            statement = statement.where(Work.editions.any())
+
+        rows = (await db.execute(statement.offset(skip).limit(limit))).all()
+        authors = await self._authors_by_work(db, [row.id for row in rows])
+        return [
+            WorkBrief(**row._mapping, authors=authors.get(row.id, [])) for row in rows
+        ]
+
+    async def aget_work(
+        self, db: AsyncSession, work_id: int, *, full_detail: bool = True
+    ) -> Optional[WorkDetail | WorkEnriched]:
+        """Get one work with its labels, and its editions if ``full_detail``."""
+        row = (
+            await db.execute(
+                select(*WORK_BRIEF_COLUMNS, Work.info).where(Work.id == work_id)
+            )
+        ).first()
+        if row is None:
+            return None
+
+        authors = await self._authors_by_work(db, [work_id])
+        labelsets = await self._labelsets_by_work(db, [work_id], detail=full_detail)
+        fields = {
+            **row._mapping,
+            "authors": authors.get(work_id, []),
+            "labelset": labelsets.get(work_id),
+        }
+
+        if full_detail:
+            editions = (
+                await db.execute(
+                    select(*EDITION_BRIEF_COLUMNS)
+                    .where(Edition.work_id == work_id)
+                    .order_by(desc(Edition.cover_url.is_not(None)))
+                )
+            ).all()
+            if fields["info"] is not None:
+                fields["info"] = {"genres": [], "other": {}, **fields["info"]}
+            return WorkDetail(
+                **fields,
+                editions=[EditionBrief(**edition._mapping) for edition in editions],
+            )
+
+        covers = await self._covers_by_work(db, [work_id])
+        return WorkEnriched(**fields, cover_url=covers.get(work_id))
+
+    async def aget_enriched_works(
+        self, db: AsyncSession, work_ids: Iterable[int]
+    ) -> Dict[int, WorkEnriched]:
+        """Get works with their authors and basic labels, keyed by id."""
+        work_ids = list(set(work_ids))
+        if not work_ids:
+            return {}
+
+        rows = (
+            await db.execute(select(*WORK_BRIEF_COLUMNS).where(Work.id.in_(work_ids)))
+        ).all()
+        authors = await self._authors_by_work(db, work_ids)
+        labelsets = await self._labelsets_by_work(db, work_ids, detail=False)
+        return {
+            row.id: WorkEnriched(
+                **row._mapping,
+                authors=authors.get(row.id, []),
+                labelset=labelsets.get(row.id),
+            )
+            for row in rows
+        }
+
+    async def awork_exists(self, db: AsyncSession, work_id: int) -> bool:
+        """Check whether a work with ``work_id`` exists."""
+        found = await db.scalar(select(Work.id).where(Work.id == work_id))
+        return found is not None
+
+    async def aget_edition_briefs(
+        self,
+        db: AsyncSession,
+        *,
+        work_id: Optional[int] = None,
+        query: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[EditionBrief]:
+        """Get a page of editions, optionally of one work or matching a query."""
+        statement = select(*EDITION_BRIEF_COLUMNS)
+        if work_id is not None:
+            statement = statement.where(Edition.work_id == work_id).order_by(
+                desc(Edition.cover_url.is_not(None))
+            )
+        elif query is not None:
+            statement = statement.where(Edition.title.match(query))
+
+        rows = (await db.execute(statement.offset(skip).limit(limit))).all()
+        return [EditionBrief(**row._mapping) for row in rows]
+
+    async def aget_edition_details(
+        self, db: AsyncSession, isbns: Iterable[str]
+    ) -> Dict[str, EditionDetail]:
+        """Get editions with their authors and illustrators, keyed by ISBN."""
+        isbns = list(set(isbns))
+        if not isbns:
+            return {}
+
+        details = await self._edition_details(
+            db, select(*EDITION_DETAIL_COLUMNS).where(Edition.isbn.in_(isbns))
+        )
+        return {detail.isbn: detail for detail in details}
+
+    async def aget_feature_edition_details(
+        self, db: AsyncSession, work_ids: Iterable[int]
+    ) -> Dict[int, EditionDetail]:
+        """Get the edition to feature for each work, keyed by work id."""
+        work_ids = list(set(work_ids))
+        if not work_ids:
+            return {}
+
+        # Same preference as Work.get_feature_edition: a cover, then the newest
+        details = await self._edition_details(
+            db,
+            select(*EDITION_DETAIL_COLUMNS)
+            .where(Edition.work_id.in_(work_ids))
+            .distinct(Edition.work_id)
+            .order_by(
+                Edition.work_id,
+                nulls_last(desc(Edition.cover_url)),
+                Edition.date_published.desc(),
+            ),
+        )
+        return {int(detail.work_id): detail for detail in details}
+
+    async def aget_booklist_brief(
+        self, db: AsyncSession, booklist_id: uuid.UUID
+    ) -> Optional[Dict[str, Any]]:
+        """Get the fields of a BookListBrief, including the item count."""
+        row = (
+            await db.execute(
+                select(
+                    BookList.id,
+                    BookList.name,
+                    BookList.type,
+                    BookList.sharing,
+                    BookList.slug,
+                    BookList.info,
+                    BookList.created_at,
+                    BookList.updated_at,
+                    BookList.book_count,
+                    User.id.label("user_id"),
+                    User.type.label("user_type"),
+                    User.name.label("user_name"),
+                    School.wriveted_identifier,
+                    School.name.label("school_name"),
+                )
+                .outerjoin(User, User.id == BookList.user_id)
+                .outerjoin(School, School.id == BookList.school_id)
+                .where(BookList.id == booklist_id)
+            )
+        ).first()
+        if row is None:
+            return None
+
+        fields = row._asdict()
+        user_id = fields.pop("user_id")
+        user_type = fields.pop("user_type")
+        user_name = fields.pop("user_name")
+        wriveted_identifier = fields.pop("wriveted_identifier")
+        school_name = fields.pop("school_name")
+        fields["user"] = (
+            {"id": user_id, "type": user_type, "name": user_name}
+            if user_id is not None
+            else None
+        )
+        fields["school"] = (
+            {"wriveted_identifier": wriveted_identifier, "name": school_name}
+            if wriveted_identifier is not None
+            else None
+        )
+        return fields
+
+    async def aget_booklist_items(
+        self, db: AsyncSession, booklist_id: uuid.UUID, skip: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Get a page of a booklist's items in list order."""
+        rows = await db.execute(
+            select(BookListItem.order_id, BookListItem.work_id, BookListItem.info)
+            .where(BookListItem.booklist_id == booklist_id)
+            .order_by(BookListItem.order_id)
+            .offset(skip)
+            .limit(limit)
+        )
+        return [row._asdict() for row in rows]
+
+    async def _edition_details(
+        self, db: AsyncSession, statement
+    ) -> List[EditionDetail]:
+        rows = (await db.execute(statement)).all()
+        if not rows:
+            return []
+
+        authors = await self._authors_by_work(
+            db, {row.work_id for row in rows if row.work_id is not None}
+        )
+        illustrators: Dict[int, List[IllustratorBrief]] = defaultdict(list)
+        illustrator_rows = await db.execute(
+            select(
+                illustrator_edition_association_table.c.edition_id,
+                Illustrator.id,
+                Illustrator.first_name,
+                Illustrator.last_name,
+                Illustrator.info,
+            )
+            .join(
+                Illustrator,
+                Illustrator.id
+                == illustrator_edition_association_table.c.illustrator_id,
+            )
+            .where(
+                illustrator_edition_association_table.c.edition_id.in_(
+                    [row.id for row in rows]
+                )
+            )
+        )
+        for illustrator in illustrator_rows:
+            illustrators[illustrator.edition_id].append(
+                IllustratorBrief(
+                    id=illustrator.id,
+                    first_name=illustrator.first_name,
+                    last_name=illustrator.last_name,
+                    info=illustrator.info,
+                )
+            )
+
+        return [
+            EditionDetail(
+                **row._mapping,
+                authors=authors.get(row.work_id, []),
+                illustrators=illustrators.get(row.id, []),
+            )
+            for row in rows
+        ]
+
+    async def _authors_by_work(
+        self, db: AsyncSession, work_ids: Iterable[int]
+    ) -> Dict[int, List[AuthorBrief]]:
+        work_ids = list(work_ids)
+        if not work_ids:
+            return {}
+
+        authors: Dict[int, List[AuthorBrief]] = defaultdict(list)
+        rows = await db.execute(
+            select(
+                author_work_association_table.c.work_id,
+                Author.id,
+                Author.first_name,
+                Author.last_name,
+            )
+            .join(Author, Author.id == author_work_association_table.c.author_id)
+            .where(author_work_association_table.c.work_id.in_(work_ids))
+            .order_by(author_work_association_table.c.work_id, Author.id)
+        )
+        for row in rows:
+            authors[row.work_id].append(
+                AuthorBrief(
+                    id=row.id, first_name=row.first_name, last_name=row.last_name
+                )
+            )
+        return authors
+
+    async def _labelsets_by_work(
+        self, db: AsyncSession, work_ids: List[int], *, detail: bool
+    ) -> Dict[int, LabelSetBasic | LabelSetDetail]:
+        columns = LabelSet.__table__.c if detail else LABELSET_BASIC_COLUMNS
+        rows = (
+            await db.execute(select(*columns).where(LabelSet.work_id.in_(work_ids)))
+        ).all()
+        if not rows:
+            return {}
+
+        labelset_ids = [row.id for row in rows]
+        hues: Dict[int, List[dict]] = defaultdict(list)
+        hue_rows = await db.execute(
+            select(LabelSetHue.labelset_id, Hue.id, Hue.name, Hue.key)
+            .join(Hue, Hue.id == LabelSetHue.hue_id)
+            .where(LabelSetHue.labelset_id.in_(labelset_ids))
+            .order_by(LabelSetHue.labelset_id, LabelSetHue.ordinal)
+        )
+        for row in hue_rows:
+            hues[row.labelset_id].append(
+                {"id": row.id, "name": row.name, "key": row.key}
+            )
+
+        reading_abilities: Dict[int, List[dict]] = defaultdict(list)
+        reading_ability_rows = await db.execute(
+            select(
+                LabelSetReadingAbility.labelset_id,
+                ReadingAbility.id,
+                ReadingAbility.key,
+                ReadingAbility.name,
+            )
+            .join(
+                ReadingAbility,
+                ReadingAbility.id == LabelSetReadingAbility.reading_ability_id,
+            )
+            .where(LabelSetReadingAbility.labelset_id.in_(labelset_ids))
+            .order_by(LabelSetReadingAbility.labelset_id, ReadingAbility.id)
+        )
+        for row in reading_ability_rows:
+            reading_abilities[row.labelset_id].append(
+                {"id": row.id, "key": row.key, "name": row.name}
+            )
+
+        schema = LabelSetDetail if detail else LabelSetBasic
+        return {
+            row.work_id: schema.model_validate(
+                {
+                    **row._mapping,
+                    "hues": hues.get(row.id, []),
+                    "reading_abilities": reading_abilities.get(row.id, []),
+                }
+            )
+            for row in rows
+        }
+
+    async def _covers_by_work(
+        self, db: AsyncSession, work_ids: List[int]
+    ) -> Dict[int, str]:
+        rows = await db.execute(
+            select(Edition.work_id, Edition.cover_url)
+            .where(Edition.work_id.in_(work_ids), Edition.cover_url.is_not(None))
+            .distinct(Edition.work_id)
+            .order_by(Edition.work_id)
+        )
+        return {row.work_id: row.cover_url for row in rows}
+
+
+catalogue_read_repository = CatalogueReadRepositoryImpl()
@@ -1,15 +1,20 @@
 import asyncio
 import base64
+import copy
 import hashlib
 import json
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import and_, func, select, update
+from sqlalchemy import and_, func, insert, inspect, literal, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
 from structlog import get_logger
 
 from app.models.cms import (
@@ -30,8 +35,15 @@ _UNSET = object()
 class ChatRepository:
     """Repository for chat-related database operations with concurrency support."""
 
+    MAX_DIGEST_CACHE_SESSIONS = 1_000
+
     def __init__(self) -> None:
         self.logger = logger
+        # Per-key state digests of recently updated sessions, keyed by session
+        # id and tagged with the state hash they add up to.
+        self._state_digests: "OrderedDict[UUID, Tuple[str, Dict[str, int]]]" = (
+            OrderedDict()
+        )
 
     async def get_session_by_token(
         self, db: AsyncSession, session_token: str
@@ -60,27 +72,36 @@ class ChatRepository:
         trace_enabled: Optional[bool] = None,
         trace_level: Optional[str] = None,
     ) -> ConversationSession:
-        """Create a new conversation session with initial state."""
+        """Create a new conversation session with initial state.
+
+        The row is inserted with ``INSERT ... RETURNING`` so server defaults
+        come back with the insert instead of a refresh after commit.
+        """
         state = initial_state or {}
         state_hash = self._calculate_state_hash(state)
 
-        session = ConversationSession(
-            flow_id=flow_id,
-            user_id=user_id,
-            session_token=session_token,
-            state=state,
-            info=meta_data or {},
-            status=SessionStatus.ACTIVE,
-            revision=1,
-            state_hash=state_hash,
-            flow_version=flow_version,
-            trace_enabled=bool(trace_enabled) if trace_enabled is not None else False,
-            trace_level=trace_level or "standard",
+        result = await db.scalars(
+            insert(ConversationSession).returning(ConversationSession),
+            [
+                {
+                    "flow_id": flow_id,
+                    "user_id": user_id,
+                    "session_token": session_token,
+                    "state": state,
+                    "info": meta_data or {},
+                    "status": SessionStatus.ACTIVE,
+                    "revision": 1,
+                    "state_hash": state_hash,
+                    "flow_version": flow_version,
+                    "trace_enabled": bool(trace_enabled)
+                    if trace_enabled is not None
+                    else False,
+                    "trace_level": trace_level or "standard",
+                }
+            ],
         )
-
-        db.add(session)
+        session = result.one()
         await db.commit()
-        await db.refresh(session)
 
         return session
 
@@ -93,8 +114,15 @@ class ChatRepository:
         current_node_id: Optional[str] = None,
         current_flow_id: Any = _UNSET,
         expected_revision: Optional[int] = None,
+        commit: bool = True,
     ) -> ConversationSession:
-        """Update session state with optimistic concurrency control."""
+        """Update session state with optimistic concurrency control.
+
+        Only the top-level state keys touched by ``state_updates`` are sent to
+        the database, applied with ``state || patch`` in a single UPDATE, and
+        the state hash is updated incrementally from those keys. With
+        ``commit=False`` the write is only flushed, for the caller to commit.
+        """
         # Get current session
         result = await db.scalars(
             select(ConversationSession)
@@ -114,52 +142,109 @@ class ChatRepository:
                 orig=ValueError("Concurrent modification detected"),
             )
 
-        # Update state with support for nested updates
-        # Create a copy to avoid modifying the original
-        current_state = dict(session.state or {})
-        self._deep_merge_state(current_state, state_updates)
-
-        # Calculate new state hash
-        new_state_hash = self._calculate_state_hash(current_state)
-
-        # Update session
-        # For JSON/JSONB columns, we need to reassign the value to trigger SQLAlchemy's change detection
-        # or use flag_modified
-        from sqlalchemy.orm.attributes import flag_modified
-
-        session.state = current_state
-        flag_modified(session, "state")  # Explicitly mark the state field as modified
-
-        session.state_hash = new_state_hash
-        session.revision = session.revision + 1
-        session.last_activity_at = datetime.utcnow()
-
+        current_state = session.state or {}
+        state_patch = self._build_state_patch(current_state, state_updates)
+        new_state = {**current_state, **state_patch}
+        cached = self._state_digests.pop(session_id, None)
+        digests = cached[1] if cached and cached[0] == session.state_hash else {}
+        new_state_hash = self._update_state_hash(
+            session.state_hash,
+            current_state,
+            new_state,
+            state_patch.keys(),
+            digests=digests,
+        )
+        self._state_digests[session_id] = (new_state_hash, digests)
+        if len(self._state_digests) > self.MAX_DIGEST_CACHE_SESSIONS:
+            self._state_digests.popitem(last=False)
+
+        values: Dict[str, Any] = {
+            "state_hash": new_state_hash,
+            "revision": session.revision + 1,
+            "last_activity_at": datetime.utcnow(),
+        }
         if current_node_id:
-            session.current_node_id = current_node_id
-
+            values["current_node_id"] = current_node_id
         if current_flow_id is not _UNSET:
-            session.current_flow_id = current_flow_id
+            values["current_flow_id"] = current_flow_id
+
+        # Fold unflushed in-memory changes to the session's info and flow
+        # position (e.g. a sub-flow push) into this same write
+        session_attrs = inspect(session).attrs
+        for key in ("info", "current_flow_id"):
+            if key not in values and session_attrs[key].history.has_changes():
+                values[key] = getattr(session, key)
+
+        if session_attrs.state.history.has_changes():
+            # The caller modified state in memory without flushing, so the
+            # database copy is stale relative to it; write the whole state.
+            session.state = new_state
+            flag_modified(session, "state")
+            for key, value in values.items():
+                setattr(session, key, value)
+            if commit:
+                await db.commit()
+                await db.refresh(session)
+            else:
+                await db.flush()
+            return session
 
-        # Debug logging for state persistence (commented out for performance)
-        # self.logger.info(
-        #     "Session state before commit",
-        #     session_id=session_id,
-        #     state=session.state,
-        #     revision=session.revision,
-        # )
+        statement_values = dict(values)
+        if state_patch:
+            statement_values["state"] = func.coalesce(
+                ConversationSession.state, literal({}, JSONB)
+            ).op("||")(literal(state_patch, JSONB))
 
-        await db.commit()
-        await db.refresh(session)
+        await db.execute(
+            update(ConversationSession)
+            .where(ConversationSession.id == session_id)
+            .values(**statement_values)
+            .execution_options(synchronize_session=False)
+        )
 
-        # self.logger.info(
-        #     "Session state after refresh",
-        #     session_id=session_id,
-        #     state=session.state,
-        #     revision=session.revision,
-        # )
+        # Mirror the write on the loaded instance without marking it dirty
+        # (avoids both a full-state flush and a refresh round trip).
+        self._set_committed_values(session, {**values, "state": new_state})
+
+        if commit:
+            await db.commit()
+        else:
+            await db.flush()
 
         return session
 
+    def _set_committed_values(
+        self, session: ConversationSession, values: Dict[str, Any]
+    ) -> None:
+        """Set attributes as if loaded from the database, keeping JSONB
+        dictionaries change-tracked."""
+        session_state = inspect(session)
+        for key, value in values.items():
+            if key in ("state", "info") and not isinstance(value, MutableDict):
+                value = MutableDict.coerce(key, dict(value or {}))
+                value._parents[session_state] = key
+            set_committed_value(session, key, value)
+
+    def _build_state_patch(
+        self, current_state: Dict[str, Any], state_updates: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Merged values for each top-level key touched by ``state_updates``.
+
+        Nested dictionaries are deep merged into a copy, so ``current_state`` is
+        left untouched. Keys whose merged value is unchanged are omitted.
+        """
+        patch = {}
+        for key, value in state_updates.items():
+            existing = current_state.get(key, _UNSET)
+            if isinstance(existing, dict) and isinstance(value, dict):
+                merged = copy.deepcopy(existing)
+                self._deep_merge_state(merged, value)
+            else:
+                merged = value
+            if existing is _UNSET or merged != existing:
+                patch[key] = merged
+        return patch
+
     async def end_session(
         self,
         db: AsyncSession,
@@ -323,11 +408,63 @@ class ChatRepository:
         #     target_after=target,
         # )
 
-    def _calculate_state_hash(self, state: Dict[str, Any]) -> str:
-        """Calculate SHA-256 hash of session state for integrity checking."""
-        state_json = json.dumps(state, sort_keys=True, separators=(",", ":"))
-        hash_bytes = hashlib.sha256(state_json.encode("utf-8")).digest()
-        return base64.b64encode(hash_bytes).decode("ascii")  # 44 characters
+    # State hashes are the sum (mod 2**256) of a SHA-256 digest per top-level
+    # key, so updating a few keys only re-hashes those keys. They're encoded
+    # as unpadded urlsafe base64 (43 chars); the previous whole-state hash was
+    # padded standard base64 (44 chars, ending in "=").
+    _STATE_HASH_MODULUS = 2**256
+
+    def _state_key_digest(self, key: str, value: Any) -> int:
+        value_json = json.dumps(value, sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha256(f"{key}\x00{value_json}".encode("utf-8")).digest()
+        return int.from_bytes(digest, "big")
+
+    def _encode_state_hash(self, value: int) -> str:
+        hash_bytes = value.to_bytes(32, "big")
+        return base64.urlsafe_b64encode(hash_bytes).decode("ascii").rstrip("=")
+
+    def _calculate_state_hash(
+        self, state: Dict[str, Any], digests: Optional[Dict[str, int]] = None
+    ) -> str:
+        """Calculate the hash of session state for integrity checking."""
+        key_digests = {k: self._state_key_digest(k, v) for k, v in state.items()}
+        if digests is not None:
+            digests.clear()
+            digests.update(key_digests)
+        return self._encode_state_hash(
+            sum(key_digests.values()) % self._STATE_HASH_MODULUS
+        )
+
+    def _update_state_hash(
+        self,
+        previous_hash: Optional[str],
+        old_state: Dict[str, Any],
+        new_state: Dict[str, Any],
+        changed_keys: Iterable[str],
+        digests: Optional[Dict[str, int]] = None,
+    ) -> str:
+        """Incrementally update a state hash for the changed top-level keys.
+
+        ``digests`` optionally holds known per-key digests of ``old_state``;
+        they're used instead of re-hashing old values, and updated in place.
+        Falls back to a full calculation for sessions that don't yet have an
+        incremental hash.
+        """
+        if not previous_hash or len(previous_hash) != 43:
+            return self._calculate_state_hash(new_state, digests)
+
+        if digests is None:
+            digests = {}
+        total = int.from_bytes(base64.urlsafe_b64decode(previous_hash + "="), "big")
+        for key in changed_keys:
+            if key in old_state:
+                old_digest = digests.get(key)
+                if old_digest is None:
+                    old_digest = self._state_key_digest(key, old_state[key])
+                total -= old_digest
+            digests[key] = self._state_key_digest(key, new_state[key])
+            total += digests[key]
+        return self._encode_state_hash(total % self._STATE_HASH_MODULUS)
 
     def generate_idempotency_key(
         self, session_id: UUID, node_id: str, revision: int
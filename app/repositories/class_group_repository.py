@@ -5,7 +5,7 @@ Migrated from app.crud.class_group to follow repository pattern.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from uuid import UUID
 
 from fastapi import HTTPException
@@ -34,6 +34,11 @@ class ClassGroupRepository(ABC):
         """Get class group by join code."""
         pass
 
+    @abstractmethod
+    def get_claimed_class_codes(self, db: Session, codes: Iterable[str]) -> set[str]:
+        """Return the subset of `codes` already used as join codes."""
+        pass
+
     @abstractmethod
     def search(
         self,
@@ -98,6 +103,17 @@ class ClassGroupRepositoryImpl(ClassGroupRepository):
             select(ClassGroup).where(ClassGroup.join_code == code)
         ).scalar_one_or_none()
 
+    def get_claimed_class_codes(self, db: Session, codes: Iterable[str]) -> set[str]:
+        """Return the subset of `codes` already used as join codes."""
+        codes = set(codes)
+        if not codes:
+            return set()
+        return set(
+            db.scalars(
+                select(ClassGroup.join_code).where(ClassGroup.join_code.in_(codes))
+            )
+        )
+
     def search(
         self,
         db: Session,
@@ -9,7 +9,7 @@ from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy import and_, func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from structlog import get_logger
@@ -21,6 +21,8 @@ from app.models.cms import (
     ContentVisibility,
     FlowDefinition,
 )
+from app.services.cms_content_pool import cms_content_pools
+from app.services.flow_graph import flow_graph_cache
 
 logger = get_logger()
 
@@ -259,22 +261,12 @@ class CMSRepositoryImpl(CMSRepository):
         exclude_ids: Optional[List[UUID]] = None,
     ) -> Optional[CMSContent]:
         """Get random content of a specific type for variety in conversations."""
-        from sqlalchemy import func
-
-        query = (
-            select(CMSContent)
-            .where(
-                and_(CMSContent.type == content_type, CMSContent.is_active.is_(True))
-            )
-            .order_by(func.random())
-            .limit(1)
+        pool = await cms_content_pools.get(db, content_type)
+        chosen = pool.sample(
+            pool.candidates(exclude_ids=exclude_ids, apply_visibility=False), 1
         )
-
-        if exclude_ids:
-            query = query.where(~CMSContent.id.in_(exclude_ids))
-
-        result = await db.execute(query)
-        content = result.scalar_one_or_none()
+        content_items = await self._get_active_content_by_ids(db, chosen)
+        content = content_items[0] if content_items else None
 
         if content:
             logger.debug(
@@ -304,95 +296,21 @@ class CMSRepositoryImpl(CMSRepository):
         - WRIVETED visibility content is always included (global Wriveted content)
         - PUBLIC visibility content is included when include_public=True
         - SCHOOL and PRIVATE visibility requires matching school_id
-        """
-        # Start with base conditions
-        conditions = [
-            CMSContent.type == content_type,
-            CMSContent.is_active.is_(True),
-        ]
-
-        # Build visibility conditions
-        visibility_conditions = [
-            CMSContent.visibility == ContentVisibility.WRIVETED,
-        ]
-
-        if include_public:
-            visibility_conditions.append(
-                CMSContent.visibility == ContentVisibility.PUBLIC
-            )
-
-        if school_id:
-            # Include content owned by this school (SCHOOL or PRIVATE visibility)
-            visibility_conditions.append(
-                and_(
-                    CMSContent.school_id == school_id,
-                    CMSContent.visibility.in_(
-                        [ContentVisibility.SCHOOL, ContentVisibility.PRIVATE]
-                    ),
-                )
-            )
-
-        conditions.append(or_(*visibility_conditions))
 
-        # Apply tag filtering (array overlap)
-        if tags:
-            conditions.append(CMSContent.tags.op("&&")(tags))
-
-        # Apply info JSONB filtering
-        if info_filters:
-            for key, value in info_filters.items():
-                # Handle numeric comparisons for age filtering
-                if key in ("min_age", "max_age") and isinstance(value, (int, str)):
-                    try:
-                        age_value = int(value)
-                        if key == "min_age":
-                            # User's age should be >= content's min_age
-                            # Filter: content.info.min_age <= user_age
-                            conditions.append(
-                                text("(info->>'min_age')::int <= :min_age").bindparams(
-                                    min_age=age_value
-                                )
-                            )
-                        elif key == "max_age":
-                            # User's age should be <= content's max_age
-                            # Filter: content.info.max_age >= user_age
-                            conditions.append(
-                                text("(info->>'max_age')::int >= :max_age").bindparams(
-                                    max_age=age_value
-                                )
-                            )
-                    except (ValueError, TypeError):
-                        logger.warning(
-                            "Invalid age value in info_filters",
-                            key=key,
-                            value=value,
-                        )
-                else:
-                    # Use JSONB containment for other key:value matches
-                    # This checks if info @> '{"key": "value"}'
-                    import json
-
-                    json_filter = json.dumps({key: value})
-                    conditions.append(
-                        text("info @> cast(:json_filter as jsonb)").bindparams(
-                            json_filter=json_filter
-                        )
-                    )
-
-        # Apply exclusion list
-        if exclude_ids:
-            conditions.append(~CMSContent.id.in_(exclude_ids))
-
-        # Build query with random ordering
-        query = (
-            select(CMSContent)
-            .where(and_(*conditions))
-            .order_by(func.random())
-            .limit(count)
+        Candidates are filtered and sampled from the in-memory pool for the
+        content type (see ``app.services.cms_content_pool``); only the chosen
+        rows are read from the database.
+        """
+        pool = await cms_content_pools.get(db, content_type)
+        mask = pool.candidates(
+            tags=tags,
+            info_filters=info_filters,
+            exclude_ids=exclude_ids,
+            school_id=school_id,
+            include_public=include_public,
         )
-
-        result = await db.execute(query)
-        content_items = list(result.scalars().all())
+        chosen = pool.sample(mask, count)
+        content_items = await self._get_active_content_by_ids(db, chosen)
 
         logger.debug(
             "Selected random content",
@@ -406,6 +324,23 @@ class CMSRepositoryImpl(CMSRepository):
 
         return content_items
 
+    async def _get_active_content_by_ids(
+        self, db: AsyncSession, content_ids: List[UUID]
+    ) -> List[CMSContent]:
+        """Fetch content by primary key, keeping the order of ``content_ids``.
+
+        Items deactivated or deleted since the pool was loaded are dropped.
+        """
+        if not content_ids:
+            return []
+        result = await db.scalars(
+            select(CMSContent).where(
+                CMSContent.id.in_(content_ids), CMSContent.is_active.is_(True)
+            )
+        )
+        by_id = {content.id: content for content in result.all()}
+        return [by_id[content_id] for content_id in content_ids if content_id in by_id]
+
     async def publish_flow(
         self,
         db: AsyncSession,
@@ -429,6 +364,7 @@ class CMSRepositoryImpl(CMSRepository):
             flow.version = new_version
 
         await db.commit()
+        flow_graph_cache.invalidate(flow_id)
         await db.refresh(flow)
 
         logger.info(
@@ -448,6 +384,7 @@ class CMSRepositoryImpl(CMSRepository):
         flow.published_by = None
 
         await db.commit()
+        flow_graph_cache.invalidate(flow_id)
         await db.refresh(flow)
 
         logger.info("Unpublished flow", flow_id=flow_id)
@@ -534,6 +471,7 @@ class CMSRepositoryImpl(CMSRepository):
 
         await db.delete(content)
         await db.commit()
+        cms_content_pools.invalidate()
 
         logger.info("Deleted content", content_id=content_id)
 
@@ -24,6 +24,7 @@ from app.repositories.work_repository import work_repository
 from app.schemas import is_url
 from app.schemas.edition import EditionCreateIn, EditionUpdateIn
 from app.schemas.work import WorkCreateIn
+from app.services.cover_derivatives import get_cover_derivative_pipeline
 from app.services.cover_images import handle_new_edition_cover_image
 
 logger = get_logger()
@@ -195,9 +196,12 @@ class EditionRepositoryImpl(EditionRepository):
         if cover_url_data and not is_url(cover_url_data):
             cover_url = handle_new_edition_cover_image(
                 edition_isbn=clean_isbn,
-                image_url_data=cover_url_data,
+                image_data=cover_url_data,
+                folder="wriveted",
+                variants=True,
             )
             edition_data.cover_url = cover_url
+        cover_image = get_cover_derivative_pipeline().collect([edition_data.cover_url])
 
         edition = Edition(
             leading_article=edition_data.leading_article,
@@ -205,6 +209,11 @@ class EditionRepositoryImpl(EditionRepository):
             edition_subtitle=edition_data.subtitle,
             isbn=clean_isbn,
             cover_url=edition_data.cover_url,
+            cover_image=(
+                cover_image[edition_data.cover_url].model_dump(mode="json")
+                if cover_image
+                else None
+            ),
             date_published=edition_data.date_published,
             info=edition_data.info.dict() if edition_data.info else {},
             work=work,
@@ -16,8 +16,9 @@ from sqlalchemy.orm import Session
 from structlog import get_logger
 
 from app.models import Event, ServiceAccount, User
-from app.models.event import EventLevel
+from app.models.event import EventLevel, event_acl
 from app.models.school import School
+from app.schemas.events.event_detail import EventDetail
 
 logger = get_logger()
 
@@ -99,6 +100,24 @@ class EventRepository(ABC):
         """Get events with optional filters and pagination."""
         pass
 
+    @abstractmethod
+    async def aget_details_with_optional_filters(
+        self,
+        db: AsyncSession,
+        query_string: str | list[str] | None = None,
+        match_prefix: bool | None = False,
+        level: EventLevel | None = None,
+        school: School | None = None,
+        user: User | None = None,
+        service_account: ServiceAccount | None = None,
+        info_jsonpath_match: str | None = None,
+        since: datetime | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[tuple[EventDetail, list]]:
+        """Get filtered events as (EventDetail, ACL) pairs without loading ORM objects."""
+        pass
+
     @abstractmethod
     def get_types(
         self,
@@ -220,7 +239,31 @@ class EventRepositoryImpl(EventRepository):
         since: datetime | None = None,
     ):
         """Build a query with optional filters for events."""
-        event_query = select(Event).order_by(Event.timestamp.desc())
+        return self._apply_optional_filters(
+            select(Event),
+            query_string=query_string,
+            match_prefix=match_prefix,
+            level=level,
+            school=school,
+            user=user,
+            service_account=service_account,
+            info_jsonpath_match=info_jsonpath_match,
+            since=since,
+        )
+
+    def _apply_optional_filters(
+        self,
+        event_query,
+        query_string: str | list[str] | None = None,
+        match_prefix: bool | None = False,
+        level: EventLevel | None = None,
+        school: School | None = None,
+        user: User | None = None,
+        service_account: ServiceAccount | None = None,
+        info_jsonpath_match: Optional[str] = None,
+        since: datetime | None = None,
+    ):
+        event_query = event_query.order_by(Event.timestamp.desc())
 
         if query_string is not None:
             if isinstance(query_string, str):
@@ -317,6 +360,106 @@ class EventRepositoryImpl(EventRepository):
             logger.error("Error querying events", error=e, **optional_filters)
             raise ValueError("Problem filtering events")
 
+    async def aget_details_with_optional_filters(
+        self,
+        db: AsyncSession,
+        query_string: str | list[str] | None = None,
+        match_prefix: bool | None = False,
+        level: EventLevel | None = None,
+        school: School | None = None,
+        user: User | None = None,
+        service_account: ServiceAccount | None = None,
+        info_jsonpath_match: str | None = None,
+        since: datetime | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[tuple[EventDetail, list]]:
+        """Get filtered events as (EventDetail, ACL) pairs without loading ORM objects."""
+        optional_filters = {
+            "query_string": query_string,
+            "match_prefix": match_prefix,
+            "level": level,
+            "school": school,
+            "user": user,
+            "service_account": service_account,
+            "info_jsonpath_match": info_jsonpath_match,
+            "since": since,
+        }
+        logger.debug("Querying event details", **optional_filters)
+        query = self.apply_pagination(
+            self._apply_optional_filters(
+                select(
+                    Event.title,
+                    Event.info,
+                    Event.level,
+                    Event.timestamp,
+                    Event.school_id,
+                    Event.user_id,
+                    School.wriveted_identifier.label("school_wriveted_identifier"),
+                    School.name.label("school_name"),
+                    User.type.label("user_type"),
+                    User.name.label("user_name"),
+                    ServiceAccount.id.label("service_account_id"),
+                    ServiceAccount.name.label("service_account_name"),
+                    ServiceAccount.type.label("service_account_type"),
+                    ServiceAccount.is_active.label("service_account_is_active"),
+                )
+                .outerjoin(School, School.id == Event.school_id)
+                .outerjoin(User, User.id == Event.user_id)
+                .outerjoin(
+                    ServiceAccount, ServiceAccount.id == Event.service_account_id
+                ),
+                **optional_filters,
+            ),
+            skip=skip,
+            limit=limit,
+        )
+        try:
+            rows = (await db.execute(query)).all()
+        except (ProgrammingError, DataError) as e:
+            logger.error("Error querying events", error=e, **optional_filters)
+            raise ValueError("Problem filtering events")
+
+        return [
+            (
+                self._event_detail_from_row(row),
+                event_acl(row.school_id, row.user_id, row.title),
+            )
+            for row in rows
+        ]
+
+    def _event_detail_from_row(self, row) -> EventDetail:
+        return EventDetail(
+            title=row.title,
+            description=(row.info or {}).get("description") or "",
+            level=row.level,
+            timestamp=row.timestamp,
+            info=row.info,
+            school=(
+                {
+                    "wriveted_identifier": row.school_wriveted_identifier,
+                    "name": row.school_name,
+                }
+                if row.school_wriveted_identifier is not None
+                else None
+            ),
+            user=(
+                {"id": row.user_id, "type": row.user_type, "name": row.user_name}
+                if row.user_id is not None
+                else None
+            ),
+            service_account=(
+                {
+                    "id": row.service_account_id,
+                    "name": row.service_account_name,
+                    "type": row.service_account_type,
+                    "is_active": row.service_account_is_active,
+                }
+                if row.service_account_id is not None
+                else None
+            ),
+        )
+
     def get_types(
         self,
         db: Session,
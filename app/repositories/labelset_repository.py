@@ -5,9 +5,10 @@ Replaces the generic CRUDLabelset class with proper repository pattern.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from collections import defaultdict
+from typing import Any, Iterable, Optional, Sequence
 
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
 from sqlalchemy.orm import Session
 from structlog import get_logger
 
@@ -15,9 +16,11 @@ from app.models import LabelSetHue
 from app.models.hue import Hue
 from app.models.labelset import LabelOrigin, LabelSet, RecommendStatus
 from app.models.labelset_hue_association import Ordinal
+from app.models.labelset_reading_ability_association import LabelSetReadingAbility
 from app.models.reading_ability import ReadingAbility
 from app.models.work import Work
 from app.schemas.labelset import LabelSetCreateIn
+from app.services.reference_data import ReferenceData, get_reference_data
 from app.utils.dict_utils import deep_merge_dicts
 
 ORIGIN_WEIGHTS = {
@@ -68,6 +71,13 @@ class LabelsetRepository(ABC):
         """Get or create a labelset for a work."""
         pass
 
+    @abstractmethod
+    def get_or_create_many(
+        self, db: Session, work_ids: Iterable[int], commit: bool = True
+    ) -> dict[int, LabelSet]:
+        """Get or create the labelsets for many works, keyed by work id."""
+        pass
+
     @abstractmethod
     def patch(
         self,
@@ -79,6 +89,17 @@ class LabelsetRepository(ABC):
         """Patch a labelset with authority-based updates."""
         pass
 
+    @abstractmethod
+    def patch_many(
+        self,
+        db: Session,
+        patches: Sequence[tuple[LabelSet, LabelSetCreateIn]],
+        commit: bool = True,
+        raise_errors: bool = True,
+    ) -> int:
+        """Patch many labelsets, writing their hues and reading abilities in bulk."""
+        pass
+
     @abstractmethod
     def create(
         self, db: Session, obj_in: LabelSetCreateIn | dict, commit: bool = True
@@ -135,6 +156,30 @@ class LabelsetRepositoryImpl(LabelsetRepository):
         db.flush()
         return labelset
 
+    def get_or_create_many(
+        self, db: Session, work_ids: Iterable[int], commit: bool = True
+    ) -> dict[int, LabelSet]:
+        """Get or create the labelsets for many works, keyed by work id."""
+        work_ids = set(work_ids)
+        labelsets = {
+            labelset.work_id: labelset
+            for labelset in db.scalars(
+                select(LabelSet).where(LabelSet.work_id.in_(work_ids))
+            )
+        }
+        created = [
+            LabelSet(work_id=work_id, hues=[], reading_abilities=[])
+            for work_id in work_ids - labelsets.keys()
+        ]
+        if created:
+            logger.info("Creating new labelsets", count=len(created))
+            db.add_all(created)
+            db.flush()
+            if commit:
+                db.commit()
+            labelsets.update((labelset.work_id, labelset) for labelset in created)
+        return labelsets
+
     def patch(
         self,
         db: Session,
@@ -143,7 +188,126 @@ class LabelsetRepositoryImpl(LabelsetRepository):
         commit: bool = True,
     ) -> LabelSet:
         """Patch a labelset with authority-based updates."""
+        self.patch_many(db, [(labelset, data)], commit=commit)
+        if commit:
+            db.refresh(labelset)
+        return labelset
+
+    def patch_many(
+        self,
+        db: Session,
+        patches: Sequence[tuple[LabelSet, LabelSetCreateIn]],
+        commit: bool = True,
+        raise_errors: bool = True,
+    ) -> int:
+        """
+        Patch many labelsets, writing their hues and reading abilities in bulk.
+
+        Each patch is applied in memory with the same authority rules as a
+        single patch, then every changed hue and reading ability association
+        is replaced with one DELETE and one INSERT per table. Hue and reading
+        ability keys are resolved from the cached reference data, and the
+        current hue ordinals are read with one query. With
+        ``raise_errors=False`` a patch that fails is logged and skipped.
+
+        Returns the number of patches applied.
+        """
+        reference = get_reference_data(db)
+        labelset_ids = {labelset.id for labelset, _ in patches}
+        hue_ordinals: dict[int, dict[int, Ordinal]] = defaultdict(dict)
+        for labelset_id, hue_id, ordinal in db.execute(
+            select(
+                LabelSetHue.labelset_id, LabelSetHue.hue_id, LabelSetHue.ordinal
+            ).where(LabelSetHue.labelset_id.in_(labelset_ids))
+        ).all():
+            hue_ordinals[labelset_id][hue_id] = ordinal
+        reading_ability_ids: dict[int, set[int]] = {}
+        new_hues: dict[int, list[dict]] = {}
+        new_reading_abilities: dict[int, list[dict]] = {}
+        patched = {}
+
+        for labelset, data in patches:
+            if labelset.id not in reading_ability_ids:
+                reading_ability_ids[labelset.id] = {
+                    reading_ability.id for reading_ability in labelset.reading_abilities
+                }
+            try:
+                hues, reading_abilities = self._patch_in_memory(
+                    labelset,
+                    data,
+                    reference,
+                    hue_ordinals[labelset.id],
+                    reading_ability_ids[labelset.id],
+                )
+            except Exception as e:
+                if raise_errors:
+                    raise
+                logger.warning(
+                    "Skipping labelset patch", labelset_id=labelset.id, error=str(e)
+                )
+                continue
+            patched[labelset.id] = labelset
+            if hues is not None:
+                hue_ordinals[labelset.id] = {
+                    hue.id: ordinal for hue, ordinal in hues.values()
+                }
+                new_hues[labelset.id] = [
+                    {"labelset_id": labelset.id, "hue_id": hue.id, "ordinal": ordinal}
+                    for hue, ordinal in hues.values()
+                ]
+            if reading_abilities is not None:
+                reading_ability_ids[labelset.id] = set(reading_abilities)
+                new_reading_abilities[labelset.id] = [
+                    {"labelset_id": labelset.id, "reading_ability_id": id}
+                    for id in reading_abilities
+                ]
+
+        for association, rows in (
+            (LabelSetHue, new_hues),
+            (LabelSetReadingAbility, new_reading_abilities),
+        ):
+            if not rows:
+                continue
+            db.execute(
+                delete(association).where(association.labelset_id.in_(rows.keys()))
+            )
+            if new_rows := [
+                row for labelset_rows in rows.values() for row in labelset_rows
+            ]:
+                db.execute(insert(association), new_rows)
+
+        # The association tables were written directly, so reload them on access
+        for labelset_id in new_hues.keys() | new_reading_abilities.keys():
+            db.expire(patched[labelset_id], ["hues", "reading_abilities"])
+
+        if commit:
+            db.commit()
+        logger.debug(
+            "Patched labelsets",
+            patched=len(patched),
+            hues_replaced=len(new_hues),
+            reading_abilities_replaced=len(new_reading_abilities),
+        )
+        return len(patched)
+
+    def _patch_in_memory(
+        self,
+        labelset: LabelSet,
+        data: LabelSetCreateIn,
+        reference: ReferenceData,
+        old_hues: dict[int, Ordinal],
+        old_reading_abilities: set[int],
+    ) -> tuple[Optional[dict], Optional[list[int]]]:
+        """
+        Apply a patch's scalar fields to ``labelset``.
+
+        ``old_hues`` maps the labelset's current hue ids to their ordinals.
+        Returns its new hues (``{key: (hue, ordinal)}``) and reading ability
+        ids, each ``None`` if they are unchanged.
+        """
         updated = False
+        hues = None
+        reading_abilities = None
 
         # HUES
         if data.hue_origin and (
@@ -156,27 +320,23 @@ class LabelsetRepositoryImpl(LabelsetRepository):
                 data.hue_secondary_key,
                 data.hue_tertiary_key,
             }
-            old_hues = {hue.key for hue in labelset.hues}
-
-            if new_hues != old_hues:
-                db.query(LabelSetHue).filter_by(labelset_id=labelset.id).delete()
-
-                for hue_key in new_hues:
-                    if hue := self.get_hue_by_key(db, hue_key):
-                        ordinal = (
-                            Ordinal.PRIMARY
-                            if hue_key == data.hue_primary_key
-                            else (
-                                Ordinal.SECONDARY
-                                if hue_key == data.hue_secondary_key
-                                else Ordinal.TERTIARY
-                            )
-                        )
-                        db.add(
-                            LabelSetHue(
-                                labelset_id=labelset.id, hue_id=hue.id, ordinal=ordinal
-                            )
+
+            resolved_hues = {}
+            for hue_key in new_hues:
+                if hue := reference.hue(hue_key):
+                    ordinal = (
+                        Ordinal.PRIMARY
+                        if hue_key == data.hue_primary_key
+                        else (
+                            Ordinal.SECONDARY
+                            if hue_key == data.hue_secondary_key
+                            else Ordinal.TERTIARY
                         )
+                    )
+                    resolved_hues[hue_key] = (hue, ordinal)
+            # Reordering the same hues is a change too
+            if {hue.id: ordinal for hue, ordinal in resolved_hues.values()} != old_hues:
+                hues = resolved_hues
 
             labelset.hue_origin = data.hue_origin if new_hues else None
             updated = True
@@ -205,12 +365,14 @@ class LabelsetRepositoryImpl(LabelsetRepository):
                 or ORIGIN_WEIGHTS[labelset.reading_ability_origin]
                 <= ORIGIN_WEIGHTS[data.reading_ability_origin.name]
             ):
-                reading_abilities = [
-                    self.get_reading_ability_by_key(db, key)
-                    for key in data.reading_ability_keys
+                new_reading_abilities = [
+                    reading_ability.id
+                    for key in dict.fromkeys(data.reading_ability_keys)
+                    if (reading_ability := reference.reading_ability(key))
                 ]
-                if reading_abilities:
-                    labelset.reading_abilities = reading_abilities
+                if new_reading_abilities:
+                    if set(new_reading_abilities) != old_reading_abilities:
+                        reading_abilities = new_reading_abilities
                     labelset.reading_ability_origin = data.reading_ability_origin
                     updated = True
 
@@ -271,10 +433,7 @@ class LabelsetRepositoryImpl(LabelsetRepository):
 
         labelset.checked = data.checked
 
-        if commit:
-            db.commit()
-            db.refresh(labelset)
-        return labelset
+        return hues, reading_abilities
 
     def create(
         self, db: Session, obj_in: LabelSetCreateIn | dict, commit: bool = True
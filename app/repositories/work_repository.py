@@ -79,6 +79,11 @@ class WorkRepository(ABC):
         """Find a work by ISBN (via editions)."""
         pass
 
+    @abstractmethod
+    def get_work_ids_by_isbns(self, db: Session, isbns: list[str]) -> dict[str, int]:
+        """Map each ISBN that has an edition with a work to that work's id."""
+        pass
+
     @abstractmethod
     def find_by_title_and_author_key(
         self, db: Session, title: str, author_key: str
@@ -298,6 +303,15 @@ class WorkRepositoryImpl(WorkRepository):
         q = select(Work).where(Work.editions.any(Edition.isbn == isbn))
         return db.execute(q).scalar_one_or_none()
 
+    def get_work_ids_by_isbns(self, db: Session, isbns: list[str]) -> dict[str, int]:
+        """Map each ISBN that has an edition with a work to that work's id."""
+        q = (
+            select(Edition.isbn, Edition.work_id)
+            .where(Edition.isbn.in_(set(isbns)))
+            .where(Edition.work_id.is_not(None))
+        )
+        return dict(db.execute(q).all())
+
     def find_by_title_and_author_key(
         self, db: Session, title: str, author_key: str
     ) -> Optional[Work]:
@@ -57,3 +57,27 @@ class ClassGroupUpdateIn(BaseModel):
 
     members: Optional[list[ClassGroupMemberUpdateIn]] = None
     admins: Optional[list[ClassGroupMemberUpdateIn]] = None
+
+
+class StudentRosterEntry(BaseModel):
+    first_name: str = Field(..., min_length=1)
+    last_name_initial: str = Field(..., min_length=1)
+
+
+class StudentRosterIn(BaseModel):
+    students: list[StudentRosterEntry] = Field(..., min_length=1, max_length=5000)
+
+
+class ProvisionedStudent(BaseModel):
+    id: UUID
+    name: str
+    username: str
+
+
+class StudentRosterResponse(BaseModel):
+    class_group_id: UUID
+    school_id: UUID = Field(None, description="School Identifier (Wriveted UUID)")
+    join_code: str = Field(
+        None, description="Joining code students sign in with, with their username"
+    )
+    students: list[ProvisionedStudent]
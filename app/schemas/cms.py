@@ -243,6 +243,9 @@ class ContentVariantDetail(BaseModel):
     weight: int
     conditions: Dict[str, Any]
     performance_data: Dict[str, Any]
+    impressions: int = 0
+    engagements: int = 0
+    conversions: int = 0
     is_active: bool
     created_at: datetime
 
@@ -58,6 +58,22 @@ class EditionInfo(BaseModel):
     other: dict | None = None
 
 
+class CoverImageVariant(BaseModel):
+    url: AnyHttpUrl
+    width: int
+    height: int
+    format: str
+
+
+class CoverImage(BaseModel):
+    width: int
+    height: int
+    blurhash: Optional[str] = None
+    dominant_color: Optional[str] = None  # "#rrggbb"
+    # Smallest first, a webp and a jpeg per width
+    variants: list[CoverImageVariant] = []
+
+
 class EditionBrief(BaseModel):
     leading_article: Optional[str] = None
     title: Optional[str] = None
@@ -74,6 +90,8 @@ class EditionDetail(EditionBrief):
     series_name: Optional[str] = None
     series_number: Optional[int] = None
 
+    cover_image: Optional[CoverImage] = None
+
     authors: list[AuthorBrief]
     illustrators: list[IllustratorBrief]
 
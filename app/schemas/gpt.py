@@ -149,6 +149,9 @@ class GptWorkData(BaseModel):
         except ValueError:
             return None
 
+    min_age: int | None = None
+    max_age: int | None = None
+
     awards: list[str] | None = []
     notes: str | None = None
     recommend_status: RecommendStatus
@@ -202,6 +202,8 @@ class HydratedBookData(BaseModel):
     illustrators: list[Contributor] = []  # CNF{n} if CR{n} in ["A12", "A35"]
 
     cover_url: str | None = None
+    # CoverImage of an uploaded cover, set once its variants are made
+    cover_image: dict | None = None
     date_published: int | None = None  # PUBPD
 
     info: EditionInfo | None = None
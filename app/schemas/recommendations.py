@@ -4,6 +4,7 @@ from typing import Optional
 from pydantic import BaseModel, HttpUrl
 
 from app.schemas import CaseInsensitiveStringEnum
+from app.schemas.edition import CoverImage
 from app.schemas.labelset import LabelSetDetail
 
 
@@ -54,6 +55,7 @@ class HueyBook(BaseModel):
     work_id: int
     isbn: str
     cover_url: HttpUrl | None = None
+    cover_image: CoverImage | None = None
     display_title: str  # {leading article} {title} (leading article is optional, thus bridging whitespace optional)
     authors_string: str  # {a1.first_name} {a1.last_name}, {a2.first_name} {a2.last_name} ... (first name is optional, thus bridging whitespace optional)
     summary: str
@@ -5,8 +5,11 @@ This service extracts analytics logic from CRUD layer to demonstrate proper
 service layer architecture improvements.
 """
 
+import dataclasses
+import math
 from datetime import date, datetime, timedelta
 from typing import Optional
+from uuid import UUID
 
 from sqlalchemy import and_, case, distinct, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,10 +26,31 @@ from app.models.cms import (
     SessionStatus,
 )
 from app.schemas.analytics import FlowAnalytics, NodeAnalytics
+from app.services.content_variants import (
+    COUNTERS,
+    VariantArm,
+    get_content_variant_allocator,
+)
 
 logger = get_logger()
 
 
+def _conversion_rate(arm: VariantArm) -> float:
+    return arm.conversions / arm.impressions if arm.impressions else 0.0
+
+
+def _two_proportion_p_value(a: VariantArm, b: VariantArm) -> Optional[float]:
+    """Two-sided p-value of a two-proportion z-test on conversion rates."""
+    if not a.impressions or not b.impressions:
+        return None
+    pooled = (a.conversions + b.conversions) / (a.impressions + b.impressions)
+    variance = pooled * (1 - pooled) * (1 / a.impressions + 1 / b.impressions)
+    if variance <= 0:
+        return 1.0
+    z = (_conversion_rate(a) - _conversion_rate(b)) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
 class AnalyticsService:
     """
     Service for conversation flow analytics.
@@ -797,21 +821,11 @@ class AnalyticsService:
         """
         logger.info("Calculating A/B test results", content_id=content_id)
 
-        # Query content variants
-        variants_query = (
-            select(
-                CMSContentVariant.variant_key,
-                CMSContentVariant.weight,
-                CMSContentVariant.performance_data,
-            )
-            .where(CMSContentVariant.content_id == content_id)
-            .where(CMSContentVariant.is_active is True)
-        )
-
-        variants_result = await db.execute(variants_query)
-        variants = variants_result.fetchall()
+        content_uuid = UUID(str(content_id))
+        allocator = get_content_variant_allocator()
+        arms = (await allocator.get_arms_many(db, [content_uuid]))[content_uuid]
 
-        if not variants:
+        if not arms:
             return {
                 "content_id": content_id,
                 "test_results": {},
@@ -820,47 +834,61 @@ class AnalyticsService:
                 "confidence_level": 0.0,
             }
 
-        # Process variant performance data
-        test_results = {}
-        best_variant = None
-        best_rate = 0.0
-
-        for variant in variants:
-            # Use performance_data if available, otherwise simulate based on variant key
-
-            # Simulate performance metrics based on variant key hash
-            import hashlib
-
-            variant_hash = int(
-                hashlib.md5(variant.variant_key.encode()).hexdigest()[:8], 16
+        shares = allocator.shares(arms)
+        # Counters include increments recorded in this process but not yet
+        # flushed, so results are current without forcing a write. Totals
+        # reported through the performance endpoint are added on top; the
+        # cached arms themselves are left untouched.
+        reported = dict(
+            (
+                await db.execute(
+                    select(
+                        CMSContentVariant.id, CMSContentVariant.performance_data
+                    ).where(CMSContentVariant.id.in_([arm.id for arm in arms]))
+                )
+            ).all()
+        )
+        arms = [
+            dataclasses.replace(
+                arm,
+                **{
+                    name: getattr(arm, name)
+                    + int((reported.get(arm.id) or {}).get(name) or 0)
+                    for name in COUNTERS
+                },
             )
+            for arm in arms
+        ]
 
-            sample_size = 400 + (variant_hash % 200)
-            conversion_rate = 0.1 + (variant_hash % 50) / 1000
-            engagement_rate = 0.6 + (variant_hash % 20) / 100
-
-            test_results[variant.variant_key] = {
-                "traffic_percentage": variant.weight or 50,
-                "conversion_rate": conversion_rate,
-                "engagement_rate": engagement_rate,
-                "sample_size": sample_size,
+        test_results = {}
+        for arm, share in zip(arms, shares):
+            impressions = arm.impressions
+            test_results[arm.variant_key] = {
+                "traffic_percentage": round(share * 100, 2),
+                "conversion_rate": (
+                    arm.conversions / impressions if impressions else 0.0
+                ),
+                "engagement_rate": (
+                    arm.engagements / impressions if impressions else 0.0
+                ),
+                "sample_size": impressions,
             }
 
-            if conversion_rate > best_rate:
-                best_rate = conversion_rate
-                best_variant = variant.variant_key
+        ranked = sorted(arms, key=lambda arm: _conversion_rate(arm), reverse=True)
+        best = ranked[0]
+        best_variant = best.variant_key if best.impressions else None
 
-        # Calculate statistical significance (simplified)
-        is_significant = len(test_results) >= 2 and best_rate > 0.12
-        confidence_level = 0.95 if is_significant else 0.80
+        p_value = _two_proportion_p_value(best, ranked[1]) if len(ranked) > 1 else None
+        is_significant = p_value is not None and p_value < 0.05
+        confidence_level = round(1 - p_value, 4) if p_value is not None else 0.0
 
         return {
             "content_id": content_id,
-            "test_status": "active" if len(variants) > 1 else "not_running",
+            "test_status": "active" if len(arms) > 1 else "not_running",
             "test_results": test_results,
             "statistical_significance": {
                 "confidence_level": confidence_level,
-                "p_value": 0.032 if is_significant else 0.15,
+                "p_value": p_value,
                 "is_significant": is_significant,
             },
             "winning_variant": best_variant,
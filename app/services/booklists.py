@@ -9,6 +9,7 @@ from app.models.booklist import BookList, ListSharingType, ListType
 from app.models.booklist_work_association import BookListItem
 from app.models.event import EventLevel, EventSlackChannel
 from app.repositories.booklist_repository import booklist_repository
+from app.repositories.catalogue_read_repository import catalogue_read_repository
 from app.repositories.edition_repository import edition_repository
 from app.schemas.booklist import (
     BookListCreateIn,
@@ -26,11 +27,7 @@ from app.services.background_tasks import queue_background_task
 
 # Local import to avoid circular dependency
 # from app.services.events import create_event
-from app.services.gcp_storage import (
-    base64_string_to_bucket,
-    delete_blob,
-    url_to_blob_name,
-)
+from app.services.object_storage import get_object_storage
 
 logger = get_logger()
 settings = get_settings()
@@ -180,15 +177,10 @@ def _handle_upload_booklist_feature_image(
     filename = booklist_id
 
     # upload the image to the bucket
-    public_url = base64_string_to_bucket(
-        data=image_data,
-        folder=folder,
-        filename=filename,
-        bucket_name=settings.GCP_HUEY_MEDIA_BUCKET,
+    return get_object_storage().upload_image(
+        image_data, settings.GCP_HUEY_MEDIA_BUCKET, folder, filename
     )
 
-    return public_url
-
 
 def handle_booklist_feature_image_update(
     booklist: BookList, image_data: str
@@ -208,10 +200,7 @@ def handle_booklist_feature_image_update(
     )
     current_url = booklist.info.get("image_url")
     if current_url and current_url != new_url:
-        delete_blob(
-            settings.GCP_HUEY_MEDIA_BUCKET,
-            url_to_blob_name(current_url),
-        )
+        get_object_storage().delete_url(current_url)
     return new_url
 
 
@@ -315,3 +304,103 @@ def populate_booklist_object(
         if not enriched
         else BookListDetailEnriched.model_validate(booklist)
     )
+
+
+async def apopulate_booklist_object(
+    booklist: BookList,
+    session,
+    pagination,
+    enriched: bool = False,
+):
+    """
+    Async version of populate_booklist_object built from Core projections.
+
+    Works, labels and editions for the whole page are fetched with a fixed
+    number of queries instead of one edition lookup per item.
+    """
+    logger.debug("Getting booklist", booklist_id=booklist.id)
+    brief = await catalogue_read_repository.aget_booklist_brief(session, booklist.id)
+    items = await catalogue_read_repository.aget_booklist_items(
+        session, booklist.id, skip=pagination.skip, limit=pagination.limit
+    )
+    works = await catalogue_read_repository.aget_enriched_works(
+        session, [item["work_id"] for item in items]
+    )
+    for item in items:
+        item["work"] = works[item["work_id"]]
+
+    if enriched:
+        items = await _enrich_booklist_items(session, booklist, items)
+
+    logger.debug("Returning paginated booklist", item_count=len(items))
+    detail = {
+        **brief,
+        "data": items,
+        "pagination": Pagination(**pagination.to_dict(), total=brief["book_count"]),
+    }
+    return (
+        BookListDetailEnriched.model_validate(detail)
+        if enriched
+        else BookListDetail.model_validate(detail)
+    )
+
+
+async def _enrich_booklist_items(session, booklist: BookList, items: list[dict]):
+    import app.services.editions as editions_service
+
+    requested_isbns = {}
+    for item in items:
+        isbn = (item["info"] or {}).get("edition")
+        if isbn:
+            try:
+                requested_isbns[item["order_id"]] = (
+                    editions_service.get_definitive_isbn(isbn)
+                )
+            except (AssertionError, ValueError, TypeError):
+                pass
+
+    editions = await catalogue_read_repository.aget_edition_details(
+        session, requested_isbns.values()
+    )
+    featured = await catalogue_read_repository.aget_feature_edition_details(
+        session,
+        [
+            item["work_id"]
+            for item in items
+            if requested_isbns.get(item["order_id"]) not in editions
+        ],
+    )
+
+    enriched_items = []
+    for item in items:
+        edition = editions.get(requested_isbns.get(item["order_id"])) or featured.get(
+            item["work_id"]
+        )
+        if edition is None:
+            await _report_work_without_editions(session, booklist, item["work"])
+            # Skip this item
+            continue
+        enriched_items.append({**item, "edition": edition})
+    return enriched_items
+
+
+async def _report_work_without_editions(session, booklist: BookList, work) -> None:
+    # Local import to avoid circular dependency
+    from app.services.events import create_event
+
+    def report(sync_session):
+        create_event(
+            session=sync_session,
+            level=EventLevel.WARNING,
+            title="Work referenced by a booklist has no editions",
+            description=f"The booklist '{booklist.name}' has an item referencing work {work.title} which has no editions",
+            info={
+                "booklist_id": booklist.id,
+                "booklist_name": booklist.name,
+                "work_id": int(work.id),
+                "work_title": work.title,
+            },
+            slack_channel=EventSlackChannel.EDITORIAL,
+        )
+
+    await session.run_sync(report)
@@ -0,0 +1,131 @@
+"""
+Process-wide cache of the metadata needed to start a chat session.
+
+``/chat/start`` needs the flow's theme and, for school-branded sessions, the
+school's name. Both change rarely and are read on every session start, so
+each process keeps the small projections it returns (the theme payload and
+the school name) for ``CHAT_METADATA_CACHE_TTL_SECONDS``.
+
+Themes are dropped when edited through the CMS API in this process. School
+names, and edits made by other processes, are picked up when the TTL expires.
+Misses (unknown or inactive themes and schools) are cached too.
+"""
+
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.cms import ChatTheme
+from app.models.school import School
+
+MAX_CACHED_ENTRIES = 4_096
+
+
+class ChatMetadataCache:
+    """TTL cache of chat themes keyed by id and school names by wriveted id."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = MAX_CACHED_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._themes: Dict[uuid.UUID, Tuple[float, Optional[Dict[str, Any]]]] = {}
+        self._school_names: Dict[str, Tuple[float, Optional[str]]] = {}
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            return get_settings().CHAT_METADATA_CACHE_TTL_SECONDS
+        return self._ttl_seconds
+
+    def invalidate_theme(self, theme_id: Optional[uuid.UUID] = None) -> None:
+        """Drop one theme, or every theme when ``theme_id`` is None."""
+        if theme_id is None:
+            self._themes.clear()
+        else:
+            self._themes.pop(theme_id, None)
+
+    def invalidate_school(self, wriveted_id: Optional[str] = None) -> None:
+        """Drop one school name, or every school name when None."""
+        if wriveted_id is None:
+            self._school_names.clear()
+        else:
+            self._school_names.pop(str(wriveted_id), None)
+
+    def _lookup(self, entries: dict, key) -> Tuple[bool, Any]:
+        entry = entries.get(key)
+        if entry is not None and self._clock() - entry[0] < self.ttl_seconds:
+            return True, entry[1]
+        return False, None
+
+    def _store(self, entries: dict, key, value) -> None:
+        entries[key] = (self._clock(), value)
+        if len(entries) > self.max_entries:
+            # Dicts keep insertion order, so this drops the oldest entry
+            entries.pop(next(iter(entries)))
+
+    async def get_theme(
+        self, db: AsyncSession, theme_id: uuid.UUID
+    ) -> Optional[Dict[str, Any]]:
+        """Return the active theme's client payload, or None."""
+        hit, theme = self._lookup(self._themes, theme_id)
+        if hit:
+            return theme
+
+        row = (
+            await db.execute(
+                select(
+                    ChatTheme.id,
+                    ChatTheme.name,
+                    ChatTheme.config,
+                    ChatTheme.logo_url,
+                    ChatTheme.avatar_url,
+                ).where(ChatTheme.id == theme_id, ChatTheme.is_active.is_(True))
+            )
+        ).first()
+        theme = (
+            {
+                "id": str(row.id),
+                "name": row.name,
+                "config": row.config,
+                "logo_url": row.logo_url,
+                "avatar_url": row.avatar_url,
+            }
+            if row is not None
+            else None
+        )
+        self._store(self._themes, theme_id, theme)
+        return theme
+
+    async def get_school_name(
+        self, db: AsyncSession, wriveted_id: Any
+    ) -> Optional[str]:
+        """Return the name of the school with ``wriveted_id``, or None."""
+        key = str(wriveted_id)
+        hit, name = self._lookup(self._school_names, key)
+        if hit:
+            return name
+
+        try:
+            school_uuid = uuid.UUID(key)
+        except ValueError:
+            name = None
+        else:
+            name = (
+                await db.execute(
+                    select(School.name).where(School.wriveted_identifier == school_uuid)
+                )
+            ).scalar_one_or_none()
+        self._store(self._school_names, key, name)
+        return name
+
+
+chat_metadata_cache = ChatMetadataCache()
@@ -22,7 +22,12 @@ from app.models.cms import (
 )
 from app.repositories.chat_repository import chat_repo
 from app.repositories.cms_repository import CMSRepositoryImpl
+from app.services.chat_metadata_cache import chat_metadata_cache
+from app.services.cms_content_cache import CachedContent, cms_content_cache
+from app.services.concurrency_service import concurrency_service
+from app.services.content_variants import VariantArm, get_content_variant_allocator
 from app.services.execution_trace import execution_trace_service
+from app.services.flow_graph import flow_graph_cache
 from app.services.variable_resolver import create_session_resolver
 
 
@@ -50,6 +55,9 @@ def sanitize_user_input(user_input: str) -> str:
 
 logger = get_logger()
 
+# Session system state key holding the variant shown per content id
+CONTENT_VARIANTS_STATE_KEY = "_content_variants"
+
 
 class NodeProcessor(ABC):
     """Abstract base class for node processors."""
@@ -93,6 +101,91 @@ class NodeProcessor(ABC):
 
         return None
 
+    async def assign_variants(
+        self,
+        db: AsyncSession,
+        content_ids: List[UUID],
+        session: ConversationSession,
+        **counts: int,
+    ) -> Dict[UUID, VariantArm]:
+        """Pick the session's variant of each content item and count it.
+
+        Uses cached variants and in-memory counters. The first variant picked
+        for a content item is stored in the session's system state and reused
+        for the rest of the session, since the traffic shares move as counts
+        come in. That state write is the only database write, and is left
+        for the caller's transaction to commit.
+        """
+        if not content_ids:
+            return {}
+        allocator = get_content_variant_allocator()
+        try:
+            arms_by_content = await allocator.get_arms_many(db, content_ids)
+        except Exception as e:
+            self.logger.error("Error loading content variants", error=str(e))
+            return {}
+
+        stored = self._stored_variant_ids(session)
+        assigned = {}
+        new_assignments = {}
+        for content_id, arms in arms_by_content.items():
+            arm = allocator.find(arms, stored.get(str(content_id)))
+            if arm is None:
+                arm = allocator.assign(content_id, session.id, arms)
+                if arm is None:
+                    continue
+                new_assignments[str(content_id)] = str(arm.id)
+            allocator.record(arm, **counts)
+            assigned[content_id] = arm
+
+        if new_assignments:
+            try:
+                await chat_repo.update_session_state(
+                    db,
+                    session_id=session.id,
+                    state_updates={
+                        "system": {CONTENT_VARIANTS_STATE_KEY: new_assignments}
+                    },
+                    commit=False,
+                )
+            except Exception as e:
+                self.logger.error("Error storing content variants", error=str(e))
+        return assigned
+
+    async def credit_variants(
+        self,
+        db: AsyncSession,
+        content_ids: List[UUID],
+        session: ConversationSession,
+        **counts: int,
+    ) -> Dict[UUID, VariantArm]:
+        """Count events against the variants this session was already shown."""
+        stored = self._stored_variant_ids(session)
+        content_ids = [
+            content_id for content_id in content_ids if str(content_id) in stored
+        ]
+        if not content_ids:
+            return {}
+        allocator = get_content_variant_allocator()
+        try:
+            arms_by_content = await allocator.get_arms_many(db, content_ids)
+        except Exception as e:
+            self.logger.error("Error loading content variants", error=str(e))
+            return {}
+
+        credited = {}
+        for content_id, arms in arms_by_content.items():
+            arm = allocator.find(arms, stored[str(content_id)])
+            if arm is not None:
+                allocator.record(arm, **counts)
+                credited[content_id] = arm
+        return credited
+
+    @staticmethod
+    def _stored_variant_ids(session: ConversationSession) -> Dict[str, str]:
+        system = (session.state or {}).get("system") or {}
+        return system.get(CONTENT_VARIANTS_STATE_KEY) or {}
+
 
 class MessageNodeProcessor(NodeProcessor):
     """Processor for MESSAGE nodes."""
@@ -111,6 +204,10 @@ class MessageNodeProcessor(NodeProcessor):
 
         # Get messages from content
         message_configs = node_content.get("messages", [])
+        cms_contents = await self._load_cms_contents(db, message_configs)
+        variants = await self.assign_variants(
+            db, list(cms_contents), session, impressions=1
+        )
 
         for msg_config in message_configs:
             message = None
@@ -118,10 +215,10 @@ class MessageNodeProcessor(NodeProcessor):
             if content_id:
                 # Get content from CMS
                 try:
-                    content = await crud.content.aget(db, UUID(content_id))
+                    content = cms_contents.get(UUID(content_id))
                     if content and content.is_active:
                         message = await self._render_content_message(
-                            content, session_state
+                            content, session_state, variants.get(content.id)
                         )
                 except Exception as e:
                     self.logger.error(
@@ -188,16 +285,48 @@ class MessageNodeProcessor(NodeProcessor):
             "wait_for_acknowledgment": node_content.get("wait_for_ack", False),
         }
 
+    async def _load_cms_contents(
+        self, db: AsyncSession, message_configs: List[Dict[str, Any]]
+    ) -> Dict[UUID, CachedContent]:
+        """Load all CMS content referenced by the node's messages at once."""
+        content_ids = []
+        for msg_config in message_configs:
+            content_id = msg_config.get("content_id")
+            if content_id:
+                try:
+                    content_ids.append(UUID(content_id))
+                except (ValueError, TypeError, AttributeError):
+                    # Reported per message when rendering
+                    continue
+        if not content_ids:
+            return {}
+        try:
+            return await cms_content_cache.get_many(db, content_ids)
+        except Exception as e:
+            self.logger.error(
+                "Error loading content",
+                content_ids=[str(content_id) for content_id in content_ids],
+                error=str(e),
+            )
+            return {}
+
     async def _render_content_message(
-        self, content, session_state: Dict[str, Any]
+        self,
+        content,
+        session_state: Dict[str, Any],
+        variant: Optional[VariantArm] = None,
     ) -> Dict[str, Any]:
         """Render content message with variable substitution."""
         content_data = content.content or {}
+        if variant is not None:
+            content_data = {**content_data, **(variant.variant_data or {})}
         message = {
             "id": str(content.id),
             "type": content.type.value,
             "content": self._deep_substitute_variables(content_data, session_state),
         }
+        if variant is not None:
+            message["variant_id"] = str(variant.id)
         return message
 
     def _render_inline_message(
@@ -328,10 +457,13 @@ class QuestionNodeProcessor(NodeProcessor):
 
             if content_id and question_message is None:
                 try:
-                    content = await crud.content.aget(db, UUID(content_id))
+                    content = await cms_content_cache.get(db, UUID(content_id))
                     if content and content.is_active:
+                        variants = await self.assign_variants(
+                            db, [content.id], session, impressions=1
+                        )
                         question_message = await self._render_question_message(
-                            content, session_state
+                            content, session_state, variants.get(content.id)
                         )
                 except Exception as e:
                     self.logger.error(
@@ -615,8 +747,10 @@ class QuestionNodeProcessor(NodeProcessor):
 
         if content_id:
             try:
-                content = await crud.content.aget(db, UUID(content_id))
+                content = await cms_content_cache.get(db, UUID(content_id))
                 if content and content.is_active:
+                    # An answer converts the variant this session was shown
+                    await self.credit_variants(db, [content.id], session, conversions=1)
                     variable_name = content.content.get("variable")
                     self.logger.debug(
                         "Got variable from CMS content",
@@ -861,15 +995,22 @@ class QuestionNodeProcessor(NodeProcessor):
         return user_input
 
     async def _render_question_message(
-        self, content, session_state: Dict[str, Any]
+        self,
+        content,
+        session_state: Dict[str, Any],
+        variant: Optional[VariantArm] = None,
     ) -> Dict[str, Any]:
         """Render question content with variable substitution."""
         content_data = content.content or {}
+        if variant is not None:
+            content_data = {**content_data, **(variant.variant_data or {})}
         message = {
             "id": str(content.id),
             "type": content.type.value,
             "content": self._deep_substitute_variables(content_data, session_state),
         }
+        if variant is not None:
+            message["variant_id"] = str(variant.id)
         return message
 
     def _deep_substitute_variables(
@@ -939,10 +1080,14 @@ class ChatRuntime:
         session_token: Optional[str] = None,
         initial_state: Optional[Dict[str, Any]] = None,
     ) -> ConversationSession:
-        """Start a new conversation session."""
-        # Get flow definition
-        flow = await crud.flow.aget(db, flow_id)
-        if not flow or not flow.is_published or not flow.is_active:
+        """Start a new conversation session.
+
+        Flow metadata and the school name come from process-wide caches, so
+        on a warm cache the only round trips are the session insert and its
+        commit.
+        """
+        compiled = await flow_graph_cache.get(db, flow_id)
+        if compiled is None or not compiled.is_available:
             raise FlowNotFoundError("Flow not found or not available")
 
         # Generate session token if not provided
@@ -951,10 +1096,12 @@ class ChatRuntime:
 
             session_token = secrets.token_urlsafe(32)
 
-        trace_enabled = await execution_trace_service.should_trace_session(
-            db=db, flow_id=flow_id, session_token=session_token
+        trace_enabled = execution_trace_service.sample_session(
+            compiled.trace_enabled, compiled.trace_sample_rate, session_token
         )
-        trace_level = execution_trace_service.get_trace_level(flow).value
+        trace_level = execution_trace_service.get_trace_level(compiled).value
+
+        initial_state = await self._with_school_name(db, initial_state)
 
         # Create session with flow version for historical tracking
         session = await chat_repo.create_session(
@@ -963,7 +1110,7 @@ class ChatRuntime:
             user_id=user_id,
             session_token=session_token,
             initial_state=initial_state,
-            flow_version=flow.version,
+            flow_version=compiled.version,
             trace_enabled=trace_enabled,
             trace_level=trace_level,
         )
@@ -977,6 +1124,24 @@ class ChatRuntime:
 
         return session
 
+    async def _with_school_name(
+        self, db: AsyncSession, initial_state: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Add ``context.school_name`` for sessions started with a school id."""
+        context = (initial_state or {}).get("context") or {}
+        school_wriveted_id = context.get("school_wriveted_id")
+        if not school_wriveted_id or context.get("school_name"):
+            return initial_state
+
+        school_name = await chat_metadata_cache.get_school_name(db, school_wriveted_id)
+        if school_name is None:
+            self.logger.warning(
+                "Could not resolve school name",
+                school_wriveted_id=school_wriveted_id,
+            )
+            return initial_state
+        return {**initial_state, "context": {**context, "school_name": school_name}}
+
     async def process_node(
         self,
         db: AsyncSession,
@@ -1140,7 +1305,23 @@ class ChatRuntime:
         user_input: str,
         input_type: str = "text",
     ) -> Dict[str, Any]:
-        """Process user interaction based on current node."""
+        """Process user interaction based on current node.
+
+        Turns on the same session are serialized with the session lock, and
+        the session is re-read once the lock is held so a turn never builds
+        on state another turn has since replaced.
+        """
+        async with concurrency_service.session_lock(db, session.id):
+            await db.refresh(session)
+            return await self._process_interaction(db, session, user_input, input_type)
+
+    async def _process_interaction(
+        self,
+        db: AsyncSession,
+        session: ConversationSession,
+        user_input: str,
+        input_type: str,
+    ) -> Dict[str, Any]:
         if session.status != SessionStatus.ACTIVE:
             raise ValueError("Session is not active")
 
@@ -1770,13 +1951,11 @@ class ChatRuntime:
         self, db: AsyncSession, flow_id: UUID, session: ConversationSession
     ) -> Optional[Dict[str, Any]]:
         """Get the initial node for a flow."""
-        flow = await crud.flow.aget(db, flow_id)
-        if not flow:
+        compiled = await flow_graph_cache.get(db, flow_id)
+        if compiled is None:
             return None
 
-        entry_node = await chat_repo.get_flow_node(
-            db, flow_id=flow_id, node_id=flow.entry_node_id
-        )
+        entry_node = await compiled.attach_node(db, compiled.entry_node_id)
 
         if entry_node:
             result = await self.process_node(db, entry_node, session)
@@ -1949,6 +2128,9 @@ chat_runtime = ChatRuntime()
 
 
 def reset_chat_runtime() -> None:
-    """Reset the global chat runtime instance for testing."""
+    """Reset the global chat runtime instance and its caches for testing."""
     global chat_runtime
     chat_runtime = ChatRuntime()
+    flow_graph_cache.invalidate()
+    chat_metadata_cache.invalidate_theme()
+    chat_metadata_cache.invalidate_school()
@@ -1,8 +1,50 @@
+import csv
+import io
 import random
+import uuid
+from datetime import datetime
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from structlog import get_logger
 
+from app.models import ClassGroup, Student, User
+from app.models.reader import Reader
+from app.models.user import UserAccountType
 from app.repositories.class_group_repository import class_group_repository
+from app.repositories.event_repository import event_repository
+from app.schemas.class_group import ProvisionedStudent, StudentRosterEntry
+
+logger = get_logger()
+
+# Ambiguities such as 1/I, O/0 have been omitted, as have vowels,
+# in an attempt to prevent accidental generation of any profanities.
+CLASS_CODE_ALPHABET = "2346789BCDFGHJKMPQRTVWXY"
+
+MAX_CANDIDATE_ROUNDS = 10
+
+
+def new_random_class_codes(session: Session, count: int, length: int = 6) -> list[str]:
+    """
+    Generates `count` distinct random class codes that aren't already claimed
+    by a class, checking each round of candidates with a single query.
+    """
+    codes: set[str] = set()
+    for _ in range(MAX_CANDIDATE_ROUNDS):
+        needed = count - len(codes)
+        if needed <= 0:
+            break
+        candidates = {
+            "".join(random.choices(CLASS_CODE_ALPHABET, k=length))
+            for _ in range(needed * 2)
+        } - codes
+        claimed = class_group_repository.get_claimed_class_codes(session, candidates)
+        codes.update(list(candidates - claimed)[:needed])
+
+    if len(codes) < count:
+        raise ValueError("Couldn't generate a random class code")
+
+    return list(codes)
 
 
 def new_random_class_code(session: Session, length: int = 6):
@@ -10,22 +52,129 @@ def new_random_class_code(session: Session, length: int = 6):
     Generates a new random class code using 6 alphanumerics*,
     ensuring it's not already claimed by a class.
 
-    * Ambiguities such as 1/I, O/0 have been omitted, as have vowels,
-    in an attempt to prevent accidental generation of any profanities.
+    * See `CLASS_CODE_ALPHABET`.
     Final entropy: 24 ^ 6 = 191,102,976 combinations
     """
-    code = ""
-    code_valid = False
-    attempts_remaining = 1000
+    (code,) = new_random_class_codes(session, 1, length)
+    return code
+
+
+def parse_student_roster_csv(text: str) -> list[StudentRosterEntry]:
+    """
+    Read a roster with a header row. Takes ``first_name`` and either
+    ``last_name_initial`` or ``last_name`` columns, any others are ignored.
 
-    while not code_valid and attempts_remaining > 0:
-        code = "".join(random.choice("2346789BCDFGHJKMPQRTVWXY") for i in range(length))
-        code_valid = (
-            code and class_group_repository.get_by_class_code(session, code) is None
+    Raises ``ValueError`` naming the line of any row with more fields than
+    the header.
+    """
+    entries = []
+    reader = csv.DictReader(io.StringIO(text.lstrip("\ufeff")))
+    for row in reader:
+        if None in row:
+            raise ValueError(
+                f"Roster line {reader.line_num} has more fields than the header"
+            )
+        row = {key.strip().lower(): (value or "").strip() for key, value in row.items()}
+        if not any(row.values()):
+            continue
+        last_name_initial = row.get("last_name_initial") or row.get("last_name", "")[:1]
+        entries.append(
+            StudentRosterEntry(
+                first_name=row.get("first_name", ""),
+                last_name_initial=last_name_initial,
+            )
         )
-        attempts_remaining -= 1
+    return entries
 
-    if attempts_remaining == 0:
-        raise ValueError("Couldn't generate a random class code")
 
-    return code
+def provision_students(
+    session: Session,
+    class_group: ClassGroup,
+    roster: list[StudentRosterEntry],
+    account=None,
+) -> list[ProvisionedStudent]:
+    """
+    Create a student account in `class_group` for every roster entry.
+
+    Usernames are allocated for the whole roster in a few batched lookups,
+    and the users, readers and students rows are each written with
+    multi-row inserts. One summary event is recorded and everything is
+    committed together.
+    """
+    # Local import to avoid circular dependency
+    from app.services.users import new_identifiable_usernames
+
+    school = class_group.school
+    usernames = new_identifiable_usernames(
+        [(entry.first_name, entry.last_name_initial) for entry in roster],
+        session,
+        school.id,
+    )
+
+    now = datetime.utcnow()
+    students = [
+        ProvisionedStudent(
+            id=uuid.uuid4(),
+            name=f"{entry.first_name} {entry.last_name_initial}",
+            username=username,
+        )
+        for entry, username in zip(roster, usernames)
+    ]
+    session.execute(
+        insert(User.__table__),
+        [
+            {
+                "id": student.id,
+                "type": UserAccountType.STUDENT,
+                "is_active": True,
+                "name": student.name,
+                "info": {"sign_in_provider": "class-code"},
+                "created_at": now,
+                "updated_at": now,
+            }
+            for student in students
+        ],
+    )
+    session.execute(
+        insert(Reader.__table__),
+        [
+            {
+                "id": student.id,
+                "first_name": entry.first_name,
+                "last_name_initial": entry.last_name_initial,
+                "huey_attributes": {},
+            }
+            for student, entry in zip(students, roster)
+        ],
+    )
+    session.execute(
+        insert(Student.__table__),
+        [
+            {
+                "id": student.id,
+                "username": student.username,
+                "school_id": school.id,
+                "class_group_id": class_group.id,
+                "student_info": {},
+            }
+            for student in students
+        ],
+    )
+
+    event_repository.create(
+        session=session,
+        title="Students provisioned",
+        description=f"{len(students)} students added to class '{class_group.name}'",
+        info={
+            "class_group_id": str(class_group.id),
+            "count": len(students),
+        },
+        school=school,
+        account=account,
+        commit=False,
+    )
+    session.commit()
+    logger.info(
+        "Provisioned students", class_group_id=class_group.id, count=len(students)
+    )
+    return students
@@ -0,0 +1,222 @@
+"""
+Read-through cache of active CMS content bodies.
+
+Message and question nodes reference CMS content by id and render it on
+every visit. Popular onboarding content is read thousands of times an hour
+and almost never changes, so each process keeps an immutable snapshot of the
+fields rendering needs (id, type, version and body), keyed by content id and
+version. Once an entry is older than ``CMS_CONTENT_CACHE_TTL_SECONDS`` only
+its version is re-read, and the body is reloaded only if the version moved.
+
+Entries are dropped when:
+1. Content is changed through ``CMSWorkflowService`` / the CMS API in this
+   process (after the change is committed),
+2. A ``cms_content`` NOTIFY arrives (sent on commit by the content change
+   trigger in any process), or
+3. The entry is older than the TTL and its version has changed.
+
+Missing and inactive content is cached as a miss so broken references don't
+cost a query per render either.
+"""
+
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.config import get_settings
+from app.models.cms import CMSContent, ContentType
+
+logger = get_logger()
+
+MAX_CACHED_CONTENT = 10_000
+
+
+@dataclass(frozen=True)
+class CachedContent:
+    """Snapshot of the CMS content fields used to render messages.
+
+    ``content`` is shared between requests and must be treated as read-only.
+    """
+
+    id: uuid.UUID
+    type: ContentType
+    version: int
+    content: Dict[str, Any]
+    is_active: bool = True
+
+
+class CMSContentCache:
+    """TTL + LRU cache of active content bodies keyed by (content id, version).
+
+    A second index maps each content id to the version last seen for it. When
+    that expires only the versions are re-read, and bodies whose version is
+    unchanged are reused instead of being loaded again.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_entries: int = MAX_CACHED_CONTENT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        # content id -> (fetched at, version), with None for missing content
+        self._versions: "OrderedDict[uuid.UUID, Tuple[float, Optional[int]]]" = (
+            OrderedDict()
+        )
+        self._bodies: "OrderedDict[Tuple[uuid.UUID, int], CachedContent]" = (
+            OrderedDict()
+        )
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            return get_settings().CMS_CONTENT_CACHE_TTL_SECONDS
+        return self._ttl_seconds
+
+    def invalidate(self, content_ids: Optional[Iterable[uuid.UUID]] = None) -> None:
+        """Drop the given content ids, or everything when None."""
+        self._generation += 1
+        if content_ids is None:
+            self._versions.clear()
+            self._bodies.clear()
+            return
+        for content_id in content_ids:
+            _, version = self._versions.pop(content_id, (None, None))
+            self._bodies.pop((content_id, version), None)
+
+    def handle_notification(
+        self, connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """asyncpg listener callback for the content change channel."""
+        self.invalidate()
+
+    async def get(
+        self, db: AsyncSession, content_id: uuid.UUID
+    ) -> Optional[CachedContent]:
+        """Return active content by id, or None if missing or inactive."""
+        return (await self.get_many(db, [content_id])).get(content_id)
+
+    async def get_many(
+        self, db: AsyncSession, content_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, CachedContent]:
+        """Return the active content among ``content_ids``, keyed by id.
+
+        Expired entries with a cached body are revalidated with one query for
+        their versions; all other misses are loaded with a single ``IN``
+        query.
+        """
+        now = self._clock()
+        ttl = self.ttl_seconds
+        found: Dict[uuid.UUID, CachedContent] = {}
+        # content id -> version of the cached body to revalidate
+        expired: Dict[uuid.UUID, int] = {}
+        missing = []
+        for content_id in dict.fromkeys(content_ids):
+            entry = self._versions.get(content_id)
+            if entry is None:
+                missing.append(content_id)
+                continue
+            fetched_at, version = entry
+            body = self._bodies.get((content_id, version))
+            if version is not None and body is None:
+                # The body was evicted before its version entry
+                missing.append(content_id)
+            elif now - fetched_at < ttl:
+                self._versions.move_to_end(content_id)
+                self.hits += 1
+                if body is not None:
+                    self._bodies.move_to_end((content_id, version))
+                    found[content_id] = body
+            elif body is not None:
+                expired[content_id] = version
+            else:
+                missing.append(content_id)
+
+        if not expired and not missing:
+            return found
+
+        generation = self._generation
+        versions: Dict[uuid.UUID, Optional[int]] = {}
+        if expired:
+            result = await db.execute(
+                select(CMSContent.id, CMSContent.version).where(
+                    CMSContent.id.in_(expired), CMSContent.is_active.is_(True)
+                )
+            )
+            current = {row.id: row.version for row in result}
+            for content_id, version in expired.items():
+                if current.get(content_id) == version:
+                    self.hits += 1
+                    versions[content_id] = version
+                    found[content_id] = self._bodies[(content_id, version)]
+                elif content_id in current:
+                    missing.append(content_id)
+                else:
+                    self.misses += 1
+                    versions[content_id] = None
+
+        if missing:
+            self.misses += len(missing)
+            result = await db.execute(
+                select(
+                    CMSContent.id,
+                    CMSContent.type,
+                    CMSContent.version,
+                    CMSContent.content,
+                ).where(CMSContent.id.in_(missing), CMSContent.is_active.is_(True))
+            )
+            loaded = {
+                row.id: CachedContent(
+                    id=row.id,
+                    type=row.type,
+                    version=row.version,
+                    content=copy.deepcopy(row.content or {}),
+                )
+                for row in result
+            }
+            for content_id in missing:
+                cached = loaded.get(content_id)
+                versions[content_id] = cached.version if cached else None
+                if cached is not None:
+                    found[content_id] = cached
+
+            logger.debug(
+                "Loaded CMS content into cache",
+                requested=len(missing),
+                loaded=len(loaded),
+            )
+
+        # Rows read before an invalidation may predate the change that
+        # caused it, so only cache them if nothing was invalidated meanwhile
+        if generation == self._generation:
+            for content_id, version in versions.items():
+                _, previous = self._versions.get(content_id, (None, None))
+                if previous != version:
+                    self._bodies.pop((content_id, previous), None)
+                self._versions[content_id] = (now, version)
+                self._versions.move_to_end(content_id)
+                if version is not None:
+                    self._bodies[(content_id, version)] = found[content_id]
+                    self._bodies.move_to_end((content_id, version))
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+
+        return found
+
+
+cms_content_cache = CMSContentCache()
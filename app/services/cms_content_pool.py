@@ -0,0 +1,338 @@
+"""
+In-memory candidate pools for random CMS content selection.
+
+Question nodes pick a random joke/fact/quiz item on almost every turn. Doing
+that in SQL means a filtered scan of ``cms_content`` (visibility ORs, tag
+overlap, ``info->>'min_age'`` casts, ``NOT IN`` exclusions) followed by
+``ORDER BY random()`` over every match.
+
+Instead each process keeps, per content type, the ids of active content and
+bitsets (plain Python ints, bit ``i`` = candidate ``i``) for visibility, owning
+school and tags. Age and other ``info`` filters are evaluated once per
+distinct filter value and memoised as bitsets too. A selection ANDs the
+relevant bitsets, clears excluded ids and samples from what remains; only the
+chosen rows are then fetched by primary key.
+
+Pools are dropped when:
+1. A ``cms_content`` NOTIFY arrives (sent by a statement trigger whenever
+   content changes), or
+2. A periodic check finds ``cms_content_version_seq`` has moved on, which
+   covers missed notifications and processes without a listener.
+"""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.config import get_settings
+from app.db.sequences import sequence_version_query
+from app.models.cms import (
+    CMSContent,
+    ContentType,
+    ContentVisibility,
+    cms_content_version_seq,
+)
+
+logger = get_logger()
+
+CMS_CONTENT_CHANNEL = "cms_content"
+VERSION_QUERY = sequence_version_query(cms_content_version_seq)
+
+# Bound on memoised per-filter bitsets per pool
+MAX_FILTER_MASKS = 1024
+
+# Tries at picking a random position directly before enumerating candidates
+REJECTION_SAMPLING_ATTEMPTS = 8
+
+
+def _parse_age(value: Any) -> Optional[int]:
+    """Integer age from an ``info`` value, or None if it isn't one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return None
+    return None
+
+
+def jsonb_contains(document: Any, fragment: Any) -> bool:
+    """Python equivalent of the jsonb ``@>`` containment operator."""
+    if isinstance(fragment, dict):
+        return isinstance(document, dict) and all(
+            key in document and jsonb_contains(document[key], value)
+            for key, value in fragment.items()
+        )
+    if isinstance(fragment, list):
+        if not isinstance(document, list):
+            return False
+        return all(
+            any(jsonb_contains(element, wanted) for element in document)
+            for wanted in fragment
+        )
+    if isinstance(document, list):
+        # A top-level array contains a bare scalar that is one of its elements
+        return any(
+            not isinstance(element, (dict, list)) and jsonb_contains(element, fragment)
+            for element in document
+        )
+    if isinstance(document, bool) or isinstance(fragment, bool):
+        return type(document) is type(fragment) and document == fragment
+    return document == fragment
+
+
+def _bit_positions(mask: int) -> List[int]:
+    positions = []
+    while mask:
+        low_bit = mask & -mask
+        positions.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return positions
+
+
+@dataclass
+class ContentPool:
+    """Candidate ids and filter bitsets for one content type."""
+
+    ids: List[uuid.UUID] = field(default_factory=list)
+    positions: Dict[uuid.UUID, int] = field(default_factory=dict)
+    infos: List[Dict[str, Any]] = field(default_factory=list)
+    all_mask: int = 0
+    visibility_masks: Dict[ContentVisibility, int] = field(default_factory=dict)
+    school_masks: Dict[uuid.UUID, int] = field(default_factory=dict)
+    tag_masks: Dict[str, int] = field(default_factory=dict)
+    _filter_masks: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, rows: Iterable[Any]) -> "ContentPool":
+        """Build from rows with id, visibility, school_id, tags and info."""
+        pool = cls()
+        for position, row in enumerate(rows):
+            bit = 1 << position
+            pool.ids.append(row.id)
+            pool.positions[row.id] = position
+            pool.infos.append(row.info or {})
+            pool.all_mask |= bit
+            pool.visibility_masks[row.visibility] = (
+                pool.visibility_masks.get(row.visibility, 0) | bit
+            )
+            if row.school_id is not None and row.visibility in (
+                ContentVisibility.SCHOOL,
+                ContentVisibility.PRIVATE,
+            ):
+                pool.school_masks[row.school_id] = (
+                    pool.school_masks.get(row.school_id, 0) | bit
+                )
+            for tag in set(row.tags or ()):
+                pool.tag_masks[tag] = pool.tag_masks.get(tag, 0) | bit
+        return pool
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _info_mask(self, key: str, value: Any) -> int:
+        """Bitset of candidates whose ``info`` passes one filter, memoised."""
+        memo_key = json.dumps([key, value], sort_keys=True, default=str)
+        mask = self._filter_masks.get(memo_key)
+        if mask is not None:
+            return mask
+
+        if key in ("min_age", "max_age"):
+            age = _parse_age(value)
+            if age is None:
+                logger.warning(
+                    "Invalid age value in info_filters", key=key, value=value
+                )
+                return self.all_mask
+
+            def passes(info: Dict[str, Any]) -> bool:
+                content_age = _parse_age(info.get(key))
+                if content_age is None:
+                    return False
+                # min_age: content.info.min_age <= user_age
+                # max_age: content.info.max_age >= user_age
+                return content_age <= age if key == "min_age" else content_age >= age
+
+        else:
+            fragment = {key: value}
+
+            def passes(info: Dict[str, Any]) -> bool:
+                return jsonb_contains(info, fragment)
+
+        mask = 0
+        for position, info in enumerate(self.infos):
+            if passes(info):
+                mask |= 1 << position
+
+        if len(self._filter_masks) >= MAX_FILTER_MASKS:
+            self._filter_masks.clear()
+        self._filter_masks[memo_key] = mask
+        return mask
+
+    def candidates(
+        self,
+        tags: Optional[List[str]] = None,
+        info_filters: Optional[Dict[str, Any]] = None,
+        exclude_ids: Optional[Iterable[uuid.UUID]] = None,
+        school_id: Optional[uuid.UUID] = None,
+        include_public: bool = True,
+        apply_visibility: bool = True,
+    ) -> int:
+        """Bitset of candidates matching the same rules as the SQL filter."""
+        if apply_visibility:
+            mask = self.visibility_masks.get(ContentVisibility.WRIVETED, 0)
+            if include_public:
+                mask |= self.visibility_masks.get(ContentVisibility.PUBLIC, 0)
+            if school_id:
+                mask |= self.school_masks.get(school_id, 0)
+        else:
+            mask = self.all_mask
+
+        if tags:
+            tag_mask = 0
+            for tag in tags:
+                tag_mask |= self.tag_masks.get(tag, 0)
+            mask &= tag_mask
+
+        for key, value in (info_filters or {}).items():
+            if not mask:
+                break
+            mask &= self._info_mask(key, value)
+
+        for content_id in exclude_ids or ():
+            position = self.positions.get(content_id)
+            if position is not None:
+                mask &= ~(1 << position)
+
+        return mask
+
+    def sample(
+        self, mask: int, count: int, rng: Optional[random.Random] = None
+    ) -> List[uuid.UUID]:
+        """Up to ``count`` distinct ids chosen uniformly from ``mask``."""
+        if not mask or count <= 0:
+            return []
+        rng = rng or random
+
+        if count == 1:
+            # Cheap when most of the pool matches: pick positions directly
+            for _ in range(REJECTION_SAMPLING_ATTEMPTS):
+                position = rng.randrange(len(self.ids))
+                if mask >> position & 1:
+                    return [self.ids[position]]
+
+        positions = _bit_positions(mask)
+        chosen = rng.sample(positions, min(count, len(positions)))
+        return [self.ids[position] for position in chosen]
+
+
+class CMSContentPools:
+    """Per-process random selection pools, one per content type."""
+
+    def __init__(
+        self,
+        refresh_interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._refresh_interval_seconds = refresh_interval_seconds
+        self._clock = clock
+        self._pools: Dict[ContentType, ContentPool] = {}
+        self._version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._invalidations = 0
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def refresh_interval_seconds(self) -> float:
+        if self._refresh_interval_seconds is None:
+            return get_settings().CMS_CONTENT_POOL_REFRESH_SECONDS
+        return self._refresh_interval_seconds
+
+    def invalidate(self) -> None:
+        """Drop all pools so the next ``get`` call reloads from the database.
+
+        Call after committing content changes. The version sequence advances
+        when the changing statement runs, before its commit, so a version
+        check alone could keep a pool loaded in between.
+        """
+        self._invalidations += 1
+        self._checked_at = None
+        self._version = None
+        self._pools.clear()
+
+    def handle_notification(
+        self, connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """asyncpg listener callback for the content change channel."""
+        logger.debug("CMS content changed", version=payload)
+        self.invalidate()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._checked_at is not None
+            and self._clock() - self._checked_at < self.refresh_interval_seconds
+        )
+
+    async def _check_version(self, db: AsyncSession) -> None:
+        if self._is_fresh():
+            return
+
+        async with self._refresh_lock:
+            if self._is_fresh():
+                return
+
+            invalidations = self._invalidations
+            version = (await db.execute(VERSION_QUERY)).scalar_one()
+            if version != self._version:
+                self._pools.clear()
+                self._version = version
+
+            # A notification that arrived mid-check may not be reflected
+            if invalidations == self._invalidations:
+                self._checked_at = self._clock()
+
+    async def get(self, db: AsyncSession, content_type: ContentType) -> ContentPool:
+        """Return the pool for ``content_type``, loading it if needed."""
+        await self._check_version(db)
+
+        pool = self._pools.get(content_type)
+        if pool is None:
+            result = await db.execute(
+                select(
+                    CMSContent.id,
+                    CMSContent.visibility,
+                    CMSContent.school_id,
+                    CMSContent.tags,
+                    CMSContent.info,
+                )
+                .where(
+                    CMSContent.type == content_type,
+                    CMSContent.is_active.is_(True),
+                )
+                .order_by(CMSContent.id)
+            )
+            pool = ContentPool.build(result.all())
+            self._pools[content_type] = pool
+            logger.info(
+                "Loaded CMS content pool",
+                content_type=content_type.value,
+                version=self._version,
+                candidates=len(pool),
+            )
+        return pool
+
+
+cms_content_pools = CMSContentPools()
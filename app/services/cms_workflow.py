@@ -18,6 +18,9 @@ from structlog import get_logger
 
 from app.repositories.cms_repository import CMSRepository, CMSRepositoryImpl
 from app.schemas.cms import FlowPublishRequest
+from app.services.cms_content_cache import cms_content_cache
+from app.services.cms_content_pool import cms_content_pools
+from app.services.content_variants import get_content_variant_allocator
 from app.services.event_outbox_service import EventOutboxService
 from app.services.exceptions import (
     ContentWorkflowError,
@@ -315,6 +318,11 @@ class CMSWorkflowService:
             "entry_node_id": flow.entry_node_id,
         }
 
+    def _content_changed(self, content_ids: List[UUID]) -> None:
+        """Drop cached copies of content after a committed change."""
+        cms_content_cache.invalidate(content_ids)
+        cms_content_pools.invalidate()
+
     def _convert_content_to_dict(self, content) -> Dict[str, Any]:
         """Convert content object to dict with proper info field consistency."""
         info = {}
@@ -387,6 +395,7 @@ class CMSWorkflowService:
 
             # Commit the transaction
             await db.commit()
+            self._content_changed([content.id])
 
             logger.info(
                 "Created content with workflow service",
@@ -437,6 +446,7 @@ class CMSWorkflowService:
 
             # Commit the transaction
             await db.commit()
+            self._content_changed([content_id])
 
             logger.info(
                 "Updated content with workflow service",
@@ -497,6 +507,9 @@ class CMSWorkflowService:
                 },
             )
 
+            await db.commit()
+            self._content_changed([content_id])
+
             self.logger.info(
                 "Updated content status via workflow",
                 content_id=content_id,
@@ -538,6 +551,7 @@ class CMSWorkflowService:
 
         # Commit all updates in a single transaction
         await db.commit()
+        self._content_changed(content_ids)
 
         return updated_count, errors
 
@@ -563,6 +577,7 @@ class CMSWorkflowService:
 
         # Commit all deletes in a single transaction
         await db.commit()
+        self._content_changed(content_ids)
 
         return deleted_count, errors
 
@@ -578,6 +593,7 @@ class CMSWorkflowService:
 
             # Delete content via repository
             success = await self.cms_repo.delete_content(db, content_id)
+            self._content_changed([content_id])
 
             if success:
                 # Publish deletion event
@@ -708,6 +724,7 @@ class CMSWorkflowService:
         variant = await crud.content_variant.acreate(
             db, obj_in=variant_in, content_id=content_id
         )
+        get_content_variant_allocator().invalidate(content_id)
         await self.event_outbox.publish_event(
             db,
             "content_variant_created",
@@ -733,6 +750,7 @@ class CMSWorkflowService:
         updated = await crud.content_variant.aupdate(
             db, db_obj=variant, obj_in=variant_update
         )
+        get_content_variant_allocator().invalidate(content_id)
         await self.event_outbox.publish_event(
             db,
             "content_variant_updated",
@@ -765,6 +783,7 @@ class CMSWorkflowService:
         updated = await crud.content_variant.aupdate(
             db, db_obj=variant, obj_in=variant_update
         )
+        get_content_variant_allocator().invalidate(content_id)
         await self.event_outbox.publish_event(
             db,
             "content_variant_updated",
@@ -785,6 +804,7 @@ class CMSWorkflowService:
         if not variant or variant.content_id != content_id:
             return False
         await crud.content_variant.aremove(db, id=variant_id)
+        get_content_variant_allocator().invalidate(content_id)
         await self.event_outbox.publish_event(
             db,
             "content_variant_deleted",
@@ -6,15 +6,20 @@ to prevent lost updates from concurrent writers (user + background tasks).
 """
 
 import asyncio
+import hashlib
+import weakref
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from uuid import UUID
 
 from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
 from app.models.cms import ConversationSession
+from app.services.exceptions import SessionLockTimeoutError
 
 logger = get_logger()
 
@@ -30,24 +35,37 @@ class ConcurrencyControlService:
     - Clear conflict resolution (user interactions win over background tasks)
     """
 
-    def __init__(self):
+    # Namespaces our advisory lock keys so they can't collide with other users
+    # of pg_advisory_lock on the same database.
+    LOCK_KEY_NAMESPACE = b"wriveted:session"
+
+    # SQLSTATE raised when lock_timeout expires
+    LOCK_NOT_AVAILABLE_SQLSTATE = "55P03"
+
+    def __init__(self, use_local_locks: bool = True):
         self.lock_timeout_seconds = 5  # Maximum time to wait for a lock
+        # Optional in-process layer: concurrent requests for the same session in
+        # this worker queue on an asyncio.Lock instead of each holding a DB
+        # connection while blocked on the advisory lock.
+        self.use_local_locks = use_local_locks
+        self._local_locks: "weakref.WeakValueDictionary[UUID, asyncio.Lock]" = (
+            weakref.WeakValueDictionary()
+        )
 
     async def acquire_session_lock(
         self, db: AsyncSession, session_id: UUID, timeout_seconds: Optional[int] = None
     ) -> bool:
         """
-        Acquire an advisory lock for a conversation session.
+        Acquire a transaction scoped advisory lock for a conversation session.
 
         This ensures only one process can modify a session at a time,
-        preventing lost updates from concurrent writers.
+        preventing lost updates from concurrent writers. The lock is held until
+        the surrounding transaction commits or rolls back.
 
-        Returns True if lock acquired, False if timeout or lock unavailable.
+        Blocks in PostgreSQL (no polling) for up to the timeout. Returns True if
+        the lock was acquired, False on timeout or error.
         """
         timeout = timeout_seconds or self.lock_timeout_seconds
-
-        # PostgreSQL advisory lock using session UUID as lock key
-        # Convert UUID to integer for pg_try_advisory_lock
         lock_key = self._uuid_to_lock_key(session_id)
 
         logger.debug(
@@ -58,59 +76,68 @@ class ConcurrencyControlService:
         )
 
         try:
-            # Try to acquire lock with timeout
-            query = text("SELECT pg_try_advisory_lock(:lock_key)")
-            result = await db.execute(query, {"lock_key": lock_key})
-            acquired = result.scalar()
-
-            if acquired:
-                logger.debug(
-                    "Session lock acquired", session_id=session_id, lock_key=lock_key
+            # The savepoint scopes lock_timeout to this statement and means a
+            # timeout doesn't abort the caller's transaction.
+            async with db.begin_nested():
+                await db.execute(
+                    text("SELECT set_config('lock_timeout', :timeout, true)"),
+                    {"timeout": f"{int(timeout * 1000)}ms"},
                 )
-                return True
-            else:
+                await db.execute(
+                    text("SELECT pg_advisory_xact_lock(:lock_key)"),
+                    {"lock_key": lock_key},
+                )
+                await db.execute(text("SET LOCAL lock_timeout TO DEFAULT"))
+
+        except DBAPIError as e:
+            if self._is_lock_timeout(e):
                 logger.warning(
-                    "Failed to acquire session lock immediately",
+                    "Lock acquisition timed out",
                     session_id=session_id,
                     lock_key=lock_key,
+                    timeout=timeout,
+                )
+            else:
+                logger.error(
+                    "Error acquiring session lock", session_id=session_id, error=str(e)
                 )
-
-                # Wait and retry with timeout
-                return await self._wait_for_lock(db, lock_key, timeout)
-
-        except Exception as e:
-            logger.error(
-                "Error acquiring session lock", session_id=session_id, error=str(e)
-            )
             return False
 
-    async def release_session_lock(self, db: AsyncSession, session_id: UUID) -> bool:
-        """
-        Release an advisory lock for a conversation session.
+        logger.debug("Session lock acquired", session_id=session_id, lock_key=lock_key)
+        return True
 
-        Returns True if lock released, False if error.
+    @asynccontextmanager
+    async def session_lock(
+        self, db: AsyncSession, session_id: UUID, timeout_seconds: Optional[int] = None
+    ) -> AsyncIterator[None]:
         """
-        lock_key = self._uuid_to_lock_key(session_id)
+        Serialize work on a session across coroutines, workers and instances.
 
-        try:
-            query = text("SELECT pg_advisory_unlock(:lock_key)")
-            result = await db.execute(query, {"lock_key": lock_key})
-            released = result.scalar()
+        Waits on the in-process lock first (if enabled), then takes the
+        advisory lock. Commit inside the block: the advisory lock is released
+        when the transaction ends.
 
-            logger.debug(
-                "Session lock release status",
-                session_id=session_id,
-                lock_key=lock_key,
-                released=released,
-            )
+        Raises SessionLockTimeoutError if the lock isn't acquired in time.
+        """
+        timeout = timeout_seconds or self.lock_timeout_seconds
 
-            return released
+        if not self.use_local_locks:
+            if not await self.acquire_session_lock(db, session_id, timeout):
+                raise SessionLockTimeoutError(str(session_id), timeout)
+            yield
+            return
 
-        except Exception as e:
-            logger.error(
-                "Error releasing session lock", session_id=session_id, error=str(e)
-            )
-            return False
+        local_lock = self._local_lock(session_id)
+        try:
+            await asyncio.wait_for(local_lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            raise SessionLockTimeoutError(str(session_id), timeout)
+        try:
+            if not await self.acquire_session_lock(db, session_id, timeout):
+                raise SessionLockTimeoutError(str(session_id), timeout)
+            yield
+        finally:
+            local_lock.release()
 
     async def update_session_with_revision_control(
         self,
@@ -236,90 +263,76 @@ class ConcurrencyControlService:
         )
         ```
         """
-        # Step 1: Acquire advisory lock
+        # Step 1: Acquire advisory lock (held until the caller's transaction ends)
         lock_acquired = await self.acquire_session_lock(db, session_id, timeout_seconds)
 
         if not lock_acquired:
             return False, None, "Could not acquire session lock"
 
-        try:
-            # Step 2: Get current session
-            query = select(ConversationSession).where(
-                ConversationSession.id == session_id
-            )
-            result = await db.execute(query)
-            current_session = result.scalar_one_or_none()
+        # Step 2: Get current session
+        query = select(ConversationSession).where(ConversationSession.id == session_id)
+        result = await db.execute(query)
+        current_session = result.scalar_one_or_none()
 
-            if not current_session:
-                return False, None, "Session not found"
-
-            # Step 3: Apply update function
-            try:
-                new_state = update_func(current_session)
-                current_revision = getattr(current_session, "revision", 0) or 0
+        if not current_session:
+            return False, None, "Session not found"
 
-                # Step 4: Update with revision control
-                (
-                    success,
-                    updated_session,
-                    error,
-                ) = await self.update_session_with_revision_control(
-                    db,
-                    session_id,
-                    current_revision,
-                    new_state,
-                    user_initiated=user_initiated,
-                )
+        # Step 3: Apply update function
+        try:
+            new_state = update_func(current_session)
+            current_revision = getattr(current_session, "revision", 0) or 0
 
-                return success, updated_session, error
+            # Step 4: Update with revision control
+            (
+                success,
+                updated_session,
+                error,
+            ) = await self.update_session_with_revision_control(
+                db,
+                session_id,
+                current_revision,
+                new_state,
+                user_initiated=user_initiated,
+            )
 
-            except Exception as e:
-                logger.error(
-                    "Error in update function", session_id=session_id, error=str(e)
-                )
-                return False, current_session, f"Update function error: {str(e)}"
+            return success, updated_session, error
 
-        finally:
-            # Step 5: Always release the lock
-            await self.release_session_lock(db, session_id)
+        except Exception as e:
+            logger.error(
+                "Error in update function", session_id=session_id, error=str(e)
+            )
+            return False, current_session, f"Update function error: {str(e)}"
 
     # PRIVATE METHODS
 
     def _uuid_to_lock_key(self, session_id: UUID) -> int:
-        """Convert UUID to integer for PostgreSQL advisory lock."""
-        # Use hash of UUID string to create a consistent integer key
-        # This ensures same session always gets same lock key
-        uuid_str = str(session_id)
-        return hash(uuid_str) % (2**31 - 1)  # Keep within PostgreSQL integer range
-
-    async def _wait_for_lock(
-        self, db: AsyncSession, lock_key: int, timeout_seconds: int
-    ) -> bool:
-        """Wait for lock with timeout using polling."""
-        start_time = datetime.utcnow()
-        sleep_interval = 0.1  # 100ms polling interval
+        """Derive a stable signed 64-bit advisory lock key from a session UUID.
 
-        while (datetime.utcnow() - start_time).total_seconds() < timeout_seconds:
-            try:
-                query = text("SELECT pg_try_advisory_lock(:lock_key)")
-                result = await db.execute(query, {"lock_key": lock_key})
-                acquired = result.scalar()
+        Must be identical in every process, so this can't use Python's
+        randomized ``hash()``.
+        """
+        digest = hashlib.blake2b(
+            session_id.bytes, digest_size=8, person=self.LOCK_KEY_NAMESPACE
+        ).digest()
+        return int.from_bytes(digest, "big", signed=True)
 
-                if acquired:
-                    logger.debug(
-                        "Session lock acquired after waiting", lock_key=lock_key
-                    )
-                    return True
+    def _local_lock(self, session_id: UUID) -> asyncio.Lock:
+        """Get the in-process lock for a session, creating it if needed.
 
-                await asyncio.sleep(sleep_interval)
+        Locks are weakly referenced so they disappear once no request holds or
+        waits on them.
+        """
+        lock = self._local_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._local_locks[session_id] = lock
+        return lock
 
-            except Exception as e:
-                logger.error(
-                    "Error while waiting for lock", lock_key=lock_key, error=str(e)
-                )
-                return False
+    def _is_lock_timeout(self, error: DBAPIError) -> bool:
+        orig = error.orig
+        sqlstate = getattr(orig, "sqlstate", None) or getattr(orig, "pgcode", None)
+        return sqlstate == self.LOCK_NOT_AVAILABLE_SQLSTATE
 
-        logger.warning(
-            "Lock acquisition timed out", lock_key=lock_key, timeout=timeout_seconds
-        )
-        return False
+
+# Module-level instance
+concurrency_service = ConcurrencyControlService()
@@ -0,0 +1,296 @@
+"""
+Content variant allocation with in-memory bandit weights and batched counters.
+
+Serving a variant happens on every render of content that has variants, so it
+must not write to the database:
+
+- Active variants of a content item ("arms") are cached per process for
+  ``CMS_VARIANT_REFRESH_SECONDS`` and dropped when variants are edited.
+- A session is assigned deterministically: ``sha256(content_id:session_id)``
+  is mapped to a point in [0, 1) and looked up in the cumulative traffic
+  shares. The shares move as counts come in, so callers store the first
+  assignment (the chat runtime keeps it in session state) and look it up
+  with ``find`` afterwards.
+- Traffic shares blend each variant's configured ``weight`` with its observed
+  conversion rate (Beta(1, 1) posterior mean), keeping an exploration floor of
+  ``CMS_VARIANT_EXPLORATION`` on the configured weights.
+- Impressions, engagements and conversions are counted in process and flushed
+  every ``CMS_VARIANT_FLUSH_SECONDS`` with one
+  ``UPDATE ... SET x = x + n FROM (VALUES ...)`` statement.
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import BigInteger, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.config import get_settings
+from app.models.cms import CMSContentVariant
+
+logger = get_logger()
+
+COUNTERS = ("impressions", "engagements", "conversions")
+
+
+@dataclass
+class VariantArm:
+    """An active variant and its observed counts (flushed + pending)."""
+
+    id: uuid.UUID
+    content_id: uuid.UUID
+    variant_key: str
+    variant_data: Dict[str, Any]
+    weight: int
+    impressions: int = 0
+    engagements: int = 0
+    conversions: int = 0
+
+
+def _hash_point(content_id: uuid.UUID, session_id: Any) -> float:
+    digest = hashlib.sha256(f"{content_id}:{session_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+def traffic_shares(arms: List[VariantArm], exploration: float) -> List[float]:
+    """Fraction of traffic each arm should receive."""
+    if not arms:
+        return []
+    configured = [max(arm.weight, 0) for arm in arms]
+    total = sum(configured)
+    if total == 0:
+        configured, total = [1] * len(arms), len(arms)
+    base = [weight / total for weight in configured]
+
+    scores = [
+        share * (arm.conversions + 1) / (arm.impressions + 2)
+        for share, arm in zip(base, arms)
+    ]
+    score_total = sum(scores)
+    exploit = [score / score_total for score in scores] if score_total else base
+    return [
+        exploration * base_share + (1 - exploration) * exploit_share
+        for base_share, exploit_share in zip(base, exploit)
+    ]
+
+
+class ContentVariantAllocator:
+    """Per-process variant assignment and performance counters."""
+
+    def __init__(
+        self,
+        refresh_seconds: Optional[float] = None,
+        exploration: Optional[float] = None,
+        flush_interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        settings = None
+        if None in (refresh_seconds, exploration, flush_interval_seconds):
+            settings = get_settings()
+        self.refresh_seconds = (
+            refresh_seconds
+            if refresh_seconds is not None
+            else settings.CMS_VARIANT_REFRESH_SECONDS
+        )
+        self.exploration = (
+            exploration if exploration is not None else settings.CMS_VARIANT_EXPLORATION
+        )
+        self.flush_interval_seconds = (
+            flush_interval_seconds
+            if flush_interval_seconds is not None
+            else settings.CMS_VARIANT_FLUSH_SECONDS
+        )
+        self._clock = clock
+        self._arms: Dict[uuid.UUID, tuple[float, List[VariantArm]]] = {}
+        self._pending: Dict[uuid.UUID, List[int]] = defaultdict(
+            lambda: [0] * len(COUNTERS)
+        )
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def invalidate(self, content_id: Optional[uuid.UUID] = None) -> None:
+        """Drop cached arms for one content item, or all of them."""
+        if content_id is None:
+            self._arms.clear()
+        else:
+            self._arms.pop(content_id, None)
+
+    async def get_arms_many(
+        self, db: AsyncSession, content_ids: Iterable[uuid.UUID]
+    ) -> Dict[uuid.UUID, List[VariantArm]]:
+        """Active variants per content id; misses load in one query."""
+        now = self._clock()
+        found: Dict[uuid.UUID, List[VariantArm]] = {}
+        missing = []
+        for content_id in dict.fromkeys(content_ids):
+            entry = self._arms.get(content_id)
+            if entry is not None and now - entry[0] < self.refresh_seconds:
+                found[content_id] = entry[1]
+            else:
+                missing.append(content_id)
+
+        if missing:
+            result = await db.execute(
+                select(
+                    CMSContentVariant.id,
+                    CMSContentVariant.content_id,
+                    CMSContentVariant.variant_key,
+                    CMSContentVariant.variant_data,
+                    CMSContentVariant.weight,
+                    CMSContentVariant.impressions,
+                    CMSContentVariant.engagements,
+                    CMSContentVariant.conversions,
+                )
+                .where(
+                    CMSContentVariant.content_id.in_(missing),
+                    CMSContentVariant.is_active.is_(True),
+                )
+                .order_by(CMSContentVariant.content_id, CMSContentVariant.variant_key)
+            )
+            loaded: Dict[uuid.UUID, List[VariantArm]] = {
+                content_id: [] for content_id in missing
+            }
+            for row in result:
+                arm = VariantArm(**row._mapping)
+                # Counts recorded here but not yet flushed
+                for name, pending in zip(COUNTERS, self._pending.get(arm.id, ())):
+                    setattr(arm, name, getattr(arm, name) + pending)
+                loaded[row.content_id].append(arm)
+            for content_id, arms in loaded.items():
+                self._arms[content_id] = (now, arms)
+            found.update(loaded)
+
+        return found
+
+    def shares(self, arms: List[VariantArm]) -> List[float]:
+        return traffic_shares(arms, self.exploration)
+
+    def assign(
+        self, content_id: uuid.UUID, session_id: Any, arms: List[VariantArm]
+    ) -> Optional[VariantArm]:
+        """Deterministically pick the variant shown to ``session_id``."""
+        if not arms:
+            return None
+        point = _hash_point(content_id, session_id)
+        cumulative = 0.0
+        for arm, share in zip(arms, self.shares(arms)):
+            cumulative += share
+            if point < cumulative:
+                return arm
+        return arms[-1]
+
+    def find(
+        self, arms: List[VariantArm], variant_id: Optional[Any]
+    ) -> Optional[VariantArm]:
+        """The arm with id ``variant_id``, if it is still active."""
+        if variant_id is None:
+            return None
+        return next((arm for arm in arms if str(arm.id) == str(variant_id)), None)
+
+    def record(
+        self,
+        arm: VariantArm,
+        impressions: int = 0,
+        engagements: int = 0,
+        conversions: int = 0,
+    ) -> None:
+        """Count events for ``arm`` in memory; flushed in the background."""
+        pending = self._pending[arm.id]
+        for index, (name, amount) in enumerate(
+            zip(COUNTERS, (impressions, engagements, conversions))
+        ):
+            if amount:
+                pending[index] += amount
+                setattr(arm, name, getattr(arm, name) + amount)
+        self._ensure_flush_task()
+
+    def pending_counts(self, variant_id: uuid.UUID) -> Dict[str, int]:
+        return dict(zip(COUNTERS, self._pending.get(variant_id, [0] * len(COUNTERS))))
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Write pending counters with a single statement; returns rows sent."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, defaultdict(lambda: [0] * len(COUNTERS))
+
+        deltas = values(
+            column("id", UUID(as_uuid=True)),
+            *(column(name, BigInteger) for name in COUNTERS),
+            name="deltas",
+        ).data([(variant_id, *counts) for variant_id, counts in pending.items()])
+        try:
+            await db.execute(
+                update(CMSContentVariant)
+                .where(CMSContentVariant.id == deltas.c.id)
+                .values(
+                    {
+                        name: getattr(CMSContentVariant, name) + deltas.c[name]
+                        for name in COUNTERS
+                    }
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception:
+            # Keep the counts for the next attempt
+            for variant_id, counts in pending.items():
+                current = self._pending[variant_id]
+                for index, amount in enumerate(counts):
+                    current[index] += amount
+            raise
+
+        logger.debug("Flushed content variant counters", variants=len(pending))
+        return len(pending)
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_periodically()
+            )
+        except RuntimeError:
+            # No running loop (e.g. sync callers); flushed on shutdown instead
+            self._flush_task = None
+
+    async def _flush_with_new_session(self) -> None:
+        from app.db.session import get_async_session_maker
+
+        async with get_async_session_maker()() as session:
+            await self.flush(session)
+
+    async def _flush_periodically(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self._flush_with_new_session()
+            except Exception as e:
+                logger.warning("Failed to flush content variant counters", error=str(e))
+
+    async def shutdown(self) -> None:
+        """Stop the background flush and write anything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._pending:
+            await self._flush_with_new_session()
+
+
+_allocator: Optional[ContentVariantAllocator] = None
+
+
+def get_content_variant_allocator() -> ContentVariantAllocator:
+    global _allocator
+    if _allocator is None:
+        _allocator = ContentVariantAllocator()
+    return _allocator
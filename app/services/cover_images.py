@@ -5,10 +5,14 @@ from structlog import get_logger
 from app.config import get_settings
 from app.models.collection_item import CollectionItem
 from app.models.edition import Edition
-from app.services.gcp_storage import (
-    base64_string_to_bucket,
-    delete_blob,
-    url_to_blob_name,
+from app.services.cover_derivatives import get_cover_derivative_pipeline
+from app.services.object_storage import (
+    InvalidImageData,
+    Upload,
+    UploadBatch,
+    blob_name_for,
+    get_object_storage,
+    parse_image_data,
 )
 
 settings = get_settings()
@@ -28,15 +32,10 @@ def _handle_upload_collection_item_cover_image(
     filename = edition_isbn or str(uuid4())
 
     # upload the image to the bucket
-    public_url = base64_string_to_bucket(
-        data=image_data,
-        folder=folder,
-        filename=filename,
-        bucket_name=settings.GCP_IMAGE_BUCKET,
+    return get_object_storage().upload_image(
+        image_data, settings.GCP_IMAGE_BUCKET, folder, filename
     )
 
-    return public_url
-
 
 def handle_collection_item_cover_image_update(
     collection_item: CollectionItem, image_data: str
@@ -56,12 +55,7 @@ def handle_collection_item_cover_image_update(
         else None
     )
     if collection_item.cover_image_url and collection_item.cover_image_url != new_url:
-        delete_blob(
-            settings.GCP_IMAGE_BUCKET,
-            url_to_blob_name(
-                settings.GCP_IMAGE_BUCKET, collection_item.cover_image_url
-            ),
-        )
+        get_object_storage().delete_url(collection_item.cover_image_url)
     return new_url
 
 
@@ -80,32 +74,67 @@ def _handle_upload_edition_cover_image(
     image_data: str,
     edition_isbn: str,
     folder: str = "wriveted",
-) -> str:
+    uploads: UploadBatch | None = None,
+    variants: bool = False,
+) -> str | None:
     """
     Handle a cover image upload for a public edition.
+
+    With ``uploads`` the cover (and its variants) are uploaded on that batch,
+    which the caller drains before saving the url. With ``variants`` it also
+    starts rendering the cover's resized variants, which the caller must pick
+    up with ``get_cover_derivative_pipeline().collect([public_url])``.
     """
-    # upload the image to the bucket
-    public_url = base64_string_to_bucket(
-        data=image_data,
-        folder=folder,
-        filename=edition_isbn,
-        bucket_name=settings.GCP_IMAGE_BUCKET,
+    try:
+        filetype, decoded = parse_image_data(image_data)
+    except InvalidImageData as e:
+        logger.warning("Ignoring invalid cover image", isbn=edition_isbn, reason=str(e))
+        return None
+    with decoded:
+        image_bytes = decoded.read()
+
+    public_url = get_object_storage().upload(
+        Upload(
+            bucket=settings.GCP_IMAGE_BUCKET,
+            blob_name=blob_name_for(folder, edition_isbn, filetype),
+            data=image_bytes,
+            content_type=f"image/{filetype}",
+        ),
+        batch=uploads,
     )
-
+    if variants:
+        get_cover_derivative_pipeline().submit(
+            image_bytes,
+            public_url,
+            settings.GCP_IMAGE_BUCKET,
+            folder,
+            edition_isbn,
+            uploads=uploads,
+        )
     return public_url
 
 
 def handle_new_edition_cover_image(
-    edition_isbn: str, image_data: str, folder: str | None
+    edition_isbn: str,
+    image_data: str,
+    folder: str | None,
+    uploads: UploadBatch | None = None,
+    variants: bool = False,
 ) -> str | None:
     """
     Handle a cover image upload for a new edition.
     """
-    return _handle_upload_edition_cover_image(image_data, edition_isbn, folder)
+    return _handle_upload_edition_cover_image(
+        image_data, edition_isbn, folder, uploads=uploads, variants=variants
+    )
 
 
 def handle_edition_cover_image_update(
-    edition: Edition, image_data: str, folder: str | None
+    edition: Edition,
+    image_data: str,
+    folder: str | None,
+    uploads: UploadBatch | None = None,
+    variants: bool = False,
 ) -> str | None:
     """
     Handle a cover image update for an existing edition.
@@ -114,16 +143,11 @@ def handle_edition_cover_image_update(
     """
     new_url = (
         _handle_upload_edition_cover_image(
-            image_data,
-            edition.isbn,
-            folder,
+            image_data, edition.isbn, folder, uploads=uploads, variants=variants
         )
         if image_data
         else None
     )
     if edition.cover_url and edition.cover_url != new_url:
-        delete_blob(
-            settings.GCP_IMAGE_BUCKET,
-            url_to_blob_name(settings.GCP_IMAGE_BUCKET, edition.cover_url),
-        )
+        get_object_storage().delete_url(edition.cover_url)
     return new_url
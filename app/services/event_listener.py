@@ -6,9 +6,8 @@ function and handles real-time flow state changes for webhooks and monitoring.
 """
 
 import asyncio
-import json
 import logging
-from typing import Callable, Dict, Optional, cast
+from typing import Awaitable, Callable, Dict, List, Optional, Set, cast
 from uuid import UUID
 
 import asyncpg
@@ -37,19 +36,140 @@ class FlowEvent(BaseModel):
     previous_revision: Optional[int] = None
 
 
+# Events that only move a session along within a flow. Consecutive ones for the
+# same session can be merged into a single transition.
+MERGEABLE_EVENT_TYPES = {"node_changed", "session_updated"}
+
+
+def merge_flow_events(first: FlowEvent, second: FlowEvent) -> FlowEvent:
+    """Merge two consecutive events for a session into one transition.
+
+    The merged event keeps the ``previous_*`` values of ``first`` and the
+    current values of ``second``.
+    """
+    event_type = (
+        "node_changed"
+        if "node_changed" in (first.event_type, second.event_type)
+        else second.event_type
+    )
+    return first.model_copy(
+        update={
+            "event_type": event_type,
+            "timestamp": second.timestamp,
+            "user_id": second.user_id or first.user_id,
+            "current_node": second.current_node,
+            "status": second.status,
+            "revision": second.revision,
+        }
+    )
+
+
+class FlowEventCoalescer:
+    """
+    Per-session debouncing of flow events.
+
+    A busy session emits node_changed events in bursts. Mergeable events are
+    held for ``debounce_seconds`` after the session's latest event (and at
+    most ``max_delay_seconds`` after its first) and merged into one event.
+    Any other event type flushes the session's pending events immediately, so
+    events for a session are always dispatched in order.
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[FlowEvent], Awaitable[None]],
+        debounce_seconds: float = 0.25,
+        max_delay_seconds: float = 1.0,
+    ):
+        self.dispatch = dispatch
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._pending: Dict[UUID, List[FlowEvent]] = {}
+        self._first_seen: Dict[UUID, float] = {}
+        self._timers: Dict[UUID, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.received = 0
+        self.dispatched = 0
+
+    def add(self, event: FlowEvent) -> None:
+        """Queue an event for dispatch."""
+        self.received += 1
+        loop = asyncio.get_running_loop()
+        session_id = event.session_id
+        pending = self._pending.setdefault(session_id, [])
+
+        if (
+            pending
+            and pending[-1].event_type in MERGEABLE_EVENT_TYPES
+            and event.event_type in MERGEABLE_EVENT_TYPES
+        ):
+            pending[-1] = merge_flow_events(pending[-1], event)
+        else:
+            pending.append(event)
+
+        if event.event_type not in MERGEABLE_EVENT_TYPES:
+            self._flush(session_id)
+            return
+
+        now = loop.time()
+        first_seen = self._first_seen.setdefault(session_id, now)
+        delay = min(self.debounce_seconds, first_seen + self.max_delay_seconds - now)
+
+        timer = self._timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[session_id] = loop.call_later(
+            max(delay, 0), self._flush, session_id
+        )
+
+    def _flush(self, session_id: UUID) -> None:
+        timer = self._timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._first_seen.pop(session_id, None)
+        events = self._pending.pop(session_id, [])
+        if not events:
+            return
+
+        self.dispatched += len(events)
+        task = asyncio.create_task(self._dispatch_in_order(events))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch_in_order(self, events: List[FlowEvent]) -> None:
+        for event in events:
+            await self.dispatch(event)
+
+    async def flush_all(self) -> None:
+        """Dispatch all pending events and wait for dispatch to finish."""
+        for session_id in list(self._pending):
+            self._flush(session_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
 class FlowEventListener:
     """
     PostgreSQL event listener for real-time flow state changes.
 
     Listens to the 'flow_events' channel and dispatches events to registered handlers.
+    Handlers registered with ``coalesce=True`` receive events after per-session
+    debouncing by a FlowEventCoalescer instead of one call per notification.
     """
 
     def __init__(self):
         self.settings = get_settings()
         self.connection: Optional[asyncpg.Connection] = None
         self.handlers: Dict[str, list[Callable[[FlowEvent], None]]] = {}
+        self.coalesced_handlers: Dict[str, list[Callable[[FlowEvent], None]]] = {}
+        self.coalescer = FlowEventCoalescer(
+            self._dispatch_coalesced,
+            debounce_seconds=self.settings.FLOW_EVENT_DEBOUNCE_MS / 1000,
+            max_delay_seconds=self.settings.FLOW_EVENT_MAX_DELAY_MS / 1000,
+        )
         self.is_listening = False
         self._listen_task: Optional[asyncio.Task] = None
+        self._channel_listeners: list[tuple[str, Callable]] = []
 
     async def connect(self) -> None:
         """Establish connection to PostgreSQL for listening to notifications."""
@@ -98,7 +218,11 @@ class FlowEventListener:
             logger.info("Disconnected from PostgreSQL event listener")
 
     def register_handler(
-        self, event_type: str, handler: Callable[[FlowEvent], None]
+        self,
+        event_type: str,
+        handler: Callable[[FlowEvent], None],
+        *,
+        coalesce: bool = False,
     ) -> None:
         """
         Register an event handler for specific event types.
@@ -106,22 +230,39 @@ class FlowEventListener:
         Args:
             event_type: Type of event to handle (session_started, node_changed, etc.)
             handler: Async function to call when event occurs
+            coalesce: Deliver bursts of node changes for a session as one event
         """
-        if event_type not in self.handlers:
-            self.handlers[event_type] = []
-        self.handlers[event_type].append(handler)
+        handlers = self.coalesced_handlers if coalesce else self.handlers
+        if event_type not in handlers:
+            handlers[event_type] = []
+        handlers[event_type].append(handler)
         logger.info(f"Registered handler for event type: {event_type}")
 
     def unregister_handler(
         self, event_type: str, handler: Callable[[FlowEvent], None]
     ) -> None:
         """Remove an event handler."""
-        if event_type in self.handlers:
-            try:
-                self.handlers[event_type].remove(handler)
+        for handlers in (self.handlers, self.coalesced_handlers):
+            if handler in handlers.get(event_type, []):
+                handlers[event_type].remove(handler)
                 logger.info(f"Unregistered handler for event type: {event_type}")
-            except ValueError:
-                logger.warning(f"Handler not found for event type: {event_type}")
+                return
+        logger.warning(f"Handler not found for event type: {event_type}")
+
+    async def add_channel_listener(self, channel: str, callback: Callable) -> None:
+        """
+        Listen to an additional notification channel on the same connection.
+
+        Args:
+            channel: PostgreSQL notification channel name
+            callback: asyncpg listener callback (connection, pid, channel, payload)
+        """
+        if not self.connection:
+            await self.connect()
+
+        await self.connection.add_listener(channel, callback)
+        self._channel_listeners.append((channel, callback))
+        logger.info(f"Started listening on '{channel}' channel")
 
     async def _handle_notification(
         self, connection: asyncpg.Connection, pid: int, channel: str, payload: str
@@ -136,37 +277,49 @@ class FlowEventListener:
             payload: JSON payload with event data
         """
         try:
-            # Parse the event data
-            event_data = json.loads(payload)
             try:
-                flow_event = FlowEvent.model_validate(event_data)
+                flow_event = FlowEvent.model_validate_json(payload)
             except Exception as e:
                 logger.error(f"Failed to parse flow event data: {e}")
                 return
 
-            logger.info(
-                f"Received flow event: {flow_event.event_type} for session {flow_event.session_id}"
+            logger.debug(
+                "Received flow event: %s for session %s",
+                flow_event.event_type,
+                flow_event.session_id,
             )
 
-            # Dispatch to registered handlers
-            handlers = self.handlers.get(flow_event.event_type, [])
-            handlers.extend(self.handlers.get("*", []))  # Wildcard handlers
-
-            for handler in handlers:
-                try:
-                    if asyncio.iscoroutinefunction(handler):
-                        await handler(flow_event)
-                    else:
-                        handler(flow_event)
-                except Exception as e:
-                    logger.error(
-                        f"Error in event handler for {flow_event.event_type}: {e}"
-                    )
+            await self._dispatch(self.handlers, flow_event)
+            if self.coalesced_handlers:
+                self.coalescer.add(flow_event)
 
         except Exception as e:
             logger.error(f"Failed to process flow event notification: {e}")
             logger.debug(f"Raw payload: {payload}")
 
+    async def _dispatch(
+        self,
+        registry: Dict[str, list[Callable[[FlowEvent], None]]],
+        flow_event: FlowEvent,
+    ) -> None:
+        """Call the handlers in ``registry`` for an event."""
+        handlers = [
+            *registry.get(flow_event.event_type, []),
+            *registry.get("*", []),  # Wildcard handlers
+        ]
+
+        for handler in handlers:
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    await handler(flow_event)
+                else:
+                    handler(flow_event)
+            except Exception as e:
+                logger.error(f"Error in event handler for {flow_event.event_type}: {e}")
+
+    async def _dispatch_coalesced(self, flow_event: FlowEvent) -> None:
+        await self._dispatch(self.coalesced_handlers, flow_event)
+
     async def start_listening(self) -> None:
         """Start listening for PostgreSQL notifications."""
         if not self.connection:
@@ -200,6 +353,11 @@ class FlowEventListener:
                 await self.connection.remove_listener(
                     "flow_events", self._handle_notification
                 )
+                for channel, callback in self._channel_listeners:
+                    await self.connection.remove_listener(channel, callback)
+            self._channel_listeners = []
+
+            await self.coalescer.flush_all()
 
             if self._listen_task:
                 self._listen_task.cancel()
@@ -7,19 +7,27 @@ This service implements the Event Outbox Pattern with dual strategy:
 
 """
 
+import asyncio
 import hashlib
 import hmac
+import json
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
 import httpx
-from sqlalchemy import and_, or_, select, text
+from sqlalchemy import and_, insert, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from structlog import get_logger
 
 from app.models.event_outbox import EventOutbox, EventPriority, EventStatus
+from app.services.login_recorder import (
+    LOGIN_EVENT_DESTINATION,
+    LOGIN_EVENT_TYPE,
+    Login,
+    apply_login_batch,
+)
 
 logger = get_logger()
 
@@ -124,6 +132,79 @@ class EventOutboxService:
 
         return event
 
+    async def publish_events(
+        self,
+        db: AsyncSession,
+        events: List[Dict[str, Any]],
+    ) -> List[EventOutbox]:
+        """
+        Publish several events to the outbox with a single INSERT.
+
+        Each item takes the same fields as ``publish_event``. Unlike
+        ``publish_event`` the rows are written immediately (in the caller's
+        transaction) and one NOTIFY statement covers all of them.
+        """
+        if not events:
+            return []
+
+        rows = [
+            {
+                "id": uuid4(),
+                "event_type": event["event_type"],
+                "destination": event["destination"],
+                "payload": event["payload"],
+                "priority": event.get("priority", EventPriority.NORMAL),
+                "routing_key": event.get("routing_key"),
+                "headers": event.get("headers") or {},
+                "max_retries": event.get("max_retries", 3),
+                "correlation_id": event.get("correlation_id") or str(uuid4()),
+                "user_id": event.get("user_id"),
+                "session_id": event.get("session_id"),
+                "flow_id": event.get("flow_id"),
+            }
+            for event in events
+        ]
+
+        result = await db.scalars(
+            insert(EventOutbox).returning(EventOutbox, sort_by_parameter_order=True),
+            rows,
+        )
+        entries = list(result.all())
+
+        logger.info(
+            "Events added to outbox",
+            event_count=len(entries),
+            event_types=sorted({entry.event_type for entry in entries}),
+        )
+
+        try:
+            await db.execute(
+                text(
+                    "SELECT pg_notify('flow_events', payload) "
+                    "FROM unnest(CAST(:payloads AS text[])) AS payload"
+                ),
+                {
+                    "payloads": [
+                        json.dumps(
+                            {
+                                "event_id": str(entry.id),
+                                "event_type": entry.event_type,
+                                "destination": entry.destination,
+                            }
+                        )
+                        for entry in entries
+                    ]
+                },
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to send PostgreSQL NOTIFY",
+                event_count=len(entries),
+                error=str(e),
+            )
+
+        return entries
+
     def publish_event_sync(
         self,
         db: Session,
@@ -219,7 +300,14 @@ class EventOutboxService:
         # Get events ready for processing (ordered by priority, then age)
         events = await self._get_events_ready_for_processing(db)
 
+        # Reading activity is processed together rather than event by event
+        reading_events = [event for event in events if self._is_reading_event(event)]
+        if reading_events:
+            await self._process_reading_events(db, reading_events, stats)
+
         for event in events:
+            if event in reading_events:
+                continue
             stats["processed"] += 1
 
             try:
@@ -318,11 +406,70 @@ class EventOutboxService:
                 EventOutbox.created_at.asc(),  # Older events first
             )
             .limit(self.batch_size)
+            # Claim the rows so concurrent processors take different batches
+            .with_for_update(skip_locked=True)
         )
 
         result = await db.execute(query)
         return result.scalars().all()
 
+    @staticmethod
+    def _is_reading_event(event: EventOutbox) -> bool:
+        from app.services.reading_events import READING_EVENT_TITLES
+
+        return (
+            event.event_type == "event_processing"
+            and event.destination == "internal:process-event"
+            and bool(event.payload.get("event_id"))
+            and event.payload.get("title") in READING_EVENT_TITLES
+        )
+
+    async def _process_reading_events(
+        self, db: AsyncSession, events: List[EventOutbox], stats: Dict[str, int]
+    ):
+        """Process a batch of reading events with one transaction.
+
+        Events that fail on their own (after the batch is retried one event
+        at a time) are failed individually; the rest are published.
+        """
+        from app.services.reading_events import process_reading_events
+
+        for event in events:
+            stats["processed"] += 1
+            await self._update_event_status(db, event, EventStatus.PROCESSING)
+
+        try:
+            result, failed = await asyncio.to_thread(
+                process_reading_events,
+                [event.payload["event_id"] for event in events],
+            )
+        except Exception as e:
+            logger.error(
+                "Reading event processing failed", events=len(events), error=str(e)
+            )
+            result, failed = (
+                None,
+                {str(event.payload["event_id"]): str(e) for event in events},
+            )
+
+        for event in events:
+            error = failed.get(str(event.payload["event_id"]))
+            if error is None:
+                await self._mark_event_published(db, event)
+                stats["succeeded"] += 1
+                continue
+            await self._handle_delivery_failure(db, event, error)
+            if event.should_move_to_dead_letter:
+                stats["dead_lettered"] += 1
+            else:
+                stats["failed"] += 1
+        logger.info(
+            "Reading events processed",
+            events=len(events),
+            failed=len(failed),
+            result=result,
+        )
+
     async def _try_immediate_delivery(self, db: AsyncSession, event: EventOutbox):
         """Try immediate delivery via NOTIFY/LISTEN for real-time features."""
         # Simplified immediate delivery - in production would use actual NOTIFY
@@ -665,6 +812,17 @@ class EventOutboxService:
                     )
                     return False
 
+            elif (
+                event.event_type == LOGIN_EVENT_TYPE
+                and event.destination == LOGIN_EVENT_DESTINATION
+            ):
+                from app.db.session import get_async_session_maker
+
+                logins = [Login.from_payload(item) for item in event.payload["logins"]]
+                async with get_async_session_maker()() as session:
+                    await apply_login_batch(session, logins)
+                return True
+
             else:
                 logger.warning(
                     "Unknown internal event type",
@@ -11,29 +11,11 @@ from app import crud
 from app.config import get_settings
 from app.db.session import get_session_maker
 from app.models import Event, School
-from app.models.booklist import ListType
-from app.models.collection_item import CollectionItem
-from app.models.collection_item_activity import CollectionItemReadStatus
 from app.models.event import EventLevel, EventSlackChannel
 from app.models.service_account import ServiceAccount
-from app.models.user import User, UserAccountType
-from app.repositories.booklist_repository import booklist_repository
-from app.repositories.collection_item_activity_repository import (
-    collection_item_activity_repository,
-)
-from app.repositories.edition_repository import edition_repository
-from app.schemas.booklist import (
-    BookListCreateIn,
-    BookListItemInfo,
-    BookListItemUpdateIn,
-    BookListUpdateIn,
-    ItemUpdateType,
-)
-from app.schemas.collection import CollectionItemActivityBase
-from app.schemas.events.huey_events import HueyBookReviewedInfo
-from app.schemas.events.special_events import ReadingLogEvent
+from app.models.user import User
 from app.schemas.feedback import ReadingLogEventFeedback
-from app.services.feedback import process_reader_feedback_alerts
+from app.services.reading_events import READING_EVENT_TITLES, apply_reading_events
 
 # NOTE: Slack SDK imports removed - now handled by SlackNotificationService
 from app.services.slack_notification import send_slack_alert_reliable_sync
@@ -269,8 +251,8 @@ def process_events(event_id):
         logger.warning(
             "Background processing event", type=event.title, event_id=event.id
         )
-        if event.title == "Huey: Book reviewed":
-            return process_book_review_event(session, event)
+        if event.title in READING_EVENT_TITLES:
+            return apply_reading_events(session, [event.id])
         elif event.title == "Test":
             logger.info("Changing event", e=event)
             event.info["description"] = "MODIFIED"
@@ -278,8 +260,6 @@ def process_events(event_id):
             session.refresh(event)
             logger.info("Changed", e=event)
             return {"msg": "ok"}
-        elif event.title == "Reader timeline event: Reading logged":
-            return process_reading_logged_event(session, event)
         elif event.title == "Subscription started":
             return process_subscription_started_event(session, event)
         # elif event.title == "Supporter encouragement: Achievement feedback sent":
@@ -296,98 +276,6 @@ def process_subscription_started_event(session: Session, event: Event):
     logger.info("Placeholder to process subscription started event", info=event.info)
 
 
-def process_book_review_event(session: Session, event: Event):
-    """
-    Add liked books to booklists for optional school, class and user.
-
-    Creates the booklists if they don't exist.
-    """
-    logger.info("Processing book review event")
-
-    logger.debug("First we prepare a list of the liked books")
-    liked_items = get_liked_books_from_book_review_event(session, event)
-
-    if len(liked_items) == 0:
-        logger.info("No liked books")
-        return
-
-    logger.info(f"Review included {len(liked_items)} liked books")
-
-    # Work out if this review event is associated with a school
-    if event.school is None:
-        logger.debug("No school associated with book review")
-    else:
-        booklist = update_or_create_liked_books(
-            session,
-            liked_items,
-            booklist_type=ListType.SCHOOL,
-            school=event.school,
-            user=event.user,
-        )
-        logger.info("Updated school booklist", booklist=booklist)
-
-    if event.user is None:
-        logger.debug("No user associated with book review")
-    else:
-        logger.debug("Updating personal list of liked books", user=event.user)
-        personal_booklist = update_or_create_liked_books(
-            session,
-            liked_items,
-            booklist_type=ListType.PERSONAL,
-            school=None,
-            user=event.user,
-        )
-        logger.info("Updated personal liked books", booklist=personal_booklist)
-
-        if event.user.type == UserAccountType.STUDENT:
-            class_group = event.user.class_group
-            logger.debug("Updating class list of liked books", class_group=class_group)
-            class_booklist = update_or_create_liked_books(
-                session,
-                liked_items,
-                booklist_type=ListType.SCHOOL,
-                school=event.school,
-                user=event.user,
-                booklist_name=f"{class_group.name} Liked Books",
-            )
-            logger.info("Updated class liked books", booklist=class_booklist)
-
-
-def process_reading_logged_event(session: Session, event: Event):
-    """
-    Process a reading logged event, creating a CollectionItemActivity of the appropriate status, and optionally alert the reader's parent.
-    """
-    logger.info("Processing reading logged event")
-
-    try:
-        log_data = ReadingLogEvent.model_validate(event.info)
-    except ValidationError as e:
-        logger.warning("Error parsing reading logged event", error=e, event=event)
-        return
-
-    status = CollectionItemReadStatus.READING
-    if log_data.stopped:
-        logger.info("Reading logged as stopped")
-        status = CollectionItemReadStatus.STOPPED_READING
-    if log_data.finished:
-        logger.info("Reading logged as finished")
-        status = CollectionItemReadStatus.READ
-
-    activity = CollectionItemActivityBase(
-        collection_item_id=log_data.collection_item_id,
-        reader_id=event.user_id,
-        status=status,
-    )
-    collection_item_activity_repository.create(session, obj_in=activity)
-
-    item: CollectionItem = crud.collection.get_collection_item(
-        db=session, collection_item_id=log_data.collection_item_id
-    )
-
-    if reader := crud.user.get(session, id=event.user_id):
-        process_reader_feedback_alerts(session, reader, item, event, log_data)
-
-
 def process_supporter_reading_feedback_event(session: Session, event: Event):
     """
     Process a supporter feedback event
@@ -424,86 +312,3 @@ def process_supporter_reading_feedback_event(session: Session, event: Event):
         },
         account=log_event.user,
     )
-
-
-def update_or_create_liked_books(
-    session: Session,
-    liked_items: list[BookListItemUpdateIn],
-    booklist_type: str,
-    school: Optional[School],
-    user: Optional[User],
-    booklist_name="Liked Books",
-):
-    # See if the "Liked Books" booklist exists.
-    liked_booklist_query = booklist_repository.get_all_query_with_optional_filters(
-        db=session,
-        list_type=booklist_type,
-        school=school,
-        user=user,
-        query_string=booklist_name,
-    )
-    booklist = session.scalars(liked_booklist_query).first()
-    if booklist is None:
-        logger.info("Creating a new booklist", type=booklist_type)
-        booklist = booklist_repository.create(
-            db=session,
-            obj_in=BookListCreateIn(
-                name=booklist_name,
-                type=booklist_type,
-                user_id=user.id if user is not None else None,
-                school_id=school.id if school is not None else None,
-                info={"description": "List of all books liked in a Chat"},
-            ),
-        )
-
-    # Update with any newly liked items. Existing likes will be skipped
-    logger.info("Updating booklist", booklist_id=booklist.id)
-    booklist = booklist_repository.update(
-        db=session, db_obj=booklist, obj_in=BookListUpdateIn(items=liked_items)
-    )
-    return booklist
-
-
-def get_liked_books_from_book_review_event(
-    session: Session, event: Event
-) -> list[BookListItemUpdateIn]:
-    liked_items = []
-    logger.info("Getting liked books from event", event_info=event.info)
-
-    if "reviews" in event.info:
-        logger.warning("Unexpected event schema. Processing multiple reviews")
-        for review in event.info["reviews"]:
-            logger.debug("Processing review", raw_review=review)
-            isbn = review["isbn"]
-            book_liked = review["liked"]
-            liked_booklist_item = booklist_item_update_from_isbn(
-                session, isbn, book_liked
-            )
-            if liked_booklist_item:
-                liked_items.append(liked_booklist_item)
-
-    else:
-        info: HueyBookReviewedInfo = HueyBookReviewedInfo.model_validate(event.info)
-        logger.debug("Processing a book review", raw_review=info)
-        liked_booklist_item = booklist_item_update_from_isbn(
-            session, info.isbn, info.liked
-        )
-        if liked_booklist_item:
-            liked_items.append(liked_booklist_item)
-
-    return liked_items
-
-
-def booklist_item_update_from_isbn(
-    session, isbn, book_liked
-) -> Optional[BookListItemUpdateIn]:
-    edition = edition_repository.get(db=session, id=isbn)
-    if edition and book_liked:
-        liked_booklist_item = BookListItemUpdateIn(
-            action=ItemUpdateType.ADD,
-            work_id=edition.work_id,
-            info=BookListItemInfo(
-                edition=isbn,
-            ),
-        )
-        return liked_booklist_item
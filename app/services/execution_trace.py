@@ -50,10 +50,21 @@ class ExecutionTraceService:
         )
         row = result.first()
 
-        if not row or not row.trace_enabled:
+        if not row:
+            return False
+        return self.sample_session(
+            row.trace_enabled, row.trace_sample_rate, session_token
+        )
+
+    @staticmethod
+    def sample_session(
+        trace_enabled: bool, sample_rate: Optional[int], session_token: str
+    ) -> bool:
+        """Apply a flow's tracing config to a session without a query."""
+        if not trace_enabled:
             return False
 
-        sample_rate = row.trace_sample_rate
+        sample_rate = sample_rate or 0
         if sample_rate >= 100:
             return True
         if sample_rate <= 0:
@@ -63,7 +74,7 @@ class ExecutionTraceService:
         hash_value = int(hashlib.md5(session_token.encode()).hexdigest(), 16)
         return (hash_value % 100) < sample_rate
 
-    def get_trace_level(self, flow: FlowDefinition) -> TraceLevel:
+    def get_trace_level(self, flow: Any) -> TraceLevel:
         """Get trace level for a flow based on environment and config."""
         # Default to standard, could be made configurable per-flow
         return TraceLevel.STANDARD
@@ -91,8 +102,9 @@ class ExecutionTraceService:
         State is PII-masked before storage.
         """
         # Mask PII in state snapshots
-        masked_before = self.pii_masker.mask_state(state_before)
-        masked_after = self.pii_masker.mask_state(state_after)
+        masked_before, masked_after = self.pii_masker.mask_state_pair(
+            state_before, state_after
+        )
 
         step = FlowExecutionStep(
             session_id=session_id,
@@ -132,8 +144,9 @@ class ExecutionTraceService:
         Buffers traces and flushes when buffer is full or session ends.
         """
         # Mask PII before buffering
-        masked_before = self.pii_masker.mask_state(state_before)
-        masked_after = self.pii_masker.mask_state(state_after)
+        masked_before, masked_after = self.pii_masker.mask_state_pair(
+            state_before, state_after
+        )
 
         trace_data = {
             "session_id": str(session_id),
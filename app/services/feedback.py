@@ -72,15 +72,13 @@ def process_reader_feedback_alert_email(
     )
 
 
-def process_reader_feedback_alert_sms(
+def reader_feedback_alert_sms(
     recipient: Supporter,
     reader: Reader,
     item: CollectionItem,
     log_data: ReadingLogEvent,
     encoded_url: str,
-):
-    logger.info("Sending sms alert")
-
+) -> SendSmsPayload:
     template_data = {
         "name": reader.name,
         "title": truncate_to_full_word_with_ellipsis(item.get_display_title(), 30),
@@ -91,25 +89,48 @@ def process_reader_feedback_alert_sms(
 
     template = "{name} read some of {title}, and described it as '{descriptor} {emoji}'.\nChoose a one-tap response: {url}\nHuey Books"
 
-    sms_data = SendSmsPayload(
+    return SendSmsPayload(
         to=recipient.phone,
         body=template.format(**template_data),
         shorten_urls=True,
     )
 
-    queue_background_task(
-        "send-sms",
-        sms_data,
+
+def send_reader_feedback_sms(messages: list[SendSmsPayload]):
+    for sms_data in messages:
+        logger.info("Sending sms alert")
+        queue_background_task(
+            "send-sms",
+            sms_data,
+        )
+
+
+def process_reader_feedback_alert_sms(
+    recipient: Supporter,
+    reader: Reader,
+    item: CollectionItem,
+    log_data: ReadingLogEvent,
+    encoded_url: str,
+):
+    send_reader_feedback_sms(
+        [reader_feedback_alert_sms(recipient, reader, item, log_data, encoded_url)]
     )
 
 
-def process_reader_feedback_alerts(
+def queue_reader_feedback_alerts(
     session: Session,
     reader: Reader,
     item: CollectionItem,
     event: Event,
     log_data: ReadingLogEvent,
-):
+) -> list[SendSmsPayload]:
+    """
+    Add the reading feedback emails and "Notification Sent" events for a
+    reader's supporters to the session without committing.
+
+    Returns the SMS messages, which can't be rolled back so should only be
+    sent once the session has been committed.
+    """
     active_associations = [
         association
         for association in reader.supporter_associations
@@ -119,6 +140,7 @@ def process_reader_feedback_alerts(
         f"About to alert {len(active_associations)} Supporters",
         reader=reader,
     )
+    messages = []
     for association in active_associations:
         recipient: User = association.supporter
 
@@ -130,8 +152,10 @@ def process_reader_feedback_alerts(
             )
 
         if association.allow_phone and recipient.phone:
-            process_reader_feedback_alert_sms(
-                recipient, reader, item, log_data, encoded_url
+            messages.append(
+                reader_feedback_alert_sms(
+                    recipient, reader, item, log_data, encoded_url
+                )
             )
 
         crud.event.create(
@@ -145,4 +169,18 @@ def process_reader_feedback_alerts(
                 "recipient_type": recipient.type,
                 "event_id": str(event.id),
             },
+            commit=False,
         )
+    return messages
+
+
+def process_reader_feedback_alerts(
+    session: Session,
+    reader: Reader,
+    item: CollectionItem,
+    event: Event,
+    log_data: ReadingLogEvent,
+):
+    messages = queue_reader_feedback_alerts(session, reader, item, event, log_data)
+    session.commit()
+    send_reader_feedback_sms(messages)
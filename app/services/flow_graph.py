@@ -0,0 +1,236 @@
+"""
+Process-wide cache of compiled flow graphs.
+
+Entering a sub-flow needs the sub-flow's entry node and the composite node's
+return connection in the parent flow. Flows are edited rarely and read on
+every chat turn, so each process keeps a compiled view of a flow (nodes keyed
+by ``node_id`` and outgoing connections keyed by source node) for a short TTL.
+Starting a session uses the same view for the flow's publication state,
+version, tracing configuration and theme.
+
+Cached ORM instances are detached and shared between requests; callers that
+need a session-bound node use ``CompiledFlow.attach_node``, which merges a
+copy into the session without emitting SQL.
+
+Entries are dropped by ``FlowService`` when a flow, its nodes or its
+connections are edited in this process. Other processes pick up edits when the
+TTL expires.
+"""
+
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+from structlog import get_logger
+
+from app.config import get_settings
+from app.models.cms import ConnectionType, FlowConnection, FlowDefinition, FlowNode
+
+logger = get_logger()
+
+MAX_CACHED_FLOWS = 256
+
+# Matches the declaration order of enum_flow_connection_type, which is what
+# ``ORDER BY connection_type`` sorts by
+_CONNECTION_TYPE_ORDER = {
+    connection_type: position for position, connection_type in enumerate(ConnectionType)
+}
+
+
+@dataclass
+class CompiledFlow:
+    """Read-only view of a flow's nodes and connections."""
+
+    flow_id: uuid.UUID
+    name: str
+    entry_node_id: str
+    version: Optional[str] = None
+    is_published: bool = True
+    is_active: bool = True
+    trace_enabled: bool = False
+    trace_sample_rate: int = 0
+    theme_id: Optional[str] = None
+    nodes: Dict[str, FlowNode] = field(default_factory=dict)
+    connections: Dict[str, List[FlowConnection]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        flow: Any,
+        nodes: List[FlowNode],
+        connections: List[FlowConnection],
+    ) -> "CompiledFlow":
+        compiled = cls(
+            flow_id=flow.id,
+            name=flow.name,
+            entry_node_id=flow.entry_node_id,
+            version=getattr(flow, "version", None),
+            is_published=getattr(flow, "is_published", True),
+            is_active=getattr(flow, "is_active", True),
+            trace_enabled=bool(getattr(flow, "trace_enabled", False)),
+            trace_sample_rate=getattr(flow, "trace_sample_rate", 0) or 0,
+            theme_id=getattr(flow, "theme_id", None),
+        )
+        compiled.nodes = {node.node_id: node for node in nodes}
+        for connection in sorted(
+            connections,
+            key=lambda conn: _CONNECTION_TYPE_ORDER.get(conn.connection_type, 0),
+        ):
+            compiled.connections.setdefault(connection.source_node_id, []).append(
+                connection
+            )
+        return compiled
+
+    @property
+    def is_available(self) -> bool:
+        """Whether new sessions may be started on this flow."""
+        return self.is_published and self.is_active
+
+    @property
+    def entry_node(self) -> Optional[FlowNode]:
+        return self.nodes.get(self.entry_node_id)
+
+    def get_connections(self, source_node_id: str) -> List[FlowConnection]:
+        return self.connections.get(source_node_id, [])
+
+    def default_target(self, source_node_id: str) -> Optional[str]:
+        """Target of the node's DEFAULT connection, if it has one."""
+        for connection in self.get_connections(source_node_id):
+            if connection.connection_type == ConnectionType.DEFAULT:
+                return connection.target_node_id
+        return None
+
+    async def attach_node(self, db: AsyncSession, node_id: str) -> Optional[FlowNode]:
+        """Return a session-bound copy of a cached node without querying.
+
+        ``merge`` shares attribute values with the instance it copies, so a
+        deep copy is merged to keep the JSON columns (``content``,
+        ``position``) of the cached node out of reach of the request.
+        """
+        node = self.nodes.get(node_id)
+        if node is None:
+            return None
+        column_attrs = inspect(FlowNode).column_attrs
+        fresh = FlowNode(
+            **{
+                attr.key: copy.deepcopy(getattr(node, attr.key))
+                for attr in column_attrs
+            }
+        )
+        make_transient_to_detached(fresh)
+        return await db.merge(fresh, load=False)
+
+
+class FlowGraphCache:
+    """TTL + LRU cache of compiled flows keyed by flow id."""
+
+    def __init__(
+        self,
+        ttl_seconds: Optional[float] = None,
+        max_flows: int = MAX_CACHED_FLOWS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self.max_flows = max_flows
+        self._clock = clock
+        self._entries: "OrderedDict[uuid.UUID, tuple[float, CompiledFlow]]" = (
+            OrderedDict()
+        )
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            return get_settings().FLOW_GRAPH_CACHE_TTL_SECONDS
+        return self._ttl_seconds
+
+    async def get(self, db: AsyncSession, flow_id: uuid.UUID) -> Optional[CompiledFlow]:
+        """Return the compiled flow, loading it if missing or expired."""
+        now = self._clock()
+        entry = self._entries.get(flow_id)
+        if entry is not None and now - entry[0] < self.ttl_seconds:
+            self._entries.move_to_end(flow_id)
+            return entry[1]
+
+        compiled = await self._load(db, flow_id)
+        if compiled is None:
+            self._entries.pop(flow_id, None)
+            return None
+
+        self._entries[flow_id] = (now, compiled)
+        self._entries.move_to_end(flow_id)
+        while len(self._entries) > self.max_flows:
+            self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, flow_id: Optional[uuid.UUID] = None) -> None:
+        """Drop one flow, or every flow when ``flow_id`` is None."""
+        if flow_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(flow_id, None)
+
+    async def _load(
+        self, db: AsyncSession, flow_id: uuid.UUID
+    ) -> Optional[CompiledFlow]:
+        flow_row = (
+            await db.execute(
+                select(
+                    FlowDefinition.id,
+                    FlowDefinition.name,
+                    FlowDefinition.entry_node_id,
+                    FlowDefinition.version,
+                    FlowDefinition.is_published,
+                    FlowDefinition.is_active,
+                    FlowDefinition.trace_enabled,
+                    FlowDefinition.trace_sample_rate,
+                    # The theme may be configured in flow_data or info
+                    func.coalesce(
+                        func.nullif(FlowDefinition.flow_data["theme_id"].astext, ""),
+                        func.nullif(FlowDefinition.info["theme_id"].astext, ""),
+                    ).label("theme_id"),
+                ).where(FlowDefinition.id == flow_id)
+            )
+        ).first()
+        if flow_row is None:
+            return None
+        nodes = await _load_detached(db, FlowNode, FlowNode.flow_id == flow_id)
+        connections = await _load_detached(
+            db, FlowConnection, FlowConnection.flow_id == flow_id
+        )
+
+        logger.debug(
+            "Compiled flow graph",
+            flow_id=str(flow_id),
+            nodes=len(nodes),
+            connections=len(connections),
+        )
+        return CompiledFlow.build(flow_row, nodes, connections)
+
+
+async def _load_detached(db: AsyncSession, model, criterion) -> list:
+    """
+    Load rows as detached instances that never enter ``db``'s identity map.
+
+    Selecting entities would hand back instances the request may already be
+    using (e.g. the composite node itself), which must not be shared or
+    expunged; building them from plain rows keeps the cache independent.
+    """
+    column_attrs = inspect(model).column_attrs
+    result = await db.execute(
+        select(*(attr.class_attribute for attr in column_attrs)).where(criterion)
+    )
+    instances = []
+    for row in result:
+        instance = model(**{attr.key: row[i] for i, attr in enumerate(column_attrs)})
+        make_transient_to_detached(instance)
+        instances.append(instance)
+    return instances
+
+
+flow_graph_cache = FlowGraphCache()
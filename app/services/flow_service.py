@@ -31,6 +31,7 @@ from app.services.exceptions import (
     FlowNotFoundError,
     FlowValidationError,
 )
+from app.services.flow_graph import flow_graph_cache
 
 logger = get_logger()
 
@@ -286,6 +287,7 @@ class FlowService:
                     )
 
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
 
             logger.info(
                 "Updated flow with business logic",
@@ -398,6 +400,7 @@ class FlowService:
             )
             # Ensure outbox event persists
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
 
             logger.info(
                 "Published flow with business logic",
@@ -431,6 +434,7 @@ class FlowService:
             )
             # Ensure outbox event persists
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
 
             logger.info("Unpublished flow", flow_id=flow_id)
 
@@ -461,6 +465,7 @@ class FlowService:
             )
             # Ensure outbox event persists
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
 
             logger.info("Soft deleted flow", flow_id=flow_id)
 
@@ -517,6 +522,7 @@ class FlowService:
             logger.info("Created node", node_id=node.id, flow_id=flow_id)
 
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
             return node
 
         except FlowNotFoundError:
@@ -542,6 +548,7 @@ class FlowService:
             logger.info("Updated node", node_id=node_id)
 
             await db.commit()
+            flow_graph_cache.invalidate(existing.flow_id)
             return updated_node
 
         except Exception as e:
@@ -565,6 +572,7 @@ class FlowService:
             if deleted:
                 await self._regenerate_flow_data(db, existing.flow_id, commit=False)
                 await db.commit()
+                flow_graph_cache.invalidate(existing.flow_id)
             return deleted
 
         except Exception as e:
@@ -614,6 +622,7 @@ class FlowService:
         flow.flow_data = snapshot
         if commit:
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
             await db.refresh(flow)
         return flow
 
@@ -688,6 +697,7 @@ class FlowService:
             )
 
             await db.commit()
+            flow_graph_cache.invalidate(flow_id)
             return connection
 
         except FlowNotFoundError:
@@ -715,6 +725,7 @@ class FlowService:
             if deleted:
                 await self._regenerate_flow_data(db, existing.flow_id, commit=False)
                 await db.commit()
+                flow_graph_cache.invalidate(existing.flow_id)
             return deleted
 
         except Exception as e:
@@ -2,8 +2,8 @@
 Flow Webhook Service - Reliable webhook delivery for flow events via Event Outbox.
 
 This service provides reliable webhook delivery for flow state changes by:
-1. Looking up configured webhook subscriptions
-2. Creating outbox entries for each subscription
+1. Looking up matching webhook subscriptions in an in-memory routing index
+2. Creating outbox entries for each subscription in one INSERT
 3. Letting the outbox processor handle reliable delivery with retries
 
 This replaces the unreliable NOTIFY-only approach with a durable, transactional pattern.
@@ -13,17 +13,17 @@ import uuid
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
+from app.config import get_settings
 from app.models.event_outbox import EventOutbox, EventPriority
-from app.models.webhook_subscription import (
-    WebhookSubscription,
-    WebhookSubscriptionStatus,
-)
 from app.services.event_listener import FlowEvent
 from app.services.event_outbox_service import EventOutboxService
+from app.services.webhook_subscription_index import (
+    SubscriptionRoute,
+    WebhookSubscriptionIndex,
+)
 
 logger = get_logger()
 
@@ -39,8 +39,15 @@ class FlowWebhookService:
     - Integrates with the circuit breaker pattern
     """
 
-    def __init__(self, outbox_service: Optional[EventOutboxService] = None):
+    def __init__(
+        self,
+        outbox_service: Optional[EventOutboxService] = None,
+        subscription_index: Optional[WebhookSubscriptionIndex] = None,
+    ):
         self.outbox_service = outbox_service or EventOutboxService()
+        self.subscription_index = subscription_index or WebhookSubscriptionIndex(
+            refresh_interval_seconds=get_settings().WEBHOOK_SUBSCRIPTION_REFRESH_SECONDS
+        )
 
     async def publish_flow_event(
         self,
@@ -50,7 +57,9 @@ class FlowWebhookService:
         """
         Publish a flow event to all matching webhook subscriptions.
 
-        Creates an outbox entry for each matching subscription, ensuring
+        Matching subscriptions come from the in-memory routing index, so events
+        nobody subscribes to don't touch the database. Outbox entries for all
+        matching subscriptions are inserted with a single statement, ensuring
         reliable delivery even if the application crashes.
 
         Args:
@@ -60,14 +69,10 @@ class FlowWebhookService:
         Returns:
             List of created outbox entries
         """
-        # Find matching webhook subscriptions
-        subscriptions = await self._get_matching_subscriptions(
-            db,
-            event_type=event.event_type,
-            flow_id=event.flow_id,
-        )
+        await self.subscription_index.ensure_fresh(db)
+        routes = self.subscription_index.match(event.flow_id, event.event_type)
 
-        if not subscriptions:
+        if not routes:
             logger.debug(
                 "No webhook subscriptions for event",
                 event_type=event.event_type,
@@ -75,15 +80,11 @@ class FlowWebhookService:
             )
             return []
 
-        # Create outbox entries for each subscription
-        outbox_entries = []
-        for subscription in subscriptions:
-            entry = await self._create_webhook_outbox_entry(
-                db,
-                subscription=subscription,
-                event=event,
-            )
-            outbox_entries.append(entry)
+        payload = self._build_payload(event)
+        outbox_entries = await self.outbox_service.publish_events(
+            db,
+            [self._build_outbox_event(route, event, payload) for route in routes],
+        )
 
         logger.info(
             "Published flow event to webhook outbox",
@@ -132,45 +133,9 @@ class FlowWebhookService:
 
         return await self.publish_flow_event(db, event)
 
-    async def _get_matching_subscriptions(
-        self,
-        db: AsyncSession,
-        event_type: str,
-        flow_id: uuid.UUID,
-    ) -> List[WebhookSubscription]:
-        """Get all active webhook subscriptions matching the event."""
-        # Query for active subscriptions that:
-        # 1. Are active status
-        # 2. Match the flow_id (or are global with null flow_id)
-        # 3. Match the event type (or subscribe to all events with empty list)
-        query = (
-            select(WebhookSubscription)
-            .where(WebhookSubscription.status == WebhookSubscriptionStatus.ACTIVE)
-            .where(
-                (WebhookSubscription.flow_id.is_(None))
-                | (WebhookSubscription.flow_id == flow_id)
-            )
-        )
-
-        result = await db.execute(query)
-        subscriptions = result.scalars().all()
-
-        # Filter by event type (done in Python since JSONB array contains is complex)
-        matching = [
-            sub for sub in subscriptions if sub.matches_event(event_type, flow_id)
-        ]
-
-        return matching
-
-    async def _create_webhook_outbox_entry(
-        self,
-        db: AsyncSession,
-        subscription: WebhookSubscription,
-        event: FlowEvent,
-    ) -> EventOutbox:
-        """Create an outbox entry for a webhook subscription."""
-        # Build the webhook payload
-        payload = {
+    def _build_payload(self, event: FlowEvent) -> Dict[str, Any]:
+        """Build the webhook payload for a flow event."""
+        return {
             "event_type": event.event_type,
             "timestamp": event.timestamp,
             "session_id": str(event.session_id),
@@ -186,27 +151,32 @@ class FlowWebhookService:
             },
         }
 
+    def _build_outbox_event(
+        self,
+        route: SubscriptionRoute,
+        event: FlowEvent,
+        payload: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Build the outbox fields for delivering an event to a subscription."""
         # Build headers including secret for HMAC
-        headers = dict(subscription.headers or {})
-        if subscription.secret:
-            headers["secret"] = subscription.secret
-        if subscription.timeout_seconds:
-            headers["timeout_seconds"] = str(subscription.timeout_seconds)
-
-        # Create outbox entry
-        return await self.outbox_service.publish_event(
-            db,
-            event_type=f"flow_webhook:{event.event_type}",
-            destination=f"webhook:{subscription.url}",
-            payload=payload,
-            priority=EventPriority.NORMAL,
-            headers=headers if headers else None,
-            max_retries=subscription.max_retries,
-            correlation_id=f"{event.session_id}:{event.event_type}",
-            user_id=event.user_id,
-            session_id=event.session_id,
-            flow_id=event.flow_id,
-        )
+        headers = dict(route.headers)
+        if route.secret:
+            headers["secret"] = route.secret
+        if route.timeout_seconds:
+            headers["timeout_seconds"] = str(route.timeout_seconds)
+
+        return {
+            "event_type": f"flow_webhook:{event.event_type}",
+            "destination": f"webhook:{route.url}",
+            "payload": payload,
+            "priority": EventPriority.NORMAL,
+            "headers": headers if headers else None,
+            "max_retries": route.max_retries,
+            "correlation_id": f"{event.session_id}:{event.event_type}",
+            "user_id": event.user_id,
+            "session_id": event.session_id,
+            "flow_id": event.flow_id,
+        }
 
 
 # Global service instance
@@ -1,54 +1,34 @@
 import base64
 import sys
-from base64 import b64decode
 
 import requests
-from google.api_core.exceptions import NotFound
-from google.cloud import storage
 from google.cloud.storage import Bucket
 from structlog import get_logger
 
 from app.config import get_settings
+from app.services.object_storage import GCSObjectStorage, get_object_storage
 
 settings = get_settings()
 logger = get_logger()
 
 
-# setup gcp bucket
 def get_gcp_bucket(bucket_name: str) -> Bucket:
     """
     Get a Google Storage Bucket reference from the bucket name.
+
+    Handles are cached on the process-wide storage client.
     """
-    # get the bucket
-    storage_client = storage.Client()
-    return storage_client.get_bucket(bucket_name)
+    storage = get_object_storage()
+    if not isinstance(storage, GCSObjectStorage):
+        raise RuntimeError("Object storage isn't backed by Google Cloud Storage")
+    return storage.bucket(bucket_name)
 
 
 def base64_string_to_bucket(data: str, folder: str, filename: str, bucket_name: str):
     """
-    Upload a base64 image string to the specified GCP bucket, returning the public url.
+    Upload a base64 image string to the specified bucket, returning the public url.
     """
-    # get the image type
-    filetype = data.split(";")[0].split("/")[1]
-
-    # get the image data
-    try:
-        image_data = data.split(",")[1]
-    except IndexError:
-        return None
-    data_bytes = b64decode(image_data)
-
-    # create blob filename
-    full_filename = f"{filename}.{filetype}"
-    blob_name = f"{folder}/{full_filename}" if folder else full_filename
-
-    # upload the image to the bucket
-    bucket = get_gcp_bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    blob.upload_from_string(data_bytes, content_type=f"image/{filetype}")
-
-    # return the public url to the image
-    return blob.public_url
+    return get_object_storage().upload_image(data, bucket_name, folder, filename)
 
 
 def img_url_to_b64_string(url: str) -> str:
@@ -83,34 +63,4 @@ def delete_blob(bucket_name: str, blob_name: str):
     """
     Delete a blob from the bucket.
     """
-    bucket = get_gcp_bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-    blob.delete()
-
-
-def get_blob(bucket_name: str, blob_name: str, create: bool = False):
-    """
-    Get a blob from the bucket.
-
-    Raises a google.api_core.exceptions.NotFound exception if the blob doesn't exist and create is False.
-    """
-    bucket = get_gcp_bucket(bucket_name)
-    blob = bucket.blob(blob_name)
-
-    if not create and not blob.exists():
-        raise NotFound(f"Blob {blob_name} doesn't exist")
-
-    return blob
-
-
-def get_first_blob_by_prefix(bucket_name: str, prefix: str):
-    """
-    Useful for getting a blob if the name is known, but not the filetype. Raises a google.api_core.exceptions.NotFound exception if no blob exists.
-    """
-    bucket = get_gcp_bucket(bucket_name)
-    blobs = bucket.list_blobs(prefix=prefix, max_results=1)
-
-    if not blobs:
-        raise NotFound(f"No blobs found with prefix {prefix}")
-
-    return next(blobs)
+    get_object_storage().delete(bucket_name, blob_name)
@@ -33,8 +33,6 @@ settings = get_settings()
 
 
 def gpt_query(system_prompt, user_content, extra_messages=None):
-    openai.api_key = settings.OPENAI_API_KEY
-
     messages = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_content},
@@ -45,11 +43,15 @@ def gpt_query(system_prompt, user_content, extra_messages=None):
     logger.debug("Prompts prepared, sending to OpenAI...")
 
     start_time = time.time()
-    response = openai.ChatCompletion.create(
+    client = openai.OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.OPENAI_TIMEOUT,
+    )
+    response = client.chat.completions.create(
         model=settings.OPENAI_MODEL,
         messages=messages,
         temperature=0,
-        timeout=settings.OPENAI_TIMEOUT,
     )
     end_time = time.time()
     duration = end_time - start_time
@@ -57,8 +59,8 @@ def gpt_query(system_prompt, user_content, extra_messages=None):
     logger.debug(f"OpenAI responded after {duration}s")
 
     return GptPromptResponse(
-        usage=GptPromptUsage(**response["usage"], duration=duration),
-        output=response["choices"][0]["message"]["content"].strip(),
+        usage=GptPromptUsage(**response.usage.model_dump(), duration=duration),
+        output=response.choices[0].message.content.strip(),
     )
 
 
@@ -233,10 +235,11 @@ def create_labelset_from_ml_labelled_work(gpt_labeled_work: GptWorkData):
 
     labelset_data["hue_origin"] = LabelOrigin.VERTEXAI
 
-    # Age
-    labelset_data["age_origin"] = LabelOrigin.VERTEXAI
-    labelset_data["min_age"] = gpt_labeled_work.min_age
-    labelset_data["max_age"] = gpt_labeled_work.max_age
+    # Age, only when given: a labelset patch without either clears them
+    if gpt_labeled_work.min_age is not None or gpt_labeled_work.max_age is not None:
+        labelset_data["age_origin"] = LabelOrigin.VERTEXAI
+        labelset_data["min_age"] = gpt_labeled_work.min_age
+        labelset_data["max_age"] = gpt_labeled_work.max_age
 
     # summary
     labelset_data["huey_summary"] = gpt_labeled_work.short_summary
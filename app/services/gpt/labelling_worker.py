@@ -0,0 +1,415 @@
+"""
+Batched, concurrent GPT labelling.
+
+``GptLabeller`` sends labelling prompts through the async OpenAI client with
+a bounded number of requests in flight, under request and token per-minute
+budgets (``TokenBucket``). Validated outputs are cached in object storage by
+a hash of the model and prompt (``LabelPromptCache``), so re-running over
+works whose context hasn't changed makes no requests.
+
+``LabellingWorker`` pulls batches of unlabelled works (or given work ids),
+loads their editions, authors and labelsets in a few queries per batch,
+labels the batch concurrently and patches the labelsets with one commit per
+batch.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import openai
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+from structlog import get_logger
+
+from app.config import get_settings
+from app.models import Edition, LabelSet, Work
+from app.models.event import EventLevel
+from app.models.labelset import LabelOrigin
+from app.models.work import WorkType
+from app.repositories.labelset_repository import labelset_repository
+from app.schemas.gpt import GptPromptUsage, GptUsage, GptWorkData
+from app.services.events import create_event
+from app.services.gpt import (
+    create_labelset_from_ml_labelled_work,
+    prepare_context_for_labelling,
+)
+from app.services.gpt.prompt import retry_prompt_template, system_prompt
+from app.services.object_storage import Upload, get_object_storage
+
+logger = get_logger()
+
+# Labels from these origins aren't replaced by the worker
+LABELLED_ORIGINS = (LabelOrigin.HUMAN, LabelOrigin.GPT4, LabelOrigin.VERTEXAI)
+
+
+def prompt_hash(model: str, system: str, user_content: str) -> str:
+    return hashlib.sha256(
+        json.dumps([model, system, user_content]).encode("utf-8")
+    ).hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """
+    Allows ``per_minute`` units a minute, refilling continuously.
+
+    ``acquire`` waits until enough units are available; ``adjust`` corrects
+    an earlier estimate once the actual cost is known (and may leave the
+    bucket in debt, delaying later callers).
+    """
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.rate = per_minute / 60
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        # Waiters queue on the lock, so they're served in order
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def adjust(self, amount: float):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class LabelPromptCache:
+    """Validated labelling outputs in object storage, keyed by ``prompt_hash``."""
+
+    PREFIX = "gpt-labels"
+
+    def __init__(self, bucket: Optional[str] = None):
+        self.bucket = bucket or get_settings().GCP_BOOK_DATA_BUCKET
+
+    def _blob_name(self, key: str) -> str:
+        return f"{self.PREFIX}/{key}.json"
+
+    async def get(self, key: str) -> Optional[GptWorkData]:
+        raw = await asyncio.to_thread(
+            get_object_storage().download, self.bucket, self._blob_name(key)
+        )
+        if raw is None:
+            return None
+        try:
+            return GptWorkData.model_validate_json(raw)
+        except ValidationError:
+            # Cached under an older schema, label again
+            return None
+
+    def put(self, key: str, output: GptWorkData):
+        get_object_storage().put_quietly(
+            Upload(
+                bucket=self.bucket,
+                blob_name=self._blob_name(key),
+                data=output.model_dump_json().encode("utf-8"),
+                content_type="application/json",
+            )
+        )
+
+
+@dataclass
+class LabellingResult:
+    work_id: int
+    output: Optional[GptWorkData] = None
+    usage: Optional[GptUsage] = None
+    cached: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class LabellingStats:
+    labelled: int = 0
+    cached: int = 0
+    failed: int = 0
+    total_tokens: int = 0
+
+    def add(self, results: Iterable[LabellingResult]):
+        for result in results:
+            if result.output is None:
+                self.failed += 1
+                continue
+            self.labelled += 1
+            self.cached += result.cached
+            if result.usage is not None:
+                self.total_tokens += result.usage.overall_total_tokens
+
+
+_openai_client: Optional[openai.AsyncOpenAI] = None
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    global _openai_client
+    if _openai_client is None:
+        settings = get_settings()
+        _openai_client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=settings.OPENAI_TIMEOUT,
+            # Backs off on rate limit and server errors
+            max_retries=3,
+        )
+    return _openai_client
+
+
+class GptLabeller:
+    def __init__(
+        self,
+        client: Optional[openai.AsyncOpenAI] = None,
+        model: Optional[str] = None,
+        system: str = system_prompt,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        cache: Optional[LabelPromptCache] = None,
+        retries: int = 2,
+    ):
+        settings = get_settings()
+        self.client = client or get_openai_client()
+        self.model = model or settings.OPENAI_MODEL
+        self.system = system
+        self.retries = retries
+        self.cache = cache
+        self.expected_completion_tokens = (
+            settings.GPT_LABELLING_EXPECTED_COMPLETION_TOKENS
+        )
+        self._in_flight = asyncio.Semaphore(
+            concurrency or settings.GPT_LABELLING_CONCURRENCY
+        )
+        self.requests = TokenBucket(
+            requests_per_minute or settings.GPT_LABELLING_REQUESTS_PER_MINUTE
+        )
+        self.tokens = TokenBucket(
+            tokens_per_minute or settings.GPT_LABELLING_TOKENS_PER_MINUTE
+        )
+
+    async def _complete(self, messages: List[dict]) -> Tuple[str, GptPromptUsage]:
+        estimate = (
+            sum(estimate_tokens(m["content"]) for m in messages)
+            + self.expected_completion_tokens
+        )
+        await self.requests.acquire()
+        await self.tokens.acquire(estimate)
+
+        started = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=self.model, messages=messages, temperature=0
+        )
+        duration = time.perf_counter() - started
+
+        self.tokens.adjust(response.usage.total_tokens - estimate)
+        return response.choices[0].message.content.strip(), GptPromptUsage(
+            prompt_tokens=response.usage.prompt_tokens,
+            completion_tokens=response.usage.completion_tokens,
+            total_tokens=response.usage.total_tokens,
+            duration=duration,
+        )
+
+    async def label(self, work_id: int, user_content: str) -> LabellingResult:
+        key = prompt_hash(self.model, self.system, user_content)
+        if self.cache is not None and (cached := await self.cache.get(key)):
+            return LabellingResult(work_id, output=cached, cached=True)
+
+        messages = [
+            {"role": "system", "content": self.system},
+            {"role": "user", "content": user_content},
+        ]
+        usages = []
+        error = None
+        async with self._in_flight:
+            for _ in range(self.retries + 1):
+                try:
+                    output, usage = await self._complete(messages)
+                except openai.OpenAIError as e:
+                    logger.warning("GPT request failed", work_id=work_id, error=str(e))
+                    return LabellingResult(work_id, error=str(e))
+                usages.append(usage)
+                try:
+                    parsed = GptWorkData(**json.loads(output))
+                    break
+                except (ValidationError, ValueError) as e:
+                    error = str(e)
+                    logger.warning(
+                        "GPT response was not valid", work_id=work_id, error=error
+                    )
+                    # try again, providing the full context
+                    messages = messages[:2] + [
+                        {"role": "assistant", "content": output},
+                        {
+                            "role": "user",
+                            "content": retry_prompt_template.format(
+                                user_content=user_content, error_message=error
+                            ),
+                        },
+                    ]
+            else:
+                return LabellingResult(
+                    work_id, usage=GptUsage(usages=usages), error=error
+                )
+
+        if self.cache is not None:
+            self.cache.put(key, parsed)
+        return LabellingResult(work_id, output=parsed, usage=GptUsage(usages=usages))
+
+    async def label_many(
+        self, prompts: Iterable[Tuple[int, str]]
+    ) -> List[LabellingResult]:
+        return await asyncio.gather(
+            *(self.label(work_id, user_content) for work_id, user_content in prompts)
+        )
+
+
+class LabellingWorker:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        labeller: Optional[GptLabeller] = None,
+        batch_size: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.session_maker = session_maker
+        self.labeller = labeller or GptLabeller(
+            cache=LabelPromptCache() if settings.GPT_LABELLING_CACHE else None
+        )
+        self.batch_size = batch_size or settings.GPT_LABELLING_BATCH_SIZE
+        self.service_account_id = settings.GPT_SERVICE_ACCOUNT_ID
+
+    async def next_unlabelled_ids(
+        self, session: AsyncSession, after_id: int, limit: int
+    ) -> List[int]:
+        """Books with edition metadata but no hues from a labelling origin."""
+        return list(
+            await session.scalars(
+                select(Work.id)
+                .outerjoin(LabelSet, LabelSet.work_id == Work.id)
+                .where(
+                    Work.id > after_id,
+                    Work.type == WorkType.BOOK,
+                    Work.editions.any(Edition.info.is_not(None)),
+                    or_(
+                        LabelSet.id.is_(None),
+                        LabelSet.hue_origin.is_(None),
+                        LabelSet.hue_origin.not_in(LABELLED_ORIGINS),
+                    ),
+                )
+                .order_by(Work.id)
+                .limit(limit)
+            )
+        )
+
+    async def load_prompts(
+        self, session: AsyncSession, work_ids: Sequence[int]
+    ) -> List[Tuple[int, str]]:
+        works = await session.scalars(
+            select(Work)
+            .where(Work.id.in_(work_ids))
+            .options(
+                selectinload(Work.editions),
+                selectinload(Work.labelset),
+                selectinload(Work.authors),
+            )
+            .order_by(Work.id)
+        )
+        return [
+            (work.id, prepare_context_for_labelling(work))
+            for work in works
+            if work.editions
+        ]
+
+    async def save(self, session: AsyncSession, results: List[LabellingResult]):
+        labelled = [result for result in results if result.output is not None]
+        if not labelled:
+            return
+
+        def patch_labelsets(sync_session):
+            labelsets = labelset_repository.get_or_create_many(
+                sync_session, [result.work_id for result in labelled], commit=False
+            )
+            patches = []
+            for result in labelled:
+                labelset_data = create_labelset_from_ml_labelled_work(result.output)
+                labelset_data.labelled_by_sa_id = self.service_account_id
+                patches.append((labelsets[result.work_id], labelset_data))
+            labelset_repository.patch_many(sync_session, patches, commit=False)
+            create_event(
+                sync_session,
+                title="Labelling: batch complete",
+                description=f"Labelled {len(labelled)} works with GPT",
+                info={
+                    "work_ids": [result.work_id for result in labelled],
+                    "cached": sum(result.cached for result in labelled),
+                    "failed": {
+                        result.work_id: result.error
+                        for result in results
+                        if result.output is None
+                    },
+                },
+                level=EventLevel.DEBUG,
+                commit=False,
+            )
+
+        await session.run_sync(patch_labelsets)
+        await session.commit()
+
+    async def label_batch(self, work_ids: Sequence[int]) -> List[LabellingResult]:
+        async with self.session_maker() as session:
+            prompts = await self.load_prompts(session, work_ids)
+        # No connection is held while waiting on the model
+        results = await self.labeller.label_many(prompts)
+        async with self.session_maker() as session:
+            await self.save(session, results)
+        return results
+
+    async def run(
+        self,
+        work_ids: Optional[Sequence[int]] = None,
+        max_works: Optional[int] = None,
+    ) -> LabellingStats:
+        """
+        Label the given works, or every unlabelled work (up to ``max_works``)
+        in batches of ``batch_size``.
+        """
+        stats = LabellingStats()
+        if work_ids is not None:
+            for start in range(0, len(work_ids), self.batch_size):
+                stats.add(
+                    await self.label_batch(work_ids[start : start + self.batch_size])
+                )
+            return stats
+
+        # Keyset pagination, so works that fail aren't picked up again
+        after_id = 0
+        while max_works is None or stats.labelled + stats.failed < max_works:
+            limit = self.batch_size
+            if max_works is not None:
+                limit = min(limit, max_works - stats.labelled - stats.failed)
+            async with self.session_maker() as session:
+                batch = await self.next_unlabelled_ids(session, after_id, limit)
+            if not batch:
+                break
+            stats.add(await self.label_batch(batch))
+            after_id = batch[-1]
+            logger.info("Labelled batch", last_work_id=after_id, stats=stats)
+        return stats
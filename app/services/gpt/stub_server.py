@@ -0,0 +1,121 @@
+"""
+Stub OpenAI chat completions server for running the labelling worker locally.
+
+Answers ``POST /v1/chat/completions`` with a valid labelling response after a
+configurable delay, optionally rejecting a fraction of requests with 429s or
+returning invalid JSON, and reports token usage estimated from the prompt.
+Responses depend only on the prompt, so they're stable across runs.
+``app.state`` counts requests and the most that were in flight at once.
+
+Run: `poetry run python -m app.services.gpt.stub_server --port 8011 --latency 1.5`
+and set `OPENAI_BASE_URL=http://localhost:8011/v1`.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.schemas.recommendations import HueKeys, ReadingAbilityKey
+
+
+def stub_label(prompt: str) -> dict:
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+    hues = rng.sample(list(HueKeys), 3)
+    min_age = rng.randint(3, 10)
+    return {
+        "short_summary": "A stub summary.",
+        "long_summary": "A longer stub summary of the book.",
+        "reading_ability": [rng.choice(list(ReadingAbilityKey)).value],
+        "styles": [],
+        "genres": [],
+        "hue_map": {hue.value: weight for hue, weight in zip(hues, (0.6, 0.3, 0.1))},
+        "characters": [],
+        "min_age": min_age,
+        "max_age": min_age + 4,
+        "recommend_status": "GOOD",
+        "awards": [],
+        "notes": "",
+        "controversial_themes": [],
+    }
+
+
+def create_stub_llm_app(
+    latency: float = 0.0,
+    rate_limit_fraction: float = 0.0,
+    invalid_fraction: float = 0.0,
+    seed: int = 0,
+) -> FastAPI:
+    app = FastAPI(title="Stub LLM")
+    rng = random.Random(seed)
+    app.state.requests = 0
+    app.state.in_flight = 0
+    app.state.max_in_flight = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        if rng.random() < rate_limit_fraction:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                status_code=429,
+                headers={"retry-after-ms": "10"},
+            )
+        app.state.in_flight += 1
+        app.state.max_in_flight = max(app.state.max_in_flight, app.state.in_flight)
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            app.state.in_flight -= 1
+
+        prompt = "".join(message["content"] for message in body["messages"])
+        content = (
+            "Sorry, I can't help with that."
+            if rng.random() < invalid_fraction
+            else json.dumps(stub_label(body["messages"][1]["content"]))
+        )
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"chatcmpl-stub-{app.state.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": content},
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--rate-limit-fraction", type=float, default=0.0)
+    parser.add_argument("--invalid-fraction", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_stub_llm_app(
+            args.latency, args.rate_limit_fraction, args.invalid_fraction
+        ),
+        port=args.port,
+    )
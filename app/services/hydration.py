@@ -1,10 +1,10 @@
+import asyncio
 import json
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
 import isbnlib
 import requests
-from google.api_core.exceptions import NotFound
 from structlog import get_logger
 
 from app.config import get_settings
@@ -19,14 +19,12 @@ from app.schemas.hydration import HydratedBookData
 from app.schemas.labelset import LabelSetCreateIn
 from app.schemas.work import WorkCreateIn
 from app.services.background_tasks import queue_background_task
+from app.services.cover_derivatives import get_cover_derivative_pipeline
 from app.services.cover_images import handle_new_edition_cover_image
 from app.services.editions import create_missing_editions, get_definitive_isbn
 from app.services.events import create_event
-from app.services.gcp_storage import (
-    get_blob,
-    get_first_blob_by_prefix,
-    img_url_to_b64_string,
-)
+from app.services.gcp_storage import img_url_to_b64_string
+from app.services.object_storage import Upload, UploadBatch, get_object_storage
 from app.services.util import chunks
 
 logger = get_logger()
@@ -170,12 +168,13 @@ def get_nielsen_data(isbn, use_cache=True):
         return
 
     if use_cache:
-        try:
-            data_blob = get_blob(settings.GCP_BOOK_DATA_BUCKET, f"nielsen/{isbn}.json")
-            # download the raw data from gcp storage as json, converting to dict
-            return json.loads(data_blob.download_as_string().decode("utf-8"))
-        except NotFound:
-            pass  # cache miss, continue to make the request
+        # download the raw data from gcp storage as json, converting to dict
+        cached = get_object_storage().download(
+            settings.GCP_BOOK_DATA_BUCKET, f"nielsen/{isbn}.json"
+        )
+        if cached is not None:
+            return json.loads(cached.decode("utf-8"))
+        # cache miss, continue to make the request
 
     # populate object with the nielsen data
     return data_query(isbn)
@@ -184,6 +183,7 @@ def get_nielsen_data(isbn, use_cache=True):
 def save_editions(
     session, hydrated_book_data: list[HydratedBookData], queue_labelling: bool = True
 ):
+    works_to_label = []
     for book_data in hydrated_book_data:
         isbn = book_data.isbn
         # Get the edition (should exist), work (?), and labelset
@@ -197,6 +197,13 @@ def save_editions(
             edition.date_published = book_data.date_published
 
         if book_data.cover_url:
+            # A cached cover or a failed render leaves cover_image unset, in
+            # which case the edition's variants are only stale if the cover
+            # itself changed
+            if book_data.cover_image is not None:
+                edition.cover_image = book_data.cover_image
+            elif book_data.cover_url != edition.cover_url:
+                edition.cover_image = None
             edition.cover_url = book_data.cover_url
 
         edition.hydrated_at = datetime.utcnow()
@@ -238,32 +245,45 @@ def save_editions(
             labelset=labelset,
             data=labelset_patch,
         )
-        if queue_labelling and book_data.cover_url:
-            queue_background_task(
-                "generate-labels",
-                {"work_id": work.id},
-            )
+        if book_data.cover_url:
+            works_to_label.append(work.id)
+
+    # One labelling task for the batch, labelled concurrently by the worker
+    if queue_labelling and works_to_label:
+        queue_background_task("generate-labels", {"work_ids": works_to_label})
 
 
-def hydrate(isbn: str, use_cache: bool = True) -> HydratedBookData:
+def hydrate(
+    isbn: str,
+    use_cache: bool = True,
+    uploads: UploadBatch | None = None,
+    cover_variants: bool = False,
+) -> HydratedBookData:
     """
     Get Nielsen data for a given ISBN.
     If use_cache is True, will first check the book data gcp bucket for a cached version.
     If use_cache is False, will make a request to Nielsen's API, updating the cache with the result (unless
     NIELSEN_CACHE_RESULTS is False).
+    With ``uploads`` the cover is uploaded on that batch, which the caller must drain (see
+    ``wait_for_cover_uploads``) before saving the result. With ``cover_variants`` the cover's
+    resized variants are rendered too, for ``wait_for_cover_uploads`` to collect.
     """
     isbn = get_definitive_isbn(isbn)
 
     # populate object with nielsen data
     raw_data = get_nielsen_data(isbn, use_cache=use_cache)
 
-    # save the raw data to gcp storage/cache
+    storage = get_object_storage()
+
+    # save the raw data to gcp storage/cache, off the hydration path
     if settings.NIELSEN_CACHE_RESULTS:
-        blob = get_blob(
-            settings.GCP_BOOK_DATA_BUCKET, f"nielsen/{isbn}.json", create=True
-        )
-        blob.upload_from_string(
-            data=json.dumps(raw_data), content_type="application/json"
+        storage.put_quietly(
+            Upload(
+                bucket=settings.GCP_BOOK_DATA_BUCKET,
+                blob_name=f"nielsen/{isbn}.json",
+                data=json.dumps(raw_data).encode("utf-8"),
+                content_type="application/json",
+            )
         )
 
     book_data = HydratedBookData.from_nielsen_blob(raw_data)
@@ -277,33 +297,37 @@ def hydrate(isbn: str, use_cache: bool = True) -> HydratedBookData:
     # start with Nielsen
     if book_data.info.image_flag:
         if use_cache:
-            try:
-                existing_blob = get_first_blob_by_prefix(
-                    settings.GCP_IMAGE_BUCKET, f"nielsen/{isbn}"
-                )
-                cover_url = existing_blob.public_url
-            except NotFound:
-                pass
+            cover_url = storage.first_url_by_prefix(
+                settings.GCP_IMAGE_BUCKET, f"nielsen/{isbn}"
+            )
 
         if not cover_url:
             if image_data := image_query(isbn, retries=2):
-                cover_url = handle_new_edition_cover_image(isbn, image_data, "nielsen")
+                cover_url = handle_new_edition_cover_image(
+                    isbn,
+                    image_data,
+                    "nielsen",
+                    uploads=uploads,
+                    variants=cover_variants,
+                )
 
     # fallback to OpenLibrary
     else:
         if use_cache:
-            try:
-                existing_blob = get_first_blob_by_prefix(
-                    settings.GCP_IMAGE_BUCKET, f"open/{isbn}"
-                )
-                cover_url = existing_blob.public_url
-            except NotFound:
-                pass
+            cover_url = storage.first_url_by_prefix(
+                settings.GCP_IMAGE_BUCKET, f"open/{isbn}"
+            )
 
         api_url = f"https://covers.openlibrary.org/b/isbn/{isbn}-L.jpg"
         if not cover_url and requests.get(api_url).status_code == 200:
             if image_data := img_url_to_b64_string(api_url):
-                cover_url = handle_new_edition_cover_image(isbn, image_data, "open")
+                cover_url = handle_new_edition_cover_image(
+                    isbn,
+                    image_data,
+                    "open",
+                    uploads=uploads,
+                    variants=cover_variants,
+                )
 
     book_data.cover_url = cover_url
     # --------------------------------------------
@@ -317,6 +341,28 @@ def hydrate(isbn: str, use_cache: bool = True) -> HydratedBookData:
     return book_data
 
 
+def wait_for_cover_uploads(book_batch: list[HydratedBookData], uploads: UploadBatch):
+    """
+    Block until the batch's cover variants are made and its ``uploads`` have
+    finished, dropping the cover url (or variants) of any that failed so
+    editions never point at missing blobs.
+    """
+    cover_images = get_cover_derivative_pipeline().collect(
+        book_data.cover_url for book_data in book_batch
+    )
+    failed = set(uploads.drain())
+    for book_data in book_batch:
+        if book_data.cover_url in failed:
+            logger.warning("Cover upload failed", isbn=book_data.isbn)
+            book_data.cover_url = None
+            continue
+        cover_image = cover_images.get(book_data.cover_url)
+        if cover_image is not None and not failed.intersection(
+            str(variant.url) for variant in cover_image.variants
+        ):
+            book_data.cover_image = cover_image.model_dump(mode="json")
+
+
 async def hydrate_bulk(session, isbns_to_hydrate: list[str] = []):
     if len(isbns_to_hydrate) < 1:
         logger.info("No editions to hydrate today. Exiting...")
@@ -337,6 +383,7 @@ async def hydrate_bulk(session, isbns_to_hydrate: list[str] = []):
     # using chunks to be nice to the db re: bulk edition creation
     for chunk in chunks(isbns_to_hydrate, 10):
         book_batch: list[HydratedBookData] = []
+        uploads = get_object_storage().batch()
 
         for isbn in chunk:
             current += 1
@@ -348,13 +395,19 @@ async def hydrate_bulk(session, isbns_to_hydrate: list[str] = []):
                 continue
 
             try:
-                book_data = hydrate(isbn, use_cache=settings.NIELSEN_ENABLE_CACHE)
+                book_data = hydrate(
+                    isbn,
+                    use_cache=settings.NIELSEN_ENABLE_CACHE,
+                    uploads=uploads,
+                    cover_variants=True,
+                )
 
             except NielsenServiceException:
                 errors += 1
                 logger.warning(
                     "Nielsen API service is apparently unavailable. Posting final batch then stopping..."
                 )
+                wait_for_cover_uploads(book_batch, uploads)
                 save_editions(
                     session, book_batch, queue_labelling=settings.LABEL_AFTER_HYDRATION
                 )
@@ -369,6 +422,7 @@ async def hydrate_bulk(session, isbns_to_hydrate: list[str] = []):
                 logger.warning(
                     "Nielsen Rate Limit reached. Posting final batch then stopping..."
                 )
+                wait_for_cover_uploads(book_batch, uploads)
                 save_editions(
                     session, book_batch, queue_labelling=settings.LABEL_AFTER_HYDRATION
                 )
@@ -416,6 +470,9 @@ async def hydrate_bulk(session, isbns_to_hydrate: list[str] = []):
             f"Have hydrated a partial batch of {len(chunk)}. Posting to Wriveted..."
         )
 
+        # The chunk's covers have been uploading concurrently while the rest
+        # of it hydrated
+        await asyncio.to_thread(wait_for_cover_uploads, book_batch, uploads)
         await create_missing_editions(session, new_edition_data=book_batch)
         save_editions(
             session, book_batch, queue_labelling=settings.LABEL_AFTER_HYDRATION
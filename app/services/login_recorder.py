@@ -0,0 +1,202 @@
+"""
+Batched recording of student logins.
+
+Class-code logins arrive in bursts (a whole class at 9am), so the login
+request itself doesn't write anything:
+
+- ``LoginRecorder.record`` appends the login to an in-process buffer.
+- Every ``LOGIN_RECORD_FLUSH_SECONDS`` the buffer is written to the event
+  outbox as ``student_logins`` events of up to ``LOGIN_RECORD_MAX_BATCH``
+  logins each, with a single INSERT.
+- The outbox processor hands each of those to ``apply_login_batch``, which
+  adds the "User logged in" events with one multi-row INSERT and sets
+  ``last_login_at`` with one ``UPDATE ... FROM (VALUES ...)``.
+
+Logins buffered when a process dies without shutting down are lost; they
+are debug level audit records, so that's an acceptable trade for taking
+the writes off the login path.
+"""
+
+import asyncio
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, column, insert, update, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.config import get_settings
+from app.models.event import Event, EventLevel
+from app.models.user import User
+
+logger = get_logger()
+
+LOGIN_EVENT_TYPE = "student_logins"
+LOGIN_EVENT_DESTINATION = "internal:record-logins"
+
+
+@dataclass
+class Login:
+    user_id: uuid.UUID
+    at: datetime
+
+    def to_payload(self) -> dict:
+        return {"user_id": str(self.user_id), "at": self.at.isoformat()}
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> "Login":
+        return cls(uuid.UUID(payload["user_id"]), datetime.fromisoformat(payload["at"]))
+
+
+async def apply_login_batch(db: AsyncSession, logins: list[Login]) -> None:
+    """Write the events and ``last_login_at`` for a batch of logins."""
+    if not logins:
+        return
+    await db.execute(
+        insert(Event),
+        [
+            {
+                "id": uuid.uuid4(),
+                "title": "User logged in",
+                "info": {"description": "Student logged in"},
+                "level": EventLevel.DEBUG,
+                "timestamp": login.at,
+                "user_id": login.user_id,
+            }
+            for login in logins
+        ],
+    )
+
+    latest: dict[uuid.UUID, datetime] = {}
+    for login in logins:
+        latest[login.user_id] = max(login.at, latest.get(login.user_id, login.at))
+    last_logins = values(
+        column("id", UUID(as_uuid=True)),
+        column("last_login_at", DateTime),
+        name="last_logins",
+    ).data(list(latest.items()))
+    await db.execute(
+        update(User)
+        .where(User.id == last_logins.c.id)
+        .values(last_login_at=last_logins.c.last_login_at)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    logger.debug("Recorded student logins", logins=len(logins), users=len(latest))
+
+
+class LoginRecorder:
+    """Per-process buffer of logins, flushed to the event outbox in batches."""
+
+    def __init__(
+        self,
+        flush_interval_seconds: Optional[float] = None,
+        max_batch: Optional[int] = None,
+    ):
+        settings = None
+        if None in (flush_interval_seconds, max_batch):
+            settings = get_settings()
+        self.flush_interval_seconds = (
+            flush_interval_seconds
+            if flush_interval_seconds is not None
+            else settings.LOGIN_RECORD_FLUSH_SECONDS
+        )
+        self.max_batch = (
+            max_batch if max_batch is not None else settings.LOGIN_RECORD_MAX_BATCH
+        )
+        self._pending: list[Login] = []
+        # record() can be called from the threadpool as well as the event loop
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, user_id: uuid.UUID, at: Optional[datetime] = None) -> None:
+        with self._lock:
+            self._pending.append(Login(user_id, at or datetime.utcnow()))
+        self._ensure_flush_task()
+
+    async def flush(self, db: AsyncSession) -> int:
+        """Publish buffered logins to the outbox, returning how many were sent."""
+        from app.services.event_outbox_service import EventOutboxService
+
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        try:
+            await EventOutboxService().publish_events(
+                db,
+                [
+                    {
+                        "event_type": LOGIN_EVENT_TYPE,
+                        "destination": LOGIN_EVENT_DESTINATION,
+                        "payload": {
+                            "logins": [
+                                login.to_payload()
+                                for login in pending[start : start + self.max_batch]
+                            ]
+                        },
+                    }
+                    for start in range(0, len(pending), self.max_batch)
+                ],
+            )
+            await db.commit()
+        except Exception:
+            # Keep the logins for the next attempt
+            with self._lock:
+                self._pending[:0] = pending
+            raise
+
+        logger.debug("Flushed student logins to the outbox", logins=len(pending))
+        return len(pending)
+
+    def _ensure_flush_task(self) -> None:
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(
+                self._flush_periodically()
+            )
+        except RuntimeError:
+            # No running loop (e.g. sync callers); flushed on shutdown instead
+            self._flush_task = None
+
+    async def _flush_with_new_session(self) -> None:
+        from app.db.session import get_async_session_maker
+
+        async with get_async_session_maker()() as session:
+            await self.flush(session)
+
+    async def _flush_periodically(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.flush_interval_seconds)
+            try:
+                await self._flush_with_new_session()
+            except Exception as e:
+                logger.warning("Failed to flush student logins", error=str(e))
+
+    async def shutdown(self) -> None:
+        """Stop the background flush and write anything still pending."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        if self._pending:
+            await self._flush_with_new_session()
+
+
+_recorder: Optional[LoginRecorder] = None
+
+
+def get_login_recorder() -> LoginRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = LoginRecorder()
+    return _recorder
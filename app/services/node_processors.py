@@ -11,7 +11,7 @@ from typing import Any, Dict, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from structlog import get_logger
 
-from app.models.cms import ConnectionType, ConversationSession, FlowNode, NodeType
+from app.models.cms import ConversationSession, FlowNode, NodeType
 from app.services.cel_evaluator import evaluate_cel_expression
 from app.services.circuit_breaker import get_circuit_breaker
 from app.services.node_input_validation import validate_node_input
@@ -573,13 +573,12 @@ class CompositeNodeProcessor:
         """Process a composite node that invokes a sub-flow."""
         from uuid import UUID
 
-        from app import crud
-        from app.repositories.chat_repository import chat_repo
+        from app.services.flow_graph import flow_graph_cache
 
         try:
-            # Get the sub-flow
+            # Get the sub-flow from the compiled flow cache
             sub_flow_id = UUID(composite_flow_id)
-            sub_flow = await crud.flow.aget(db, sub_flow_id)
+            sub_flow = await flow_graph_cache.get(db, sub_flow_id)
 
             if not sub_flow:
                 self.logger.error(
@@ -593,9 +592,7 @@ class CompositeNodeProcessor:
                 }
 
             # Get entry node of sub-flow
-            entry_node = await chat_repo.get_flow_node(
-                db, flow_id=sub_flow_id, node_id=sub_flow.entry_node_id
-            )
+            entry_node = await sub_flow.attach_node(db, sub_flow.entry_node_id)
 
             if not entry_node:
                 return {
@@ -604,14 +601,10 @@ class CompositeNodeProcessor:
                 }
 
             # Get the composite node's outgoing connection (return node after sub-flow completes)
-            connections = await chat_repo.get_node_connections(
-                db, flow_id=node.flow_id, source_node_id=node.node_id
+            parent_flow = await flow_graph_cache.get(db, node.flow_id)
+            return_node_id = (
+                parent_flow.default_target(node.node_id) if parent_flow else None
             )
-            return_node_id = None
-            for conn in connections:
-                if conn.connection_type == ConnectionType.DEFAULT:
-                    return_node_id = conn.target_node_id
-                    break
 
             # Push parent flow context to session.info flow_stack for return after sub-flow
             flow_stack = list(session.info.get("flow_stack", []))
@@ -623,20 +616,11 @@ class CompositeNodeProcessor:
                 }
             )
 
-            # Update session with sub-flow context
-            session = await chat_repo.update_session_state(
-                db,
-                session_id=session.id,
-                state_updates={},
-                current_flow_id=sub_flow_id,
-            )
-            # Update info separately (using SQLAlchemy's mutable tracking)
+            # Switch the session to the sub-flow in memory only; the state
+            # write after the entry node persists info and current_flow_id
+            # in the same UPDATE rather than a separate transaction
             session.info["flow_stack"] = flow_stack
-            from sqlalchemy.orm.attributes import flag_modified
-
-            flag_modified(session, "info")
-            await db.commit()
-            await db.refresh(session)
+            session.current_flow_id = sub_flow_id
 
             self.logger.info(
                 "Invoking sub-flow",
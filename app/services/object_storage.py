@@ -0,0 +1,461 @@
+"""
+Object storage for cover images, booklist feature images and cached book data.
+
+One ``ObjectStorage`` per process (``get_object_storage()``) owns the storage
+client, the bucket handles and a small thread pool for uploads, so a request
+no longer builds a new ``storage.Client`` and fetches bucket metadata before
+every upload.
+
+Base64 image payloads are decoded in fixed-size chunks into a spooled
+temporary file rather than as one large ``bytes`` copy. Uploads block by
+default. A caller with many of them (e.g. covers during bulk hydration)
+starts an ``UploadBatch``: the public url (which only depends on the blob
+name) is returned immediately and the upload runs on the pool, and the
+caller's ``batch.drain()`` reports which of *its* uploads failed before any
+url is saved.
+
+Blobs that nothing in the database points at (cached API responses, deletes
+of replaced images) can be left to the pool with
+``OBJECT_STORAGE_BACKGROUND_UPLOADS``; their failures are only logged.
+
+``OBJECT_STORAGE_BACKEND=local`` swaps Google Cloud Storage for a directory
+on disk with the same behaviour, for development, tests and benchmarks.
+"""
+
+import asyncio
+import binascii
+import io
+import shutil
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from base64 import b64decode
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Union
+from urllib.parse import quote, unquote
+
+from structlog import get_logger
+
+from app.config import get_settings
+
+logger = get_logger()
+
+# Multiple of 4 so every chunk but the last decodes on its own
+DECODE_CHUNK_CHARS = 64 * 1024
+# Decoded images larger than this are spooled to disk while uploading
+SPOOL_MAX_BYTES = 2 * 1024 * 1024
+
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG", "png"),
+    (b"GIF8", "gif"),
+    (b"RIFF", "webp"),
+)
+
+Payload = Union[bytes, IO[bytes]]
+
+
+class InvalidImageData(ValueError):
+    pass
+
+
+@dataclass
+class Upload:
+    bucket: str
+    blob_name: str
+    data: Payload
+    content_type: str
+
+
+def decode_base64_to_file(encoded: str, start: int = 0) -> IO[bytes]:
+    """Decode ``encoded[start:]`` chunk by chunk into a rewound temporary file."""
+    decoded = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    carry = ""
+    try:
+        for offset in range(start, len(encoded), DECODE_CHUNK_CHARS):
+            chunk = carry + "".join(
+                encoded[offset : offset + DECODE_CHUNK_CHARS].split()
+            )
+            usable = len(chunk) - len(chunk) % 4
+            decoded.write(b64decode(chunk[:usable]))
+            carry = chunk[usable:]
+        if carry.strip("="):
+            decoded.write(b64decode(carry + "=" * (-len(carry) % 4)))
+    except binascii.Error as e:
+        decoded.close()
+        raise InvalidImageData("Image data is not valid base64") from e
+    decoded.seek(0)
+    return decoded
+
+
+def parse_image_data(data: str) -> tuple[str, IO[bytes]]:
+    """
+    Split an image payload into its file type and decoded bytes.
+
+    Accepts a data url (``data:image/png;base64,...``) or bare base64, in
+    which case the type is taken from the decoded file signature.
+    """
+    if data.startswith("data:"):
+        separator = data.find(",")
+        if separator == -1:
+            raise InvalidImageData("Image data url has no payload")
+        filetype = data[5:separator].split(";")[0].split("/")[-1]
+        if not filetype:
+            raise InvalidImageData("Image data url has no media type")
+        return filetype, decode_base64_to_file(data, separator + 1)
+
+    decoded = decode_base64_to_file(data)
+    header = decoded.read(16)
+    decoded.seek(0)
+    for signature, filetype in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return filetype, decoded
+    decoded.close()
+    raise InvalidImageData("Unrecognised image data")
+
+
+def blob_name_for(folder: Optional[str], filename: str, filetype: str) -> str:
+    full_filename = f"{filename}.{filetype}"
+    return f"{folder}/{full_filename}" if folder else full_filename
+
+
+class ObjectStorage(ABC):
+    """Uploads, downloads and deletes blobs in named buckets."""
+
+    def __init__(self, max_concurrent_uploads: Optional[int] = None):
+        self.max_concurrent_uploads = (
+            max_concurrent_uploads
+            or get_settings().OBJECT_STORAGE_MAX_CONCURRENT_UPLOADS
+        )
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    # ---- backend specific --------------------------------------------------
+
+    @abstractmethod
+    def public_url(self, bucket: str, blob_name: str) -> str:
+        """The url a blob is served from once uploaded."""
+
+    @abstractmethod
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        """Inverse of ``public_url``, None for urls this backend didn't make."""
+
+    @abstractmethod
+    def _write(
+        self, bucket: str, blob_name: str, data: IO[bytes], content_type: str
+    ) -> None:
+        pass
+
+    @abstractmethod
+    def _read(self, bucket: str, blob_name: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def _delete(self, bucket: str, blob_name: str) -> None:
+        pass
+
+    @abstractmethod
+    def _first_blob_name(self, bucket: str, prefix: str) -> Optional[str]:
+        pass
+
+    # ---- shared ------------------------------------------------------------
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.max_concurrent_uploads, thread_name_prefix="object-storage"
+                )
+            return self._executor
+
+    def _put(self, upload: Upload) -> str:
+        data = upload.data
+        fileobj = io.BytesIO(data) if isinstance(data, bytes) else data
+        try:
+            self._write(upload.bucket, upload.blob_name, fileobj, upload.content_type)
+        finally:
+            fileobj.close()
+        return self.public_url(upload.bucket, upload.blob_name)
+
+    def upload(self, upload: Upload, batch: Optional["UploadBatch"] = None) -> str:
+        """
+        Store ``upload`` and return its public url.
+
+        With a ``batch`` the upload runs on the pool, and the url must not be
+        saved until ``batch.drain()`` has confirmed it.
+        """
+        if batch is not None:
+            return batch.upload(upload)
+        return self._put(upload)
+
+    def batch(self) -> "UploadBatch":
+        return UploadBatch(self)
+
+    def put_quietly(self, upload: Upload) -> None:
+        """
+        Store a blob that nothing in the database refers to, e.g. a cached API
+        response. Runs on the pool when OBJECT_STORAGE_BACKGROUND_UPLOADS is
+        set; failures are logged rather than raised.
+        """
+        if get_settings().OBJECT_STORAGE_BACKGROUND_UPLOADS:
+            self.executor.submit(self._put_quietly, upload)
+        else:
+            self._put_quietly(upload)
+
+    def _put_quietly(self, upload: Upload) -> None:
+        try:
+            self._put(upload)
+        except Exception as e:
+            logger.warning(
+                "Failed to store blob",
+                bucket=upload.bucket,
+                blob=upload.blob_name,
+                error=str(e),
+            )
+
+    def upload_image(
+        self,
+        data: str,
+        bucket: str,
+        folder: Optional[str],
+        filename: str,
+        batch: Optional["UploadBatch"] = None,
+    ) -> Optional[str]:
+        """
+        Upload a base64 image (data url or bare) and return its public url.
+
+        Returns None when the payload can't be decoded as an image. With a
+        ``batch`` the upload runs on the pool, as for ``upload``.
+        """
+        try:
+            filetype, decoded = parse_image_data(data)
+        except InvalidImageData as e:
+            logger.warning("Ignoring invalid image upload", reason=str(e))
+            return None
+
+        return self.upload(
+            Upload(
+                bucket=bucket,
+                blob_name=blob_name_for(folder, filename, filetype),
+                data=decoded,
+                content_type=f"image/{filetype}",
+            ),
+            batch=batch,
+        )
+
+    def download(self, bucket: str, blob_name: str) -> Optional[bytes]:
+        """A blob's content, or None if it doesn't exist."""
+        return self._read(bucket, blob_name)
+
+    def delete(self, bucket: str, blob_name: str) -> None:
+        self._delete(bucket, blob_name)
+
+    def delete_url(self, url: str, background: Optional[bool] = None) -> None:
+        """Delete the blob behind a url made by ``public_url``, if any."""
+        bucket, _, blob_name = (self.blob_name_from_url(url) or "").partition("/")
+        if not blob_name:
+            logger.info("Not deleting blob for unrecognised url", url=url)
+            return
+        if background is None:
+            background = get_settings().OBJECT_STORAGE_BACKGROUND_UPLOADS
+        if background:
+            self.executor.submit(self._delete_quietly, bucket, blob_name)
+        else:
+            self._delete_quietly(bucket, blob_name)
+
+    def _delete_quietly(self, bucket: str, blob_name: str) -> None:
+        try:
+            self._delete(bucket, blob_name)
+        except Exception as e:
+            logger.warning(
+                "Failed to delete blob", bucket=bucket, blob=blob_name, error=str(e)
+            )
+
+    def first_url_by_prefix(self, bucket: str, prefix: str) -> Optional[str]:
+        """Public url of the first blob whose name starts with ``prefix``."""
+        blob_name = self._first_blob_name(bucket, prefix)
+        return self.public_url(bucket, blob_name) if blob_name else None
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+class UploadBatch:
+    """
+    Uploads started together by one caller, running on the storage pool.
+
+    Each caller drains its own batch, so it learns about exactly the uploads
+    it started and can drop their urls before saving them.
+    """
+
+    def __init__(self, storage: ObjectStorage):
+        self.storage = storage
+        self._uploads: Dict[Future, str] = {}
+        self._lock = threading.Lock()
+
+    def upload(self, upload: Upload) -> str:
+        url = self.storage.public_url(upload.bucket, upload.blob_name)
+        future = self.storage.executor.submit(self.storage._put, upload)
+        with self._lock:
+            self._uploads[future] = url
+        return url
+
+    def upload_image(
+        self, data: str, bucket: str, folder: Optional[str], filename: str
+    ) -> Optional[str]:
+        return self.storage.upload_image(data, bucket, folder, filename, batch=self)
+
+    def drain(self, timeout: Optional[float] = None) -> List[str]:
+        """
+        Wait for the uploads started so far, returning the urls of those that
+        failed (or hadn't finished within ``timeout``).
+        """
+        with self._lock:
+            uploads, self._uploads = self._uploads, {}
+        done, _ = wait(uploads, timeout=timeout)
+        failed = []
+        for future, url in uploads.items():
+            error = future.exception() if future in done else TimeoutError()
+            if error is not None:
+                logger.error("Upload failed", url=url, error=str(error))
+                failed.append(url)
+        return failed
+
+    async def adrain(self, timeout: Optional[float] = None) -> List[str]:
+        return await asyncio.to_thread(self.drain, timeout)
+
+
+class GCSObjectStorage(ObjectStorage):
+    """Google Cloud Storage with one client and bucket handle per process."""
+
+    URL_PREFIX = "https://storage.googleapis.com/"
+
+    def __init__(self, max_concurrent_uploads: Optional[int] = None):
+        super().__init__(max_concurrent_uploads)
+        self._client = None
+        self._buckets: dict = {}
+
+    @property
+    def client(self):
+        # Imported here so the local backend works without GCP credentials
+        from google.cloud import storage
+
+        with self._lock:
+            if self._client is None:
+                self._client = storage.Client()
+            return self._client
+
+    def bucket(self, name: str):
+        """Cached handle; ``client.bucket`` makes no metadata request."""
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets.setdefault(name, self.client.bucket(name))
+        return bucket
+
+    def public_url(self, bucket: str, blob_name: str) -> str:
+        # Same as Blob.public_url
+        return f"{self.URL_PREFIX}{bucket}/{quote(blob_name, safe='/~')}"
+
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        # Everything after the host, i.e. "<bucket>/<blob name>"
+        anchor = "storage.googleapis.com/"
+        if anchor not in url:
+            return None
+        return unquote(url.split(anchor, 1)[1])
+
+    def _write(self, bucket, blob_name, data, content_type) -> None:
+        self.bucket(bucket).blob(blob_name).upload_from_file(
+            data, content_type=content_type, rewind=True
+        )
+
+    def _read(self, bucket, blob_name) -> Optional[bytes]:
+        from google.api_core.exceptions import NotFound
+
+        try:
+            return self.bucket(bucket).blob(blob_name).download_as_bytes()
+        except NotFound:
+            return None
+
+    def _delete(self, bucket, blob_name) -> None:
+        self.bucket(bucket).blob(blob_name).delete()
+
+    def _first_blob_name(self, bucket, prefix) -> Optional[str]:
+        blob = next(
+            iter(self.client.list_blobs(bucket, prefix=prefix, max_results=1)), None
+        )
+        return blob.name if blob is not None else None
+
+
+class LocalObjectStorage(ObjectStorage):
+    """Buckets as directories under ``root``."""
+
+    def __init__(
+        self,
+        root: Union[str, Path, None] = None,
+        base_url: Optional[str] = None,
+        max_concurrent_uploads: Optional[int] = None,
+    ):
+        super().__init__(max_concurrent_uploads)
+        settings = get_settings()
+        self.root = Path(root or settings.OBJECT_STORAGE_LOCAL_ROOT)
+        self.base_url = (base_url or settings.OBJECT_STORAGE_LOCAL_BASE_URL).rstrip("/")
+
+    def _path(self, bucket: str, blob_name: str) -> Path:
+        path = (self.root / bucket / blob_name).resolve()
+        if not path.is_relative_to(self.root.resolve() / bucket):
+            raise ValueError(f"Blob name {blob_name!r} escapes its bucket")
+        return path
+
+    def public_url(self, bucket: str, blob_name: str) -> str:
+        return f"{self.base_url}/{bucket}/{quote(blob_name, safe='/~')}"
+
+    def blob_name_from_url(self, url: str) -> Optional[str]:
+        if not url.startswith(f"{self.base_url}/"):
+            return None
+        return unquote(url[len(self.base_url) + 1 :])
+
+    def _write(self, bucket, blob_name, data, content_type) -> None:
+        path = self._path(bucket, blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f".{path.name}.partial")
+        with partial.open("wb") as out:
+            shutil.copyfileobj(data, out)
+        partial.replace(path)
+
+    def _read(self, bucket, blob_name) -> Optional[bytes]:
+        path = self._path(bucket, blob_name)
+        return path.read_bytes() if path.is_file() else None
+
+    def _delete(self, bucket, blob_name) -> None:
+        self._path(bucket, blob_name).unlink(missing_ok=True)
+
+    def _first_blob_name(self, bucket, prefix) -> Optional[str]:
+        bucket_root = self.root / bucket
+        folder, _, name_prefix = prefix.rpartition("/")
+        directory = bucket_root / folder
+        if not directory.is_dir():
+            return None
+        for path in sorted(directory.iterdir()):
+            if path.is_file() and path.name.startswith(name_prefix):
+                return path.relative_to(bucket_root).as_posix()
+        return None
+
+
+_object_storage: Optional[ObjectStorage] = None
+
+
+def get_object_storage() -> ObjectStorage:
+    global _object_storage
+    if _object_storage is None:
+        settings = get_settings()
+        if settings.OBJECT_STORAGE_BACKEND == settings.ObjectStorageBackend.LOCAL:
+            _object_storage = LocalObjectStorage()
+        else:
+            _object_storage = GCSObjectStorage()
+    return _object_storage
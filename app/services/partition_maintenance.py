@@ -0,0 +1,274 @@
+"""Partition maintenance for time-partitioned chat tables.
+
+`conversation_history` (monthly) and `flow_execution_steps` (daily) are range
+partitioned on their timestamp column. This service pre-creates upcoming
+partitions and drops partitions that are entirely older than a cutoff, which
+replaces row-by-row retention deletes with cheap metadata operations.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+logger = get_logger()
+
+
+@dataclass(frozen=True)
+class PartitionSpec:
+    """How a parent table is partitioned."""
+
+    table: str
+    column: str
+    # "day" or "month"
+    interval: str
+    # Number of future partitions to keep created ahead of time
+    premake: int
+    # Whether the partition key column is timestamptz
+    timezone_aware: bool
+
+    @property
+    def suffix_format(self) -> str:
+        return "%Y%m%d" if self.interval == "day" else "%Y%m"
+
+    def partition_start(self, value: datetime) -> datetime:
+        """Lower bound of the partition that contains ``value``."""
+        value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+        if self.interval == "month":
+            value = value.replace(day=1)
+        return value
+
+    def next_start(self, start: datetime) -> datetime:
+        if self.interval == "day":
+            return start + timedelta(days=1)
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+
+    def partition_name(self, start: datetime) -> str:
+        return f"{self.table}_p{start.strftime(self.suffix_format)}"
+
+    @property
+    def default_partition(self) -> str:
+        return f"{self.table}_default"
+
+    def parse_partition_name(self, name: str) -> Optional[datetime]:
+        """Return the lower bound encoded in a partition name, if it is one of ours."""
+        match = re.fullmatch(rf"{re.escape(self.table)}_p(\d{{6}}|\d{{8}})", name)
+        if match is None:
+            return None
+        try:
+            start = datetime.strptime(match.group(1), self.suffix_format)
+        except ValueError:
+            return None
+        return start.replace(tzinfo=timezone.utc) if self.timezone_aware else start
+
+
+CONVERSATION_HISTORY_PARTITIONS = PartitionSpec(
+    table="conversation_history",
+    column="created_at",
+    interval="month",
+    premake=3,
+    timezone_aware=False,
+)
+
+FLOW_EXECUTION_STEPS_PARTITIONS = PartitionSpec(
+    table="flow_execution_steps",
+    column="started_at",
+    interval="day",
+    premake=14,
+    timezone_aware=True,
+)
+
+PARTITIONED_TABLES = (
+    CONVERSATION_HISTORY_PARTITIONS,
+    FLOW_EXECUTION_STEPS_PARTITIONS,
+)
+
+
+class PartitionMaintenanceService:
+    """Creates and drops range partitions for the time-partitioned tables."""
+
+    def _now(self, spec: PartitionSpec, now: Optional[datetime]) -> datetime:
+        now = now or datetime.now(timezone.utc)
+        if spec.timezone_aware:
+            return now if now.tzinfo else now.replace(tzinfo=timezone.utc)
+        return now.astimezone(timezone.utc).replace(tzinfo=None) if now.tzinfo else now
+
+    async def list_partitions(
+        self, db: AsyncSession, spec: PartitionSpec
+    ) -> List[Tuple[str, datetime]]:
+        """List (name, lower bound) for the managed partitions of a table, oldest first.
+
+        The DEFAULT partition and any partitions not following our naming
+        scheme are ignored.
+        """
+        result = await db.execute(
+            text("""
+                SELECT child.relname AS name
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = :table
+            """),
+            {"table": spec.table},
+        )
+        partitions = []
+        for row in result:
+            start = spec.parse_partition_name(row.name)
+            if start is not None:
+                partitions.append((row.name, start))
+        return sorted(partitions, key=lambda p: p[1])
+
+    async def ensure_partitions(
+        self,
+        db: AsyncSession,
+        spec: PartitionSpec,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Create the current partition and ``spec.premake`` future ones.
+
+        Postgres refuses to create a partition while the DEFAULT partition
+        holds rows in its range, so when it does the DEFAULT partition is
+        detached, the partitions are created, those rows are moved into them
+        and the DEFAULT partition is reattached. Everything runs in the
+        caller's transaction under an advisory lock per table.
+
+        Returns the names of any partitions that were created.
+        """
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+            {"key": f"partition_maintenance:{spec.table}"},
+        )
+        existing = {name for name, _ in await self.list_partitions(db, spec)}
+        start = spec.partition_start(self._now(spec, now))
+        missing = []
+        for _ in range(spec.premake + 1):
+            end = spec.next_start(start)
+            name = spec.partition_name(start)
+            if name not in existing:
+                missing.append((name, start, end))
+            start = end
+
+        stranded = [
+            partition
+            for partition in missing
+            if await db.scalar(
+                text(
+                    f'SELECT EXISTS (SELECT 1 FROM "{spec.default_partition}" '
+                    f'WHERE "{spec.column}" >= :start AND "{spec.column}" < :end)'
+                ),
+                {"start": partition[1], "end": partition[2]},
+            )
+        ]
+        if stranded:
+            await db.execute(
+                text(
+                    f'ALTER TABLE "{spec.table}" '
+                    f'DETACH PARTITION "{spec.default_partition}"'
+                )
+            )
+
+        created = []
+        for name, start, end in missing:
+            await db.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{spec.table}" '
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                )
+            )
+            created.append(name)
+
+        if stranded:
+            for name, start, end in stranded:
+                await db.execute(
+                    text(
+                        f'WITH moved AS (DELETE FROM "{spec.default_partition}" '
+                        f'WHERE "{spec.column}" >= :start AND "{spec.column}" < :end '
+                        f'RETURNING *) INSERT INTO "{name}" SELECT * FROM moved'
+                    ),
+                    {"start": start, "end": end},
+                )
+            await db.execute(
+                text(
+                    f'ALTER TABLE "{spec.table}" '
+                    f'ATTACH PARTITION "{spec.default_partition}" DEFAULT'
+                )
+            )
+            logger.info(
+                "Moved rows out of the default partition",
+                table=spec.table,
+                partitions=[name for name, _, _ in stranded],
+            )
+
+        if created:
+            logger.info("Created partitions", table=spec.table, partitions=created)
+        return created
+
+    async def drop_partitions_before(
+        self, db: AsyncSession, spec: PartitionSpec, cutoff: datetime
+    ) -> List[str]:
+        """Drop every partition whose upper bound is at or before ``cutoff``.
+
+        Partitions straddling the cutoff are kept; callers delete the residual
+        rows themselves if they need exact retention.
+        """
+        cutoff = self._now(spec, cutoff)
+        dropped = []
+        for name, start in await self.list_partitions(db, spec):
+            if spec.next_start(start) > cutoff:
+                break
+            await db.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+            dropped.append(name)
+
+        if dropped:
+            logger.info(
+                "Dropped expired partitions", table=spec.table, partitions=dropped
+            )
+        return dropped
+
+    async def run_maintenance(
+        self,
+        db: AsyncSession,
+        history_retention_days: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> dict:
+        """Pre-create partitions for all tables and apply retention.
+
+        Trace retention is delegated to the trace cleanup service because it
+        depends on per-flow ``retention_days``. Conversation history is only
+        expired when ``history_retention_days`` is given.
+        """
+        from app.services.trace_cleanup import trace_cleanup_service
+
+        stats: dict = {"created": [], "dropped": []}
+        for spec in PARTITIONED_TABLES:
+            stats["created"].extend(await self.ensure_partitions(db, spec, now=now))
+        await db.commit()
+
+        if history_retention_days is not None:
+            cutoff = self._now(CONVERSATION_HISTORY_PARTITIONS, now) - timedelta(
+                days=history_retention_days
+            )
+            stats["dropped"].extend(
+                await self.drop_partitions_before(
+                    db, CONVERSATION_HISTORY_PARTITIONS, cutoff
+                )
+            )
+            await db.commit()
+
+        stats["dropped"].extend(
+            await trace_cleanup_service.drop_expired_trace_partitions(db, now=now)
+        )
+        stats[
+            "trace_rows_deleted"
+        ] = await trace_cleanup_service.delete_residual_traces(db, now=now)
+        return stats
+
+
+# Module-level instance
+partition_maintenance_service = PartitionMaintenanceService()
@@ -6,7 +6,7 @@ personally identifiable information while preserving debugging utility.
 
 import hashlib
 import re
-from typing import Any, Dict, Set
+from typing import Any, Dict, Optional, Pattern, Set, Tuple
 
 
 class PIIMasker:
@@ -66,6 +66,20 @@ class PIIMasker:
         r"\b(?:\d{1,3}\.){3}\d{1,3}\b|" r"\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b"
     )
 
+    # All value patterns as one alternation so each string is scanned once.
+    # Order matters: at a given position an email wins over a phone number.
+    VALUE_PATTERN = re.compile(
+        f"(?P<email>{EMAIL_PATTERN.pattern})"
+        f"|(?P<phone>{PHONE_PATTERN.pattern})"
+        f"|(?P<ip>{IP_PATTERN.pattern})"
+    )
+    VALUE_REPLACEMENTS = {"email": "[EMAIL]", "phone": "[PHONE]", "ip": "[IP]"}
+
+    # Upper bound on the per-key decision cache. State keys come from flow
+    # definitions so the working set is small; this only guards against
+    # unbounded growth from user-controlled keys.
+    MAX_KEY_CACHE_SIZE = 10_000
+
     def __init__(self, mask_char: str = "*", preserve_length: bool = False):
         """Initialize the PII masker.
 
@@ -76,6 +90,25 @@ class PIIMasker:
         """
         self.mask_char = mask_char
         self.preserve_length = preserve_length
+        self._sensitive_key_pattern = self._compile_key_pattern(self.SENSITIVE_KEYS)
+        self._key_decisions: Dict[str, bool] = {}
+
+    @staticmethod
+    def _compile_key_pattern(keys: Set[str]) -> Pattern[str]:
+        """Compile the sensitive key substrings into a single regex."""
+        # Longest first so overlapping alternatives don't shadow each other
+        alternatives = sorted(keys, key=len, reverse=True)
+        return re.compile("|".join(re.escape(key) for key in alternatives))
+
+    def is_sensitive_key(self, key: str) -> bool:
+        """Whether values under ``key`` should always be masked (cached)."""
+        decision = self._key_decisions.get(key)
+        if decision is None:
+            decision = self._sensitive_key_pattern.search(key.lower()) is not None
+            if len(self._key_decisions) >= self.MAX_KEY_CACHE_SIZE:
+                self._key_decisions.clear()
+            self._key_decisions[key] = decision
+        return decision
 
     def mask_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Recursively mask PII in state dictionary.
@@ -90,6 +123,47 @@ class PIIMasker:
             return {}
         return self._mask_recursive(state)
 
+    def mask_state_pair(
+        self, state_before: Dict[str, Any], state_after: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Mask a before/after pair of state snapshots.
+
+        ``state_before`` is masked in full. Only the parts of ``state_after``
+        that differ from ``state_before`` are masked; unchanged subtrees reuse
+        the already masked values from ``state_before``.
+
+        Returns:
+            Tuple of (masked_before, masked_after)
+        """
+        masked_before = self.mask_state(state_before)
+        if not state_after:
+            return masked_before, {}
+        if not state_before:
+            return masked_before, self.mask_state(state_after)
+        return masked_before, self._mask_diff(state_after, state_before, masked_before)
+
+    def _mask_diff(
+        self,
+        after: Any,
+        before: Any,
+        masked_before: Any,
+        parent_key: str = "",
+    ) -> Any:
+        """Mask ``after``, reusing ``masked_before`` wherever it is unchanged."""
+        if after is before or (type(after) is type(before) and after == before):
+            return masked_before
+        if isinstance(after, dict) and isinstance(before, dict):
+            result = {}
+            for key, value in after.items():
+                if key in before:
+                    result[key] = self._mask_diff(
+                        value, before[key], masked_before[key], key
+                    )
+                else:
+                    result[key] = self._mask_recursive(value, key)
+            return result
+        return self._mask_recursive(after, parent_key)
+
     def _mask_recursive(self, obj: Any, parent_key: str = "") -> Any:
         """Recursively process object and mask sensitive data."""
         if isinstance(obj, dict):
@@ -101,6 +175,9 @@ class PIIMasker:
         # Pass through other types unchanged (int, float, bool, None)
         return obj
 
+    def _replace_match(self, match: "re.Match[str]") -> str:
+        return self.VALUE_REPLACEMENTS[match.lastgroup or ""]
+
     def _mask_string(self, value: str, key: str) -> str:
         """Mask a string value if it appears to contain PII.
 
@@ -112,26 +189,11 @@ class PIIMasker:
             Original value or masked version
         """
         # Check if key indicates sensitive data
-        key_lower = key.lower()
-        if any(sensitive in key_lower for sensitive in self.SENSITIVE_KEYS):
+        if key and self.is_sensitive_key(key):
             return self._mask_value(value, f"key:{key}")
 
-        # Check for patterns in value
-        masked = value
-
-        # Replace emails
-        if self.EMAIL_PATTERN.search(masked):
-            masked = self.EMAIL_PATTERN.sub("[EMAIL]", masked)
-
-        # Replace phone numbers
-        if self.PHONE_PATTERN.search(masked):
-            masked = self.PHONE_PATTERN.sub("[PHONE]", masked)
-
-        # Replace IP addresses
-        if self.IP_PATTERN.search(masked):
-            masked = self.IP_PATTERN.sub("[IP]", masked)
-
-        return masked
+        # Replace emails, phone numbers and IP addresses in a single pass
+        return self.VALUE_PATTERN.sub(self._replace_match, value)
 
     def _mask_value(self, value: str, context: str = "") -> str:
         """Create a masked version of a value.
@@ -202,3 +264,10 @@ pii_masker = PIIMasker()
 def mask_state(state: Dict[str, Any]) -> Dict[str, Any]:
     """Convenience function to mask PII in state."""
     return pii_masker.mask_state(state)
+
+
+def mask_state_pair(
+    state_before: Dict[str, Any], state_after: Optional[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Convenience function to mask a before/after pair of states."""
+    return pii_masker.mask_state_pair(state_before, state_after or {})
@@ -0,0 +1,389 @@
+"""
+Batched processing of reading activity events.
+
+Book reviews and reading logs arrive in bursts (a class finishing a Huey
+chat, a reading session logged at bedtime), and processing them one at a
+time costs several queries and a commit per event. ``process_reading_events``
+takes a batch of them and:
+
+- looks up every reviewed ISBN and reviewer with one query each, loads the
+  candidate "Liked Books" booklists with one query, creates the missing ones
+  with one flush and applies each booklist's new items as one batch;
+- writes the collection item activity for every reading log with one
+  multi-row INSERT, and notifies each reader's supporters once, about their
+  latest reading;
+- commits once, then sends the SMS notifications.
+
+A batch that fails is retried event by event, so only the bad events fail.
+"""
+
+import uuid
+from collections import defaultdict
+from typing import Any, Iterable, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.orm import Session, selectinload
+from structlog import get_logger
+
+from app.db.session import get_session_maker
+from app.models import ClassGroup, CollectionItem, Edition, Event, Student, User
+from app.models.booklist import BookList, ListType
+from app.models.collection_item_activity import (
+    CollectionItemActivity,
+    CollectionItemReadStatus,
+)
+from app.models.reader import Reader
+from app.models.supporter_reader_association import SupporterReaderAssociation
+from app.models.user import UserAccountType
+from app.repositories.booklist_repository import booklist_repository
+from app.schemas.booklist import BookListItemInfo, BookListItemUpdateIn, ItemUpdateType
+from app.schemas.events.huey_events import HueyBookReviewedInfo
+from app.schemas.events.special_events import ReadingLogEvent
+from app.schemas.feedback import SendSmsPayload
+from app.services.feedback import queue_reader_feedback_alerts, send_reader_feedback_sms
+
+logger = get_logger()
+
+BOOK_REVIEWED = "Huey: Book reviewed"
+READING_LOGGED = "Reader timeline event: Reading logged"
+READING_EVENT_TITLES = frozenset({BOOK_REVIEWED, READING_LOGGED})
+
+LIKED_BOOKS = "Liked Books"
+
+# (list type, school id, user id, name) - a None id matches any booklist,
+# as with booklist_repository.get_all_query_with_optional_filters
+BooklistKey = tuple[ListType, Optional[int], Optional[uuid.UUID], str]
+
+
+def process_reading_events(
+    event_ids: Iterable[uuid.UUID | str],
+) -> tuple[dict[str, int], dict[str, str]]:
+    """Process a batch of reading events in a new session, with one commit.
+
+    If the batch fails it is rolled back and each event is applied on its own,
+    so one bad event (e.g. a log for a deleted collection item) doesn't fail
+    the rest. Returns the stats and the error for each event that failed.
+    """
+    event_ids = [str(event_id) for event_id in event_ids]
+    Session = get_session_maker()
+    with Session() as session:
+        try:
+            stats, sms_messages = _apply_and_commit(session, event_ids)
+            failed = {}
+        except Exception as e:
+            session.rollback()
+            if len(event_ids) == 1:
+                raise
+            logger.warning(
+                "Reading event batch failed, applying events one at a time",
+                events=len(event_ids),
+                error=str(e),
+            )
+            stats, sms_messages, failed = defaultdict(int), [], {}
+            for event_id in event_ids:
+                try:
+                    event_stats, event_sms = _apply_and_commit(session, [event_id])
+                except Exception as e:
+                    session.rollback()
+                    logger.warning(
+                        "Reading event failed", event_id=event_id, error=str(e)
+                    )
+                    failed[event_id] = str(e)
+                    continue
+                for key, value in event_stats.items():
+                    stats[key] += value
+                sms_messages.extend(event_sms)
+            stats = dict(stats)
+
+    send_reader_feedback_sms(sms_messages)
+    logger.info("Processed reading events", failed=len(failed), **stats)
+    return stats, failed
+
+
+def apply_reading_events(
+    session: Session, event_ids: Iterable[uuid.UUID | str]
+) -> dict[str, int]:
+    stats, sms_messages = _apply_and_commit(session, event_ids)
+    send_reader_feedback_sms(sms_messages)
+
+    logger.info("Processed reading events", **stats)
+    return stats
+
+
+def _apply_and_commit(
+    session: Session, event_ids: Iterable[uuid.UUID | str]
+) -> tuple[dict[str, int], list[SendSmsPayload]]:
+    events = session.execute(
+        select(Event.id, Event.title, Event.info, Event.user_id, Event.school_id)
+        .where(Event.id.in_([uuid.UUID(str(event_id)) for event_id in event_ids]))
+        .where(Event.title.in_(READING_EVENT_TITLES))
+        .order_by(Event.timestamp)
+    ).all()
+
+    stats = apply_book_reviews(
+        session, [event for event in events if event.title == BOOK_REVIEWED]
+    )
+    sms_messages = apply_reading_logs(
+        session,
+        [event for event in events if event.title == READING_LOGGED],
+        stats,
+    )
+    session.commit()
+
+    stats["events"] = len(events)
+    return stats, sms_messages
+
+
+def get_liked_isbns(info: dict) -> list[str]:
+    """The ISBNs of the books liked in a book review event's info."""
+    if "reviews" in info:
+        logger.warning("Unexpected event schema. Processing multiple reviews")
+        return [review["isbn"] for review in info["reviews"] if review["liked"]]
+    review = HueyBookReviewedInfo.model_validate(info)
+    return [review.isbn] if review.liked and review.isbn else []
+
+
+def apply_book_reviews(session: Session, events: list) -> dict[str, int]:
+    """
+    Add the books liked in a batch of review events to the reviewers' school,
+    class and personal "Liked Books" booklists, creating any that are missing.
+    """
+    import app.services.editions as editions_service
+
+    stats = {"liked_books": 0, "booklists_created": 0, "booklists_updated": 0}
+
+    liked_isbns: dict[Any, list[tuple[str, str]]] = {}
+    for event in events:
+        try:
+            isbns = get_liked_isbns(event.info)
+        except (KeyError, ValidationError) as e:
+            logger.warning(
+                "Error parsing book review event", error=e, event_id=event.id
+            )
+            continue
+        cleaned = []
+        for isbn in isbns:
+            try:
+                cleaned.append((isbn, editions_service.get_definitive_isbn(isbn)))
+            except (AssertionError, ValueError, TypeError):
+                logger.debug("Skipping invalid ISBN", isbn=isbn)
+        if cleaned:
+            liked_isbns[event.id] = cleaned
+    if not liked_isbns:
+        return stats
+
+    work_ids = dict(
+        session.execute(
+            select(Edition.isbn, Edition.work_id)
+            .where(
+                Edition.isbn.in_(
+                    {isbn for isbns in liked_isbns.values() for _, isbn in isbns}
+                )
+            )
+            .where(Edition.work_id.is_not(None))
+        ).all()
+    )
+    user_ids = {event.user_id for event in events if event.user_id is not None}
+    users = {
+        row.id: row
+        for row in session.execute(
+            select(User.id, User.type, ClassGroup.name.label("class_name"))
+            .outerjoin(Student, Student.id == User.id)
+            .outerjoin(ClassGroup, ClassGroup.id == Student.class_group_id)
+            .where(User.id.in_(user_ids))
+        ).all()
+    }
+
+    # Every booklist's new items, in event order
+    liked_items: dict[BooklistKey, list[BookListItemUpdateIn]] = defaultdict(list)
+    for event in events:
+        items = [
+            BookListItemUpdateIn(
+                action=ItemUpdateType.ADD,
+                work_id=work_ids[cleaned_isbn],
+                info=BookListItemInfo(edition=isbn),
+            )
+            for isbn, cleaned_isbn in liked_isbns.get(event.id, [])
+            if cleaned_isbn in work_ids
+        ]
+        if not items:
+            continue
+        stats["liked_books"] += len(items)
+        for key in _liked_booklist_keys(event, users.get(event.user_id)):
+            liked_items[key].extend(items)
+    if not liked_items:
+        return stats
+
+    booklists = _get_or_create_booklists(session, liked_items.keys(), stats)
+    for key, items in liked_items.items():
+        booklist_repository.apply_item_changes(session, booklists[key], items)
+    stats["booklists_updated"] = len({booklist.id for booklist in booklists.values()})
+    return stats
+
+
+def _liked_booklist_keys(event, user) -> list[BooklistKey]:
+    keys = []
+    if event.school_id is not None:
+        keys.append((ListType.SCHOOL, event.school_id, event.user_id, LIKED_BOOKS))
+    if user is not None:
+        keys.append((ListType.PERSONAL, None, user.id, LIKED_BOOKS))
+        if user.type == UserAccountType.STUDENT and user.class_name is not None:
+            keys.append(
+                (
+                    ListType.SCHOOL,
+                    event.school_id,
+                    user.id,
+                    f"{user.class_name} {LIKED_BOOKS}",
+                )
+            )
+    return keys
+
+
+def _get_or_create_booklists(
+    session: Session, keys: Iterable[BooklistKey], stats: dict[str, int]
+) -> dict[BooklistKey, BookList]:
+    keys = list(keys)
+    candidates = session.scalars(
+        select(BookList)
+        .where(BookList.type.in_({list_type for list_type, _, _, _ in keys}))
+        .where(func.lower(BookList.name).in_({name.lower() for *_, name in keys}))
+        .where(
+            or_(
+                BookList.school_id.in_(
+                    {school_id for _, school_id, _, _ in keys if school_id is not None}
+                ),
+                BookList.user_id.in_(
+                    {user_id for _, _, user_id, _ in keys if user_id is not None}
+                ),
+            )
+        )
+        .order_by(BookList.created_at.desc())
+    ).all()
+
+    booklists = {}
+    created = []
+    for key in keys:
+        list_type, school_id, user_id, name = key
+        booklist = next(
+            (
+                candidate
+                for candidate in candidates
+                if candidate.type == list_type
+                and candidate.name.lower() == name.lower()
+                and school_id in (None, candidate.school_id)
+                and user_id in (None, candidate.user_id)
+            ),
+            None,
+        )
+        if booklist is None:
+            logger.info("Creating a new booklist", type=list_type, name=name)
+            booklist = BookList(
+                name=name,
+                type=list_type,
+                school_id=school_id,
+                user_id=user_id,
+                info={"description": "List of all books liked in a Chat"},
+            )
+            # Later keys for the same list (e.g. a second reviewer's school
+            # list) should find this one rather than create another
+            candidates.insert(0, booklist)
+            created.append(booklist)
+        booklists[key] = booklist
+
+    if created:
+        session.add_all(created)
+        session.flush()
+        stats["booklists_created"] = len(created)
+    return booklists
+
+
+def reading_log_status(log_data: ReadingLogEvent) -> CollectionItemReadStatus:
+    if log_data.finished:
+        return CollectionItemReadStatus.READ
+    if log_data.stopped:
+        return CollectionItemReadStatus.STOPPED_READING
+    return CollectionItemReadStatus.READING
+
+
+def apply_reading_logs(
+    session: Session, events: list, stats: dict[str, int]
+) -> list[SendSmsPayload]:
+    """
+    Record the collection item activity for a batch of reading log events
+    and queue their supporter notifications.
+
+    Each reader's supporters are notified once, about the reader's latest
+    log in the batch. Returns the SMS messages to send after committing.
+    """
+    logs = []
+    for event in events:
+        try:
+            logs.append((event, ReadingLogEvent.model_validate(event.info)))
+        except ValidationError as e:
+            logger.warning(
+                "Error parsing reading logged event", error=e, event_id=event.id
+            )
+    stats["reading_logs"] = len(logs)
+    stats["notified_readers"] = 0
+    if not logs:
+        return []
+
+    session.execute(
+        insert(CollectionItemActivity),
+        [
+            {
+                "collection_item_id": log_data.collection_item_id,
+                "reader_id": event.user_id,
+                "status": reading_log_status(log_data),
+            }
+            for event, log_data in logs
+        ],
+    )
+
+    latest_logs = {}
+    for event, log_data in logs:
+        latest = latest_logs.get(event.user_id)
+        if latest is None or log_data.timestamp >= latest[1].timestamp:
+            latest_logs[event.user_id] = (event, log_data)
+
+    readers = (
+        session.scalars(
+            select(Reader)
+            .where(Reader.id.in_(latest_logs.keys()))
+            .options(
+                selectinload(Reader.supporter_associations).selectinload(
+                    SupporterReaderAssociation.supporter
+                )
+            )
+        )
+        .unique()
+        .all()
+    )
+    items = {
+        item.id: item
+        for item in session.scalars(
+            select(CollectionItem).where(
+                CollectionItem.id.in_(
+                    {
+                        log_data.collection_item_id
+                        for _, log_data in latest_logs.values()
+                    }
+                )
+            )
+        )
+        .unique()
+        .all()
+    }
+
+    messages = []
+    for reader in readers:
+        event, log_data = latest_logs[reader.id]
+        item = items.get(log_data.collection_item_id)
+        if item is None:
+            continue
+        messages.extend(
+            queue_reader_feedback_alerts(session, reader, item, event, log_data)
+        )
+        stats["notified_readers"] += 1
+    return messages
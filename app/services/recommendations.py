@@ -9,15 +9,14 @@ from app import crud
 from app.models import (
     CollectionItem,
     Edition,
-    Hue,
     LabelSet,
     LabelSetHue,
     LabelSetReadingAbility,
-    ReadingAbility,
     Work,
 )
 from app.models.labelset import RecommendStatus
 from app.schemas.recommendations import ReadingAbilityKey
+from app.services.reference_data import reference_data_registry
 
 logger = get_logger()
 
@@ -81,18 +80,18 @@ async def get_recommended_labelset_query(
             # .order_by(Work.id, CollectionItem.copies_available.desc())
         )
 
+    if hues or reading_abilities:
+        # Hue and reading ability ids are inlined from the cached reference
+        # data rather than looked up with subqueries
+        reference = await reference_data_registry.aget(asession)
     if hues is not None and len(hues) > 0:
-        # Labelset Ids from hues
-        hue_ids_query = select(Hue.id).where(Hue.key.in_(hues))
-        query = query.where(LabelSetHue.hue_id.in_(hue_ids_query))
+        query = query.where(LabelSetHue.hue_id.in_(reference.hue_ids(hues)))
 
     if reading_abilities is not None and len(reading_abilities) > 0:
-        # Labelset Ids from reading abilities
-        reading_ability_ids_query = select(ReadingAbility.id).where(
-            ReadingAbility.key.in_(reading_abilities)
-        )
         query = query.where(
-            LabelSetReadingAbility.reading_ability_id.in_(reading_ability_ids_query)
+            LabelSetReadingAbility.reading_ability_id.in_(
+                reference.reading_ability_ids(reading_abilities)
+            )
         )
 
     if age is not None:
@@ -0,0 +1,247 @@
+"""
+In-memory registry of small, static reference tables.
+
+Hues, reading abilities, countries and products are a few hundred rows that
+change with a migration or a rare admin edit, but were looked up by key per
+request. Each process keeps them in a ``ReferenceData`` snapshot of frozen
+dataclasses (not ORM objects, so they can be shared between sessions and
+threads), preloaded by the app lifespan.
+
+The snapshot is reloaded when:
+1. A ``reference_data`` NOTIFY arrives (sent by statement triggers on the
+   reference tables), or
+2. A periodic check finds ``reference_data_version_seq`` has moved on, which
+   covers missed notifications and processes without a listener.
+
+``ServiceAccountType`` is a Python enum rather than a table, so it needs no
+registry entry.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from structlog import get_logger
+
+from app.config import get_settings
+from app.db.sequences import sequence_version_query
+from app.models.country import Country
+from app.models.hue import Hue
+from app.models.product import Product
+from app.models.reading_ability import ReadingAbility
+from app.models.reference_data import reference_data_version_seq
+
+logger = get_logger()
+
+REFERENCE_DATA_CHANNEL = "reference_data"
+VERSION_QUERY = sequence_version_query(reference_data_version_seq)
+
+
+@dataclass(frozen=True)
+class HueRef:
+    id: int
+    key: str
+    name: str
+
+
+@dataclass(frozen=True)
+class ReadingAbilityRef:
+    id: int
+    key: str
+    name: str
+
+
+@dataclass(frozen=True)
+class CountryRef:
+    id: str
+    name: str
+    phonecode: int
+
+
+@dataclass(frozen=True)
+class ProductRef:
+    id: str
+    name: str
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    hues: dict[str, HueRef]
+    reading_abilities: dict[str, ReadingAbilityRef]
+    countries: dict[str, CountryRef]
+    products: dict[str, ProductRef]
+
+    def hue(self, key: Optional[str]) -> Optional[HueRef]:
+        return self.hues.get(key) if key is not None else None
+
+    def hue_ids(self, keys: Iterable[str]) -> list[int]:
+        """Ids of the hues with the given keys; unknown keys are ignored."""
+        return [hue.id for key in keys if (hue := self.hue(key))]
+
+    def reading_ability(self, key: Optional[str]) -> Optional[ReadingAbilityRef]:
+        return self.reading_abilities.get(key) if key is not None else None
+
+    def reading_ability_ids(self, keys: Iterable[str]) -> list[int]:
+        """Ids of the reading abilities with the given keys; unknown keys are ignored."""
+        return [
+            reading_ability.id
+            for key in keys
+            if (reading_ability := self.reading_ability(key))
+        ]
+
+    def country(self, code: Optional[str]) -> Optional[CountryRef]:
+        return self.countries.get(code) if code is not None else None
+
+    def product(self, id: Optional[str]) -> Optional[ProductRef]:
+        return self.products.get(id) if id is not None else None
+
+
+def load_reference_data(db: Session) -> ReferenceData:
+    data = ReferenceData(
+        hues={
+            row.key: HueRef(row.id, row.key, row.name)
+            for row in db.execute(select(Hue.id, Hue.key, Hue.name))
+        },
+        reading_abilities={
+            row.key: ReadingAbilityRef(row.id, row.key, row.name)
+            for row in db.execute(
+                select(ReadingAbility.id, ReadingAbility.key, ReadingAbility.name)
+            )
+        },
+        countries={
+            row.id: CountryRef(row.id, row.name, row.phonecode)
+            for row in db.execute(select(Country.id, Country.name, Country.phonecode))
+        },
+        products={
+            row.id: ProductRef(row.id, row.name)
+            for row in db.execute(select(Product.id, Product.name))
+        },
+    )
+    logger.debug(
+        "Loaded reference data",
+        hues=len(data.hues),
+        reading_abilities=len(data.reading_abilities),
+        countries=len(data.countries),
+        products=len(data.products),
+    )
+    return data
+
+
+class ReferenceDataRegistry:
+    """Per-process snapshot of the reference tables, checked against their version."""
+
+    def __init__(
+        self,
+        refresh_interval_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._refresh_interval_seconds = refresh_interval_seconds
+        self._clock = clock
+        self._data: Optional[ReferenceData] = None
+        self._version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._invalidations = 0
+        # Sync callers run in the threadpool, async ones on the event loop
+        self._sync_lock = threading.Lock()
+        self._async_lock = asyncio.Lock()
+
+    @property
+    def refresh_interval_seconds(self) -> float:
+        if self._refresh_interval_seconds is None:
+            return get_settings().REFERENCE_DATA_REFRESH_SECONDS
+        return self._refresh_interval_seconds
+
+    @property
+    def current(self) -> Optional[ReferenceData]:
+        """The loaded snapshot, possibly stale, without touching the database."""
+        return self._data
+
+    def invalidate(self) -> None:
+        """Force the next lookup to check the version and reload.
+
+        The version sequence advances when the changing statement runs, before
+        its commit, so a reload in between would record the new version with
+        the old rows; notifications (sent on commit) therefore always reload.
+        """
+        self._invalidations += 1
+        self._checked_at = None
+        self._version = None
+
+    def handle_notification(
+        self, connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """asyncpg listener callback for the reference data change channel."""
+        logger.debug("Reference data changed", version=payload)
+        self.invalidate()
+
+    def load(self, data: ReferenceData, version: Optional[int]) -> None:
+        """Replace the snapshot with ``data``, read at ``version``."""
+        self._data = data
+        self._version = version
+        self._checked_at = self._clock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._data is not None
+            and self._checked_at is not None
+            and self._clock() - self._checked_at < self.refresh_interval_seconds
+        )
+
+    def _checked(self, invalidations: int) -> None:
+        # A notification that arrived mid-refresh may not be reflected
+        if invalidations == self._invalidations:
+            self._checked_at = self._clock()
+        else:
+            self._checked_at = None
+
+    def get(self, db: Session) -> ReferenceData:
+        """The reference data, reloaded with ``db`` if it has changed."""
+        if self._is_fresh():
+            return self._data
+
+        with self._sync_lock:
+            if self._is_fresh():
+                return self._data
+
+            invalidations = self._invalidations
+            version = db.execute(VERSION_QUERY).scalar_one()
+            if version != self._version or self._data is None:
+                self.load(load_reference_data(db), version)
+            self._checked(invalidations)
+        return self._data
+
+    async def aget(self, db: AsyncSession) -> ReferenceData:
+        """Async version of ``get``."""
+        if self._is_fresh():
+            return self._data
+
+        async with self._async_lock:
+            if self._is_fresh():
+                return self._data
+
+            invalidations = self._invalidations
+            version = (await db.execute(VERSION_QUERY)).scalar_one()
+            if version != self._version or self._data is None:
+                self.load(await db.run_sync(load_reference_data), version)
+            self._checked(invalidations)
+        return self._data
+
+    async def preload(self) -> ReferenceData:
+        """Load the reference data with a new session, e.g. at startup."""
+        from app.db.session import get_async_session_maker
+
+        async with get_async_session_maker()() as session:
+            return await self.aget(session)
+
+
+reference_data_registry = ReferenceDataRegistry()
+
+
+def get_reference_data(db: Session) -> ReferenceData:
+    """The process wide reference data, loaded or refreshed with ``db`` if needed."""
+    return reference_data_registry.get(db)
@@ -1,15 +1,22 @@
 """Trace cleanup service for managing trace data retention.
 
-Provides batched deletion of old execution traces based on flow retention settings.
+Expires old execution traces based on flow retention settings. Traces are stored
+in daily partitions, so most retention is handled by dropping partitions.
 """
 
 import asyncio
 import logging
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.services.partition_maintenance import (
+    FLOW_EXECUTION_STEPS_PARTITIONS,
+    partition_maintenance_service,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -20,11 +27,57 @@ class TraceCleanupService:
     BATCH_SIZE = 1000
     BATCH_DELAY_SECONDS = 0.1
 
-    async def cleanup_old_traces(self, db: AsyncSession) -> int:
-        """Delete old traces in batches based on flow retention settings.
+    async def get_max_retention_days(self, db: AsyncSession) -> int:
+        """Longest trace retention requested by any flow (at least the default)."""
+        result = await db.scalar(
+            text("""
+                SELECT GREATEST(
+                    COALESCE(MAX(retention_days), :default_days), :default_days
+                )
+                FROM flow_definitions
+            """),
+            {"default_days": self.DEFAULT_RETENTION_DAYS},
+        )
+        return int(result or self.DEFAULT_RETENTION_DAYS)
+
+    async def drop_expired_trace_partitions(
+        self, db: AsyncSession, now: Optional[datetime] = None
+    ) -> List[str]:
+        """Drop whole daily partitions that are past every flow's retention window."""
+        now = now or datetime.now(timezone.utc)
+        max_retention_days = await self.get_max_retention_days(db)
+        dropped = await partition_maintenance_service.drop_partitions_before(
+            db,
+            FLOW_EXECUTION_STEPS_PARTITIONS,
+            now - timedelta(days=max_retention_days),
+        )
+        await db.commit()
+        return dropped
+
+    async def delete_residual_traces(
+        self, db: AsyncSession, now: Optional[datetime] = None
+    ) -> int:
+        """Delete expired rows that survive partition drops.
 
-        Returns total deleted count.
+        These are rows from flows with a shorter ``retention_days`` than the
+        longest one, plus rows in the partition straddling the cutoff. The
+        ``started_at`` bound on the shortest retention lets the planner prune
+        every partition that can't contain expired rows.
         """
+        now = now or datetime.now(timezone.utc)
+        min_retention_days = await db.scalar(
+            text("""
+                SELECT LEAST(
+                    COALESCE(MIN(retention_days), :default_days), :default_days
+                )
+                FROM flow_definitions
+            """),
+            {"default_days": self.DEFAULT_RETENTION_DAYS},
+        )
+        min_cutoff = now - timedelta(
+            days=int(min_retention_days or self.DEFAULT_RETENTION_DAYS)
+        )
+
         deleted_total = 0
 
         while True:
@@ -32,15 +85,20 @@ class TraceCleanupService:
             result = await db.execute(
                 text("""
                     DELETE FROM flow_execution_steps
-                    WHERE id IN (
-                        SELECT fes.id FROM flow_execution_steps fes
+                    WHERE started_at < :min_cutoff
+                      AND (id, started_at) IN (
+                        SELECT fes.id, fes.started_at
+                        FROM flow_execution_steps fes
                         JOIN conversation_sessions cs ON cs.id = fes.session_id
                         JOIN flow_definitions fd ON fd.id = cs.flow_id
-                        WHERE fes.started_at < NOW() - INTERVAL '1 day' * COALESCE(fd.retention_days, :default_days)
+                        WHERE fes.started_at < :min_cutoff
+                          AND fes.started_at < CAST(:now AS timestamptz) - INTERVAL '1 day' * COALESCE(fd.retention_days, :default_days)
                         LIMIT :batch_size
-                    )
+                      )
                 """),
                 {
+                    "min_cutoff": min_cutoff,
+                    "now": now,
                     "default_days": self.DEFAULT_RETENTION_DAYS,
                     "batch_size": self.BATCH_SIZE,
                 },
@@ -50,18 +108,30 @@ class TraceCleanupService:
             deleted_total += deleted
             await db.commit()
 
-            logger.info(
-                "Trace cleanup batch completed",
-                extra={"deleted_batch": deleted, "total_deleted": deleted_total},
-            )
-
             if deleted < self.BATCH_SIZE:
                 break
 
-            # Small delay between batches to reduce DB load
             await asyncio.sleep(self.BATCH_DELAY_SECONDS)
 
-        logger.info("Trace cleanup completed", extra={"total_deleted": deleted_total})
+        return deleted_total
+
+    async def cleanup_old_traces(
+        self, db: AsyncSession, now: Optional[datetime] = None
+    ) -> int:
+        """Expire old traces based on flow retention settings.
+
+        Drops daily partitions older than the longest retention, then deletes
+        the small residual of rows from flows with custom retention.
+
+        Returns the number of residual rows deleted.
+        """
+        dropped = await self.drop_expired_trace_partitions(db, now=now)
+        deleted_total = await self.delete_residual_traces(db, now=now)
+
+        logger.info(
+            "Trace cleanup completed",
+            extra={"dropped_partitions": dropped, "total_deleted": deleted_total},
+        )
         return deleted_total
 
     async def cleanup_audit_logs(
@@ -106,7 +176,11 @@ class TraceCleanupService:
             text("""
             SELECT
                 COUNT(*) as total_traces,
-                pg_size_pretty(pg_total_relation_size('flow_execution_steps')) as table_size,
+                pg_size_pretty((
+                    SELECT COALESCE(SUM(pg_total_relation_size(inhrelid)), 0)
+                    FROM pg_inherits
+                    WHERE inhparent = 'flow_execution_steps'::regclass
+                )) as table_size,
                 MIN(started_at) as oldest_trace,
                 MAX(started_at) as newest_trace
             FROM flow_execution_steps
@@ -126,16 +126,15 @@ def generate_random_users(session: Session, num_users: int, school_id: int, **kw
         "is_active": False,
     }
     user_kwargs.update(kwargs)
-    new_users = []
-    with WordList() as wordlist:
-        for i in range(num_users):
-            username = new_random_username(
-                session=session, wordlist=wordlist, school_id=school_id
-            )
-            user = Student(username=username, school_id=school_id, **user_kwargs)
-            session.add(user)
-            session.flush()
-            new_users.append(user)
+    usernames = new_random_usernames(
+        session=session, school_id=school_id, count=num_users
+    )
+    new_users = [
+        Student(username=username, school_id=school_id, **user_kwargs)
+        for username in usernames
+    ]
+    session.add_all(new_users)
+    session.flush()
     return new_users
 
 
@@ -145,36 +144,50 @@ class WordListItem(BaseModel):
     noun: str
 
 
+def _load_wordlist() -> list[WordListItem]:
+    here = os.path.dirname(os.path.abspath(__file__))
+    # current csv capable of 11*11*11*100 ≈ 130k names
+    with open(os.path.join(here, "wordlist.csv")) as file:
+        return [WordListItem(**item) for item in csv.DictReader(file)]
+
+
+WORDLIST = _load_wordlist()
+
+
 class WordList:
-    def __init__(self):
-        here = os.path.dirname(os.path.abspath(__file__))
-        # current csv capable of 11*11*11*100 ≈ 130k names
-        self.filename = os.path.join(here, "wordlist.csv")
+    """Kept for existing callers - yields the module level `WORDLIST`."""
 
     def __enter__(self):
-        self.file = open(self.filename)
-        data = csv.DictReader(self.file)
-        wordlist = [WordListItem(**item) for item in data]
-        return wordlist
+        return WORDLIST
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.file.close()
+        pass
 
 
-def new_random_username(
+# Candidates proposed per round are this multiple of the names still needed,
+# so a mostly empty namespace settles in one query
+CANDIDATE_OVERSAMPLING = 2
+MAX_CANDIDATE_ROUNDS = 10
+
+
+def new_random_usernames(
     session: Session,
     school_id: int,
-    wordlist: list[WordListItem],
+    count: int,
+    wordlist: list[WordListItem] | None = None,
     adjective: bool = False,
     colour: bool = True,
     noun: bool = True,
     numbers: int = 2,
     slugify: bool = False,
-):
+) -> list[str]:
     """
-    Generates a new random username of the specified or default complexity,
-    ensuring it's not already claimed by a user.
+    Generates `count` distinct random usernames of the specified or default
+    complexity, none of them already claimed by a student at the school.
     Default complexity: ColourNounNumber (RedWolf52)
+
+    Each round proposes a batch of candidates and checks them with a single
+    query, so the number of queries doesn't grow with `count`.
     """
     from app import crud
 
@@ -182,27 +195,59 @@ def new_random_username(
         raise ValueError(
             "Must enable at least one username constituent (adjective, colour, noun, numbers)"
         )
-
-    name = ""
-    name_valid = False
-    attempts_remaining = 1000
-
-    while not name_valid and attempts_remaining > 0:
-        name = generate_random_username_from_wordlist(
-            wordlist, adjective, colour, noun, numbers, slugify
-        )
-        name_valid = (
-            name
-            and crud.user.get_student_by_username_and_school_id(
-                session, name, school_id
+    wordlist = WORDLIST if wordlist is None else wordlist
+
+    usernames: dict[str, str] = {}
+    for _ in range(MAX_CANDIDATE_ROUNDS):
+        needed = count - len(usernames)
+        if needed <= 0:
+            break
+        candidates = {}
+        for _ in range(needed * CANDIDATE_OVERSAMPLING + 8):
+            name = generate_random_username_from_wordlist(
+                wordlist, adjective, colour, noun, numbers, slugify
             )
-            is None
+            if name and name.lower() not in usernames:
+                candidates.setdefault(name.lower(), name)
+        claimed = crud.user.get_claimed_student_usernames(
+            session, candidates.values(), school_id
         )
-        attempts_remaining -= 1
+        for key, name in candidates.items():
+            if key not in claimed and len(usernames) < count:
+                usernames[key] = name
 
-    if attempts_remaining == 0:
+    if len(usernames) < count:
         raise ValueError("Couldn't generate a random user name")
 
+    return list(usernames.values())
+
+
+def new_random_username(
+    session: Session,
+    school_id: int,
+    wordlist: list[WordListItem] | None = None,
+    adjective: bool = False,
+    colour: bool = True,
+    noun: bool = True,
+    numbers: int = 2,
+    slugify: bool = False,
+):
+    """
+    Generates a new random username of the specified or default complexity,
+    ensuring it's not already claimed by a user.
+    Default complexity: ColourNounNumber (RedWolf52)
+    """
+    (name,) = new_random_usernames(
+        session,
+        school_id,
+        1,
+        wordlist=wordlist,
+        adjective=adjective,
+        colour=colour,
+        noun=noun,
+        numbers=numbers,
+        slugify=slugify,
+    )
     return name
 
 
@@ -213,29 +258,77 @@ def new_identifiable_username(
     Generates a new identifiable username using Reader's first name and initial of last name,
     ensuring it's not already claimed by another user.
     Appends with digits for extra entropy.
+
+    All 90 two digit suffixes are checked in one query, and a random free one
+    is picked.
     """
     from app import crud
 
     username_base = (first_name + last_name_initial).replace(" ", "")
-    username = username_base
-    username_valid = False
-    attempts_remaining = 1000
-
-    while not username_valid and attempts_remaining > 0:
-        username = username_base + str(random.randint(10, 99))
-        username_valid = (
-            username
-            and crud.user.get_student_by_username_and_school_id(
-                session, username, school_id
-            )
-            is None
-        )
-        attempts_remaining -= 1
+    candidates = [username_base + str(suffix) for suffix in range(10, 100)]
+    claimed = crud.user.get_claimed_student_usernames(session, candidates, school_id)
+    available = [username for username in candidates if username.lower() not in claimed]
 
-    if attempts_remaining == 0:
+    if not available:
         raise ValueError("Couldn't generate a unique username for Reader")
 
-    return username
+    return random.choice(available)
+
+
+def new_identifiable_usernames(
+    names: list[tuple[str, str]], session, school_id: int
+) -> list[str]:
+    """
+    Batch version of `new_identifiable_username` for a list of
+    ``(first_name, last_name_initial)`` pairs, e.g. a class roster.
+
+    Each round proposes a few random suffixes for every name still without a
+    username and checks them all with one query, doubling the number of
+    suffixes tried per round so crowded names still settle quickly.
+    """
+    from app import crud
+
+    bases = [
+        (first_name + last_name_initial).replace(" ", "")
+        for first_name, last_name_initial in names
+    ]
+    usernames: list[str | None] = [None] * len(bases)
+    # Lowercased names given out in this batch
+    taken: set[str] = set()
+
+    for round_number in range(MAX_CANDIDATE_ROUNDS):
+        pending = [i for i, username in enumerate(usernames) if username is None]
+        if not pending:
+            break
+        suffixes_per_name = min(90, 3 * 2**round_number)
+        proposals = {
+            i: [
+                bases[i] + str(suffix)
+                for suffix in random.sample(range(10, 100), suffixes_per_name)
+                if (bases[i] + str(suffix)).lower() not in taken
+            ]
+            for i in pending
+        }
+        claimed = crud.user.get_claimed_student_usernames(
+            session,
+            [
+                candidate
+                for candidates in proposals.values()
+                for candidate in candidates
+            ],
+            school_id,
+        )
+        for i, candidates in proposals.items():
+            for candidate in candidates:
+                if candidate.lower() not in claimed and candidate.lower() not in taken:
+                    usernames[i] = candidate
+                    taken.add(candidate.lower())
+                    break
+
+    if None in usernames:
+        raise ValueError("Couldn't generate a unique username for every Reader")
+
+    return usernames
 
 
 def generate_random_username_from_wordlist(
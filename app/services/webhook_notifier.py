@@ -7,7 +7,7 @@ flow events occur, enabling real-time integration with external systems.
 
 import asyncio
 import logging
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, List, Optional, Union, cast
 
 import httpx
 from pydantic import BaseModel, HttpUrl
@@ -27,6 +27,10 @@ class WebhookConfig(BaseModel):
     timeout: int = 10  # Request timeout in seconds
     retry_attempts: int = 3  # Number of retry attempts
     retry_delay: int = 1  # Base delay between retries in seconds
+    batch_events: bool = False  # Send queued events together as one payload
+    max_batch_size: int = 50  # Maximum events per batched payload
+    max_concurrency: int = 4  # Concurrent requests to this webhook
+    max_queue_size: int = 1000  # Events queued for this webhook before dropping
 
 
 class WebhookPayload(BaseModel):
@@ -40,16 +44,26 @@ class WebhookPayload(BaseModel):
     data: Dict[str, Any]  # Event-specific data
 
 
+class WebhookBatchPayload(BaseModel):
+    """Payload for webhooks that opt in to receiving several events at once."""
+
+    events: List[WebhookPayload]
+
+
 class WebhookNotifier:
     """
     Service for sending webhook notifications on flow events.
 
     Manages webhook configurations and handles reliable delivery with retries.
+    Each webhook has its own delivery queue drained by up to
+    ``max_concurrency`` workers, so a slow receiver only backs up its own queue.
     """
 
     def __init__(self):
         self.webhooks: List[WebhookConfig] = []
         self.client: Optional[httpx.AsyncClient] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, List[asyncio.Task]] = {}
 
     async def initialize(self) -> None:
         """Initialize the HTTP client for webhook delivery."""
@@ -58,8 +72,15 @@ class WebhookNotifier:
                 timeout=httpx.Timeout(30.0), follow_redirects=True
             )
 
-    async def shutdown(self) -> None:
-        """Shutdown the HTTP client."""
+    async def shutdown(self, timeout: float = 10.0) -> None:
+        """Deliver queued notifications, then shutdown the HTTP client."""
+        try:
+            await asyncio.wait_for(self.wait_until_idle(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out delivering queued webhook notifications")
+        for url in list(self._workers):
+            self._stop_workers(url)
+
         if self.client:
             await self.client.aclose()
             self.client = None
@@ -72,11 +93,66 @@ class WebhookNotifier:
     def remove_webhook(self, url: str) -> None:
         """Remove a webhook configuration by URL."""
         self.webhooks = [w for w in self.webhooks if str(w.url) != url]
+        self._stop_workers(url)
         logger.info(f"Removed webhook: {url}")
 
+    async def wait_until_idle(self) -> None:
+        """Wait until every queued notification has been attempted."""
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    def _stop_workers(self, url: str) -> None:
+        for worker in self._workers.pop(url, []):
+            worker.cancel()
+        self._queues.pop(url, None)
+
+    def _enqueue(self, webhook: WebhookConfig, payload: WebhookPayload) -> None:
+        url = str(webhook.url)
+        queue = self._queues.get(url)
+        if queue is None:
+            queue = self._queues[url] = asyncio.Queue(maxsize=webhook.max_queue_size)
+            self._workers[url] = [
+                asyncio.create_task(self._delivery_worker(webhook, queue))
+                for _ in range(webhook.max_concurrency)
+            ]
+
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Webhook queue for {url} is full, dropping {payload.event_type} event"
+            )
+
+    async def _delivery_worker(
+        self, webhook: WebhookConfig, queue: asyncio.Queue
+    ) -> None:
+        """Deliver queued payloads for one webhook until cancelled."""
+        while True:
+            payloads = [await queue.get()]
+            if webhook.batch_events:
+                while len(payloads) < webhook.max_batch_size and not queue.empty():
+                    payloads.append(queue.get_nowait())
+
+            try:
+                if webhook.batch_events:
+                    await self._send_webhook(
+                        webhook, WebhookBatchPayload(events=payloads)
+                    )
+                else:
+                    await self._send_webhook(webhook, payloads[0])
+                logger.debug(
+                    f"Webhook {webhook.url} delivered {len(payloads)} event(s)"
+                )
+            except Exception as e:
+                logger.error(f"Webhook {webhook.url} failed: {e}")
+            finally:
+                for _ in payloads:
+                    queue.task_done()
+
     async def notify_event(self, event: FlowEvent) -> None:
         """
-        Send webhook notifications for a flow event.
+        Queue webhook notifications for a flow event.
+
+        Delivery happens in the background on each matching webhook's queue.
 
         Args:
             event: The flow event to notify about
@@ -112,20 +188,14 @@ class WebhookNotifier:
             },
         )
 
-        # Send notifications concurrently
-        tasks = [self._send_webhook(webhook, payload) for webhook in matching_webhooks]
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Log results
-        for webhook, result in zip(matching_webhooks, results):
-            if isinstance(result, Exception):
-                logger.error(f"Webhook {webhook.url} failed: {result}")
-            else:
-                logger.info(f"Webhook {webhook.url} delivered successfully")
+        # Hand off to each webhook's delivery queue
+        for webhook in matching_webhooks:
+            self._enqueue(webhook, payload)
 
     async def _send_webhook(
-        self, webhook: WebhookConfig, payload: WebhookPayload
+        self,
+        webhook: WebhookConfig,
+        payload: Union[WebhookPayload, WebhookBatchPayload],
     ) -> None:
         """
         Send a single webhook notification with retries.
@@ -140,12 +210,14 @@ class WebhookNotifier:
             **webhook.headers,
         }
 
+        # Sign exactly the bytes that are sent
+        payload_bytes = payload.model_dump_json().encode("utf-8")
+
         # Add HMAC signature if secret is provided
         if webhook.secret:
             import hashlib
             import hmac
 
-            payload_bytes = payload.model_dump_json().encode("utf-8")
             signature = hmac.new(
                 cast(str, webhook.secret).encode("utf-8"), payload_bytes, hashlib.sha256
             ).hexdigest()
@@ -156,7 +228,7 @@ class WebhookNotifier:
             try:
                 response = await self.client.post(
                     str(webhook.url),
-                    json=payload.model_dump(),
+                    content=payload_bytes,
                     headers=headers,
                     timeout=webhook.timeout,
                 )
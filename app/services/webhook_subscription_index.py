@@ -0,0 +1,177 @@
+"""
+In-memory routing index for webhook subscriptions.
+
+Flow events fire on every chat turn, but webhook subscriptions change rarely.
+Rather than querying ``webhook_subscriptions`` per event, each process keeps
+the active subscriptions bucketed by ``(flow_id | *, event_type | *)``.
+
+The index is rebuilt when:
+1. A ``webhook_subscriptions`` NOTIFY arrives (sent by a statement trigger
+   whenever routing columns change), or
+2. A periodic check finds ``webhook_subscriptions_version_seq`` has moved on,
+   which covers missed notifications and processes without a listener.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from structlog import get_logger
+
+from app.db.sequences import sequence_version_query
+from app.models.webhook_subscription import (
+    WebhookSubscription,
+    WebhookSubscriptionStatus,
+    webhook_subscriptions_version_seq,
+)
+
+logger = get_logger()
+
+WEBHOOK_SUBSCRIPTIONS_CHANNEL = "webhook_subscriptions"
+WILDCARD = "*"
+
+VERSION_QUERY = sequence_version_query(webhook_subscriptions_version_seq)
+
+RouteKey = Tuple[Union[uuid.UUID, str], str]
+
+
+@dataclass(frozen=True)
+class SubscriptionRoute:
+    """The parts of a subscription needed to enqueue a webhook delivery."""
+
+    id: uuid.UUID
+    url: str
+    secret: Optional[str]
+    headers: Dict[str, str] = field(hash=False)
+    timeout_seconds: Optional[int]
+    max_retries: int
+    position: int
+
+    @classmethod
+    def from_subscription(
+        cls, subscription: WebhookSubscription, position: int
+    ) -> "SubscriptionRoute":
+        return cls(
+            id=subscription.id,
+            url=subscription.url,
+            secret=subscription.secret,
+            headers=dict(subscription.headers or {}),
+            timeout_seconds=subscription.timeout_seconds,
+            max_retries=subscription.max_retries,
+            position=position,
+        )
+
+
+class WebhookSubscriptionIndex:
+    """Per-process index of active webhook subscriptions."""
+
+    def __init__(
+        self,
+        refresh_interval_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self._clock = clock
+        self._routes: Dict[RouteKey, List[SubscriptionRoute]] = {}
+        self._version: Optional[int] = None
+        self._checked_at: Optional[float] = None
+        self._invalidations = 0
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._routes
+
+    def invalidate(self) -> None:
+        """Force the next ``ensure_fresh`` call to reload the index.
+
+        The version sequence advances when the changing statement runs, before
+        its commit, so a reload in between would record the new version with
+        the old rows; notifications (sent on commit) therefore always reload.
+        """
+        self._invalidations += 1
+        self._checked_at = None
+        self._version = None
+
+    def handle_notification(
+        self, connection, pid: int, channel: str, payload: str
+    ) -> None:
+        """asyncpg listener callback for the subscription change channel."""
+        logger.debug("Webhook subscriptions changed", version=payload)
+        self.invalidate()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._checked_at is not None
+            and self._clock() - self._checked_at < self.refresh_interval_seconds
+        )
+
+    async def ensure_fresh(self, db: AsyncSession) -> None:
+        """Rebuild the index if the subscription version has changed.
+
+        Does nothing (no database access) while the last check is recent and
+        no change notification has arrived since.
+        """
+        if self._is_fresh():
+            return
+
+        async with self._refresh_lock:
+            if self._is_fresh():
+                return
+
+            invalidations = self._invalidations
+            version = (await db.execute(VERSION_QUERY)).scalar_one()
+
+            if version != self._version:
+                result = await db.scalars(
+                    select(WebhookSubscription)
+                    .where(
+                        WebhookSubscription.status == WebhookSubscriptionStatus.ACTIVE
+                    )
+                    .order_by(WebhookSubscription.created_at, WebhookSubscription.id)
+                )
+                self.load(result.all(), version)
+
+            # A notification that arrived mid-refresh may not be reflected
+            if invalidations == self._invalidations:
+                self._checked_at = self._clock()
+
+    def load(self, subscriptions: List[WebhookSubscription], version: int) -> None:
+        """Replace the index with the given subscriptions."""
+        routes: Dict[RouteKey, List[SubscriptionRoute]] = {}
+        for position, subscription in enumerate(subscriptions):
+            if subscription.status != WebhookSubscriptionStatus.ACTIVE:
+                continue
+            route = SubscriptionRoute.from_subscription(subscription, position)
+            flow_key = subscription.flow_id or WILDCARD
+            for event_type in set(subscription.event_types or [WILDCARD]):
+                routes.setdefault((flow_key, event_type), []).append(route)
+
+        self._routes = routes
+        self._version = version
+        logger.info(
+            "Loaded webhook subscription index",
+            version=version,
+            subscription_count=len(subscriptions),
+        )
+
+    def match(self, flow_id: uuid.UUID, event_type: str) -> List[SubscriptionRoute]:
+        """Subscriptions that should receive ``event_type`` for ``flow_id``."""
+        if not self._routes:
+            return []
+
+        matched: Dict[uuid.UUID, SubscriptionRoute] = {}
+        for key in (
+            (flow_id, event_type),
+            (flow_id, WILDCARD),
+            (WILDCARD, event_type),
+            (WILDCARD, WILDCARD),
+        ):
+            for route in self._routes.get(key, ()):
+                matched[route.id] = route
+
+        return sorted(matched.values(), key=lambda route: route.position)
@@ -16,6 +16,18 @@ def pytest_addoption(parser):
         default=False,
         help="Run tests that require isolation (e.g., connection pool stress tests)",
     )
+    parser.addoption(
+        "--update-query-baselines",
+        action="store_true",
+        default=False,
+        help="Record the SQL statements issued inside each query_budget block",
+    )
+    parser.addoption(
+        "--latency-budget-factor",
+        type=float,
+        default=1.0,
+        help="Scale query_budget wall-time limits (0 disables them)",
+    )
 
 
 def pytest_configure(config):
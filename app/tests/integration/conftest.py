@@ -67,6 +67,8 @@ from app.schemas.work import WorkCreateIn
 from app.services.collections import reset_collection
 from app.services.editions import generate_random_valid_isbn13
 from app.services.security import create_access_token
+from app.tests.util.query_budget import query_budget  # noqa: F401
+from app.tests.util.query_budget import record_queries
 from app.tests.util.random_strings import random_lower_string
 
 
@@ -396,6 +398,17 @@ async def reset_global_state():
         logger.warning(f"Error cleaning up global state: {e}")
 
 
+@pytest.fixture()
+def count_queries():
+    """Record the SQL statements every engine issues while the test runs.
+
+    Yields the list of statements; clear it to start counting from a
+    particular point in the test.
+    """
+    with record_queries() as recording:
+        yield recording.statements
+
+
 @pytest.fixture()
 async def async_session(reset_global_state):
     """Create an isolated async session for each test with proper cleanup and timeouts."""
@@ -250,6 +250,30 @@ def test_start_conversation(client, test_flow_with_nodes):
     # Secure attributes are tested in the actual CSRF middleware
 
 
+def test_start_conversation_uses_cached_flow_metadata(
+    client, test_flow_with_nodes, count_queries
+):
+    """A warm /chat/start reads no flow definition, theme or school rows."""
+    session_data = {
+        "flow_id": test_flow_with_nodes["flow_id"],
+        "initial_state": {"user": {"name": "Alice"}},
+    }
+    assert client.post("v1/chat/start", json=session_data).status_code == 201
+
+    count_queries.clear()
+    response = client.post("v1/chat/start", json=session_data)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["flow_name"]
+    inserts = [q for q in count_queries if q.startswith("INSERT INTO conversation_sessions")]
+    assert len(inserts) == 1
+    assert "RETURNING" in inserts[0]
+    for table in ("flow_definitions", "chat_themes", "schools"):
+        assert not any(
+            q.startswith("SELECT") and f"FROM {table}" in q for q in count_queries
+        ), table
+
+
 def test_start_conversation_with_invalid_flow(client):
     """Test starting conversation with non-existent flow."""
     fake_flow_id = str(uuid.uuid4())
@@ -352,6 +376,29 @@ def test_interact_with_session_csrf_protected(client, test_flow_with_nodes):
     assert data["session_ended"] is True
 
 
+def test_chat_turn_query_budget(client, test_flow_with_nodes, query_budget):
+    """Starting a session and answering a question stay within budget."""
+    session_data = {
+        "flow_id": test_flow_with_nodes["flow_id"],
+        "initial_state": {"user": {"name": "Dana"}},
+    }
+    # Warm the per-process flow and content caches
+    client.post("v1/chat/start", json=session_data)
+
+    with query_budget("chat_start", queries=20, ms=1000):
+        start_response = client.post("v1/chat/start", json=session_data)
+    assert start_response.status_code == status.HTTP_201_CREATED
+    client.cookies.update(start_response.cookies)
+
+    with query_budget("chat_interact", queries=30, ms=1000):
+        response = client.post(
+            f"v1/chat/sessions/{start_response.json()['session_token']}/interact",
+            json={"input": "Fantasy", "input_type": "text"},
+            headers={"X-CSRF-Token": start_response.cookies["csrf_token"]},
+        )
+    assert response.status_code == status.HTTP_200_OK
+
+
 def test_interact_without_csrf_token(client, test_flow_with_nodes):
     """Test that interaction without CSRF token fails."""
     # Start session
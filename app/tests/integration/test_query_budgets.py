@@ -0,0 +1,72 @@
+"""Query-count and wall-time budgets for read-heavy API endpoints.
+
+Budgets are ceilings, not exact counts: they catch a new lazy load or a
+per-row lookup without failing on harmless reordering. Run with
+``--update-query-baselines`` after an intentional change to record the
+statements each budget expects.
+"""
+
+from starlette import status
+
+from app.models.booklist import ListType
+
+
+def test_booklist_detail_query_budget(
+    client, backend_service_account_headers, works_list, query_budget
+):
+    response = client.post(
+        "v1/list",
+        headers=backend_service_account_headers,
+        json={
+            "name": "budgeted list",
+            "type": ListType.OTHER_LIST,
+            "items": [
+                {"work_id": w.id, "order_id": i} for i, w in enumerate(works_list)
+            ],
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    booklist_id = response.json()["id"]
+
+    counts = {}
+    for limit in (10, 50):
+        with query_budget("booklist_detail", queries=10, ms=1000) as recording:
+            detail = client.get(
+                f"v1/list/{booklist_id}",
+                params={"limit": limit},
+                headers=backend_service_account_headers,
+            )
+        assert detail.status_code == status.HTTP_200_OK
+        assert len(detail.json()["data"]) == limit
+        counts[limit] = recording.count
+
+    # Loading a bigger page must not issue more statements (no N+1)
+    assert counts[50] == counts[10], counts
+
+
+def test_search_query_budget(
+    client, backend_service_account_headers, works_list, query_budget
+):
+    title = works_list[0].title
+
+    with query_budget("search", queries=4, ms=1000):
+        response = client.get(
+            "v1/search",
+            params={"query": title},
+            headers=backend_service_account_headers,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_recommend_query_budget(
+    client, backend_service_account_headers, works_list, query_budget
+):
+    with query_budget("recommend", queries=15, ms=2000):
+        response = client.post(
+            "v1/recommend",
+            json={"age": 8, "reading_abilities": ["HARRY_POTTER"], "fallback": True},
+            headers=backend_service_account_headers,
+        )
+
+    assert response.status_code == status.HTTP_200_OK
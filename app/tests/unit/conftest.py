@@ -36,3 +36,53 @@ def sendgrid_email_search_response():
         }
     }
     return response
+
+
+class CountingSession:
+    """Stand-in for ``AsyncSession`` that records every database round trip.
+
+    Statements are answered from ``results`` in order (a ``MagicMock`` once
+    they run out), so tests can assert exactly how many queries a code path
+    issues.
+    """
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.statements = []
+        self.parameters = []
+        self.commits = 0
+
+    def _record(self, statement, params=None):
+        self.statements.append(statement)
+        self.parameters.append(params)
+        return self.results.pop(0) if self.results else MagicMock()
+
+    async def execute(self, statement, params=None, **kwargs):
+        return self._record(statement, params)
+
+    async def scalars(self, statement, params=None, **kwargs):
+        return self._record(statement, params)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        return self._record(statement, params)
+
+    async def merge(self, instance, load=True):
+        return instance
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    @property
+    def round_trips(self):
+        return len(self.statements) + self.commits
+
+
+@pytest.fixture
+def counting_db():
+    return CountingSession()
@@ -0,0 +1,157 @@
+"""Unit tests for applying a batch of booklist item changes in one pass."""
+
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import Delete, Insert, Update
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.repositories.booklist_repository import (
+    BooklistRepositoryImpl,
+    plan_item_changes,
+)
+from app.schemas.booklist import BookListItemUpdateIn
+
+
+def change(action, work_id, order_id=None, **info):
+    return BookListItemUpdateIn(
+        action=action, work_id=work_id, order_id=order_id, info=info or None
+    )
+
+
+def rows(*work_ids):
+    return [(work_id, order_id, None) for order_id, work_id in enumerate(work_ids)]
+
+
+def final_order(current, plan):
+    order_ids = {work_id: order_id for work_id, order_id, _ in current}
+    order_ids.update(plan.moved)
+    order_ids.update({item["work_id"]: item["order_id"] for item in plan.added})
+    for work_id in plan.removed:
+        del order_ids[work_id]
+    return sorted(order_ids, key=order_ids.get)
+
+
+class TestPlanItemChanges:
+    def test_move_shifts_items_between_old_and_new_position(self):
+        current = rows(10, 11, 12, 13, 14)
+
+        plan = plan_item_changes(current, [change("update", 13, order_id=1)])
+
+        assert final_order(current, plan) == [10, 13, 11, 12, 14]
+        assert plan.moved == [(13, 1), (11, 2), (12, 3)]
+        assert not (plan.removed or plan.added or plan.info_updates)
+
+    def test_changes_apply_in_order(self):
+        current = rows(10, 11, 12)
+
+        plan = plan_item_changes(
+            current,
+            [
+                change("add", 20, order_id=0),
+                change("remove", 11),
+                change("update", 10, order_id=0),
+                change("add", 21),
+            ],
+        )
+
+        assert final_order(current, plan) == [10, 20, 12, 21]
+        assert plan.removed == [11]
+        assert [item["work_id"] for item in plan.added] == [20, 21]
+
+    def test_gaps_in_the_existing_order_are_closed(self):
+        current = [(10, 0, None), (11, 4, None), (12, 9, None)]
+
+        plan = plan_item_changes(current, [change("add", 20)])
+
+        assert plan.moved == [(11, 1), (12, 2)]
+        assert plan.added == [{"work_id": 20, "order_id": 3, "info": None}]
+
+    def test_redundant_changes_are_skipped(self):
+        current = rows(10, 11)
+
+        plan = plan_item_changes(
+            current,
+            [change("add", 10), change("remove", 99), change("update", 98, 0)],
+        )
+
+        assert not plan
+
+    def test_info_is_merged(self):
+        current = [(10, 0, {"note": "old", "edition": "978"})]
+
+        plan = plan_item_changes(current, [change("update", 10, note="new")])
+
+        assert plan.info_updates == [
+            (10, {"note": "new", "edition": None, "feedback": None})
+        ]
+        assert not plan.moved
+
+
+class ItemsSession:
+    """Serves a list's current items and records each write with its rows."""
+
+    def __init__(self, current):
+        self.current = current
+        self.statements = []
+        self.parameters = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+        self.parameters.append(params)
+        return SimpleNamespace(all=lambda: self.current)
+
+
+class TestApplyItemChanges:
+    def test_reordering_a_whole_list_is_a_single_update(self):
+        current = rows(*range(500))
+        db = ItemsSession(current)
+        reversed_order = [
+            change("update", work_id, order_id=0) for work_id in range(500)
+        ]
+
+        plan = BooklistRepositoryImpl().apply_item_changes(
+            db, SimpleNamespace(id=7), reversed_order
+        )
+
+        assert final_order(current, plan) == list(reversed(range(500)))
+        select_items, defer_constraints, reorder = db.statements
+        assert "DEFERRED" in str(defer_constraints)
+        assert isinstance(reorder, Update)
+        sql = str(reorder.compile(dialect=postgresql.dialect()))
+        assert "FROM (VALUES" in sql
+
+    def test_one_statement_per_kind_of_write(self):
+        db = ItemsSession(rows(10, 11, 12))
+
+        BooklistRepositoryImpl().apply_item_changes(
+            db,
+            SimpleNamespace(id=7),
+            [
+                change("remove", 10),
+                change("remove", 11),
+                change("update", 12, note="hi"),
+                change("add", 20),
+                change("add", 21),
+            ],
+        )
+
+        writes = [type(statement) for statement in db.statements[2:]]
+        assert writes == [Delete, Update, Update, Insert]
+        remove = db.statements[2].compile(dialect=postgresql.dialect())
+        assert [10, 11] in remove.params.values()
+        assert [(row["work_id"], row["order_id"]) for row in db.parameters[-1]] == [
+            (20, 1),
+            (21, 2),
+        ]
+        assert {row["booklist_id"] for row in db.parameters[-1]} == {7}
+
+    def test_no_writes_when_nothing_changes(self):
+        db = ItemsSession(rows(10))
+
+        BooklistRepositoryImpl().apply_item_changes(
+            db, SimpleNamespace(id=7), [change("add", 10)]
+        )
+
+        assert len(db.statements) == 1
@@ -0,0 +1,228 @@
+"""Unit tests for the Core projections behind the catalogue read endpoints."""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.api.common.pagination import PaginatedQueryParams
+from app.models.work import WorkType
+from app.repositories.catalogue_read_repository import catalogue_read_repository
+from app.schemas.booklist import BookListDetailEnriched
+from app.schemas.work import WorkDetail
+from app.services.booklists import apopulate_booklist_object
+
+
+class FakeRow(SimpleNamespace):
+    @property
+    def _mapping(self):
+        return vars(self)
+
+    def _asdict(self):
+        return dict(vars(self))
+
+
+class FakeResult:
+    def __init__(self, *rows):
+        self.rows = [FakeRow(**row) for row in rows]
+
+    def all(self):
+        return self.rows
+
+    def first(self):
+        return self.rows[0] if self.rows else None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+class ProjectionSession:
+    """Answers each query from ``results`` in order and counts commits."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def work_row(id, title="A Book", **extra):
+    return dict(
+        id=id,
+        type=WorkType.BOOK,
+        leading_article=None,
+        title=title,
+        subtitle=None,
+        **extra,
+    )
+
+
+def author_row(work_id, id, last_name):
+    return dict(work_id=work_id, id=id, first_name=None, last_name=last_name)
+
+
+def edition_row(id, isbn, work_id, cover_url=None):
+    return dict(
+        id=id,
+        leading_article=None,
+        title="A Book",
+        cover_url=cover_url,
+        work_id=work_id,
+        isbn=isbn,
+        date_published=None,
+        info={"pages": 32},
+    )
+
+
+class TestWorks:
+    async def test_briefs_group_authors_by_work(self):
+        db = ProjectionSession(
+            [
+                FakeResult(work_row(1), work_row(2)),
+                FakeResult(author_row(1, 10, "Dahl"), author_row(1, 11, "Blake")),
+            ]
+        )
+
+        briefs = await catalogue_read_repository.aget_work_briefs(
+            db, type=WorkType.BOOK, skip=0, limit=10
+        )
+
+        assert len(db.statements) == 2
+        assert [author.last_name for author in briefs[0].authors] == ["Dahl", "Blake"]
+        assert briefs[1].authors == []
+
+    async def test_empty_page_skips_author_query(self):
+        db = ProjectionSession([FakeResult()])
+
+        briefs = await catalogue_read_repository.aget_work_briefs(
+            db, type=WorkType.BOOK, query="nothing"
+        )
+
+        assert briefs == []
+        assert len(db.statements) == 1
+
+    async def test_detail_fills_info_defaults_without_writing(self):
+        labelset = dict(
+            id=5,
+            work_id=1,
+            min_age=3,
+            max_age=8,
+            huey_summary="Fun",
+            created_at=datetime(2024, 1, 1),
+        )
+        db = ProjectionSession(
+            [
+                FakeResult(work_row(1, info={"other": {"source": "nielsen"}})),
+                FakeResult(author_row(1, 10, "Dahl")),
+                FakeResult(labelset),
+                FakeResult(
+                    dict(labelset_id=5, id=1, name="Dark", key="hue01_dark_suspense")
+                ),
+                FakeResult(dict(labelset_id=5, id=2, key="SPOT", name="Spot")),
+                FakeResult(edition_row(7, "9780140328721", 1)),
+            ]
+        )
+
+        work = await catalogue_read_repository.aget_work(db, 1, full_detail=True)
+
+        assert isinstance(work, WorkDetail)
+        assert work.info.genres == []
+        assert work.info.other == {"source": "nielsen"}
+        assert [hue.key for hue in work.labelset.hues] == ["hue01_dark_suspense"]
+        assert work.labelset.reading_abilities[0].key == "SPOT"
+        assert work.editions[0].isbn == "9780140328721"
+        assert db.commits == 0
+
+    async def test_missing_work(self):
+        db = ProjectionSession([FakeResult()])
+
+        assert await catalogue_read_repository.aget_work(db, 404) is None
+
+
+class TestBooklists:
+    async def test_enriched_page_uses_fixed_number_of_queries(self):
+        booklist = SimpleNamespace(id=uuid.uuid4(), name="Favourites")
+        brief = dict(
+            id=booklist.id,
+            name="Favourites",
+            type="PERSONAL",
+            sharing="PRIVATE",
+            slug=None,
+            info=None,
+            created_at=datetime(2024, 1, 1),
+            updated_at=datetime(2024, 1, 1),
+            book_count=3,
+            user_id=None,
+            user_type=None,
+            user_name=None,
+            wriveted_identifier=None,
+            school_name=None,
+        )
+        db = ProjectionSession(
+            [
+                FakeResult(brief),
+                FakeResult(
+                    dict(order_id=0, work_id=1, info={"edition": "9780140328721"}),
+                    dict(order_id=1, work_id=2, info=None),
+                    dict(order_id=2, work_id=3, info={"note": "no editions"}),
+                ),
+                # Works, their authors and (absent) labelsets
+                FakeResult(work_row(1), work_row(2), work_row(3)),
+                FakeResult(),
+                FakeResult(),
+                # Requested edition, then featured editions for the rest
+                FakeResult(edition_row(7, "9780140328721", 1)),
+                FakeResult(),
+                FakeResult(),
+                FakeResult(
+                    edition_row(8, "9780141365466", 2, "https://example.com/c.jpg")
+                ),
+                FakeResult(),
+                FakeResult(),
+            ]
+        )
+
+        with patch(
+            "app.services.booklists._report_work_without_editions", AsyncMock()
+        ) as report:
+            detail = await apopulate_booklist_object(
+                booklist, db, PaginatedQueryParams(skip=0, limit=10), enriched=True
+            )
+
+        assert isinstance(detail, BookListDetailEnriched)
+        assert [item.edition.isbn for item in detail.data] == [
+            "9780140328721",
+            "9780141365466",
+        ]
+        assert detail.pagination.total == 3
+        report.assert_awaited_once()
+        assert len(db.statements) == 11
+
+
+def _dependency_calls(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from _dependency_calls(dependency)
+
+
+def test_public_booklist_detail_uses_only_the_async_session():
+    from app.api.booklists import public_router
+    from app.db.session import get_async_session, get_session
+
+    (route,) = [
+        route
+        for route in public_router.routes
+        if route.path == "/public-list/{booklist_slug}"
+    ]
+    calls = set(_dependency_calls(route.dependant))
+
+    assert get_async_session in calls
+    assert get_session not in calls
@@ -0,0 +1,111 @@
+"""Unit tests for incremental session state writes."""
+
+from app.repositories.chat_repository import ChatRepository
+
+
+def build_state():
+    return {
+        "user": {"name": "Sam", "age": 9},
+        "temp": {"shown_ids": ["a", "b"], "quiz": {"q1": "dragons"}},
+        "context": {"locale": "en-AU"},
+    }
+
+
+class TestStatePatch:
+    """Test which keys are sent to the database."""
+
+    def test_only_touched_keys_are_included(self):
+        repo = ChatRepository()
+        state = build_state()
+
+        patch = repo._build_state_patch(state, {"temp": {"quiz": {"q2": "space"}}})
+
+        assert list(patch) == ["temp"]
+        assert patch["temp"] == {
+            "shown_ids": ["a", "b"],
+            "quiz": {"q1": "dragons", "q2": "space"},
+        }
+
+    def test_current_state_is_not_mutated(self):
+        repo = ChatRepository()
+        state = build_state()
+
+        repo._build_state_patch(state, {"temp": {"quiz": {"q2": "space"}}})
+
+        assert state == build_state()
+
+    def test_unchanged_values_are_omitted(self):
+        repo = ChatRepository()
+
+        patch = repo._build_state_patch(
+            build_state(), {"user": {"age": 9}, "context": {"locale": "en-AU"}}
+        )
+
+        assert patch == {}
+
+    def test_new_keys_are_included(self):
+        repo = ChatRepository()
+
+        patch = repo._build_state_patch(build_state(), {"answer": None})
+
+        assert patch == {"answer": None}
+
+
+class TestStateHash:
+    """Test the incremental state hash."""
+
+    def test_incremental_hash_matches_full_calculation(self):
+        repo = ChatRepository()
+        state = build_state()
+        state_hash = repo._calculate_state_hash(state)
+
+        for turn in range(20):
+            patch = repo._build_state_patch(
+                state,
+                {"temp": {"shown_ids": state["temp"]["shown_ids"] + [str(turn)]}},
+            )
+            if turn % 5 == 0:
+                patch.update(repo._build_state_patch(state, {f"var_{turn}": turn}))
+            new_state = {**state, **patch}
+            state_hash = repo._update_state_hash(state_hash, state, new_state, patch)
+            state = new_state
+
+        assert state_hash == repo._calculate_state_hash(state)
+        assert len(state_hash) == 43
+
+    def test_hash_is_independent_of_key_order(self):
+        repo = ChatRepository()
+        state = build_state()
+
+        reordered = dict(reversed(list(state.items())))
+
+        assert repo._calculate_state_hash(state) == repo._calculate_state_hash(
+            reordered
+        )
+
+    def test_legacy_hashes_are_recalculated(self):
+        repo = ChatRepository()
+        state = build_state()
+        legacy_hash = "n4bQgYhMfWWaL+qgxVrQFaO/TxsrC4Is0V1sFbDwCgg="
+
+        new_state = {**state, "answer": "yes"}
+        updated = repo._update_state_hash(legacy_hash, state, new_state, ["answer"])
+
+        assert updated == repo._calculate_state_hash(new_state)
+
+    def test_cached_digests_give_the_same_hash(self):
+        repo = ChatRepository()
+        state = build_state()
+        digests = {}
+        state_hash = repo._calculate_state_hash(state, digests)
+
+        patch = repo._build_state_patch(state, {"temp": {"quiz": {"q2": "space"}}})
+        new_state = {**state, **patch}
+        updated = repo._update_state_hash(
+            state_hash, state, new_state, patch, digests=digests
+        )
+
+        assert updated == repo._calculate_state_hash(new_state)
+        assert digests == {
+            key: repo._state_key_digest(key, value) for key, value in new_state.items()
+        }
@@ -0,0 +1,131 @@
+"""Unit tests for the cached /chat/start path."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.chat_metadata_cache import ChatMetadataCache
+from app.services.chat_runtime import ChatRuntime, FlowNotFoundError
+from app.services.flow_graph import CompiledFlow, FlowGraphCache
+
+SCHOOL_ID = uuid.uuid4()
+
+
+def compiled_flow(**fields):
+    flow = SimpleNamespace(
+        id=uuid.uuid4(),
+        name="Onboarding",
+        entry_node_id="welcome",
+        version="1.2.0",
+        is_published=True,
+        is_active=True,
+        trace_enabled=False,
+        trace_sample_rate=0,
+        theme_id=None,
+    )
+    vars(flow).update(fields)
+    return CompiledFlow.build(flow, [], [])
+
+
+def scalar_result(value):
+    result = MagicMock()
+    result.scalar_one_or_none.return_value = value
+    return result
+
+
+@pytest.fixture
+def caches():
+    flows = FlowGraphCache(ttl_seconds=60)
+    metadata = ChatMetadataCache(ttl_seconds=60)
+    with (
+        patch("app.services.chat_runtime.flow_graph_cache", flows),
+        patch("app.services.chat_runtime.chat_metadata_cache", metadata),
+    ):
+        yield flows, metadata
+
+
+async def warm(flows, compiled):
+    with patch.object(flows, "_load", AsyncMock(return_value=compiled)):
+        await flows.get(MagicMock(), compiled.flow_id)
+
+
+class TestStartSession:
+    async def test_warm_start_only_inserts_and_commits(self, caches, counting_db):
+        flows, metadata = caches
+        compiled = compiled_flow()
+        await warm(flows, compiled)
+        counting_db.results.append(scalar_result("Hill Primary"))
+        await ChatRuntime().start_session(
+            counting_db,
+            compiled.flow_id,
+            initial_state={"context": {"school_wriveted_id": str(SCHOOL_ID)}},
+        )
+
+        counting_db.statements.clear()
+        counting_db.parameters.clear()
+        counting_db.commits = 0
+        await ChatRuntime().start_session(
+            counting_db,
+            compiled.flow_id,
+            initial_state={"context": {"school_wriveted_id": str(SCHOOL_ID)}},
+        )
+
+        assert counting_db.round_trips == 2
+        (row,) = counting_db.parameters[0]
+        assert row["state"]["context"]["school_name"] == "Hill Primary"
+        assert row["flow_version"] == "1.2.0"
+
+    async def test_provided_school_name_is_kept(self, caches, counting_db):
+        flows, _ = caches
+        compiled = compiled_flow()
+        await warm(flows, compiled)
+
+        await ChatRuntime().start_session(
+            counting_db,
+            compiled.flow_id,
+            initial_state={
+                "context": {"school_wriveted_id": str(SCHOOL_ID), "school_name": "X"}
+            },
+        )
+
+        assert len(counting_db.statements) == 1
+        (row,) = counting_db.parameters[0]
+        assert row["state"]["context"]["school_name"] == "X"
+
+    @pytest.mark.parametrize(
+        "fields", [{"is_published": False}, {"is_active": False}]
+    )
+    async def test_unavailable_flow_is_rejected(self, caches, counting_db, fields):
+        flows, _ = caches
+        compiled = compiled_flow(**fields)
+        await warm(flows, compiled)
+
+        with pytest.raises(FlowNotFoundError):
+            await ChatRuntime().start_session(counting_db, compiled.flow_id)
+
+        assert counting_db.round_trips == 0
+
+
+class TestChatMetadataCache:
+    async def test_missing_theme_is_cached_until_invalidated(self, counting_db):
+        cache = ChatMetadataCache(ttl_seconds=60)
+        theme_id = uuid.uuid4()
+        missing = MagicMock()
+        missing.first.return_value = None
+        counting_db.results.append(missing)
+
+        assert await cache.get_theme(counting_db, theme_id) is None
+        assert await cache.get_theme(counting_db, theme_id) is None
+        assert len(counting_db.statements) == 1
+
+        cache.invalidate_theme(theme_id)
+        await cache.get_theme(counting_db, theme_id)
+        assert len(counting_db.statements) == 2
+
+    async def test_invalid_school_id_skips_the_database(self, counting_db):
+        cache = ChatMetadataCache(ttl_seconds=60)
+
+        assert await cache.get_school_name(counting_db, "not-a-uuid") is None
+        assert counting_db.round_trips == 0
@@ -0,0 +1,127 @@
+"""Unit tests for the read-through CMS content cache."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.cms import ContentType
+from app.services.cms_content_cache import CMSContentCache
+
+
+def content_row(content_id, text="Hello", version=1):
+    return SimpleNamespace(
+        id=content_id, type=ContentType.MESSAGE, version=version, content={"text": text}
+    )
+
+
+def mock_db(*batches):
+    db = MagicMock()
+    db.execute = AsyncMock(side_effect=[list(batch) for batch in batches])
+    return db
+
+
+class TestGetMany:
+    async def test_misses_are_loaded_in_one_query(self):
+        cache = CMSContentCache(ttl_seconds=60)
+        ids = [uuid.uuid4() for _ in range(3)]
+        db = mock_db([content_row(ids[0]), content_row(ids[1])])
+
+        found = await cache.get_many(db, ids + ids[:1])
+
+        assert db.execute.await_count == 1
+        assert set(found) == set(ids[:2])
+        assert found[ids[0]].content == {"text": "Hello"}
+
+    async def test_hits_and_missing_content_skip_the_database(self):
+        cache = CMSContentCache(ttl_seconds=60)
+        present, missing = uuid.uuid4(), uuid.uuid4()
+        await cache.get_many(mock_db([content_row(present)]), [present, missing])
+
+        db = mock_db()
+        found = await cache.get_many(db, [present, missing])
+
+        db.execute.assert_not_awaited()
+        assert list(found) == [present]
+        assert await cache.get(db, missing) is None
+
+    async def test_expired_entries_are_reloaded(self):
+        now = [0.0]
+        cache = CMSContentCache(ttl_seconds=60, clock=lambda: now[0])
+        content_id = uuid.uuid4()
+        await cache.get(mock_db([content_row(content_id, "old")]), content_id)
+
+        now[0] = 61.0
+        db = mock_db(
+            [SimpleNamespace(id=content_id, version=2)],
+            [content_row(content_id, "new", 2)],
+        )
+        content = await cache.get(db, content_id)
+
+        assert (content.content["text"], content.version) == ("new", 2)
+        assert list(cache._bodies) == [(content_id, 2)]
+
+    async def test_expired_entries_with_the_same_version_keep_their_body(self):
+        now = [0.0]
+        cache = CMSContentCache(ttl_seconds=60, clock=lambda: now[0])
+        content_id = uuid.uuid4()
+        first = await cache.get(mock_db([content_row(content_id)]), content_id)
+
+        now[0] = 61.0
+        db = mock_db([SimpleNamespace(id=content_id, version=1)])
+        content = await cache.get(db, content_id)
+
+        assert content is first
+        (query,) = db.execute.await_args.args
+        assert [column.name for column in query.selected_columns] == ["id", "version"]
+        now[0] = 100.0
+        assert await cache.get(mock_db(), content_id) is first
+
+    async def test_expired_content_that_went_inactive_is_a_miss(self):
+        now = [0.0]
+        cache = CMSContentCache(ttl_seconds=60, clock=lambda: now[0])
+        content_id = uuid.uuid4()
+        await cache.get(mock_db([content_row(content_id)]), content_id)
+
+        now[0] = 61.0
+        assert await cache.get(mock_db([]), content_id) is None
+        assert not cache._bodies
+
+    async def test_bodies_are_copied_from_the_row(self):
+        cache = CMSContentCache(ttl_seconds=60)
+        content_id = uuid.uuid4()
+        row = content_row(content_id)
+        row.content = {"options": [{"label": "Yes"}]}
+
+        await cache.get(mock_db([row]), content_id)
+        row.content["options"][0]["label"] = "No"
+
+        cached = await cache.get(mock_db(), content_id)
+        assert cached.content == {"options": [{"label": "Yes"}]}
+
+
+class TestInvalidate:
+    async def test_invalidated_content_is_reloaded(self):
+        cache = CMSContentCache(ttl_seconds=60)
+        content_id = uuid.uuid4()
+        await cache.get(mock_db([content_row(content_id, "old")]), content_id)
+
+        cache.invalidate([content_id])
+        content = await cache.get(
+            mock_db([content_row(content_id, "new", 2)]), content_id
+        )
+
+        assert content.version == 2
+
+    async def test_rows_read_across_an_invalidation_are_not_cached(self):
+        cache = CMSContentCache(ttl_seconds=60)
+        content_id = uuid.uuid4()
+
+        async def execute_then_invalidate(query):
+            cache.invalidate([content_id])
+            return [content_row(content_id, "stale")]
+
+        db = MagicMock(execute=execute_then_invalidate)
+        content = await cache.get(db, content_id)
+
+        assert content.content["text"] == "stale"
+        assert content_id not in cache._versions
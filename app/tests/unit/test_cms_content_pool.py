@@ -0,0 +1,146 @@
+"""Unit tests for in-memory random CMS content selection pools."""
+
+import random
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.cms import ContentType, ContentVisibility
+from app.services.cms_content_pool import CMSContentPools, ContentPool, jsonb_contains
+
+SCHOOL_ID = uuid.uuid4()
+OTHER_SCHOOL_ID = uuid.uuid4()
+
+
+def content_row(visibility, school_id=None, tags=(), **info):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        visibility=visibility,
+        school_id=school_id,
+        tags=list(tags),
+        info=info,
+    )
+
+
+def build_rows():
+    return [
+        content_row(ContentVisibility.WRIVETED, tags=["animals"], min_age=5),
+        content_row(ContentVisibility.WRIVETED, tags=["space"], min_age=9, max_age=12),
+        content_row(ContentVisibility.PUBLIC, tags=["animals", "space"]),
+        content_row(ContentVisibility.SCHOOL, SCHOOL_ID, tags=["animals"], min_age="7"),
+        content_row(ContentVisibility.PRIVATE, OTHER_SCHOOL_ID, tags=["animals"]),
+        content_row(ContentVisibility.PRIVATE, SCHOOL_ID, difficulty="easy"),
+    ]
+
+
+def selected(pool, mask):
+    return {pool.ids[position] for position in range(len(pool)) if mask >> position & 1}
+
+
+class TestCandidates:
+    """Bitset filtering follows the SQL visibility, tag and info rules."""
+
+    def test_visibility(self):
+        rows = build_rows()
+        pool = ContentPool.build(rows)
+
+        assert selected(pool, pool.candidates()) == {r.id for r in rows[:3]}
+        assert selected(pool, pool.candidates(include_public=False)) == {
+            r.id for r in rows[:2]
+        }
+        assert selected(pool, pool.candidates(school_id=SCHOOL_ID)) == {
+            rows[0].id,
+            rows[1].id,
+            rows[2].id,
+            rows[3].id,
+            rows[5].id,
+        }
+
+    def test_tags_overlap_and_age_filters(self):
+        rows = build_rows()
+        pool = ContentPool.build(rows)
+
+        mask = pool.candidates(
+            tags=["animals", "missing"],
+            info_filters={"min_age": 8},
+            school_id=SCHOOL_ID,
+        )
+
+        # Content without min_age never passes an age filter
+        assert selected(pool, mask) == {rows[0].id, rows[3].id}
+        assert selected(pool, pool.candidates(info_filters={"max_age": "10"})) == {
+            rows[1].id
+        }
+
+    def test_other_info_filters_use_containment(self):
+        rows = build_rows()
+        pool = ContentPool.build(rows)
+
+        mask = pool.candidates(info_filters={"difficulty": "easy"}, school_id=SCHOOL_ID)
+
+        assert selected(pool, mask) == {rows[5].id}
+
+    def test_excluded_ids_are_removed(self):
+        rows = build_rows()
+        pool = ContentPool.build(rows)
+
+        mask = pool.candidates(exclude_ids=[rows[0].id, uuid.uuid4()])
+
+        assert selected(pool, mask) == {rows[1].id, rows[2].id}
+
+
+class TestSample:
+    def test_samples_are_distinct_members_of_the_mask(self):
+        rows = [content_row(ContentVisibility.WRIVETED) for _ in range(200)]
+        pool = ContentPool.build(rows)
+        mask = pool.candidates(exclude_ids=[row.id for row in rows[::2]])
+        rng = random.Random(7)
+
+        for count in (1, 5, 150):
+            chosen = pool.sample(mask, count, rng)
+            assert len(chosen) == min(count, 100)
+            assert len(set(chosen)) == len(chosen)
+            assert set(chosen) <= selected(pool, mask)
+
+    def test_empty_mask_returns_nothing(self):
+        pool = ContentPool.build(build_rows())
+
+        assert pool.sample(0, 3) == []
+
+
+def test_jsonb_contains_matches_postgres_semantics():
+    assert jsonb_contains({"a": 1, "b": [1, 2]}, {"b": [2]})
+    assert jsonb_contains({"a": {"b": 1, "c": 2}}, {"a": {"b": 1}})
+    assert jsonb_contains({"a": [1, 2]}, {"a": 1})
+    assert not jsonb_contains({"a": 1}, {"a": True})
+    assert not jsonb_contains({"a": 1}, {"a": [1]})
+
+
+class TestRefresh:
+    """Pools are reloaded only when the content version moves on."""
+
+    def mock_db(self, version, rows):
+        db = MagicMock()
+        version_result = MagicMock()
+        version_result.scalar_one.return_value = version
+        rows_result = MagicMock()
+        rows_result.all.return_value = rows
+        db.execute = AsyncMock(side_effect=[version_result, rows_result])
+        return db
+
+    async def test_pool_reused_until_version_changes(self):
+        now = [0.0]
+        pools = CMSContentPools(refresh_interval_seconds=10, clock=lambda: now[0])
+        rows = build_rows()
+
+        first = await pools.get(self.mock_db(1, rows), ContentType.JOKE)
+        now[0] = 5.0
+        cached_db = MagicMock(execute=AsyncMock())
+        assert await pools.get(cached_db, ContentType.JOKE) is first
+        cached_db.execute.assert_not_awaited()
+
+        pools.handle_notification(None, 1, "cms_content", "2")
+        second = await pools.get(self.mock_db(2, rows[:1]), ContentType.JOKE)
+
+        assert second is not first
+        assert len(second) == 1
@@ -0,0 +1,136 @@
+"""Unit tests for session concurrency control."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.models.cms import SessionStatus
+from app.services import chat_runtime
+from app.services.concurrency_service import ConcurrencyControlService
+from app.services.exceptions import SessionLockTimeoutError
+
+
+def mock_db():
+    db = MagicMock()
+    db.execute = AsyncMock()
+    nested = MagicMock()
+    nested.__aenter__ = AsyncMock(return_value=None)
+    nested.__aexit__ = AsyncMock(return_value=False)
+    db.begin_nested = MagicMock(return_value=nested)
+    return db
+
+
+class TestLockKey:
+    """Test advisory lock key derivation."""
+
+    def test_lock_key_is_signed_64_bit(self):
+        service = ConcurrencyControlService()
+        for _ in range(100):
+            key = service._uuid_to_lock_key(uuid4())
+            assert -(2**63) <= key < 2**63
+
+    def test_lock_key_is_stable_across_processes(self):
+        """Keys must not depend on PYTHONHASHSEED, so pin a known value."""
+        session_id = UUID("8c3a3b0e-9d4f-4f8e-a1c2-3d4e5f607182")
+
+        key = ConcurrencyControlService()._uuid_to_lock_key(session_id)
+
+        assert key == -748552614225497449
+
+
+class TestSessionLock:
+    """Test lock acquisition and the in-process lock layer."""
+
+    async def test_acquire_uses_blocking_xact_lock(self):
+        service = ConcurrencyControlService()
+        db = mock_db()
+
+        assert await service.acquire_session_lock(db, uuid4(), timeout_seconds=2)
+
+        statements = [str(call.args[0]) for call in db.execute.call_args_list]
+        assert "pg_advisory_xact_lock" in statements[1]
+        assert db.execute.call_args_list[0].args[1] == {"timeout": "2000ms"}
+        assert not any("pg_try_advisory_lock" in s for s in statements)
+
+    async def test_same_session_is_serialized_in_process(self):
+        service = ConcurrencyControlService()
+        db = mock_db()
+        session_id = uuid4()
+        events = []
+
+        async def worker(name):
+            async with service.session_lock(db, session_id):
+                events.append(f"{name} start")
+                await asyncio.sleep(0.01)
+                events.append(f"{name} end")
+
+        await asyncio.gather(worker("a"), worker("b"))
+
+        assert events == ["a start", "a end", "b start", "b end"]
+
+    async def test_local_lock_timeout_raises(self):
+        service = ConcurrencyControlService()
+        db = mock_db()
+        session_id = uuid4()
+
+        async with service.session_lock(db, session_id):
+            with pytest.raises(SessionLockTimeoutError):
+                async with service.session_lock(db, session_id, timeout_seconds=0.01):
+                    pass
+
+    async def test_local_locks_are_released_when_unused(self):
+        service = ConcurrencyControlService()
+        db = mock_db()
+
+        async with service.session_lock(db, uuid4()):
+            assert len(service._local_locks) == 1
+
+        assert len(service._local_locks) == 0
+
+
+class TestChatTurns:
+    """Test that interaction turns on one session take the session lock."""
+
+    async def test_concurrent_turns_do_not_lose_updates(self, monkeypatch):
+        monkeypatch.setattr(
+            chat_runtime, "concurrency_service", ConcurrencyControlService()
+        )
+        session_id = uuid4()
+        stored = {"revision": 1}
+        db = mock_db()
+
+        async def refresh(session):
+            session.revision = stored["revision"]
+
+        db.refresh = refresh
+
+        async def process_turn(self, db, session, user_input, input_type):
+            seen = session.revision
+            await asyncio.sleep(0.01)
+            stored["revision"] = seen + 1
+            return {"input": user_input, "revision": seen}
+
+        monkeypatch.setattr(
+            chat_runtime.ChatRuntime, "_process_interaction", process_turn
+        )
+        runtime = chat_runtime.ChatRuntime()
+
+        # Each request loads its own copy of the session before the turn
+        results = await asyncio.gather(
+            *(
+                runtime.process_interaction(
+                    db,
+                    SimpleNamespace(
+                        id=session_id, revision=1, status=SessionStatus.ACTIVE
+                    ),
+                    text,
+                )
+                for text in ("first", "second")
+            )
+        )
+
+        assert [result["revision"] for result in results] == [1, 2]
+        assert stored["revision"] == 3
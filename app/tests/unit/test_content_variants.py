@@ -0,0 +1,219 @@
+"""Unit tests for in-memory content variant allocation and counters."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services import analytics, chat_runtime
+from app.services.content_variants import (
+    ContentVariantAllocator,
+    VariantArm,
+    traffic_shares,
+)
+
+CONTENT_ID = uuid.uuid4()
+
+
+def arm(key, weight=50, impressions=0, conversions=0):
+    return VariantArm(
+        id=uuid.uuid4(),
+        content_id=CONTENT_ID,
+        variant_key=key,
+        variant_data={"text": key},
+        weight=weight,
+        impressions=impressions,
+        conversions=conversions,
+    )
+
+
+def variant_row(variant):
+    return SimpleNamespace(content_id=variant.content_id, _mapping=dict(vars(variant)))
+
+
+def allocator():
+    allocation = ContentVariantAllocator(
+        refresh_seconds=30, exploration=0.1, flush_interval_seconds=10
+    )
+    # Flushes are driven explicitly in these tests
+    allocation._ensure_flush_task = lambda: None
+    return allocation
+
+
+class TestTrafficShares:
+    def test_configured_weights_without_data(self):
+        shares = traffic_shares([arm("a", 75), arm("b", 25)], exploration=0.1)
+
+        assert shares == pytest.approx([0.75, 0.25])
+
+    def test_converting_variant_gets_more_traffic(self):
+        shares = traffic_shares(
+            [
+                arm("a", impressions=1000, conversions=50),
+                arm("b", impressions=1000, conversions=200),
+            ],
+            exploration=0.1,
+        )
+
+        assert sum(shares) == pytest.approx(1.0)
+        assert shares[1] > 0.7
+        # Exploration floor keeps the weaker arm in play
+        assert shares[0] >= 0.05
+
+
+class TestAssign:
+    def test_assignment_is_stable_per_session(self):
+        arms = [arm("a"), arm("b")]
+        allocation = allocator()
+
+        picks = {
+            session: allocation.assign(CONTENT_ID, session, arms).variant_key
+            for session in range(200)
+        }
+
+        assert picks == {
+            session: allocation.assign(CONTENT_ID, session, arms).variant_key
+            for session in range(200)
+        }
+        assert set(picks.values()) == {"a", "b"}
+
+    def test_no_arms(self):
+        assert allocator().assign(CONTENT_ID, "session", []) is None
+
+
+class TestCounters:
+    async def test_arms_are_cached_and_include_pending_counts(self):
+        allocation = allocator()
+        variant = arm("a", impressions=10)
+        db = MagicMock(execute=AsyncMock(return_value=[variant_row(variant)]))
+
+        (loaded,) = (await allocation.get_arms_many(db, [CONTENT_ID]))[CONTENT_ID]
+        allocation.record(loaded, impressions=2, conversions=1)
+        allocation.invalidate(CONTENT_ID)
+        (reloaded,) = (await allocation.get_arms_many(db, [CONTENT_ID]))[CONTENT_ID]
+        await allocation.get_arms_many(db, [CONTENT_ID])
+
+        assert db.execute.await_count == 2
+        assert (reloaded.impressions, reloaded.conversions) == (12, 1)
+        assert allocation.pending_counts(variant.id) == {
+            "impressions": 2,
+            "engagements": 0,
+            "conversions": 1,
+        }
+
+    async def test_flush_sends_one_statement(self):
+        allocation = allocator()
+        arms = [arm("a"), arm("b")]
+        for variant in arms:
+            allocation.record(variant, impressions=3)
+        db = MagicMock(execute=AsyncMock(), commit=AsyncMock())
+
+        assert await allocation.flush(db) == 2
+
+        db.execute.assert_awaited_once()
+        db.commit.assert_awaited_once()
+        assert allocation.pending_counts(arms[0].id)["impressions"] == 0
+        assert await allocation.flush(db) == 0
+
+    async def test_failed_flush_keeps_counts(self):
+        allocation = allocator()
+        variant = arm("a")
+        allocation.record(variant, impressions=3)
+        db = MagicMock(execute=AsyncMock(side_effect=RuntimeError), commit=AsyncMock())
+
+        with pytest.raises(RuntimeError):
+            await allocation.flush(db)
+
+        allocation.record(variant, impressions=1)
+        assert allocation.pending_counts(variant.id)["impressions"] == 4
+
+
+class TestSessionAssignment:
+    """The chat runtime keeps a session on the variant it was first shown."""
+
+    async def test_conversions_credit_the_variant_shown(self, monkeypatch):
+        allocation = allocator()
+        arms = [arm("a"), arm("b")]
+        allocation._arms[CONTENT_ID] = (0.0, arms)
+        allocation._clock = lambda: 0.0
+        monkeypatch.setattr(
+            chat_runtime, "get_content_variant_allocator", lambda: allocation
+        )
+        session = SimpleNamespace(id=uuid.uuid4(), state={})
+        commits = []
+
+        async def update_session_state(db, *, session_id, state_updates, commit):
+            session.state = {"system": dict(state_updates["system"])}
+            commits.append(commit)
+            return session
+
+        monkeypatch.setattr(
+            chat_runtime.chat_repo, "update_session_state", update_session_state
+        )
+        processor = chat_runtime.MessageNodeProcessor(MagicMock())
+
+        shown = (await processor.assign_variants(None, [CONTENT_ID], session))[
+            CONTENT_ID
+        ]
+        # Enough traffic on the other variant to move every share boundary
+        other = next(variant for variant in arms if variant is not shown)
+        allocation.record(other, impressions=1000, conversions=900)
+        again = await processor.assign_variants(
+            None, [CONTENT_ID], session, impressions=1
+        )
+        credited = await processor.credit_variants(
+            None, [CONTENT_ID], session, conversions=1
+        )
+
+        assert again[CONTENT_ID] is shown
+        # Stored once, and left for the turn's own commit
+        assert commits == [False]
+        assert credited[CONTENT_ID] is shown
+        assert allocation.pending_counts(shown.id)["conversions"] == 1
+        assert (
+            await processor.credit_variants(
+                None, [CONTENT_ID], SimpleNamespace(id=uuid.uuid4(), state={})
+            )
+            == {}
+        )
+
+
+class TestResults:
+    async def results(self, monkeypatch, arms, reported):
+        allocation = allocator()
+        allocation._arms[CONTENT_ID] = (allocation._clock(), arms)
+        monkeypatch.setattr(
+            analytics, "get_content_variant_allocator", lambda: allocation
+        )
+        rows = MagicMock(all=lambda: list(reported.items()))
+        db = MagicMock(execute=AsyncMock(return_value=rows))
+
+        results = await analytics.AnalyticsService().get_content_ab_test_results(
+            db, str(CONTENT_ID)
+        )
+        return results["test_results"]
+
+    async def test_counters_alone(self, monkeypatch):
+        a, b = arm("a", impressions=100, conversions=5), arm("b", impressions=50)
+        results = await self.results(monkeypatch, [a, b], {a.id: None, b.id: {}})
+
+        assert results["a"]["sample_size"] == 100
+        assert results["a"]["conversion_rate"] == pytest.approx(0.05)
+        assert results["b"]["sample_size"] == 50
+
+    async def test_reported_totals_are_added_to_counters(self, monkeypatch):
+        a, b = arm("a", impressions=100, conversions=5), arm("b")
+        reported = {
+            a.id: {"impressions": 100, "conversions": 15},
+            b.id: {"impressions": 40, "engagements": 10},
+        }
+
+        results = await self.results(monkeypatch, [a, b], reported)
+
+        assert results["a"]["sample_size"] == 200
+        assert results["a"]["conversion_rate"] == pytest.approx(0.1)
+        assert results["b"]["sample_size"] == 40
+        assert results["b"]["engagement_rate"] == pytest.approx(0.25)
+        # The cached arms keep counting from the allocator alone
+        assert (a.impressions, b.impressions) == (100, 0)
@@ -0,0 +1,201 @@
+"""Unit tests for the cover variant and placeholder pipeline."""
+
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.api import editions as editions_api
+from app.config import get_settings
+from app.schemas.edition import CoverImage, EditionUpdateIn
+from app.schemas.hydration import HydratedBookData
+from app.services import cover_derivatives, cover_images, hydration
+from app.services.cover_derivatives import (
+    CoverDerivativePipeline,
+    _encode83,
+    blurhash,
+    render_cover_derivatives,
+)
+from app.services.object_storage import LocalObjectStorage
+
+BASE_URL = "http://storage.test"
+
+settings = get_settings()
+
+
+def cover_bytes(size=(400, 600), color=(200, 30, 30), fmt="PNG", mode="RGB"):
+    image = Image.new(mode, size, color)
+    # A second colour band, so the image isn't uniform
+    image.paste((20, 20, 160) if mode == "RGB" else 0, (0, 0, size[0], size[1] // 4))
+    encoded = BytesIO()
+    image.save(encoded, format=fmt)
+    return encoded.getvalue()
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = LocalObjectStorage(tmp_path, BASE_URL, max_concurrent_uploads=2)
+    monkeypatch.setattr(cover_derivatives, "get_object_storage", lambda: storage)
+    yield storage
+    storage.shutdown()
+
+
+class TestRender:
+    def test_variants_at_each_width_without_upscaling(self):
+        rendered = render_cover_derivatives(cover_bytes(), [160, 320, 640])
+
+        assert (rendered.width, rendered.height) == (400, 600)
+        assert [(v.width, v.height, v.format) for v in rendered.variants] == [
+            (160, 240, "jpeg"),
+            (160, 240, "webp"),
+            (320, 480, "jpeg"),
+            (320, 480, "webp"),
+            (400, 600, "jpeg"),
+            (400, 600, "webp"),
+        ]
+        for variant in rendered.variants:
+            with Image.open(BytesIO(variant.data)) as image:
+                assert image.format.lower() == variant.format
+                assert image.size == (variant.width, variant.height)
+
+    def test_placeholders(self):
+        rendered = render_cover_derivatives(cover_bytes(), [160])
+
+        # 4x3 components: size flag, max, dc and 11 ac values
+        assert len(rendered.blurhash) == 1 + 1 + 4 + 2 * 11
+        assert rendered.blurhash[0] == "L"
+        assert rendered.dominant_color == "#c81e1e"
+
+    def test_transparent_covers_are_flattened_onto_white(self):
+        rendered = render_cover_derivatives(
+            cover_bytes(color=(0, 0, 0, 0), mode="RGBA"), [160]
+        )
+
+        assert rendered.dominant_color == "#ffffff"
+
+    def test_blurhash_average_colour(self):
+        image = Image.new("RGB", (8, 8), (255, 255, 255))
+
+        # Characters 2-6 encode the average (DC) colour
+        assert blurhash(image)[2:6] == _encode83(0xFFFFFF, 4)
+
+    def test_invalid_image(self):
+        with pytest.raises(OSError):
+            render_cover_derivatives(b"not an image", [160])
+
+
+class TestPipeline:
+    def test_submit_uploads_variants_and_collect_returns_cover_image(self, storage):
+        pipeline = CoverDerivativePipeline(processes=0, widths=[160, 320])
+        original_url = f"{BASE_URL}/covers/nielsen/978.png"
+
+        uploads = storage.batch()
+
+        pipeline.submit(
+            cover_bytes(), original_url, "covers", "nielsen", "978", uploads=uploads
+        )
+        cover_images = pipeline.collect([original_url, None])
+
+        assert uploads.drain() == []
+        cover_image = cover_images[original_url]
+        assert isinstance(cover_image, CoverImage)
+        assert str(cover_image.variants[0].url) == (
+            f"{BASE_URL}/covers/derivatives/nielsen/978/160.jpeg"
+        )
+        assert storage.download("covers", "derivatives/nielsen/978/320.webp")
+        # Results are handed out once
+        assert pipeline.collect([original_url]) == {}
+
+    def test_failed_render_is_left_out(self, storage):
+        pipeline = CoverDerivativePipeline(processes=0, widths=[160])
+
+        pipeline.submit(b"broken", f"{BASE_URL}/covers/x.png", "covers", None, "x")
+
+        assert pipeline.collect([f"{BASE_URL}/covers/x.png"]) == {}
+
+
+def test_variants_are_only_rendered_when_they_will_be_collected(storage, monkeypatch):
+    pipeline = CoverDerivativePipeline(processes=0, widths=[160])
+    monkeypatch.setattr(cover_images, "get_cover_derivative_pipeline", lambda: pipeline)
+    monkeypatch.setattr(cover_images, "get_object_storage", lambda: storage)
+    image_data = "data:image/png;base64," + base64.b64encode(cover_bytes()).decode()
+
+    url = cover_images.handle_new_edition_cover_image("978", image_data, "open")
+    assert url and not pipeline._results
+
+    collected_url = cover_images.handle_new_edition_cover_image(
+        "979", image_data, "open", variants=True
+    )
+    assert list(pipeline.collect([collected_url])) == [collected_url]
+    assert not pipeline._results
+
+
+def test_cover_update_stores_its_variants(storage, monkeypatch):
+    pipeline = CoverDerivativePipeline(processes=0, widths=[160])
+    monkeypatch.setattr(cover_images, "get_cover_derivative_pipeline", lambda: pipeline)
+    monkeypatch.setattr(cover_images, "get_object_storage", lambda: storage)
+    monkeypatch.setattr(editions_api, "get_cover_derivative_pipeline", lambda: pipeline)
+    monkeypatch.setattr(editions_api, "get_object_storage", lambda: storage)
+    monkeypatch.setattr(
+        editions_api.edition_repository,
+        "update",
+        lambda db, db_obj, obj_in, merge_dicts: SimpleNamespace(
+            title="A Book", isbn=db_obj.isbn, **obj_in
+        ),
+    )
+    monkeypatch.setattr(editions_api.event_repository, "create", lambda *a, **kw: None)
+    edition = SimpleNamespace(isbn="978", cover_url=f"{BASE_URL}/wriveted/978.png")
+    image_data = "data:image/png;base64," + base64.b64encode(cover_bytes()).decode()
+
+    updated = editions_api.update_edition(
+        EditionUpdateIn(cover_url=image_data),
+        session=None,
+        edition=edition,
+        merge_dicts=False,
+        account=None,
+    )
+
+    assert (
+        updated.cover_url == f"{BASE_URL}/{settings.GCP_IMAGE_BUCKET}/wriveted/978.png"
+    )
+    assert updated.cover_image["variants"][0]["width"] == 160
+    assert not pipeline._results
+
+
+def test_hydration_keeps_variants_of_an_unchanged_cover(monkeypatch):
+    cover_url = f"{BASE_URL}/nielsen/978.jpg"
+    edition = SimpleNamespace(
+        cover_url=cover_url,
+        cover_image={"width": 400},
+        info={},
+        date_published=2020,
+        work=SimpleNamespace(id=1),
+    )
+    monkeypatch.setattr(hydration.edition_repository, "get", lambda db, id: edition)
+    monkeypatch.setattr(
+        hydration.labelset_repository, "get_or_create", lambda db, work: work
+    )
+    monkeypatch.setattr(hydration.labelset_repository, "patch", lambda db, **kw: None)
+    monkeypatch.setattr(
+        hydration, "LabelSetCreateIn", SimpleNamespace(model_validate=lambda data: data)
+    )
+    session = SimpleNamespace(flush=lambda: None)
+
+    # A cached cover has no fresh variants
+    hydration.save_editions(
+        session,
+        [HydratedBookData(isbn="978", cover_url=cover_url)],
+        queue_labelling=False,
+    )
+    assert edition.cover_image == {"width": 400}
+
+    hydration.save_editions(
+        session,
+        [HydratedBookData(isbn="978", cover_url=f"{BASE_URL}/nielsen/978-new.jpg")],
+        queue_labelling=False,
+    )
+    assert edition.cover_image is None
@@ -0,0 +1,57 @@
+"""Unit tests for projecting event rows for the events listing."""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi_permissions import has_permission
+
+from app.models.event import Event, EventLevel, event_acl
+from app.repositories.event_repository import event_repository
+
+
+def event_row(**overrides):
+    row = dict(
+        title="Reader timeline event: Read a book",
+        info={"description": "Loved it"},
+        level=EventLevel.NORMAL,
+        timestamp=datetime(2024, 1, 1),
+        school_id=None,
+        user_id=uuid.uuid4(),
+        school_wriveted_identifier=None,
+        school_name=None,
+        user_type="student",
+        user_name="Sam",
+        service_account_id=None,
+        service_account_name=None,
+        service_account_type=None,
+        service_account_is_active=None,
+    )
+    row.update(overrides)
+    return SimpleNamespace(**row)
+
+
+def test_event_acl_matches_model_acl():
+    user_id = uuid.uuid4()
+    event = Event(title="Reader timeline event: x", school_id=3, user_id=user_id)
+
+    assert event.__acl__() == event_acl(3, user_id, "Reader timeline event: x")
+
+
+def test_row_maps_to_event_detail():
+    row = event_row()
+
+    detail = event_repository._event_detail_from_row(row)
+
+    assert detail.description == "Loved it"
+    assert detail.user.name == "Sam"
+    assert detail.school is None
+    assert detail.service_account is None
+
+
+def test_row_acl_allows_supporter():
+    row = event_row()
+    acl = event_acl(row.school_id, row.user_id, row.title)
+
+    assert has_permission([f"supporter:{row.user_id}"], "read", acl)
+    assert not has_permission([f"educator:{row.school_id}"], "read", acl)
@@ -0,0 +1,128 @@
+"""Unit tests for flow event debouncing and batched webhook delivery."""
+
+import asyncio
+import json
+import uuid
+from datetime import datetime
+
+import httpx
+from pydantic import HttpUrl
+
+from app.services.event_listener import FlowEvent, FlowEventCoalescer
+from app.services.webhook_notifier import WebhookConfig, WebhookNotifier
+
+
+def flow_event(
+    session_id, event_type, previous_node=None, current_node=None, revision=1
+):
+    return FlowEvent(
+        event_type=event_type,
+        session_id=session_id,
+        flow_id=uuid.uuid4(),
+        timestamp=datetime.utcnow().timestamp(),
+        previous_node=previous_node,
+        current_node=current_node,
+        revision=revision,
+        previous_revision=revision - 1,
+    )
+
+
+class TestFlowEventCoalescer:
+    """Test per-session debouncing."""
+
+    async def test_node_changes_are_merged(self):
+        dispatched = []
+
+        async def dispatch(event):
+            dispatched.append(event)
+
+        coalescer = FlowEventCoalescer(dispatch, debounce_seconds=0.01)
+        session_id = uuid.uuid4()
+        for revision, (previous, current) in enumerate(
+            [("a", "b"), ("b", "c"), ("c", "d")], start=2
+        ):
+            coalescer.add(
+                flow_event(session_id, "node_changed", previous, current, revision)
+            )
+
+        await asyncio.sleep(0.05)
+
+        (merged,) = dispatched
+        assert (merged.previous_node, merged.current_node) == ("a", "d")
+        assert (merged.previous_revision, merged.revision) == (1, 4)
+
+    async def test_other_events_flush_pending_in_order(self):
+        dispatched = []
+
+        async def dispatch(event):
+            dispatched.append(event.event_type)
+
+        coalescer = FlowEventCoalescer(dispatch, debounce_seconds=10)
+        session_id = uuid.uuid4()
+        coalescer.add(flow_event(session_id, "session_started"))
+        coalescer.add(flow_event(session_id, "node_changed", "a", "b"))
+        coalescer.add(flow_event(session_id, "session_updated"))
+        coalescer.add(flow_event(session_id, "session_status_changed"))
+        await coalescer.flush_all()
+
+        assert dispatched == [
+            "session_started",
+            "node_changed",
+            "session_status_changed",
+        ]
+
+    async def test_sessions_are_debounced_independently(self):
+        dispatched = []
+
+        async def dispatch(event):
+            dispatched.append(event.session_id)
+
+        coalescer = FlowEventCoalescer(dispatch, debounce_seconds=10)
+        sessions = [uuid.uuid4(), uuid.uuid4()]
+        for session_id in sessions * 3:
+            coalescer.add(flow_event(session_id, "node_changed"))
+        await coalescer.flush_all()
+
+        assert sorted(dispatched) == sorted(sessions)
+        assert (coalescer.received, coalescer.dispatched) == (6, 2)
+
+
+class TestWebhookNotifierQueues:
+    """Test per-webhook delivery queues."""
+
+    async def _deliver(self, webhook, events):
+        requests = []
+
+        def receiver(request):
+            requests.append(json.loads(request.content))
+            return httpx.Response(200)
+
+        notifier = WebhookNotifier()
+        notifier.client = httpx.AsyncClient(transport=httpx.MockTransport(receiver))
+        notifier.add_webhook(webhook)
+        for event in events:
+            await notifier.notify_event(event)
+        await notifier.shutdown()
+        return requests
+
+    async def test_batched_webhook_receives_multi_event_payloads(self):
+        webhook = WebhookConfig(
+            url=HttpUrl("https://example.com/hook"),
+            batch_events=True,
+            max_batch_size=10,
+            max_concurrency=1,
+        )
+        events = [flow_event(uuid.uuid4(), "session_started") for _ in range(25)]
+
+        requests = await self._deliver(webhook, events)
+
+        assert [len(body["events"]) for body in requests] == [10, 10, 5]
+
+    async def test_unbatched_webhook_receives_one_request_per_event(self):
+        webhook = WebhookConfig(url=HttpUrl("https://example.com/hook"))
+        events = [flow_event(uuid.uuid4(), "session_started") for _ in range(5)]
+
+        requests = await self._deliver(webhook, events)
+
+        assert len(requests) == 5
+        assert all(body["event_type"] == "session_started" for body in requests)
@@ -0,0 +1,117 @@
+"""Unit tests for the compiled flow graph cache."""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cms import ConnectionType, FlowConnection, FlowNode, NodeType
+from app.services.flow_graph import CompiledFlow, FlowGraphCache, _load_detached
+
+
+def connection(source, target, connection_type):
+    return FlowConnection(
+        id=uuid.uuid4(),
+        source_node_id=source,
+        target_node_id=target,
+        connection_type=connection_type,
+    )
+
+
+def compiled_flow(flow_id=None):
+    flow = SimpleNamespace(id=flow_id or uuid.uuid4(), name="Flow", entry_node_id="a")
+    nodes = [
+        FlowNode(id=uuid.uuid4(), node_id=node_id, node_type=NodeType.MESSAGE)
+        for node_id in ("a", "b", "c")
+    ]
+    connections = [
+        connection("a", "c", ConnectionType.DEFAULT),
+        connection("a", "b", ConnectionType.OPTION_0),
+    ]
+    return CompiledFlow.build(flow, nodes, connections)
+
+
+class TestCompiledFlow:
+    """Test lookups on a compiled flow."""
+
+    def test_entry_node_and_default_target(self):
+        compiled = compiled_flow()
+
+        assert compiled.entry_node.node_id == "a"
+        assert compiled.default_target("a") == "c"
+        assert compiled.default_target("b") is None
+
+    def test_connections_follow_enum_order(self):
+        compiled = compiled_flow()
+
+        assert [conn.connection_type for conn in compiled.get_connections("a")] == [
+            ConnectionType.DEFAULT,
+            ConnectionType.OPTION_0,
+        ]
+
+    async def test_attached_node_does_not_share_content(self):
+        compiled = compiled_flow()
+        cached = compiled.nodes["a"]
+        cached.content = {"messages": [{"text": "Hi"}]}
+        db = AsyncSession()
+
+        attached = await compiled.attach_node(db, "a")
+        attached.content["messages"][0]["text"] = "Bye"
+
+        assert attached in db
+        assert cached.content == {"messages": [{"text": "Hi"}]}
+
+
+class TestFlowGraphCache:
+    """Test expiry and invalidation."""
+
+    async def test_cached_until_ttl_or_invalidation(self):
+        now = [0.0]
+        cache = FlowGraphCache(ttl_seconds=60, clock=lambda: now[0])
+        flow_id = uuid.uuid4()
+        cache._load = AsyncMock(side_effect=lambda db, fid: compiled_flow(fid))
+
+        first = await cache.get(MagicMock(), flow_id)
+        now[0] = 30.0
+        assert await cache.get(MagicMock(), flow_id) is first
+        assert cache._load.await_count == 1
+
+        now[0] = 61.0
+        assert await cache.get(MagicMock(), flow_id) is not first
+        cache.invalidate(flow_id)
+        await cache.get(MagicMock(), flow_id)
+        assert cache._load.await_count == 3
+
+    async def test_least_recently_used_flow_is_evicted(self):
+        cache = FlowGraphCache(ttl_seconds=60, max_flows=2, clock=lambda: 0.0)
+        cache._load = AsyncMock(side_effect=lambda db, fid: compiled_flow(fid))
+        first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+        for flow_id in (first, second, first, third):
+            await cache.get(MagicMock(), flow_id)
+
+        assert list(cache._entries) == [first, third]
+
+
+class TestLoadDetached:
+    """Cached instances never join the loading session."""
+
+    async def test_rows_become_detached_instances(self):
+        column_attrs = inspect(FlowNode).column_attrs
+        node_id = uuid.uuid4()
+        row = tuple(
+            {"id": node_id, "node_id": "a", "node_type": NodeType.MESSAGE}.get(attr.key)
+            for attr in column_attrs
+        )
+        db = MagicMock()
+        db.execute = AsyncMock(return_value=[row])
+
+        (node,) = await _load_detached(db, FlowNode, FlowNode.node_id == "a")
+
+        state = inspect(node)
+        assert state.detached
+        assert state.identity == (node_id,)
+        assert not state.modified
+        assert node.node_type == NodeType.MESSAGE
@@ -0,0 +1,162 @@
+"""Unit tests for the batched GPT labelling worker, against the stub LLM server."""
+
+import httpx
+import openai
+import pytest
+
+from app.schemas.gpt import GptWorkData
+from app.services.gpt import create_labelset_from_ml_labelled_work, labelling_worker
+from app.services.gpt.labelling_worker import (
+    GptLabeller,
+    LabellingResult,
+    LabellingWorker,
+    LabelPromptCache,
+    TokenBucket,
+)
+from app.services.gpt.stub_server import create_stub_llm_app, stub_label
+from app.services.object_storage import LocalObjectStorage
+
+
+def labeller_for(stub, **kwargs):
+    client = openai.AsyncOpenAI(
+        api_key="stub",
+        base_url="http://stub/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=stub)),
+        max_retries=3,
+    )
+    kwargs.setdefault("requests_per_minute", 10_000)
+    kwargs.setdefault("tokens_per_minute", 10_000_000)
+    return GptLabeller(client=client, model="stub-model", **kwargs)
+
+
+def prompts(n):
+    return [(work_id, f"Title: Book {work_id}") for work_id in range(1, n + 1)]
+
+
+class TestTokenBucket:
+    async def test_waits_for_refill(self, monkeypatch):
+        now = [0.0]
+
+        async def sleep(seconds):
+            now[0] += seconds
+
+        monkeypatch.setattr(labelling_worker.asyncio, "sleep", sleep)
+        bucket = TokenBucket(per_minute=60, clock=lambda: now[0])
+
+        await bucket.acquire(60)
+        await bucket.acquire(3)
+
+        assert now[0] == pytest.approx(3)
+
+    async def test_adjust_puts_bucket_in_debt(self, monkeypatch):
+        now = [0.0]
+
+        async def sleep(seconds):
+            now[0] += seconds
+
+        monkeypatch.setattr(labelling_worker.asyncio, "sleep", sleep)
+        bucket = TokenBucket(per_minute=60, clock=lambda: now[0])
+
+        await bucket.acquire(10)
+        # The request cost 60 more than reserved, leaving the bucket at -10
+        bucket.adjust(60)
+        await bucket.acquire(1)
+
+        assert now[0] == pytest.approx(11)
+
+
+class TestGptLabeller:
+    async def test_requests_run_concurrently(self):
+        stub = create_stub_llm_app(latency=0.1)
+        labeller = labeller_for(stub, concurrency=10)
+
+        results = await labeller.label_many(prompts(10))
+
+        assert all(isinstance(result.output, GptWorkData) for result in results)
+        assert [result.work_id for result in results] == list(range(1, 11))
+        assert results[0].usage.overall_total_tokens > 0
+        assert stub.state.max_in_flight == 10
+
+    async def test_concurrency_is_bounded(self):
+        stub = create_stub_llm_app(latency=0.05)
+        labeller = labeller_for(stub, concurrency=2)
+
+        await labeller.label_many(prompts(6))
+
+        assert stub.state.requests == 6
+        assert stub.state.max_in_flight == 2
+
+    async def test_rate_limited_requests_are_retried(self):
+        stub = create_stub_llm_app(rate_limit_fraction=0.3, seed=3)
+        labeller = labeller_for(stub)
+
+        results = await labeller.label_many(prompts(5))
+
+        assert all(result.output is not None for result in results)
+        assert stub.state.requests > 5
+
+    async def test_invalid_output_gives_up_after_retries(self):
+        stub = create_stub_llm_app(invalid_fraction=1.0)
+        labeller = labeller_for(stub, retries=2)
+
+        (result,) = await labeller.label_many(prompts(1))
+
+        assert result.output is None
+        assert result.error
+        assert len(result.usage.usages) == 3
+
+    async def test_cached_prompts_make_no_requests(self, tmp_path, monkeypatch):
+        storage = LocalObjectStorage(tmp_path, "http://storage.test")
+        monkeypatch.setattr(labelling_worker, "get_object_storage", lambda: storage)
+        stub = create_stub_llm_app()
+        labeller = labeller_for(stub, cache=LabelPromptCache("book-data"))
+
+        first = await labeller.label_many(prompts(3))
+        again = await labeller.label_many(prompts(4))
+
+        assert stub.state.requests == 4
+        assert [result.cached for result in again] == [True, True, True, False]
+        assert again[0].output == first[0].output
+        storage.shutdown()
+
+
+class TestLabellingWorker:
+    async def test_run_pages_through_unlabelled_works(self):
+        worker = LabellingWorker(session_maker=None, labeller=object(), batch_size=2)
+        pages = {0: [1, 2], 2: [5, 9], 9: [12]}
+        labelled = []
+
+        async def next_unlabelled_ids(session, after_id, limit):
+            return pages.get(after_id, [])[:limit]
+
+        async def label_batch(work_ids):
+            labelled.append(list(work_ids))
+            return [
+                LabellingResult(work_id, output=None if work_id == 5 else object())
+                for work_id in work_ids
+            ]
+
+        class NoSession:
+            async def __aenter__(self):
+                return None
+
+            async def __aexit__(self, *exc):
+                return False
+
+        worker.session_maker = NoSession
+        worker.next_unlabelled_ids = next_unlabelled_ids
+        worker.label_batch = label_batch
+
+        stats = await worker.run(max_works=4)
+
+        assert labelled == [[1, 2], [5, 9]]
+        assert (stats.labelled, stats.failed) == (3, 1)
+
+
+def test_labelset_without_ages_keeps_existing_ages():
+    data = stub_label("prompt")
+    del data["min_age"], data["max_age"]
+
+    labelset = create_labelset_from_ml_labelled_work(GptWorkData(**data))
+
+    assert labelset.age_origin is None
@@ -0,0 +1,164 @@
+"""Unit tests for bulk labelset patching and the cached hue/reading ability lookups."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.sql import Delete, Insert, Select
+
+from app.models.hue import Hue
+from app.models.labelset import LabelOrigin, LabelSet
+from app.models.labelset_hue_association import Ordinal
+from app.models.reading_ability import ReadingAbility
+from app.repositories.labelset_repository import labelset_repository
+from app.schemas.labelset import LabelSetCreateIn
+from app.services import reference_data
+from app.services.reference_data import (
+    HueRef,
+    ReadingAbilityRef,
+    ReferenceData,
+    ReferenceDataRegistry,
+)
+
+HUES = {
+    key: HueRef(id, key, key)
+    for id, key in enumerate(["hue01_dark", "hue02_beautiful", "hue03_dark"], 1)
+}
+READING_ABILITIES = {
+    key: ReadingAbilityRef(id, key, key)
+    for id, key in enumerate(["SPOT", "CAT_HAT", "TREEHOUSE"], 1)
+}
+
+
+class LabelsetSession:
+    """Serves the hue ordinals of ``labelsets`` and records every write."""
+
+    def __init__(self, *labelsets):
+        self.hue_rows = [
+            (labelset.id, hue.id, ordinal)
+            for labelset in labelsets
+            for hue, ordinal in zip(labelset.hues, Ordinal)
+        ]
+        self.writes = []
+        self.expired = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        if isinstance(statement, Select):
+            return SimpleNamespace(all=lambda: self.hue_rows)
+        self.writes.append((statement, params))
+
+    def expire(self, instance, attribute_names=None):
+        self.expired.append(instance)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def cached_reference_data(monkeypatch):
+    registry = ReferenceDataRegistry(refresh_interval_seconds=3600)
+    registry.load(
+        ReferenceData(
+            hues=HUES, reading_abilities=READING_ABILITIES, countries={}, products={}
+        ),
+        version=1,
+    )
+    monkeypatch.setattr(reference_data, "reference_data_registry", registry)
+
+
+def labelset(id, hue_keys=(), reading_ability_keys=()):
+    return LabelSet(
+        id=id,
+        hue_origin=LabelOrigin.PREDICTED_NIELSEN if hue_keys else None,
+        hues=[Hue(id=HUES[key].id, key=key) for key in hue_keys],
+        reading_abilities=[
+            ReadingAbility(id=READING_ABILITIES[key].id, key=key)
+            for key in reading_ability_keys
+        ],
+    )
+
+
+def gpt_patch(*hue_keys, reading_ability_keys=None):
+    return LabelSetCreateIn(
+        hue_primary_key=hue_keys[0] if hue_keys else None,
+        hue_secondary_key=hue_keys[1] if len(hue_keys) > 1 else None,
+        hue_origin=LabelOrigin.GPT4,
+        reading_ability_keys=reading_ability_keys,
+        reading_ability_origin=LabelOrigin.GPT4 if reading_ability_keys else None,
+    )
+
+
+def test_patch_many_writes_each_association_table_once(cached_reference_data):
+    unchanged = labelset(1, ["hue01_dark", "hue02_beautiful"], ["SPOT"])
+    rehued = labelset(2, ["hue01_dark"])
+    fresh = labelset(3)
+    session = LabelsetSession(unchanged, rehued, fresh)
+
+    patched = labelset_repository.patch_many(
+        session,
+        [
+            (
+                unchanged,
+                gpt_patch(
+                    "hue01_dark", "hue02_beautiful", reading_ability_keys=["SPOT"]
+                ),
+            ),
+            (rehued, gpt_patch("hue03_dark", "unknown_hue")),
+            (
+                fresh,
+                gpt_patch(
+                    "hue02_beautiful",
+                    reading_ability_keys=["CAT_HAT", "NOPE", "CAT_HAT"],
+                ),
+            ),
+        ],
+    )
+
+    assert patched == 3
+    delete_hues, insert_hues, delete_abilities, insert_abilities = session.writes
+    assert isinstance(delete_hues[0], Delete) and isinstance(insert_hues[0], Insert)
+    assert isinstance(delete_abilities[0], Delete)
+    assert isinstance(insert_abilities[0], Insert)
+    assert insert_hues[1] == [
+        {"labelset_id": 2, "hue_id": 3, "ordinal": Ordinal.PRIMARY},
+        {"labelset_id": 3, "hue_id": 2, "ordinal": Ordinal.PRIMARY},
+    ]
+    assert insert_abilities[1] == [{"labelset_id": 3, "reading_ability_id": 2}]
+    assert session.expired == [rehued, fresh]
+    assert fresh.hue_origin == fresh.reading_ability_origin == LabelOrigin.GPT4
+    assert session.commits == 1
+
+
+def test_swapped_hue_ordinals_are_written(cached_reference_data):
+    swapped = labelset(1, ["hue01_dark", "hue02_beautiful"])
+    session = LabelsetSession(swapped)
+
+    labelset_repository.patch_many(
+        session, [(swapped, gpt_patch("hue02_beautiful", "hue01_dark"))]
+    )
+
+    (_, (_, rows)) = session.writes
+    assert {(row["hue_id"], row["ordinal"]) for row in rows} == {
+        (2, Ordinal.PRIMARY),
+        (1, Ordinal.SECONDARY),
+    }
+    assert session.expired == [swapped]
+
+
+def test_failed_patches_can_be_skipped(cached_reference_data):
+    session = LabelsetSession()
+    # An origin that is no longer weighted can't be compared against
+    retired = LabelSet(id=1, hue_origin="RETIRED", hues=[], reading_abilities=[])
+
+    patched = labelset_repository.patch_many(
+        session,
+        [(retired, gpt_patch("hue01_dark")), (labelset(2), gpt_patch("hue01_dark"))],
+        raise_errors=False,
+    )
+
+    assert patched == 1
+    assert session.writes[1][1] == [
+        {"labelset_id": 2, "hue_id": 1, "ordinal": Ordinal.PRIMARY}
+    ]
+    with pytest.raises(KeyError):
+        labelset_repository.patch_many(session, [(retired, gpt_patch("hue01_dark"))])
@@ -0,0 +1,61 @@
+"""Unit tests for application startup and shutdown."""
+
+from types import SimpleNamespace
+
+import app.events as events
+
+
+class Service:
+    def __init__(self, name, calls, fail=False):
+        self.name = name
+        self.calls = calls
+        self.fail = fail
+
+    def shutdown(self):
+        self.calls.append(self.name)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+
+
+class AsyncService(Service):
+    async def shutdown(self):
+        super().shutdown()
+
+
+def install_services(monkeypatch, calls, failing=()):
+    for getter, service in (
+        ("get_content_variant_allocator", AsyncService("variants", calls)),
+        ("get_login_recorder", AsyncService("logins", calls)),
+        ("get_cover_derivative_pipeline", Service("covers", calls)),
+        ("get_object_storage", Service("storage", calls)),
+    ):
+        service.fail = service.name in failing
+        monkeypatch.setattr(events, getter, lambda service=service: service)
+
+    async def preload():
+        calls.append("preload")
+
+    monkeypatch.setattr(events.reference_data_registry, "preload", preload)
+
+
+async def test_services_shut_down_with_the_event_listener_disabled(monkeypatch):
+    calls = []
+    install_services(monkeypatch, calls)
+    monkeypatch.setattr(
+        events, "get_settings", lambda: SimpleNamespace(DISABLE_EVENT_LISTENER=True)
+    )
+
+    async with events.lifespan(None):
+        assert calls == ["preload"]
+
+    assert calls == ["preload", "variants", "logins", "covers", "storage"]
+
+
+async def test_a_failing_shutdown_does_not_stop_the_rest(monkeypatch):
+    calls = []
+    install_services(monkeypatch, calls, failing={"variants", "covers"})
+
+    async with events.internal_lifespan(None):
+        pass
+
+    assert calls == ["preload", "variants", "logins", "covers", "storage"]
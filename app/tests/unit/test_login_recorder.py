@@ -0,0 +1,102 @@
+"""Unit tests for the class-code login lookup and batched login recording."""
+
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy.sql import Insert, Update
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud
+from app.services import event_outbox_service
+from app.services.login_recorder import (
+    LOGIN_EVENT_DESTINATION,
+    LOGIN_EVENT_TYPE,
+    Login,
+    LoginRecorder,
+    apply_login_batch,
+)
+
+STUDENT_A = uuid.uuid4()
+STUDENT_B = uuid.uuid4()
+
+
+@pytest.fixture
+def published(monkeypatch):
+    batches = []
+
+    async def publish_events(self, db, events):
+        batches.append(events)
+        return events
+
+    monkeypatch.setattr(
+        event_outbox_service.EventOutboxService, "publish_events", publish_events
+    )
+    return batches
+
+
+async def test_login_lookup_is_one_query(counting_db):
+    await crud.user.aget_student_class_code_login(
+        counting_db, username="SamK12", class_joining_code="BCD234"
+    )
+
+    assert counting_db.round_trips == 1
+
+
+class TestLoginRecorder:
+    async def test_flush_publishes_buffered_logins_in_batches(
+        self, counting_db, published
+    ):
+        recorder = LoginRecorder(flush_interval_seconds=60, max_batch=2)
+        for user_id in (STUDENT_A, STUDENT_B, STUDENT_A):
+            recorder.record(user_id)
+
+        assert await recorder.flush(counting_db) == 3
+
+        (events,) = published
+        assert [len(event["payload"]["logins"]) for event in events] == [2, 1]
+        assert {event["event_type"] for event in events} == {LOGIN_EVENT_TYPE}
+        assert {event["destination"] for event in events} == {LOGIN_EVENT_DESTINATION}
+        assert counting_db.commits == 1
+        assert await recorder.flush(counting_db) == 0
+        await recorder.shutdown()
+
+    async def test_failed_flush_keeps_logins(self, counting_db, monkeypatch):
+        async def publish_events(self, db, events):
+            raise ConnectionError("database unavailable")
+
+        monkeypatch.setattr(
+            event_outbox_service.EventOutboxService, "publish_events", publish_events
+        )
+        recorder = LoginRecorder(flush_interval_seconds=60, max_batch=10)
+        recorder.record(STUDENT_A)
+
+        with pytest.raises(ConnectionError):
+            await recorder.flush(counting_db)
+
+        assert [login.user_id for login in recorder._pending] == [STUDENT_A]
+        recorder._pending.clear()
+        await recorder.shutdown()
+
+
+async def test_login_batch_is_two_statements_and_one_commit(counting_db):
+    first, later = datetime(2024, 2, 1, 9, 0), datetime(2024, 2, 1, 9, 5)
+    logins = [
+        Login(STUDENT_A, first),
+        Login(STUDENT_B, first),
+        Login.from_payload(Login(STUDENT_A, later).to_payload()),
+    ]
+
+    await apply_login_batch(counting_db, logins)
+
+    (insert_events, update_users) = counting_db.statements
+    assert isinstance(insert_events, Insert)
+    assert len(counting_db.parameters[0]) == 3
+    assert isinstance(update_users, Update)
+    # One row per student, with their latest login
+    params = update_users.compile().construct_params().values()
+    assert sorted(value for value in params if isinstance(value, datetime)) == [
+        first,
+        later,
+    ]
+    assert counting_db.commits == 1
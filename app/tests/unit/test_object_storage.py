@@ -0,0 +1,148 @@
+"""Unit tests for the pooled object storage, using the local filesystem backend."""
+
+import base64
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import object_storage
+from app.services.object_storage import (
+    InvalidImageData,
+    LocalObjectStorage,
+    Upload,
+    decode_base64_to_file,
+    parse_image_data,
+)
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 300
+JPEG = b"\xff\xd8\xff\xe0" + b"cover" * 100
+
+BASE_URL = "http://storage.test"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = LocalObjectStorage(tmp_path, BASE_URL, max_concurrent_uploads=4)
+    yield storage
+    storage.shutdown()
+
+
+class TestDecoding:
+    def test_chunked_decode_matches_b64decode(self, monkeypatch):
+        # Small chunks, so the payload spans many with a remainder carried over
+        monkeypatch.setattr(object_storage, "DECODE_CHUNK_CHARS", 12)
+        encoded = base64.b64encode(PNG[:1001]).decode()
+
+        assert decode_base64_to_file(encoded).read() == PNG[:1001]
+
+    def test_data_url(self):
+        encoded = base64.b64encode(JPEG).decode()
+
+        filetype, decoded = parse_image_data(f"data:image/jpeg;base64,{encoded}")
+
+        assert filetype == "jpeg"
+        assert decoded.read() == JPEG
+
+    def test_bare_base64_is_sniffed(self):
+        # The Nielsen image query returns bare base64 with extra padding
+        encoded = base64.b64encode(PNG).decode() + "=="
+
+        filetype, decoded = parse_image_data(encoded)
+
+        assert filetype == "png"
+        assert decoded.read() == PNG
+
+    @pytest.mark.parametrize(
+        "data",
+        ["data:image/png;base64", "not base64!", base64.b64encode(b"text").decode()],
+    )
+    def test_invalid_payloads(self, data):
+        with pytest.raises(InvalidImageData):
+            parse_image_data(data)
+
+
+class TestLocalObjectStorage:
+    def test_foreground_upload_and_download(self, storage):
+        url = storage.upload(Upload("books", "nielsen/1.json", b"{}", "text/json"))
+
+        assert url == f"{BASE_URL}/books/nielsen/1.json"
+        assert storage.download("books", "nielsen/1.json") == b"{}"
+        assert storage.download("books", "nielsen/2.json") is None
+
+    def test_batched_image_uploads_finish_on_drain(self, storage):
+        encoded = base64.b64encode(PNG).decode()
+        uploads = storage.batch()
+
+        urls = [
+            uploads.upload_image(encoded, "images", "nielsen", isbn)
+            for isbn in ("111", "222", "333")
+        ]
+
+        assert uploads.drain() == []
+        assert urls[0] == f"{BASE_URL}/images/nielsen/111.png"
+        for isbn in ("111", "222", "333"):
+            assert storage.download("images", f"nielsen/{isbn}.png") == PNG
+
+    def test_drain_reports_only_its_own_failed_uploads(self, storage, monkeypatch):
+        def fail(*args):
+            raise OSError("bucket unavailable")
+
+        monkeypatch.setattr(storage, "_write", fail)
+        uploads, other_uploads = storage.batch(), storage.batch()
+
+        url = storage.upload(Upload("images", "a.png", PNG, "image/png"), uploads)
+
+        assert other_uploads.drain() == []
+        assert uploads.drain() == [url]
+        assert uploads.drain() == []
+        with pytest.raises(OSError):
+            storage.upload(Upload("images", "b.png", PNG, "image/png"))
+
+    def test_quiet_puts_log_failures(self, storage, monkeypatch):
+        def fail(*args):
+            raise OSError("bucket unavailable")
+
+        monkeypatch.setattr(storage, "_write", fail)
+
+        # Logged rather than raised
+        storage.put_quietly(Upload("books", "nielsen/1.json", b"{}", "text/json"))
+
+    def test_invalid_image_is_not_uploaded(self, storage):
+        assert storage.upload_image("nope", "images", None, "x") is None
+
+    def test_delete_url(self, storage):
+        url = storage.upload(Upload("images", "wriveted/1.jpeg", JPEG, "image/jpeg"))
+
+        storage.delete_url(url, background=False)
+        storage.delete_url("https://covers.openlibrary.org/b/1.jpg")
+
+        assert storage.download("images", "wriveted/1.jpeg") is None
+
+    def test_first_url_by_prefix(self, storage):
+        storage.upload(Upload("images", "open/978.jpeg", JPEG, "image/jpeg"))
+
+        assert storage.first_url_by_prefix("images", "open/978") == (
+            f"{BASE_URL}/images/open/978.jpeg"
+        )
+        assert storage.first_url_by_prefix("images", "nielsen/978") is None
+
+    def test_blob_names_cannot_escape_bucket(self, storage):
+        with pytest.raises(ValueError):
+            storage.upload(Upload("images", "../other/x.png", PNG, "image/png"))
+
+
+def test_failed_cover_uploads_are_dropped_from_hydration_batch(monkeypatch, storage):
+    from app.services import hydration
+
+    uploads = SimpleNamespace(drain=lambda: [f"{BASE_URL}/images/bad.png"])
+    batch = [
+        SimpleNamespace(isbn="1", cover_url=f"{BASE_URL}/images/bad.png"),
+        SimpleNamespace(isbn="2", cover_url=f"{BASE_URL}/images/good.png"),
+    ]
+
+    hydration.wait_for_cover_uploads(batch, uploads)
+
+    assert [book.cover_url for book in batch] == [
+        None,
+        f"{BASE_URL}/images/good.png",
+    ]
@@ -0,0 +1,106 @@
+"""Unit tests for time partition bookkeeping."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services.partition_maintenance import (
+    CONVERSATION_HISTORY_PARTITIONS,
+    FLOW_EXECUTION_STEPS_PARTITIONS,
+    PartitionMaintenanceService,
+)
+
+
+class PartitionedSession:
+    """Has ``existing`` partitions and DEFAULT partition rows at ``stranded``."""
+
+    def __init__(self, existing=(), stranded=()):
+        self.existing = existing
+        self.stranded = stranded
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        if "FROM pg_inherits" in sql:
+            return [SimpleNamespace(name=name) for name in self.existing]
+        self.statements.append(sql)
+
+    async def scalar(self, statement, params=None):
+        return any(params["start"] <= row < params["end"] for row in self.stranded)
+
+
+class TestPartitionSpec:
+    """Test partition bounds and naming."""
+
+    def test_daily_partition_bounds(self):
+        spec = FLOW_EXECUTION_STEPS_PARTITIONS
+        start = spec.partition_start(
+            datetime(2026, 10, 18, 13, 45, tzinfo=timezone.utc)
+        )
+
+        assert start == datetime(2026, 10, 18, tzinfo=timezone.utc)
+        assert spec.next_start(start) == datetime(2026, 10, 19, tzinfo=timezone.utc)
+        assert spec.partition_name(start) == "flow_execution_steps_p20261018"
+
+    def test_monthly_partition_bounds_wrap_year(self):
+        spec = CONVERSATION_HISTORY_PARTITIONS
+        start = spec.partition_start(datetime(2026, 12, 31, 23, 59))
+
+        assert start == datetime(2026, 12, 1)
+        assert spec.next_start(start) == datetime(2027, 1, 1)
+        assert spec.partition_name(start) == "conversation_history_p202612"
+
+    def test_parse_partition_name_round_trips(self):
+        spec = FLOW_EXECUTION_STEPS_PARTITIONS
+        start = datetime(2026, 2, 28, tzinfo=timezone.utc)
+
+        assert spec.parse_partition_name(spec.partition_name(start)) == start
+
+    def test_parse_partition_name_ignores_default_and_foreign_tables(self):
+        spec = CONVERSATION_HISTORY_PARTITIONS
+
+        assert spec.parse_partition_name("conversation_history_default") is None
+        assert spec.parse_partition_name("flow_execution_steps_p202610") is None
+        assert spec.parse_partition_name("conversation_history_p202613") is None
+
+
+class TestEnsurePartitions:
+    """Test partition creation around the DEFAULT partition."""
+
+    async def test_creates_missing_partitions_in_place(self):
+        spec = CONVERSATION_HISTORY_PARTITIONS
+        db = PartitionedSession(existing=["conversation_history_p202610"])
+
+        created = await PartitionMaintenanceService().ensure_partitions(
+            db, spec, now=datetime(2026, 10, 18)
+        )
+
+        assert created == [
+            "conversation_history_p202611",
+            "conversation_history_p202612",
+            "conversation_history_p202701",
+        ]
+        assert "pg_advisory_xact_lock" in db.statements[0]
+        assert not any("DETACH" in sql or "ATTACH" in sql for sql in db.statements)
+
+    async def test_rows_in_the_default_partition_are_moved(self):
+        spec = CONVERSATION_HISTORY_PARTITIONS
+        db = PartitionedSession(
+            existing=["conversation_history_p202610", "conversation_history_p202611"],
+            stranded=[datetime(2026, 12, 24)],
+        )
+
+        created = await PartitionMaintenanceService().ensure_partitions(
+            db, spec, now=datetime(2026, 10, 18)
+        )
+
+        assert created == [
+            "conversation_history_p202612",
+            "conversation_history_p202701",
+        ]
+        lock, detach, *creates, move, attach = db.statements
+        assert "pg_advisory_xact_lock" in lock
+        assert 'DETACH PARTITION "conversation_history_default"' in detach
+        assert all("PARTITION OF" in sql for sql in creates)
+        assert 'DELETE FROM "conversation_history_default"' in move
+        assert 'INSERT INTO "conversation_history_p202612"' in move
+        assert 'ATTACH PARTITION "conversation_history_default" DEFAULT' in attach
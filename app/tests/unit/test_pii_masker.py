@@ -188,6 +188,66 @@ class TestPIIMasker:
         assert len(result["email"]) == len("test@example.com")
         assert all(c == "*" for c in result["email"])
 
+    def test_mixed_value_patterns_single_pass(self, masker):
+        """Test that emails, phones and IPs in one string are all masked."""
+        state = {"note": "Email a@b.com or call +1 555 123 4567 from 192.168.0.1 today"}
+        result = masker.mask_state(state)
+
+        assert result["note"] == "Email [EMAIL] or call [PHONE]from [IP] today"
+
+    def test_sensitive_key_decision_is_cached(self, masker):
+        """Test that key decisions are cached and case-insensitive."""
+        assert masker.is_sensitive_key("Parent_EMAIL") is True
+        assert masker.is_sensitive_key("favourite_colour") is False
+        assert masker._key_decisions == {
+            "Parent_EMAIL": True,
+            "favourite_colour": False,
+        }
+
+
+class TestMaskStatePair:
+    """Test structural diff masking of before/after snapshots."""
+
+    @pytest.fixture
+    def masker(self):
+        return PIIMasker()
+
+    def test_matches_full_masking(self, masker):
+        """Test that diff masking produces the same result as masking both."""
+        before = {
+            "user": {"email": "kid@example.com", "age": 9},
+            "temp": {"shown_ids": ["a", "b"], "note": "call 0412 345 678 9"},
+            "history": [{"answer": "dragons"}],
+        }
+        after = {
+            "user": {"email": "kid@example.com", "age": 10},
+            "temp": {"shown_ids": ["a", "b", "c"], "note": "call 0412 345 678 9"},
+            "history": [{"answer": "dragons"}],
+            "contact": {"phone": "0412345678"},
+        }
+
+        masked_before, masked_after = masker.mask_state_pair(before, after)
+
+        assert masked_before == masker.mask_state(before)
+        assert masked_after == masker.mask_state(after)
+
+    def test_reuses_unchanged_subtrees(self, masker):
+        """Test that unchanged subtrees are not masked a second time."""
+        before = {"profile": {"name": "Sam"}, "step": 1}
+        after = {"profile": {"name": "Sam"}, "step": 2}
+
+        masked_before, masked_after = masker.mask_state_pair(before, after)
+
+        assert masked_after["profile"] is masked_before["profile"]
+        assert masked_after["step"] == 2
+
+    def test_empty_states(self, masker):
+        """Test empty before or after states."""
+        assert masker.mask_state_pair({}, {"email": "a@b.com"})[1] == (
+            masker.mask_state({"email": "a@b.com"})
+        )
+        assert masker.mask_state_pair({"step": 1}, {}) == ({"step": 1}, {})
+
 
 class TestModuleFunctions:
     """Test module-level convenience functions."""
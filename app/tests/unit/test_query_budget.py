@@ -0,0 +1,50 @@
+"""Unit tests for the query budget test harness."""
+
+import pytest
+
+from app.tests.util import query_budget as budgets
+from app.tests.util.query_budget import (
+    BudgetExceeded,
+    QueryRecording,
+    check_budget,
+    normalize_statement,
+)
+
+
+def test_normalize_statement_keeps_only_the_shape():
+    statement = """
+        SELECT works.id, works.title
+        FROM works
+        WHERE works.id IN ($1, $2, $3) AND works.type = $4
+    """
+
+    assert normalize_statement(statement) == (
+        "SELECT … FROM works WHERE works.id IN (…) AND works.type = ?"
+    )
+
+
+def test_within_budget_passes():
+    check_budget("detail", QueryRecording(["SELECT 1"], elapsed_ms=5), 1, ms=10)
+
+
+def test_over_budget_reports_statements_and_baseline_diff(tmp_path, monkeypatch):
+    monkeypatch.setattr(budgets, "BASELINE_DIR", tmp_path)
+    (tmp_path / "detail.sql").write_text("SELECT … FROM works WHERE works.id = ?\n")
+    recording = QueryRecording(
+        ["SELECT id FROM works WHERE works.id = $1"]
+        + ["SELECT id FROM authors WHERE authors.id = $1"] * 2,
+        elapsed_ms=50,
+    )
+
+    with pytest.raises(BudgetExceeded) as error:
+        check_budget("detail", recording, queries=1, ms=10)
+
+    message = str(error.value)
+    assert "3 SQL statements (budget 1)" in message
+    assert "50 ms wall time (budget 10 ms)" in message
+    assert "2 x SELECT … FROM authors WHERE authors.id = ?" in message
+    assert "+SELECT … FROM authors WHERE authors.id = ?" in message
+
+
+def test_latency_factor_zero_disables_time_budget():
+    check_budget("slow", QueryRecording([], elapsed_ms=500), ms=10, latency_factor=0)
@@ -0,0 +1,287 @@
+"""Unit tests for batched processing of reading activity events."""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.sql import Insert
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.models.booklist import BookList, ListType
+from app.models.collection_item_activity import CollectionItemReadStatus
+from app.models.event_outbox import EventOutbox, EventStatus
+from app.models.user import UserAccountType
+from app.services import reading_events
+from app.services.event_outbox_service import EventOutboxService
+from app.services.reading_events import (
+    BOOK_REVIEWED,
+    READING_LOGGED,
+    apply_book_reviews,
+    apply_reading_logs,
+)
+
+SCHOOL_ID = 12
+STUDENT_A = uuid.uuid4()
+STUDENT_B = uuid.uuid4()
+
+
+class Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def unique(self):
+        return self
+
+
+class EventSession:
+    """Answers each execute/scalars call from ``results`` in order."""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.statements = []
+        self.parameters = []
+        self.added = []
+        self.flushes = 0
+        self.rollbacks = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+        self.parameters.append(params)
+        return Rows(self.results.pop(0) if self.results else [])
+
+    scalars = execute
+
+    def add_all(self, instances):
+        self.added.extend(instances)
+
+    def flush(self):
+        # New booklists get their ids here, as they would from the database
+        self.flushes += 1
+        for instance in self.added:
+            instance.id = instance.id or uuid.uuid4()
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+def review_event(user_id, isbns):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        title=BOOK_REVIEWED,
+        user_id=user_id,
+        school_id=SCHOOL_ID,
+        info={"reviews": [{"isbn": isbn, "liked": True} for isbn in isbns]},
+    )
+
+
+@pytest.fixture
+def applied_changes(monkeypatch):
+    changes = []
+    monkeypatch.setattr(
+        reading_events.booklist_repository,
+        "apply_item_changes",
+        lambda db, booklist, items: changes.append(
+            (booklist, [item.work_id for item in items])
+        ),
+    )
+    return changes
+
+
+def test_book_reviews_update_each_booklist_once(applied_changes):
+    school_list = BookList(
+        id=uuid.uuid4(),
+        name="liked books",
+        type=ListType.SCHOOL,
+        school_id=SCHOOL_ID,
+        user_id=STUDENT_A,
+    )
+    session = EventSession(
+        [
+            [("9780140328721", 1), ("9780141354828", 2)],
+            [
+                SimpleNamespace(
+                    id=STUDENT_A, type=UserAccountType.STUDENT, class_name="3B"
+                ),
+                SimpleNamespace(
+                    id=STUDENT_B, type=UserAccountType.STUDENT, class_name="3B"
+                ),
+            ],
+            [school_list],
+        ]
+    )
+    events = [
+        review_event(STUDENT_A, ["978-0-14-032872-1"]),
+        review_event(STUDENT_A, ["9780141354828", "not an isbn"]),
+        review_event(STUDENT_B, ["9780141354828"]),
+    ]
+
+    stats = apply_book_reviews(session, events)
+
+    # Editions, reviewers and candidate booklists, then one flush of new lists
+    assert len(session.statements) == 3
+    assert session.flushes == 1
+    assert sorted((b.type, b.name) for b in session.added) == [
+        (ListType.PERSONAL, "Liked Books"),
+        (ListType.PERSONAL, "Liked Books"),
+        (ListType.SCHOOL, "3B Liked Books"),
+        (ListType.SCHOOL, "3B Liked Books"),
+        (ListType.SCHOOL, "Liked Books"),
+    ]
+    personal_owners = {b.user_id for b in session.added if b.type == ListType.PERSONAL}
+    assert personal_owners == {STUDENT_A, STUDENT_B}
+    assert (school_list, [1, 2]) in applied_changes
+    assert stats == {"liked_books": 3, "booklists_created": 5, "booklists_updated": 6}
+
+
+def log_event(user_id, collection_item_id, at, **flags):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        title=READING_LOGGED,
+        user_id=user_id,
+        school_id=None,
+        info={
+            "collection_item_id": collection_item_id,
+            "collection_id": str(uuid.uuid4()),
+            "descriptor": "Exciting",
+            "emoji": "🤩",
+            "timestamp": at.isoformat(),
+            **flags,
+        },
+    )
+
+
+def test_reading_logs_are_inserted_together_and_notified_once(monkeypatch):
+    notified = []
+    monkeypatch.setattr(
+        reading_events,
+        "queue_reader_feedback_alerts",
+        lambda session, reader, item, event, log_data: notified.append(
+            (reader.id, item.id)
+        )
+        or ["sms"],
+    )
+    session = EventSession(
+        [
+            None,
+            [SimpleNamespace(id=STUDENT_A)],
+            [SimpleNamespace(id=8)],
+        ]
+    )
+    events = [
+        log_event(STUDENT_A, 7, datetime(2024, 3, 1, 19, 0)),
+        log_event(STUDENT_A, 8, datetime(2024, 3, 1, 20, 0), finished=True),
+        log_event(STUDENT_A, 7, datetime(2024, 3, 1, 18, 0), stopped=True),
+    ]
+    stats = {}
+
+    messages = apply_reading_logs(session, events, stats)
+
+    insert_activity, _, _ = session.statements
+    assert isinstance(insert_activity, Insert)
+    assert [row["status"] for row in session.parameters[0]] == [
+        CollectionItemReadStatus.READING,
+        CollectionItemReadStatus.READ,
+        CollectionItemReadStatus.STOPPED_READING,
+    ]
+    assert [row["collection_item_id"] for row in session.parameters[0]] == [7, 8, 7]
+    assert notified == [(STUDENT_A, 8)]
+    assert messages == ["sms"]
+    assert stats == {"reading_logs": 3, "notified_readers": 1}
+
+
+def outbox_row(title):
+    return EventOutbox(
+        id=uuid.uuid4(),
+        event_type="event_processing",
+        destination="internal:process-event",
+        payload={"event_id": str(uuid.uuid4()), "title": title},
+        status=EventStatus.PENDING,
+        retry_count=0,
+        max_retries=3,
+    )
+
+
+async def test_outbox_processes_reading_events_as_one_batch(counting_db, monkeypatch):
+    rows = [outbox_row(BOOK_REVIEWED), outbox_row(READING_LOGGED), outbox_row("Test")]
+    batches = []
+    monkeypatch.setattr(
+        reading_events,
+        "process_reading_events",
+        lambda event_ids: (batches.append(event_ids) or {}, {}),
+    )
+    service = EventOutboxService()
+
+    async def ready(db):
+        return rows
+
+    async def deliver(event):
+        return True
+
+    monkeypatch.setattr(service, "_get_events_ready_for_processing", ready)
+    monkeypatch.setattr(service, "_deliver_event", deliver)
+
+    stats = await service.process_pending_events(counting_db)
+
+    assert batches == [[rows[0].payload["event_id"], rows[1].payload["event_id"]]]
+    assert {row.status for row in rows} == {EventStatus.PUBLISHED}
+    assert stats["processed"] == stats["succeeded"] == 3
+
+
+def test_a_failing_batch_is_retried_event_by_event(monkeypatch):
+    good, bad = str(uuid.uuid4()), str(uuid.uuid4())
+    session = EventSession()
+    applied = []
+
+    def apply_and_commit(session, event_ids):
+        if bad in event_ids:
+            raise ValueError("violates foreign key constraint")
+        applied.append(event_ids)
+        return {"reading_logs": len(event_ids)}, ["sms"]
+
+    sent = []
+    monkeypatch.setattr(reading_events, "get_session_maker", lambda: lambda: session)
+    monkeypatch.setattr(reading_events, "_apply_and_commit", apply_and_commit)
+    monkeypatch.setattr(reading_events, "send_reader_feedback_sms", sent.extend)
+
+    stats, failed = reading_events.process_reading_events([good, bad])
+
+    assert applied == [[good]]
+    assert session.rollbacks == 2
+    assert stats == {"reading_logs": 1}
+    assert failed == {bad: "violates foreign key constraint"}
+    assert sent == ["sms"]
+
+
+async def test_outbox_fails_only_the_bad_reading_events(counting_db, monkeypatch):
+    rows = [outbox_row(BOOK_REVIEWED), outbox_row(READING_LOGGED)]
+    bad_id = rows[1].payload["event_id"]
+    monkeypatch.setattr(
+        reading_events,
+        "process_reading_events",
+        lambda event_ids: ({}, {bad_id: "violates foreign key constraint"}),
+    )
+    service = EventOutboxService()
+
+    async def ready(db):
+        return rows
+
+    monkeypatch.setattr(service, "_get_events_ready_for_processing", ready)
+
+    stats = await service.process_pending_events(counting_db)
+
+    assert rows[0].status == EventStatus.PUBLISHED
+    assert rows[1].status != EventStatus.PUBLISHED
+    assert rows[1].retry_count == 1
+    assert stats["succeeded"] == 1
+    assert stats["failed"] + stats["dead_lettered"] == 1
@@ -0,0 +1,104 @@
+"""Unit tests for the version-checked reference data registry."""
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.schools import _check_country_codes
+from app.services.reference_data import (
+    VERSION_QUERY,
+    CountryRef,
+    ReferenceData,
+    ReferenceDataRegistry,
+)
+
+
+class Result(list):
+    def scalar_one(self):
+        return self[0]
+
+
+class ReferenceSession:
+    """Answers a version check and then the four reference table selects.
+
+    Rows are named after the version last checked, so a reload is visible.
+    """
+
+    def __init__(self, versions):
+        self.versions = list(versions)
+        self.version = None
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append(statement)
+        if statement is VERSION_QUERY:
+            self.version = self.versions.pop(0)
+            return Result([self.version])
+        return Result(
+            [
+                SimpleNamespace(
+                    id="NZL", key="hue01", name=f"Dark {self.version}", phonecode=64
+                )
+            ]
+        )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_reference_data_is_reloaded_when_its_version_moves_on():
+    clock = Clock()
+    registry = ReferenceDataRegistry(refresh_interval_seconds=60, clock=clock)
+    session = ReferenceSession(versions=[1, 1, 2])
+
+    first = registry.get(session)
+    assert registry.get(session) is first
+    assert len(session.statements) == 5
+    assert first.hue("hue01").name == "Dark 1"
+    assert first.country("NZL").phonecode == 64
+
+    # Unchanged version: only the version is checked
+    clock.now = 61
+    assert registry.get(session) is first
+    assert len(session.statements) == 6
+
+    clock.now = 122
+    assert registry.get(session).hue("hue01").name == "Dark 2"
+    assert len(session.statements) == 11
+
+
+def test_notifications_force_a_reload():
+    registry = ReferenceDataRegistry(refresh_interval_seconds=60, clock=Clock())
+    session = ReferenceSession(versions=[1, 1])
+
+    first = registry.get(session)
+    registry.handle_notification(None, 1, "reference_data", "2")
+
+    # The version seen before the change committed may not have moved on
+    assert registry.get(session) is not first
+    assert len(session.statements) == 10
+
+
+def test_unknown_country_codes_are_rejected():
+    reference = ReferenceData(
+        hues={},
+        reading_abilities={},
+        countries={"NZL": CountryRef("NZL", "New Zealand", 64)},
+        products={},
+    )
+    schools = [
+        SimpleNamespace(country_code=code) for code in ("NZL", "XYZ", "nzl", "XYZ")
+    ]
+
+    with pytest.raises(HTTPException) as error:
+        _check_country_codes(reference, schools)
+
+    assert error.value.status_code == 422
+    assert error.value.detail == "Unknown country code(s): XYZ, nzl"
+    _check_country_codes(reference, schools[:1])
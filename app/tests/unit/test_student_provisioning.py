@@ -0,0 +1,108 @@
+"""Unit tests for provisioning a class roster of students in bulk."""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud
+from app.models import Event
+from app.schemas.class_group import StudentRosterEntry
+from app.services.class_groups import parse_student_roster_csv, provision_students
+from app.services.users import new_identifiable_usernames
+
+
+class RosterSession:
+    """Keeps the rows inserted into each table, in insert order."""
+
+    def __init__(self):
+        self.inserted = {}
+        self.added = []
+        self.commits = 0
+
+    def execute(self, statement, params=None):
+        self.inserted[statement.table.name] = params
+
+    def add(self, instance):
+        self.added.append(instance)
+
+    def commit(self):
+        self.commits += 1
+
+
+@pytest.fixture
+def claimed_usernames(monkeypatch):
+    lookups = []
+
+    def lookup(session, usernames, school_id):
+        usernames = list(usernames)
+        lookups.append(usernames)
+        return {name.lower() for name in usernames if name.lower().startswith("jok")}
+
+    monkeypatch.setattr(crud.user, "get_claimed_student_usernames", lookup)
+    return lookups
+
+
+def test_parse_roster_csv():
+    roster = parse_student_roster_csv(
+        "\ufefffirst_name,Last_Name,year\n" "Ava,Nguyen,3\n" ",,\n" " Noah ,smith,3\n"
+    )
+
+    assert [(entry.first_name, entry.last_name_initial) for entry in roster] == [
+        ("Ava", "N"),
+        ("Noah", "s"),
+    ]
+
+
+def test_parse_roster_csv_rejects_rows_wider_than_the_header():
+    with pytest.raises(ValueError, match="line 3"):
+        parse_student_roster_csv("first_name,last_name\nAva,Nguyen\nNoah,Smith,3\n")
+
+
+class TestIdentifiableUsernames:
+    def test_duplicate_names_get_distinct_usernames(self, claimed_usernames):
+        usernames = new_identifiable_usernames(
+            [("Sam", "K")] * 40, session=None, school_id=1
+        )
+
+        assert len({username.lower() for username in usernames}) == 40
+        assert all(username.startswith("SamK") for username in usernames)
+        assert len(claimed_usernames) <= 4
+
+    def test_crowded_names_fall_back_to_more_suffixes(self, claimed_usernames):
+        # Every JoK suffix is taken, so this can never succeed
+        with pytest.raises(ValueError):
+            new_identifiable_usernames([("Jo", "K")], session=None, school_id=1)
+
+        assert len(claimed_usernames[-1]) == 90
+
+
+def test_provision_students_writes_each_table_once(claimed_usernames):
+    session = RosterSession()
+    class_group = SimpleNamespace(
+        id=uuid.uuid4(), name="3B", school=SimpleNamespace(id=7)
+    )
+    roster = [
+        StudentRosterEntry(first_name=f"Kid{i}", last_name_initial="Z")
+        for i in range(2000)
+    ]
+
+    students = provision_students(session, class_group, roster)
+
+    assert list(session.inserted) == ["users", "readers", "students"]
+    user_rows, reader_rows, student_rows = session.inserted.values()
+    assert all(len(rows) == 2000 for rows in session.inserted.values())
+    ids = [student.id for student in students]
+    assert [row["id"] for row in user_rows] == ids
+    assert [row["id"] for row in reader_rows] == ids
+    assert [row["id"] for row in student_rows] == ids
+    assert student_rows[0]["school_id"] == 7
+    assert student_rows[0]["class_group_id"] == class_group.id
+    assert student_rows[0]["username"] == students[0].username
+    assert students[0].name == "Kid0 Z"
+    assert len(claimed_usernames) == 1
+    (event,) = session.added
+    assert isinstance(event, Event)
+    assert event.info["count"] == 2000
+    assert session.commits == 1
@@ -0,0 +1,53 @@
+"""Unit tests for residual trace deletion."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from app.services import trace_cleanup
+from app.services.trace_cleanup import TraceCleanupService
+
+
+class ExpiredStepsSession:
+    """Holds ``expired`` residual steps and deletes up to a batch per DELETE."""
+
+    def __init__(self, expired, min_retention_days):
+        self.expired = expired
+        self.min_retention_days = min_retention_days
+        self.deletes = []
+        self.commits = 0
+
+    async def scalar(self, statement, params=None):
+        return self.min_retention_days
+
+    async def execute(self, statement, params=None):
+        self.deletes.append((statement, params))
+        deleted = min(self.expired, params["batch_size"])
+        self.expired -= deleted
+        return SimpleNamespace(rowcount=deleted)
+
+    async def commit(self):
+        self.commits += 1
+
+
+async def test_residual_traces_are_deleted_in_batches(monkeypatch):
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(trace_cleanup.asyncio, "sleep", sleep)
+    service = TraceCleanupService()
+    service.BATCH_SIZE = 2
+    db = ExpiredStepsSession(expired=3, min_retention_days=7)
+    now = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+    deleted = await service.delete_residual_traces(db, now=now)
+
+    assert deleted == 3
+    assert db.expired == 0
+    assert db.commits == 2
+    assert sleeps == [service.BATCH_DELAY_SECONDS]
+    statement, params = db.deletes[0]
+    assert "CAST(:now AS timestamptz)" in str(statement)
+    assert params["batch_size"] == 2
+    assert params["min_cutoff"] == datetime(2026, 10, 11, tzinfo=timezone.utc)
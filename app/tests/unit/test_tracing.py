@@ -0,0 +1,84 @@
+"""Unit tests for trace sampling and span export configuration."""
+
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.sdk.trace.sampling import Decision, ParentBased
+from opentelemetry.trace import Status, StatusCode
+
+from app.config import Settings
+from app.logging import ErrorSpanProcessor, RouteRatioSampler, build_tracer_provider
+
+
+def sample(sampler, path):
+    return sampler.should_sample(
+        None, trace_id=12345, name="POST", attributes={"http.target": path}
+    ).decision
+
+
+class TestRouteRatioSampler:
+    def test_route_override_applies_to_matching_paths(self):
+        sampler = RouteRatioSampler(
+            1.0, {"/v1/chat/sessions/*/interact": 0.0}, record_unsampled=False
+        )
+
+        assert sample(sampler, "/v1/chat/sessions/abc/interact") == Decision.DROP
+        assert sample(sampler, "/v1/chat/start") == Decision.RECORD_AND_SAMPLE
+
+    def test_query_string_is_ignored(self):
+        sampler = RouteRatioSampler(1.0, {"/v1/search": 0.0})
+
+        assert sample(sampler, "/v1/search?q=dragons") == Decision.DROP
+
+    def test_unsampled_traces_are_recorded_when_capturing_errors(self):
+        sampler = RouteRatioSampler(0.0, record_unsampled=True)
+
+        assert sample(sampler, "/v1/works") == Decision.RECORD_ONLY
+
+
+class TestErrorSpanProcessor:
+    def _provider(self, exporter):
+        provider = TracerProvider(
+            sampler=ParentBased(RouteRatioSampler(0.0, record_unsampled=True))
+        )
+        provider.add_span_processor(ErrorSpanProcessor(SimpleSpanProcessor(exporter)))
+        return provider
+
+    def test_unsampled_spans_are_dropped(self):
+        exporter = InMemorySpanExporter()
+        tracer = self._provider(exporter).get_tracer(__name__)
+
+        with tracer.start_as_current_span("ok"):
+            pass
+
+        assert exporter.get_finished_spans() == ()
+
+    def test_unsampled_error_spans_are_exported(self):
+        exporter = InMemorySpanExporter()
+        tracer = self._provider(exporter).get_tracer(__name__)
+
+        with tracer.start_as_current_span("failed") as span:
+            span.set_status(Status(StatusCode.ERROR))
+
+        (exported,) = exporter.get_finished_spans()
+        assert exported.name == "failed"
+        assert exported.context.trace_flags.sampled
+
+
+def test_build_tracer_provider_uses_settings():
+    settings = Settings(
+        POSTGRESQL_PASSWORD="test",
+        SECRET_KEY="test",
+        SENDGRID_API_KEY="test",
+        SHOPIFY_HMAC_SECRET="test",
+        OTEL_TRACE_SAMPLE_RATE=0.0,
+        OTEL_ALWAYS_SAMPLE_ERRORS=False,
+    )
+    exporter = InMemorySpanExporter()
+    provider = build_tracer_provider(settings, exporter)
+
+    with provider.get_tracer(__name__).start_as_current_span("dropped"):
+        pass
+    provider.force_flush()
+
+    assert exporter.get_finished_spans() == ()
@@ -0,0 +1,97 @@
+"""Unit tests for set-based username and class code generation."""
+
+import pytest
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud
+from app.services import class_groups
+from app.services.class_groups import CLASS_CODE_ALPHABET, new_random_class_codes
+from app.services.users import (
+    WORDLIST,
+    WordList,
+    WordListItem,
+    new_identifiable_username,
+    new_random_usernames,
+)
+
+
+class ClaimedLookup:
+    """Answers claimed-name lookups from a fixed set, counting the queries."""
+
+    def __init__(self, claimed=()):
+        self.claimed = {name.lower() for name in claimed}
+        self.queries = 0
+        self.largest_query = 0
+
+    def __call__(self, session, names, *args):
+        names = {name.lower() for name in names}
+        self.queries += 1
+        self.largest_query = max(self.largest_query, len(names))
+        return names & self.claimed
+
+
+@pytest.fixture
+def claimed_usernames(monkeypatch):
+    lookup = ClaimedLookup()
+    monkeypatch.setattr(crud.user, "get_claimed_student_usernames", lookup)
+    return lookup
+
+
+def test_wordlist_is_parsed_once():
+    with WordList() as wordlist:
+        assert wordlist is WORDLIST
+    assert isinstance(WORDLIST[0], WordListItem)
+
+
+class TestRandomUsernames:
+    def test_a_thousand_names_take_a_bounded_number_of_queries(
+        self, claimed_usernames
+    ):
+        usernames = new_random_usernames(session=None, school_id=1, count=1000)
+
+        assert len({username.lower() for username in usernames}) == 1000
+        assert claimed_usernames.queries <= 3
+
+    def test_claimed_names_are_skipped(self, claimed_usernames):
+        wordlist = [WordListItem(adjective="A", colour="C", noun="N")]
+        claimed_usernames.claimed = {f"cn{digit}" for digit in range(9)}
+
+        usernames = new_random_usernames(
+            session=None, school_id=1, count=1, wordlist=wordlist, numbers=1
+        )
+
+        assert usernames == ["CN9"]
+
+    def test_exhausted_namespace_raises(self, claimed_usernames):
+        wordlist = [WordListItem(adjective="A", colour="C", noun="N")]
+
+        with pytest.raises(ValueError):
+            new_random_usernames(
+                session=None, school_id=1, count=11, wordlist=wordlist, numbers=1
+            )
+        assert claimed_usernames.queries == 10
+
+
+def test_identifiable_username_checks_every_suffix_in_one_query(claimed_usernames):
+    claimed_usernames.claimed = {f"samk{suffix}" for suffix in range(10, 99)}
+
+    username = new_identifiable_username("Sam", "K", session=None, school_id=1)
+
+    assert username == "SamK99"
+    assert claimed_usernames.queries == 1
+    assert claimed_usernames.largest_query == 90
+
+
+def test_class_codes_are_checked_in_batches(monkeypatch):
+    lookup = ClaimedLookup()
+    monkeypatch.setattr(
+        class_groups.class_group_repository,
+        "get_claimed_class_codes",
+        lambda session, codes: lookup(session, codes),
+    )
+
+    codes = new_random_class_codes(session=None, count=500)
+
+    assert len(set(codes)) == 500
+    assert all(set(code) <= set(CLASS_CODE_ALPHABET) for code in codes)
+    assert lookup.queries == 1
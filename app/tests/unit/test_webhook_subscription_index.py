@@ -0,0 +1,128 @@
+"""Unit tests for the in-memory webhook subscription routing index."""
+
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+from app.models.webhook_subscription import (
+    WebhookSubscription,
+    WebhookSubscriptionStatus,
+)
+from app.services.webhook_subscription_index import WebhookSubscriptionIndex
+
+
+def subscription(flow_id=None, event_types=None, status=None):
+    return WebhookSubscription(
+        id=uuid.uuid4(),
+        name="Webhook",
+        url="https://example.com/webhook",
+        event_types=event_types or [],
+        flow_id=flow_id,
+        status=status or WebhookSubscriptionStatus.ACTIVE,
+        headers={},
+        timeout_seconds=30,
+        max_retries=3,
+    )
+
+
+def mock_db(version, subscriptions=()):
+    db = MagicMock()
+    version_result = MagicMock()
+    version_result.scalar_one.return_value = version
+    db.execute = AsyncMock(return_value=version_result)
+    rows = MagicMock()
+    rows.all.return_value = list(subscriptions)
+    db.scalars = AsyncMock(return_value=rows)
+    return db
+
+
+class TestMatch:
+    """Index matching agrees with WebhookSubscription.matches_event."""
+
+    def test_matches_flow_and_event_type_with_wildcards(self):
+        flow_id, other_flow_id = uuid.uuid4(), uuid.uuid4()
+        subscriptions = [
+            subscription(flow_id, ["node_changed"]),
+            subscription(flow_id),
+            subscription(None, ["node_changed", "session_started"]),
+            subscription(None),
+            subscription(other_flow_id),
+        ]
+        index = WebhookSubscriptionIndex()
+        index.load(subscriptions, version=1)
+
+        for event_type in ("node_changed", "session_started", "session_deleted"):
+            for candidate_flow in (flow_id, other_flow_id, uuid.uuid4()):
+                expected = [
+                    s.id
+                    for s in subscriptions
+                    if s.matches_event(event_type, candidate_flow)
+                ]
+                matched = index.match(candidate_flow, event_type)
+                assert [route.id for route in matched] == expected
+
+    def test_inactive_subscriptions_are_skipped(self):
+        flow_id = uuid.uuid4()
+        index = WebhookSubscriptionIndex()
+        index.load([subscription(flow_id, status=WebhookSubscriptionStatus.PAUSED)], 1)
+
+        assert index.is_empty
+        assert index.match(flow_id, "node_changed") == []
+
+
+class TestRefresh:
+    """The index only queries the database when it may be stale."""
+
+    async def test_recent_check_skips_database(self):
+        now = [0.0]
+        index = WebhookSubscriptionIndex(
+            refresh_interval_seconds=30, clock=lambda: now[0]
+        )
+        db = mock_db(version=1)
+
+        await index.ensure_fresh(db)
+        now[0] = 10.0
+        await index.ensure_fresh(db)
+
+        assert db.execute.await_count == 1
+        assert db.scalars.await_count == 1
+
+    async def test_unchanged_version_does_not_reload(self):
+        now = [0.0]
+        index = WebhookSubscriptionIndex(
+            refresh_interval_seconds=30, clock=lambda: now[0]
+        )
+        db = mock_db(version=1)
+
+        await index.ensure_fresh(db)
+        now[0] = 31.0
+        await index.ensure_fresh(db)
+
+        assert db.execute.await_count == 2
+        assert db.scalars.await_count == 1
+
+    async def test_notification_forces_reload(self):
+        flow_id = uuid.uuid4()
+        index = WebhookSubscriptionIndex(refresh_interval_seconds=30, clock=lambda: 0.0)
+
+        await index.ensure_fresh(mock_db(version=1))
+        assert index.match(flow_id, "node_changed") == []
+
+        index.handle_notification(None, 1, "webhook_subscriptions", "2")
+        await index.ensure_fresh(
+            mock_db(version=2, subscriptions=[subscription(flow_id)])
+        )
+
+        assert len(index.match(flow_id, "node_changed")) == 1
+
+    async def test_notification_reloads_even_if_version_is_unchanged(self):
+        flow_id = uuid.uuid4()
+        index = WebhookSubscriptionIndex(refresh_interval_seconds=30, clock=lambda: 0.0)
+        await index.ensure_fresh(mock_db(version=1))
+
+        # The version was read after the change ran but before it committed
+        index.handle_notification(None, 1, "webhook_subscriptions", "1")
+        await index.ensure_fresh(
+            mock_db(version=1, subscriptions=[subscription(flow_id)])
+        )
+
+        assert len(index.match(flow_id, "node_changed")) == 1
@@ -0,0 +1,156 @@
+"""
+Query-count and latency budgets for API endpoints.
+
+Wrap a request in ``query_budget`` to record every SQL statement any engine
+issues (sync or async) and the wall time taken, and fail the test when either
+exceeds the declared budget::
+
+    def test_booklist_detail_budget(client, query_budget, headers, booklist):
+        with query_budget("booklist_detail", queries=6, ms=300):
+            response = client.get(f"v1/list/{booklist.id}", headers=headers)
+
+Failures list the statements that were issued. Run the suite with
+``--update-query-baselines`` to record the current statements for each budget
+under ``app/tests/integration/query_baselines/``; later failures then show a
+diff against that baseline, which points straight at the new lazy load or
+repeated lookup.
+
+Wall-time budgets are scaled by ``--latency-budget-factor`` (``0`` disables
+them) so slow CI machines can loosen them without editing tests.
+"""
+
+import difflib
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BASELINE_DIR = Path(__file__).parent.parent / "integration" / "query_baselines"
+
+_WHITESPACE = re.compile(r"\s+")
+_SELECT_LIST = re.compile(r"^SELECT (.+?) FROM ", re.IGNORECASE)
+_IN_LIST = re.compile(r"IN \((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_PARAMETER = re.compile(r"\$\d+|%\([^)]+\)s|\?")
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a statement to its shape: one line, no parameters or columns."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _SELECT_LIST.sub("SELECT … FROM ", statement)
+    statement = _IN_LIST.sub("IN (…)", statement)
+    return _PARAMETER.sub("?", statement)
+
+
+@dataclass
+class QueryRecording:
+    """Statements issued and time taken inside a ``record_queries`` block."""
+
+    statements: List[str] = field(default_factory=list)
+    elapsed_ms: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def shapes(self) -> List[str]:
+        return [normalize_statement(statement) for statement in self.statements]
+
+    def summary(self) -> str:
+        counts = Counter(self.shapes)
+        return "\n".join(
+            f"  {count:>3} x {shape}" for shape, count in counts.most_common()
+        )
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecording]:
+    """Record statements sent by any SQLAlchemy engine and the elapsed time."""
+    recording = QueryRecording()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        recording.statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    started = time.perf_counter()
+    try:
+        yield recording
+    finally:
+        recording.elapsed_ms = (time.perf_counter() - started) * 1000
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+def _baseline_path(name: str) -> Path:
+    return BASELINE_DIR / f"{name}.sql"
+
+
+def _diff_against_baseline(name: str, shapes: List[str]) -> str:
+    path = _baseline_path(name)
+    if not path.exists():
+        listing = "\n".join(f"  {shape}" for shape in shapes)
+        return f"Statements issued (no baseline recorded):\n{listing}"
+    baseline = path.read_text().splitlines()
+    diff = difflib.unified_diff(
+        baseline, shapes, "baseline", "current", lineterm="", n=1
+    )
+    return "Statements compared to baseline:\n" + "\n".join(diff)
+
+
+def check_budget(
+    name: str,
+    recording: QueryRecording,
+    queries: Optional[int] = None,
+    ms: Optional[float] = None,
+    latency_factor: float = 1.0,
+) -> None:
+    """Raise ``BudgetExceeded`` when ``recording`` is over either budget."""
+    problems = []
+    if queries is not None and recording.count > queries:
+        problems.append(f"{recording.count} SQL statements (budget {queries})")
+    if ms is not None and latency_factor > 0:
+        allowed = ms * latency_factor
+        if recording.elapsed_ms > allowed:
+            problems.append(
+                f"{recording.elapsed_ms:.0f} ms wall time (budget {allowed:.0f} ms)"
+            )
+    if not problems:
+        return
+
+    raise BudgetExceeded(
+        f"{name} exceeded its budget: {'; '.join(problems)}\n"
+        f"Statement counts:\n{recording.summary()}\n"
+        f"{_diff_against_baseline(name, recording.shapes)}"
+    )
+
+
+@pytest.fixture
+def query_budget(request):
+    """Context manager factory enforcing query-count and wall-time budgets."""
+    update_baselines = request.config.getoption(
+        "--update-query-baselines", default=False
+    )
+    latency_factor = request.config.getoption("--latency-budget-factor", default=1.0)
+
+    @contextmanager
+    def budget(
+        name: str, queries: Optional[int] = None, ms: Optional[float] = None
+    ) -> Iterator[QueryRecording]:
+        with record_queries() as recording:
+            yield recording
+        if update_baselines:
+            BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+            _baseline_path(name).write_text("\n".join(recording.shapes) + "\n")
+        check_budget(name, recording, queries, ms, latency_factor)
+
+    return budget
@@ -0,0 +1,135 @@
+"""
+Compare per-item and batched booklist edits.
+
+Builds a scratch booklist of `--items` works in the configured Postgres
+database, then applies the same shuffle (every item moved once, as a
+drag-and-drop editor saving the whole list would) two ways:
+
+- **per-item**: `_update_item_in_booklist` for each move, which shifts a
+  range of rows and commits every time - how PATCH used to apply items.
+- **batched**: `booklist_repository.update`, which plans the batch in memory
+  and writes the new order with one `UPDATE ... FROM (VALUES ...)`.
+
+For each it reports the wall time, statements sent and commits, and checks
+both end with the same order. The scratch list is deleted afterwards. Needs a
+database with at least `--items` works, e.g. the seeded dev stack.
+
+Run: `poetry run python -m scripts.benchmarks.booklist_reorder --items 500`
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import event, select, text
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.db.session import get_session_maker
+from app.models import BookList, BookListItem, Work
+from app.models.booklist import ListType
+from app.repositories.booklist_repository import booklist_repository
+from app.schemas.booklist import BookListItemUpdateIn, BookListUpdateIn, ItemUpdateType
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self.on_execute)
+        event.listen(engine, "commit", self.on_commit)
+
+    def on_execute(self, *args):
+        self.statements += 1
+
+    def on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+
+def reset_order(session, booklist, work_ids):
+    session.execute(text("SET CONSTRAINTS ALL DEFERRED"))
+    for order_id, work_id in enumerate(work_ids):
+        session.get(BookListItem, (booklist.id, work_id)).order_id = order_id
+    session.commit()
+
+
+def current_order(session, booklist):
+    return list(
+        session.scalars(
+            select(BookListItem.work_id)
+            .where(BookListItem.booklist_id == booklist.id)
+            .order_by(BookListItem.order_id)
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    session_maker = get_session_maker()
+    with session_maker() as session:
+        work_ids = list(
+            session.scalars(select(Work.id).order_by(Work.id).limit(args.items))
+        )
+        if len(work_ids) < args.items:
+            print(f"Need {args.items} works, the database has {len(work_ids)}")
+            return
+
+        booklist = BookList(name="booklist_reorder benchmark", type=ListType.OTHER_LIST)
+        session.add(booklist)
+        session.flush()
+        session.add_all(
+            BookListItem(booklist_id=booklist.id, work_id=work_id, order_id=order_id)
+            for order_id, work_id in enumerate(work_ids)
+        )
+        session.commit()
+
+        shuffled = list(work_ids)
+        random.Random(args.seed).shuffle(shuffled)
+        moves = [
+            BookListItemUpdateIn(
+                action=ItemUpdateType.UPDATE, work_id=work_id, order_id=order_id
+            )
+            for order_id, work_id in enumerate(shuffled)
+        ]
+        counter = StatementCounter(session.get_bind())
+        print(f"Reordering a {args.items} item list")
+
+        try:
+            results = {}
+            for name in ("per-item", "batched"):
+                reset_order(session, booklist, work_ids)
+                counter.reset()
+                started = time.perf_counter()
+                if name == "per-item":
+                    for move in moves:
+                        booklist_repository._update_item_in_booklist(
+                            db=session, booklist_id=booklist.id, item_update=move
+                        )
+                else:
+                    booklist_repository.update(
+                        db=session,
+                        db_obj=booklist,
+                        obj_in=BookListUpdateIn(items=moves),
+                    )
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {name:9s} {elapsed * 1000:9.1f} ms  "
+                    f"{counter.statements:6d} statements  {counter.commits:5d} commits"
+                )
+                results[name] = current_order(session, booklist)
+            assert results["per-item"] == results["batched"] == shuffled
+        finally:
+            session.rollback()
+            session.delete(session.get(BookList, booklist.id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
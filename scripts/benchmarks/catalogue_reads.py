@@ -0,0 +1,191 @@
+"""
+Compare the ORM and Core read paths for the catalogue endpoints.
+
+Runs the same page of `GET /works`, `GET /work/{id}` and the enriched
+`GET /list/{id}` against the configured Postgres database two ways:
+
+- **orm**: the previous handlers - a sync `Session` per request in a
+  40-thread pool (FastAPI's default threadpool size), loading ORM objects
+  and validating response schemas from them.
+- **core**: `catalogue_read_repository` / `apopulate_booklist_object` on the
+  async engine, mapping rows straight to the response schemas.
+
+For each it reports throughput and p50/p95 latency at the requested
+concurrency, plus the peak Python allocation for a single request
+(tracemalloc), which is what bounds how many requests an instance can hold
+in flight. Needs a database with some works and a booklist, e.g. the seeded
+dev stack.
+
+Run: `poetry run python -m scripts.benchmarks.catalogue_reads --concurrency 50`
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.api.common.pagination import PaginatedQueryParams
+from app.db.session import get_async_session_maker, get_session_maker
+from app.models import BookList, BookListItem, Work
+from app.models.work import WorkType
+from app.repositories.catalogue_read_repository import catalogue_read_repository
+from app.schemas.work import WorkBrief, WorkDetail
+from app.services.booklists import apopulate_booklist_object, populate_booklist_object
+
+THREADPOOL_SIZE = 40
+
+
+def orm_works(session, limit):
+    works = session.scalars(
+        select(Work).where(Work.type == WorkType.BOOK, Work.editions.any()).limit(limit)
+    ).all()
+    return [WorkBrief.model_validate(work) for work in works]
+
+
+def orm_work(session, work_id):
+    return WorkDetail.model_validate(session.get(Work, work_id))
+
+
+def orm_booklist(session, booklist_id, limit):
+    booklist = session.get(BookList, booklist_id)
+    return populate_booklist_object(
+        booklist, session, PaginatedQueryParams(skip=0, limit=limit), enriched=True
+    )
+
+
+async def core_works(session, limit):
+    return await catalogue_read_repository.aget_work_briefs(
+        session, type=WorkType.BOOK, limit=limit
+    )
+
+
+async def core_work(session, work_id):
+    return await catalogue_read_repository.aget_work(session, work_id)
+
+
+async def core_booklist(session, booklist_id, limit):
+    booklist = await session.get(BookList, booklist_id)
+    return await apopulate_booklist_object(
+        booklist, session, PaginatedQueryParams(skip=0, limit=limit), enriched=True
+    )
+
+
+async def run_orm(handler, args, requests, concurrency):
+    session_maker = get_session_maker()
+    loop = asyncio.get_running_loop()
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    def call():
+        with session_maker() as session:
+            handler(session, *args)
+
+    async def one(pool):
+        async with gate:
+            started = time.perf_counter()
+            await loop.run_in_executor(pool, call)
+            latencies.append(time.perf_counter() - started)
+
+    with ThreadPoolExecutor(THREADPOOL_SIZE) as pool:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(pool) for _ in range(requests)))
+        return time.perf_counter() - started, latencies
+
+
+async def run_core(handler, args, requests, concurrency):
+    session_maker = get_async_session_maker()
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            async with session_maker() as session:
+                await handler(session, *args)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - started, latencies
+
+
+async def peak_kib(mode, handler, args):
+    tracemalloc.start()
+    if mode == "orm":
+        with get_session_maker()() as session:
+            handler(session, *args)
+    else:
+        async with get_async_session_maker()() as session:
+            await handler(session, *args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+async def pick_targets():
+    async with get_async_session_maker()() as session:
+        work_id = await session.scalar(
+            select(Work.id).where(Work.editions.any()).order_by(Work.id).limit(1)
+        )
+        booklist_id = await session.scalar(
+            select(BookListItem.booklist_id)
+            .group_by(BookListItem.booklist_id)
+            .order_by(func.count().desc())
+            .limit(1)
+        )
+    return work_id, booklist_id
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    work_id, booklist_id = await pick_targets()
+    scenarios = {
+        "GET /works": (orm_works, core_works, (args.limit,)),
+        "GET /work/{id}": (orm_work, core_work, (work_id,)),
+        "GET /list/{id}?enriched": (
+            orm_booklist,
+            core_booklist,
+            (booklist_id, args.limit),
+        ),
+    }
+
+    print(
+        f"{args.requests} requests per scenario, concurrency {args.concurrency}, "
+        f"page size {args.limit}"
+    )
+    for name, (orm_handler, core_handler, handler_args) in scenarios.items():
+        if None in handler_args:
+            print(f"  {name}: skipped, no data")
+            continue
+        print(f"  {name}")
+        for mode, handler, runner in (
+            ("orm", orm_handler, run_orm),
+            ("core", core_handler, run_core),
+        ):
+            # Warm up connections and statement caches before timing
+            await runner(handler, handler_args, args.concurrency, args.concurrency)
+            elapsed, latencies = await runner(
+                handler, handler_args, args.requests, args.concurrency
+            )
+            quantiles = statistics.quantiles(latencies, n=20)
+            print(
+                f"    {mode:5s} {args.requests / elapsed:8.1f} req/s  "
+                f"p50 {quantiles[9] * 1000:7.1f} ms  "
+                f"p95 {quantiles[18] * 1000:7.1f} ms  "
+                f"peak {await peak_kib(mode, handler, handler_args):8.1f} KiB/request"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
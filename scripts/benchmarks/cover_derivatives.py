@@ -0,0 +1,93 @@
+"""
+Measure the cover derivative pipeline.
+
+Renders variants for a batch of synthetic covers (shapes on a gradient with
+some grain, so they compress roughly like scans rather than flat colour) in the calling thread and in the
+process pool, reporting covers per second, and compares the bytes a client
+downloads for the original against each variant width.
+
+Run: `poetry run python -m scripts.benchmarks.cover_derivatives --covers 100`
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from io import BytesIO
+from multiprocessing import get_context
+
+from PIL import Image, ImageDraw, ImageFilter
+
+from app.services.cover_derivatives import render_cover_derivatives
+
+
+def make_cover(width, height, seed=1):
+    """A gradient with blurred shapes and grain, roughly like a cover scan."""
+    rng = random.Random(seed)
+    image = Image.merge(
+        "RGB",
+        [
+            Image.linear_gradient("L").resize((width, height)),
+            Image.radial_gradient("L").resize((width, height)),
+            Image.linear_gradient("L").rotate(90).resize((width, height)),
+        ],
+    )
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        size = rng.randrange(20, width // 3)
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+        shape((x, y, x + size, y + size), fill=colour)
+    image = image.filter(ImageFilter.GaussianBlur(2))
+    grain = Image.effect_noise((width, height), 12).convert("RGB")
+    image = Image.blend(image, grain, 0.08)
+    encoded = BytesIO()
+    image.save(encoded, format="JPEG", quality=90)
+    return encoded.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--covers", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--widths", type=int, nargs="+", default=[160, 320, 640])
+    args = parser.parse_args()
+
+    cover = make_cover(1000, 1500)
+    print(
+        f"{args.covers} covers of 1000x1500 ({len(cover) / 1024:.0f} KiB jpeg), "
+        f"widths {args.widths}"
+    )
+
+    started = time.perf_counter()
+    for _ in range(args.covers):
+        rendered = render_cover_derivatives(cover, args.widths)
+    elapsed = time.perf_counter() - started
+    print(f"  inline       {args.covers / elapsed:7.1f} covers/s")
+
+    with ProcessPoolExecutor(args.processes, mp_context=get_context("spawn")) as pool:
+        # Start the workers before timing
+        wait([pool.submit(render_cover_derivatives, cover, [16])] * args.processes)
+        started = time.perf_counter()
+        wait(
+            [
+                pool.submit(render_cover_derivatives, cover, args.widths)
+                for _ in range(args.covers)
+            ]
+        )
+        elapsed = time.perf_counter() - started
+    print(f"  {args.processes:2d} processes {args.covers / elapsed:7.1f} covers/s")
+
+    print("  bytes per cover download")
+    print(f"    original     {len(cover) / 1024:7.1f} KiB")
+    for variant in rendered.variants:
+        print(
+            f"    {variant.width:4d}w {variant.format:5s} "
+            f"{len(variant.data) / 1024:7.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
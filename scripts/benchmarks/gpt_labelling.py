@@ -0,0 +1,101 @@
+"""
+Compare sequential and concurrent GPT labelling against the stub LLM server.
+
+Labels `--works` synthetic prompts through `GptLabeller` with the stub
+(`app.services.gpt.stub_server`) served in-process, which answers after
+`--latency` seconds like a slow completion would:
+
+- **sequential**: one request in flight, as `label_with_gpt` did per work.
+- **concurrent**: up to `--concurrency` requests in flight, within the
+  request and token per-minute budgets.
+- **cached**: the same prompts again, answered from the prompt cache.
+
+Run: `poetry run python -m scripts.benchmarks.gpt_labelling --works 50 --latency 1`
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+import httpx
+import openai
+
+from app.services.gpt import labelling_worker
+from app.services.gpt.labelling_worker import GptLabeller, LabelPromptCache
+from app.services.gpt.stub_server import create_stub_llm_app
+from app.services.object_storage import LocalObjectStorage
+
+
+def make_labeller(stub, concurrency, args, cache=None):
+    client = openai.AsyncOpenAI(
+        api_key="stub",
+        base_url="http://stub/v1",
+        http_client=httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=stub), timeout=60
+        ),
+    )
+    return GptLabeller(
+        client=client,
+        model="stub-model",
+        concurrency=concurrency,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        cache=cache,
+    )
+
+
+async def timed(labeller, prompts):
+    started = time.perf_counter()
+    results = await labeller.label_many(prompts)
+    elapsed = time.perf_counter() - started
+    assert all(result.output is not None for result in results)
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--works", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests-per-minute", type=int, default=500)
+    parser.add_argument("--tokens-per-minute", type=int, default=300_000)
+    args = parser.parse_args()
+
+    prompts = [
+        (work_id, f"Title: Book {work_id}\n" + "Summary of the book. " * 100)
+        for work_id in range(args.works)
+    ]
+    print(
+        f"{args.works} works, {args.latency}s per completion, "
+        f"{args.requests_per_minute} requests/min, "
+        f"{args.tokens_per_minute} tokens/min"
+    )
+
+    stub = create_stub_llm_app(latency=args.latency)
+    elapsed = await timed(make_labeller(stub, 1, args), prompts)
+    print(f"  sequential     {args.works / elapsed:7.2f} works/s")
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalObjectStorage(root, "http://localhost")
+        labelling_worker.get_object_storage = lambda: storage
+        cache = LabelPromptCache("benchmark")
+
+        stub = create_stub_llm_app(latency=args.latency)
+        labeller = make_labeller(stub, args.concurrency, args, cache)
+        elapsed = await timed(labeller, prompts)
+        print(
+            f"  concurrent x{args.concurrency:<2d} {args.works / elapsed:7.2f} works/s"
+        )
+
+        requests = stub.state.requests
+        elapsed = await timed(labeller, prompts)
+        print(
+            f"  cached         {args.works / elapsed:7.2f} works/s  "
+            f"({stub.state.requests - requests} requests)"
+        )
+        storage.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+"""
+Compare per-labelset and bulk labelset patching.
+
+Takes the labelsets of `--works` works from the configured Postgres database
+and applies the same GPT-style patch (new hues and reading abilities) two
+ways:
+
+- **per-labelset**: `labelset_repository.patch` for each work, as hydration
+  and the old PATCH `/v1/labelsets` did.
+- **bulk**: `labelset_repository.patch_many`, as PATCH `/v1/labelsets` and
+  the GPT labelling worker now do, which replaces every changed association
+  with one DELETE and one INSERT per table.
+
+Reports wall time and statements sent for each. Nothing is committed; each
+run is rolled back. Needs a database with labelled works and the hue and
+reading ability reference rows, e.g. the seeded dev stack.
+
+Run: `poetry run python -m scripts.benchmarks.labelset_patch --works 2000`
+"""
+
+import argparse
+import random
+import time
+
+from sqlalchemy import event, select
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.db.session import get_session_maker
+from app.models import Work
+from app.models.labelset import LabelOrigin
+from app.repositories.labelset_repository import labelset_repository
+from app.schemas.labelset import LabelSetCreateIn
+from app.services.reference_data import get_reference_data
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        event.listen(engine, "before_cursor_execute", self.on_execute)
+
+    def on_execute(self, *args):
+        self.statements += 1
+
+    def reset(self):
+        self.statements = 0
+
+
+def random_patches(work_ids, reference):
+    hue_keys = list(reference.hues)
+    reading_ability_keys = list(reference.reading_abilities)
+    patches = {}
+    for work_id in work_ids:
+        primary, secondary, tertiary = random.sample(hue_keys, 3)
+        patches[work_id] = LabelSetCreateIn(
+            hue_primary_key=primary,
+            hue_secondary_key=secondary,
+            hue_tertiary_key=tertiary,
+            hue_origin=LabelOrigin.HUMAN,
+            reading_ability_keys=random.sample(reading_ability_keys, 2),
+            reading_ability_origin=LabelOrigin.HUMAN,
+        )
+    return patches
+
+
+def patch_one_at_a_time(session, labelsets, patches):
+    for work_id, labelset in labelsets.items():
+        labelset_repository.patch(session, labelset, patches[work_id], commit=False)
+        session.flush()
+
+
+def patch_in_bulk(session, labelsets, patches):
+    labelset_repository.patch_many(
+        session,
+        [(labelset, patches[work_id]) for work_id, labelset in labelsets.items()],
+        commit=False,
+    )
+    session.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--works", type=int, default=2000)
+    args = parser.parse_args()
+
+    session_maker = get_session_maker()
+    with session_maker() as session:
+        work_ids = session.scalars(
+            select(Work.id).order_by(Work.id).limit(args.works)
+        ).all()
+        reference = get_reference_data(session)
+        if len(reference.hues) < 3 or len(reference.reading_abilities) < 2:
+            print("Needs the hue and reading ability reference data")
+            return
+        patches = random_patches(work_ids, reference)
+
+        counter = StatementCounter(session.get_bind())
+        print(f"Patching the labelsets of {len(work_ids)} works")
+        for name, patch in (
+            ("per-labelset", patch_one_at_a_time),
+            ("bulk", patch_in_bulk),
+        ):
+            try:
+                labelsets = labelset_repository.get_or_create_many(
+                    session, work_ids, commit=False
+                )
+                counter.reset()
+                started = time.perf_counter()
+                patch(session, labelsets, patches)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {name:13s} {elapsed:7.2f} s  {len(work_ids) / elapsed:8.0f} works/s  "
+                    f"{counter.statements:6d} statements"
+                )
+            finally:
+                session.rollback()
+
+
+if __name__ == "__main__":
+    main()
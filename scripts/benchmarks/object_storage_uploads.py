@@ -0,0 +1,121 @@
+"""
+Compare cover upload strategies for a bulk hydration sized batch.
+
+Uploads the same set of base64 encoded covers three ways:
+
+- **per-call**: the previous `base64_string_to_bucket` flow - a new storage
+  client and a bucket metadata request per image, the whole payload decoded
+  in one `b64decode`, then a blocking upload.
+- **pooled**: one process-wide `ObjectStorage` with cached buckets and
+  chunked decoding, still uploading in the foreground.
+- **background**: the pooled storage uploading an `UploadBatch` on its
+  thread pool, waiting once for the whole batch with `drain()` (what
+  `hydrate_bulk` does per chunk).
+
+The local filesystem backend has no network round trips, so `--latency-ms`
+adds a simulated round trip to every storage request (client creation,
+bucket lookup and upload) to approximate Cloud Storage. Also reports the
+peak Python allocation for one upload (tracemalloc).
+
+Run: `poetry run python -m scripts.benchmarks.object_storage_uploads --images 200`
+"""
+
+import argparse
+import base64
+import os
+import tempfile
+import time
+import tracemalloc
+from base64 import b64decode
+
+from app.services.object_storage import LocalObjectStorage, Upload
+
+BUCKET = "benchmark-images"
+
+
+class SlowLocalObjectStorage(LocalObjectStorage):
+    def __init__(self, root, latency, max_concurrent_uploads):
+        super().__init__(root, "http://localhost", max_concurrent_uploads)
+        self.latency = latency
+
+    def connect(self):
+        # Stands in for storage.Client() and client.get_bucket()
+        time.sleep(2 * self.latency)
+
+    def _write(self, bucket, blob_name, data, content_type):
+        time.sleep(self.latency)
+        super()._write(bucket, blob_name, data, content_type)
+
+
+def per_call(storage, covers):
+    for isbn, data in covers:
+        storage.connect()
+        filetype = data.split(";")[0].split("/")[1]
+        data_bytes = b64decode(data.split(",")[1])
+        storage.upload(
+            Upload(BUCKET, f"wriveted/{isbn}.{filetype}", data_bytes, "image/png")
+        )
+
+
+def pooled(storage, covers):
+    for isbn, data in covers:
+        storage.upload_image(data, BUCKET, "wriveted", isbn)
+
+
+def background(storage, covers):
+    uploads = storage.batch()
+    for isbn, data in covers:
+        uploads.upload_image(data, BUCKET, "wriveted", isbn)
+    assert uploads.drain() == []
+
+
+def peak_kib(strategy, storage, cover):
+    tracemalloc.start()
+    strategy(storage, [cover])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--image-kib", type=int, default=150)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    image = b"\x89PNG\r\n\x1a\n" + os.urandom(args.image_kib * 1024)
+    encoded = base64.b64encode(image).decode()
+    covers = [
+        (f"978{n:010d}", f"data:image/png;base64,{encoded}") for n in range(args.images)
+    ]
+
+    print(
+        f"{args.images} covers of {args.image_kib} KiB, "
+        f"{args.latency_ms} ms simulated round trip, "
+        f"{args.concurrency} upload threads"
+    )
+    for name, strategy in (
+        ("per-call", per_call),
+        ("pooled", pooled),
+        ("background", background),
+    ):
+        with tempfile.TemporaryDirectory() as root:
+            storage = SlowLocalObjectStorage(
+                root, args.latency_ms / 1000, args.concurrency
+            )
+            started = time.perf_counter()
+            strategy(storage, covers)
+            elapsed = time.perf_counter() - started
+            peak = peak_kib(strategy, storage, covers[0])
+            storage.shutdown()
+        print(
+            f"  {name:10s} {args.images / elapsed:8.1f} images/s  "
+            f"{elapsed * 1000 / args.images:7.1f} ms/image  "
+            f"peak {peak:8.1f} KiB/upload"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark PII masking of trace state snapshots on large session states.
+
+Compares the previous approach (mask state_before and state_after in full)
+against `PIIMasker.mask_state_pair`, which only masks what changed.
+
+Run: `poetry run python -m scripts.benchmarks.pii_masker`
+"""
+
+import argparse
+import copy
+import random
+import time
+
+from app.services.pii_masker import PIIMasker
+
+
+def build_session_state(turns: int, seed: int) -> dict:
+    """A synthetic long-running chat session state."""
+    rng = random.Random(seed)
+    return {
+        "user": {
+            "id": "4b7b1c1e-2f7b-4a55-9d7a-9e1f2c3d4e5f",
+            "first_name": "Sam",
+            "email": "parent@example.com",
+            "age": 9,
+            "reading_ability": "TREEHOUSE",
+        },
+        "context": {"school_name": "Example Primary", "locale": "en-AU"},
+        "temp": {
+            "shown_ids": [f"{rng.getrandbits(64):016x}" for _ in range(turns)],
+            "quiz": {
+                f"q{i}": {
+                    "answer": rng.choice(["dragons", "space", "horses", "robots"]),
+                    "comment": f"I liked question {i}, ask again at 10.0.0.{i % 255}",
+                }
+                for i in range(turns)
+            },
+        },
+        "_current_options": [
+            {"value": f"option_{i}", "label": f"Option {i}"} for i in range(8)
+        ],
+    }
+
+
+def next_turn(state: dict, turn: int) -> dict:
+    """What a single click typically changes."""
+    after = copy.deepcopy(state)
+    after["temp"]["shown_ids"].append(f"{turn:016x}")
+    after["temp"]["last_answer"] = f"answer {turn}"
+    return after
+
+
+def timed(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    before = build_session_state(args.turns, args.seed)
+    after = next_turn(before, args.turns)
+
+    masker = PIIMasker()
+
+    def full():
+        masker.mask_state(before)
+        masker.mask_state(after)
+
+    def pair():
+        masker.mask_state_pair(before, after)
+
+    assert masker.mask_state_pair(before, after) == (
+        masker.mask_state(before),
+        masker.mask_state(after),
+    )
+
+    full_ms = timed(full, args.iterations)
+    pair_ms = timed(pair, args.iterations)
+    print(f"Session state with {args.turns} turns")
+    print(f"  mask before + after: {full_ms:8.3f} ms/step")
+    print(f"  mask_state_pair:     {pair_ms:8.3f} ms/step")
+    print(f"  speedup:             {full_ms / pair_ms:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
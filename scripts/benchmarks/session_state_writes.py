@@ -0,0 +1,177 @@
+"""
+Benchmark session state writes over a long chat session.
+
+Replays a synthetic 200-turn session against a scratch table in the
+configured Postgres database, comparing the previous write (send and store
+the full state each turn) with the patch write used by
+`ChatRepository.update_session_state` (`state || patch` with only the
+touched top-level keys). Reports bytes sent, WAL generated and the size of
+the table's TOAST relation afterwards, plus hashing cost in Python.
+
+Postgres still rewrites the whole (TOASTed) jsonb value on every UPDATE, so
+expect the WAL and TOAST numbers to move much less than bytes sent.
+
+Run: `poetry run python -m scripts.benchmarks.session_state_writes`
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import text
+
+from app.db.session import get_async_session_maker
+from app.repositories.chat_repository import ChatRepository
+
+TABLE = "bench_session_state"
+
+
+def build_turns(turns: int, seed: int) -> tuple[dict, list[dict]]:
+    """Initial state plus the state_updates each turn sends."""
+    rng = random.Random(seed)
+    initial = {
+        "user": {"id": "4b7b1c1e-2f7b-4a55-9d7a-9e1f2c3d4e5f", "age": 9},
+        "context": {"school_name": "Example Primary", "locale": "en-AU"},
+        "temp": {"shown_ids": [], "quiz": {}},
+    }
+    updates = []
+    for turn in range(turns):
+        update = {
+            "temp": {
+                "quiz": {
+                    f"q{turn}": {
+                        "answer": rng.choice(["dragons", "space", "horses"]),
+                        "comment": "x" * rng.randint(20, 200),
+                    }
+                }
+            },
+            "_current_options": [
+                {"value": f"option_{i}", "label": f"Option {turn}-{i}"}
+                for i in range(rng.randint(2, 8))
+            ],
+        }
+        if turn % 10 == 0:
+            update["user"] = {"last_answer_turn": turn}
+        updates.append(update)
+    return initial, updates
+
+
+async def wal_lsn(conn) -> str:
+    return (await conn.execute(text("SELECT pg_current_wal_lsn()"))).scalar_one()
+
+
+async def run(session_maker, mode: str, initial: dict, updates: list[dict]):
+    repo = ChatRepository()
+    sent = 0
+    async with session_maker() as db:
+        await db.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        await db.execute(
+            text(f"CREATE TABLE {TABLE} (id int PRIMARY KEY, state jsonb, hash text)")
+        )
+        await db.execute(
+            text(f"INSERT INTO {TABLE} VALUES (1, CAST(:state AS jsonb), NULL)"),
+            {"state": json.dumps(initial)},
+        )
+        await db.commit()
+
+        state = dict(initial)
+        state_hash = repo._calculate_state_hash(state)
+        start_lsn = await wal_lsn(db)
+        start = time.perf_counter()
+        for update in updates:
+            patch = repo._build_state_patch(state, update)
+            new_state = {**state, **patch}
+            if mode == "full":
+                payload = json.dumps(new_state)
+                state_hash = repo._calculate_state_hash(new_state)
+                sql = f"UPDATE {TABLE} SET state = CAST(:p AS jsonb), hash = :h"
+            else:
+                payload = json.dumps(patch)
+                state_hash = repo._update_state_hash(
+                    state_hash, state, new_state, patch
+                )
+                sql = (
+                    f"UPDATE {TABLE} SET state = state || CAST(:p AS jsonb), hash = :h"
+                )
+            sent += len(payload)
+            await db.execute(
+                text(sql + " WHERE id = 1"), {"p": payload, "h": state_hash}
+            )
+            await db.commit()
+            state = new_state
+        elapsed = time.perf_counter() - start
+        end_lsn = await wal_lsn(db)
+
+        wal_bytes, toast_bytes = (
+            await db.execute(
+                text(
+                    "SELECT pg_wal_lsn_diff(:end, :start), "
+                    "pg_total_relation_size(reltoastrelid) "
+                    "FROM pg_class WHERE relname = :table"
+                ),
+                {"end": end_lsn, "start": start_lsn, "table": TABLE},
+            )
+        ).one()
+        stored = (
+            await db.execute(text(f"SELECT state FROM {TABLE} WHERE id = 1"))
+        ).scalar_one()
+        assert stored == state, "database state diverged from in-memory state"
+        await db.execute(text(f"DROP TABLE {TABLE}"))
+        await db.commit()
+
+    return {
+        "sent": sent,
+        "wal": int(wal_bytes),
+        "toast": int(toast_bytes),
+        "ms_per_turn": elapsed / len(updates) * 1000,
+    }
+
+
+def hash_timings(initial: dict, updates: list[dict]) -> tuple[float, float]:
+    repo = ChatRepository()
+    full = incremental = 0.0
+    state = dict(initial)
+    digests = {}
+    state_hash = repo._calculate_state_hash(state, digests)
+    for update in updates:
+        patch = repo._build_state_patch(state, update)
+        new_state = {**state, **patch}
+        start = time.perf_counter()
+        repo._calculate_state_hash(new_state)
+        full += time.perf_counter() - start
+        start = time.perf_counter()
+        state_hash = repo._update_state_hash(
+            state_hash, state, new_state, patch, digests=digests
+        )
+        incremental += time.perf_counter() - start
+        state = new_state
+    return full / len(updates) * 1000, incremental / len(updates) * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    initial, updates = build_turns(args.turns, args.seed)
+    session_maker = get_async_session_maker()
+
+    print(f"Session with {args.turns} turns")
+    for mode in ("full", "patch"):
+        result = await run(session_maker, mode, initial, updates)
+        print(
+            f"  {mode:6s} sent {result['sent'] / 1024:9.1f} KiB  "
+            f"WAL {result['wal'] / 1024:9.1f} KiB  "
+            f"TOAST {result['toast'] / 1024:7.1f} KiB  "
+            f"{result['ms_per_turn']:6.2f} ms/turn"
+        )
+
+    full_ms, incremental_ms = hash_timings(initial, updates)
+    print(f"  state hash: full {full_ms:.3f} ms/turn, incremental {incremental_ms:.3f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
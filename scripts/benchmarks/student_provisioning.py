@@ -0,0 +1,151 @@
+"""
+Compare one-at-a-time and bulk student provisioning.
+
+Creates `--students` students in a scratch class of the first school in the
+configured Postgres database two ways:
+
+- **per-student**: what `/auth/register-student` does for each student - a
+  username lookup, an ORM insert across users/readers/students, an event and
+  a commit.
+- **bulk**: `provision_students`, as used by `POST /class/{id}/students` -
+  batched username allocation, multi-row inserts into each table, one
+  summary event and one commit.
+
+Reports wall time, statements sent and commits for each. The scratch
+classes, their students and events are deleted afterwards.
+
+Run: `poetry run python -m scripts.benchmarks.student_provisioning --students 2000`
+"""
+
+import argparse
+import time
+
+from sqlalchemy import delete, event, select
+
+# crud has to be imported before app.services.booklists to resolve their cycle
+from app import crud  # noqa: F401
+from app.db.session import get_session_maker
+from app.models import ClassGroup, Event, School, Student, User
+from app.models.user import UserAccountType
+from app.repositories.event_repository import event_repository
+from app.schemas.class_group import StudentRosterEntry
+from app.services.class_groups import provision_students
+from app.services.users import new_identifiable_username
+
+FIRST_NAMES = ["Ava", "Noah", "Mia", "Leo", "Isla", "Jack", "Zoe", "Oliver"]
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, "before_cursor_execute", self.on_execute)
+        event.listen(engine, "commit", self.on_commit)
+
+    def on_execute(self, *args):
+        self.statements += 1
+
+    def on_commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+
+def roster(count):
+    # 8 first names x 26 initials, so usernames collide like a real school's
+    return [
+        StudentRosterEntry(
+            first_name=FIRST_NAMES[i % len(FIRST_NAMES)],
+            last_name_initial=chr(ord("A") + (i // len(FIRST_NAMES)) % 26),
+        )
+        for i in range(count)
+    ]
+
+
+def provision_one_at_a_time(session, class_group, entries):
+    school = class_group.school
+    for entry in entries:
+        student = Student(
+            type=UserAccountType.STUDENT,
+            is_active=True,
+            name=f"{entry.first_name} {entry.last_name_initial}",
+            username=new_identifiable_username(
+                entry.first_name, entry.last_name_initial, session, school.id
+            ),
+            first_name=entry.first_name,
+            last_name_initial=entry.last_name_initial,
+            school_id=school.id,
+            class_group_id=class_group.id,
+            info={"sign_in_provider": "class-code"},
+        )
+        session.add(student)
+        event_repository.create(
+            session=session,
+            title="Student account created",
+            description=f"User type: {student.type}",
+            account=student,
+            school=school,
+            commit=False,
+        )
+        session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=2000)
+    args = parser.parse_args()
+
+    session_maker = get_session_maker()
+    with session_maker() as session:
+        school = session.scalars(select(School).order_by(School.id).limit(1)).first()
+        if school is None:
+            print("Needs a school in the database")
+            return
+
+        counter = StatementCounter(session.get_bind())
+        entries = roster(args.students)
+        print(f"Provisioning {args.students} students into {school.name}")
+        class_ids = []
+        try:
+            for name, provision in (
+                ("per-student", provision_one_at_a_time),
+                ("bulk", provision_students),
+            ):
+                class_group = ClassGroup(
+                    name=f"student_provisioning benchmark {name}",
+                    school_id=school.wriveted_identifier,
+                    join_code=f"BENCH{len(class_ids)}",
+                )
+                session.add(class_group)
+                session.commit()
+                class_ids.append(class_group.id)
+
+                counter.reset()
+                started = time.perf_counter()
+                provision(session, class_group, entries)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {name:12s} {elapsed:7.2f} s  {args.students / elapsed:8.0f} students/s  "
+                    f"{counter.statements:6d} statements  {counter.commits:5d} commits"
+                )
+        finally:
+            session.rollback()
+            student_ids = select(Student.id).where(
+                Student.class_group_id.in_(class_ids)
+            )
+            session.execute(delete(Event).where(Event.user_id.in_(student_ids)))
+            session.execute(
+                delete(Event).where(
+                    Event.info["class_group_id"].astext.in_(
+                        [str(id) for id in class_ids]
+                    )
+                )
+            )
+            session.execute(delete(User).where(User.id.in_(student_ids)))
+            session.execute(delete(ClassGroup).where(ClassGroup.id.in_(class_ids)))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
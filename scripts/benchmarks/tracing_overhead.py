@@ -0,0 +1,122 @@
+"""
+Benchmark per-request overhead of tracing configurations.
+
+Each request to the stub endpoint emits a server span plus a number of child
+spans (standing in for the SQL/asyncpg/httpx spans a chat interaction emits).
+The exporter sleeps to simulate the network round trip to Cloud Trace, which
+is what made synchronous SimpleSpanProcessor export expensive.
+
+Run: `poetry run python -m scripts.benchmarks.tracing_overhead`
+"""
+
+import argparse
+import statistics
+import time
+
+from fastapi import FastAPI
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import (
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from starlette.testclient import TestClient
+
+from app.config import Settings
+from app.logging import build_tracer_provider
+
+
+class SlowExporter(SpanExporter):
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.exported = 0
+
+    def export(self, spans):
+        time.sleep(self.latency)
+        self.exported += len(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        pass
+
+
+def build_app(provider: TracerProvider | None, child_spans: int) -> FastAPI:
+    app = FastAPI()
+    tracer = provider.get_tracer(__name__) if provider else None
+
+    @app.post("/v1/chat/sessions/{token}/interact")
+    def interact(token: str):
+        if tracer is not None:
+            for i in range(child_spans):
+                with tracer.start_as_current_span(f"SELECT {i}"):
+                    pass
+        return {"ok": True}
+
+    if provider is not None:
+        FastAPIInstrumentor.instrument_app(app, tracer_provider=provider)
+    return app
+
+
+def run(app: FastAPI, requests: int) -> list[float]:
+    timings = []
+    with TestClient(app) as client:
+        for i in range(requests):
+            start = time.perf_counter()
+            client.post(f"/v1/chat/sessions/token-{i}/interact")
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--child-spans", type=int, default=20)
+    parser.add_argument("--export-latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    def settings(**overrides) -> Settings:
+        return Settings(
+            POSTGRESQL_PASSWORD="bench",
+            SECRET_KEY="bench",
+            SENDGRID_API_KEY="bench",
+            SHOPIFY_HMAC_SECRET="bench",
+            **overrides,
+        )
+
+    def simple_provider(exporter):
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        return provider
+
+    scenarios = {
+        "tracing off": lambda exporter: None,
+        "simple processor (previous)": simple_provider,
+        "batch, sample all": lambda exporter: build_tracer_provider(
+            settings(), exporter
+        ),
+        "batch, interact sampled at 1%": lambda exporter: build_tracer_provider(
+            settings(OTEL_ROUTE_SAMPLE_RATES={"/v1/chat/sessions/*/interact": 0.01}),
+            exporter,
+        ),
+    }
+
+    print(
+        f"{args.requests} requests, {args.child_spans} child spans, "
+        f"{args.export_latency_ms}ms export latency"
+    )
+    for name, make_provider in scenarios.items():
+        exporter = SlowExporter(args.export_latency_ms)
+        provider = make_provider(exporter)
+        timings = run(build_app(provider, args.child_spans), args.requests)
+        if provider is not None:
+            provider.shutdown()
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(
+            f"  {name:32s} mean {statistics.mean(timings):7.2f}ms "
+            f"p95 {p95:7.2f}ms  spans exported {exporter.exported}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark flow event webhook fan-out against a local stub receiver.
+
+Simulates busy sessions emitting bursts of node_changed events and delivers
+them to a stub webhook receiver (served with uvicorn on localhost), comparing
+the previous fan-out (one POST per event per webhook, awaited in the
+listener) with per-session debouncing plus queued, batched delivery.
+
+Run: `poetry run python -m scripts.benchmarks.webhook_fanout`
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import httpx
+import uvicorn
+from pydantic import HttpUrl
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from app.services.event_listener import FlowEvent, FlowEventCoalescer
+from app.services.webhook_notifier import WebhookConfig, WebhookNotifier, WebhookPayload
+
+
+class StubReceiver:
+    def __init__(self, latency_ms: float):
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self.events = 0
+
+    async def receive(self, request: Request) -> Response:
+        body = await request.json()
+        self.requests += 1
+        self.events += len(body["events"]) if "events" in body else 1
+        await asyncio.sleep(self.latency)
+        return Response(status_code=204)
+
+
+def build_events(sessions: int, turns: int, seed: int) -> list[FlowEvent]:
+    """Interleaved bursts of node changes from many sessions."""
+    rng = random.Random(seed)
+    flow_id = uuid.UUID(int=rng.getrandbits(128))
+    events = []
+    for _ in range(sessions):
+        session_id = uuid.UUID(int=rng.getrandbits(128))
+        events.append(
+            FlowEvent(
+                event_type="session_started",
+                session_id=session_id,
+                flow_id=flow_id,
+                timestamp=0,
+                current_node="node_0",
+                revision=1,
+            )
+        )
+        for turn in range(1, turns + 1):
+            events.append(
+                FlowEvent(
+                    event_type="node_changed",
+                    session_id=session_id,
+                    flow_id=flow_id,
+                    timestamp=turn,
+                    previous_node=f"node_{turn - 1}",
+                    current_node=f"node_{turn}",
+                    revision=turn + 1,
+                    previous_revision=turn,
+                )
+            )
+    # Keep each session's events in order while interleaving sessions
+    rng.shuffle(events)
+    events.sort(key=lambda event: (event.revision, rng.random()))
+    return events
+
+
+def to_payload(event: FlowEvent) -> WebhookPayload:
+    return WebhookPayload(
+        event_type=event.event_type,
+        timestamp=event.timestamp,
+        session_id=str(event.session_id),
+        flow_id=str(event.flow_id),
+        data={"current_node": event.current_node},
+    )
+
+
+async def run_previous(webhooks, events, client, burst_gap):
+    notifier = WebhookNotifier()
+    notifier.client = client
+    for event in events:
+        payload = to_payload(event)
+        await asyncio.gather(
+            *(notifier._send_webhook(webhook, payload) for webhook in webhooks)
+        )
+        await asyncio.sleep(burst_gap)
+
+
+async def run_coalesced(webhooks, events, client, burst_gap, debounce_ms):
+    notifier = WebhookNotifier()
+    notifier.client = client
+    for webhook in webhooks:
+        notifier.add_webhook(webhook)
+    coalescer = FlowEventCoalescer(
+        notifier.notify_event, debounce_seconds=debounce_ms / 1000
+    )
+    for event in events:
+        coalescer.add(event)
+        await asyncio.sleep(burst_gap)
+    await coalescer.flush_all()
+    await notifier.wait_until_idle()
+    for webhook in webhooks:
+        notifier.remove_webhook(str(webhook.url))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--webhooks", type=int, default=3)
+    parser.add_argument("--receiver-latency-ms", type=float, default=5.0)
+    parser.add_argument("--burst-gap-ms", type=float, default=0.2)
+    parser.add_argument("--debounce-ms", type=float, default=250)
+    parser.add_argument("--port", type=int, default=8931)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    receiver = StubReceiver(args.receiver_latency_ms)
+    app = Starlette(routes=[Route("/hook/{n}", receiver.receive, methods=["POST"])])
+    server = uvicorn.Server(
+        uvicorn.Config(app, port=args.port, log_level="warning", access_log=False)
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    events = build_events(args.sessions, args.turns, args.seed)
+    urls = [
+        HttpUrl(f"http://127.0.0.1:{args.port}/hook/{n}") for n in range(args.webhooks)
+    ]
+    scenarios = {
+        "per event (previous)": lambda client: run_previous(
+            [WebhookConfig(url=url) for url in urls],
+            events,
+            client,
+            args.burst_gap_ms / 1000,
+        ),
+        "debounced": lambda client: run_coalesced(
+            [WebhookConfig(url=url) for url in urls],
+            events,
+            client,
+            args.burst_gap_ms / 1000,
+            args.debounce_ms,
+        ),
+        "debounced + batched": lambda client: run_coalesced(
+            [WebhookConfig(url=url, batch_events=True) for url in urls],
+            events,
+            client,
+            args.burst_gap_ms / 1000,
+            args.debounce_ms,
+        ),
+    }
+
+    print(
+        f"{len(events)} events from {args.sessions} sessions, "
+        f"{args.webhooks} webhooks, {args.receiver_latency_ms}ms receiver latency"
+    )
+    async with httpx.AsyncClient() as client:
+        for name, scenario in scenarios.items():
+            receiver.requests = receiver.events = 0
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            await scenario(client)
+            cpu = time.process_time() - cpu_start
+            wall = time.perf_counter() - wall_start
+            print(
+                f"  {name:22s} requests {receiver.requests:6d}  "
+                f"events delivered {receiver.events:6d}  "
+                f"wall {wall:6.2f}s  cpu {cpu:6.2f}s"
+            )
+
+    server.should_exit = True
+    await server_task
+
+
+if __name__ == "__main__":
+    asyncio.run(main())